@@ -0,0 +1,36 @@
+"""Helpers shared by the benchmark scripts"""
+import json
+import logging
+import sys
+from typing import Any, Dict, Optional
+
+import click
+
+
+def setup_logging(verbose: bool) -> None:
+    # the output of the benchmark goes to stdout, the logs to stderr
+    logging.basicConfig(
+        level=logging.INFO if verbose else logging.WARNING,
+        format="%(asctime)-15s %(levelname)-9s %(name)s: %(message)s",
+        stream=sys.stderr,
+    )
+
+
+def round_floats(value: Any, digits: int = 4) -> Any:
+    """Round all floats, so the reports of different runs can be diffed"""
+    if isinstance(value, float):
+        return round(value, digits)
+    if isinstance(value, dict):
+        return {key: round_floats(item, digits) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [round_floats(item, digits) for item in value]
+    return value
+
+
+def write_report(report: Dict[str, Any], output: Optional[str] = None) -> None:
+    """Write the report as JSON with sorted keys to stdout and to `output` if given"""
+    text = json.dumps(round_floats(report), indent=2, sort_keys=True) + "\n"
+    click.echo(text, nl=False)
+    if output is not None:
+        with open(output, "w") as output_file:
+            output_file.write(text)
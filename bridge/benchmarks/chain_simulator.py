@@ -0,0 +1,829 @@
+"""A simulated chain in the process, usable as web3 provider instead of a node
+
+The chain produces blocks on its own every `block_time` seconds or whenever
+`mine_block` is called, and replaces its latest blocks in a reorg either at random
+or whenever `reorg` is called. Transactions are executed as soon as they are sent and
+are included in the next block. Contracts are simulated in python, for the bridge
+there are simulations of the token, the home bridge and the validator proxy. The
+state of the contracts is not rolled back in a reorg, only the blocks change.
+
+The provider answers the JSON-RPC requests the bridge sends to a node. It can add
+latency, inject errors and timeouts, limit the results of eth_getLogs like public
+nodes do, and pretend to be still syncing, either like geth or like a parity node
+in warp sync with a gap of blocks not synced yet.
+
+Within `simulated_providers`, `bridge.main` uses the given providers instead of
+connecting to their rpc urls, which allows to run the components of the bridge
+against simulated chains in the benchmarks and the tests.
+"""
+import collections
+import contextlib
+import itertools
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import attr
+import gevent
+import requests
+import rlp
+from eth_abi import decode_abi, encode_abi
+from eth_account import Account
+from eth_utils import (
+    big_endian_to_int,
+    decode_hex,
+    encode_hex,
+    event_abi_to_log_topic,
+    function_abi_to_4byte_selector,
+    int_to_big_endian,
+    keccak,
+    to_canonical_address,
+    to_checksum_address,
+)
+from web3.providers.base import BaseProvider
+
+import bridge.main
+from bridge.contract_abis import (
+    HOME_BRIDGE_ABI,
+    MINIMAL_ERC20_TOKEN_ABI,
+    MINIMAL_VALIDATOR_PROXY_ABI,
+)
+from bridge.events import ChainRole
+from bridge.service import Service
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CLIENT_VERSION = "Geth/v1.9.14-simulated"
+PARITY_CLIENT_VERSION = "Parity-Ethereum//v2.7.2-stable-simulated"
+BLOCK_GAS_LIMIT = 8_000_000
+
+
+class SimulatedRpcError(Exception):
+    """Answered as JSON-RPC error response"""
+
+    def __init__(self, message: str, code: int = -32000) -> None:
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+class SimulatedNodeError(ConnectionError):
+    """Injected error, as if the node could not be reached"""
+
+
+class RevertError(Exception):
+    pass
+
+
+@attr.s(auto_attribs=True)
+class SimulatedLog:
+    address: bytes
+    topics: List[bytes]
+    data: bytes
+
+
+@attr.s(auto_attribs=True)
+class SimulatedTransaction:
+    hash: bytes
+    sender: bytes
+    to: Optional[bytes]
+    nonce: int
+    data: bytes = b""
+    value: int = 0
+    status: int = 1
+    logs: List[SimulatedLog] = attr.Factory(list)
+
+
+@attr.s(auto_attribs=True)
+class SimulatedBlock:
+    number: int
+    hash: bytes
+    parent_hash: bytes
+    timestamp: int
+    transactions: List[SimulatedTransaction] = attr.Factory(list)
+
+
+@attr.s(auto_attribs=True)
+class TransactionLocation:
+    block: SimulatedBlock
+    index: int
+
+
+class SimulatedContract:
+    """A contract simulated in python
+
+    The functions of the ABI are dispatched to the handlers returned by
+    `get_handlers`, which get the sender and the decoded arguments and return the
+    decoded outputs.
+    """
+
+    abi: List[Dict[str, Any]] = []
+
+    def __init__(self, address: bytes) -> None:
+        self.address = to_canonical_address(address)
+        self.chain: Optional["SimulatedChain"] = None
+        self.function_abis = {
+            function_abi_to_4byte_selector(description): description
+            for description in self.abi
+            if description.get("type", "function") == "function"
+        }
+        self.event_abis = {
+            description["name"]: description
+            for description in self.abi
+            if description["type"] == "event"
+        }
+        self.handlers = self.get_handlers()
+
+    def get_handlers(self) -> Dict[str, Callable]:
+        return {}
+
+    @property
+    def code(self) -> bytes:
+        """Code containing the selectors and event topics, like a compiled contract"""
+        return b"".join(
+            [b"\x60\x80\x60\x40"]
+            + list(self.function_abis)
+            + [event_abi_to_log_topic(abi) for abi in self.event_abis.values()]
+        )
+
+    def execute(self, sender: bytes, data: bytes) -> bytes:
+        function_abi = self.function_abis.get(data[:4])
+        if function_abi is None:
+            raise RevertError(f"Unknown function selector {encode_hex(data[:4])}")
+        input_types = [argument["type"] for argument in function_abi["inputs"]]
+        output_types = [output["type"] for output in function_abi["outputs"]]
+        arguments = decode_abi(input_types, data[4:])
+        result = self.handlers[function_abi["name"]](sender, *arguments)
+        if len(output_types) == 0:
+            return b""
+        if len(output_types) == 1:
+            result = (result,)
+        return encode_abi(output_types, result)
+
+    def emit(self, event_name: str, **arguments) -> None:
+        assert self.chain is not None, "contract has not been deployed"
+        event_abi = self.event_abis[event_name]
+        topics = [event_abi_to_log_topic(event_abi)]
+        data_types, data_values = [], []
+        for argument in event_abi["inputs"]:
+            value = arguments[argument["name"]]
+            if argument["indexed"]:
+                topics.append(encode_abi([argument["type"]], [value]))
+            else:
+                data_types.append(argument["type"])
+                data_values.append(value)
+        self.chain.add_log(
+            SimulatedLog(
+                address=self.address,
+                topics=topics,
+                data=encode_abi(data_types, data_values),
+            )
+        )
+
+
+class SimulatedToken(SimulatedContract):
+    """The token on the foreign chain, only emitting transfers"""
+
+    abi = MINIMAL_ERC20_TOKEN_ABI
+
+    def transfer(self, sender: bytes, to: bytes, value: int) -> bytes:
+        """Add a transfer of `value` tokens from `sender` to `to` to the next block"""
+        assert self.chain is not None, "contract has not been deployed"
+        with self.chain.transaction(sender, self.address) as transaction:
+            self.emit(
+                "Transfer",
+                **{
+                    "from": to_checksum_address(sender),
+                    "to": to_checksum_address(to),
+                    "value": value,
+                },
+            )
+        return transaction.hash
+
+
+class SimulatedValidatorProxy(SimulatedContract):
+    abi = MINIMAL_VALIDATOR_PROXY_ABI
+
+    def __init__(self, address: bytes, validators: Sequence[bytes]) -> None:
+        super().__init__(address)
+        self.validators: Set[bytes] = {
+            to_canonical_address(validator) for validator in validators
+        }
+
+    def get_handlers(self):
+        return {"isValidator": self.is_validator}
+
+    def is_validator(self, sender, address) -> bool:
+        return to_canonical_address(address) in self.validators
+
+
+class SimulatedHomeBridge(SimulatedContract):
+    """The home bridge, completing a transfer once enough validators confirmed it
+
+    The transfer is paid out right away, there are no coins to run out of.
+    """
+
+    abi = HOME_BRIDGE_ABI
+
+    def __init__(
+        self,
+        address: bytes,
+        validator_proxy: SimulatedValidatorProxy,
+        validators_required_percent: int = 50,
+    ) -> None:
+        super().__init__(address)
+        self.validator_proxy = validator_proxy
+        self.validators_required_percent = validators_required_percent
+        self.confirmations: Dict[bytes, Set[bytes]] = collections.defaultdict(set)
+        self.completed_transfers: Set[bytes] = set()
+
+    def get_handlers(self):
+        return {
+            "validatorProxy": lambda sender: to_checksum_address(
+                self.validator_proxy.address
+            ),
+            "validatorsRequiredPercent": lambda sender: (
+                self.validators_required_percent
+            ),
+            "transferState": self.transfer_state,
+            "confirmTransfer": self.confirm_transfer,
+        }
+
+    @property
+    def number_of_required_confirmations(self) -> int:
+        number_of_validators = len(self.validator_proxy.validators)
+        # same rounding up as the contract
+        return max(
+            (number_of_validators * self.validators_required_percent + 99) // 100, 1
+        )
+
+    def transfer_state(self, sender, transfer_hash):
+        return (
+            len(self.confirmations[transfer_hash]),
+            transfer_hash in self.completed_transfers,
+        )
+
+    def confirm_transfer(
+        self, sender, transfer_hash, transaction_hash, amount, recipient
+    ):
+        if sender not in self.validator_proxy.validators:
+            raise RevertError("Sender is not a validator")
+        if sender in self.confirmations[transfer_hash]:
+            raise RevertError("Transfer already confirmed by the validator")
+        self.confirmations[transfer_hash].add(sender)
+        self.emit(
+            "Confirmation",
+            transferHash=transfer_hash,
+            transactionHash=transaction_hash,
+            amount=amount,
+            recipient=recipient,
+            validator=to_checksum_address(sender),
+        )
+        if (
+            transfer_hash not in self.completed_transfers
+            and len(self.confirmations[transfer_hash])
+            >= self.number_of_required_confirmations
+        ):
+            self.completed_transfers.add(transfer_hash)
+            self.emit(
+                "TransferCompleted",
+                transferHash=transfer_hash,
+                transactionHash=transaction_hash,
+                amount=amount,
+                recipient=recipient,
+                coinTransferSuccessful=True,
+            )
+
+
+class _TransactionContext:
+    def __init__(self, chain: "SimulatedChain", transaction: SimulatedTransaction):
+        self.chain = chain
+        self.transaction = transaction
+
+    def __enter__(self) -> SimulatedTransaction:
+        self.chain._current_transaction = self.transaction
+        return self.transaction
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.chain._current_transaction = None
+        if exc_type is not None and issubclass(exc_type, RevertError):
+            self.transaction.status = 0
+            self.transaction.logs.clear()
+        self.chain.pending_transactions.append(self.transaction)
+        # a revert is only visible in the status of the transaction
+        return exc_type is not None and issubclass(exc_type, RevertError)
+
+
+class SimulatedChain:
+    def __init__(
+        self,
+        *,
+        chain_id: int = 1,
+        block_time: float = 1.0,
+        start_timestamp: Optional[int] = None,
+        reorg_rate: float = 0.0,
+        reorg_depth: int = 1,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.chain_id = chain_id
+        self.block_time = block_time
+        # probability of a reorg of `reorg_depth` blocks after every block of `run`
+        self.reorg_rate = reorg_rate
+        self.reorg_depth = reorg_depth
+        self.number_of_reorgs = 0
+        if start_timestamp is None:
+            start_timestamp = int(time.time())
+        self.blocks: List[SimulatedBlock] = [
+            SimulatedBlock(
+                number=0,
+                hash=keccak(int_to_big_endian(chain_id)),
+                parent_hash=bytes(32),
+                timestamp=start_timestamp,
+            )
+        ]
+        self.pending_transactions: List[SimulatedTransaction] = []
+        self.transaction_locations: Dict[bytes, TransactionLocation] = {}
+        self.contracts: Dict[bytes, SimulatedContract] = {}
+        self.balances: Dict[bytes, int] = collections.defaultdict(int)
+        self.nonces: Dict[bytes, int] = collections.defaultdict(int)
+        self._current_transaction: Optional[SimulatedTransaction] = None
+        self._transaction_counter = itertools.count()
+        self._random = random.Random(seed)
+
+        self.services = [Service(f"simulated-chain-{chain_id}", self.run)]
+
+    @property
+    def latest_block(self) -> SimulatedBlock:
+        return self.blocks[-1]
+
+    def deploy(self, contract: SimulatedContract) -> SimulatedContract:
+        contract.chain = self
+        self.contracts[contract.address] = contract
+        return contract
+
+    def make_block_hash(self, number: int, parent_hash: bytes) -> bytes:
+        # the blocks replacing others in a reorg get different hashes
+        return keccak(
+            parent_hash
+            + int_to_big_endian(number)
+            + int_to_big_endian(self.number_of_reorgs)
+        )
+
+    def mine_block(self, timestamp: Optional[int] = None) -> SimulatedBlock:
+        parent = self.latest_block
+        if timestamp is None:
+            timestamp = max(int(time.time()), parent.timestamp + 1)
+        number = parent.number + 1
+        block = SimulatedBlock(
+            number=number,
+            hash=self.make_block_hash(number, parent.hash),
+            parent_hash=parent.hash,
+            timestamp=timestamp,
+            transactions=self.pending_transactions,
+        )
+        self.pending_transactions = []
+        self.blocks.append(block)
+        for index, transaction in enumerate(block.transactions):
+            self.transaction_locations[transaction.hash] = TransactionLocation(
+                block, index
+            )
+        return block
+
+    def mine_blocks(self, number_of_blocks: int) -> None:
+        for _ in range(number_of_blocks):
+            self.mine_block()
+
+    def reorg(self, depth: int, *, drop_transactions: bool = False) -> None:
+        """Replace the latest `depth` blocks with `depth + 1` new blocks
+
+        The transactions of the replaced blocks are included again in the first new
+        block, after the pending transactions, unless they are dropped.
+        """
+        if not 0 < depth < len(self.blocks):
+            raise ValueError(f"Can not reorg {depth} of {len(self.blocks)} blocks")
+        replaced_blocks = self.blocks[-depth:]
+        del self.blocks[-depth:]
+        self.number_of_reorgs += 1
+        logger.debug(f"Reorg of {depth} blocks from block {replaced_blocks[0].number}")
+
+        for block in replaced_blocks:
+            for transaction in block.transactions:
+                del self.transaction_locations[transaction.hash]
+                if not drop_transactions:
+                    self.pending_transactions.append(transaction)
+        self.mine_blocks(depth + 1)
+
+    def run(self) -> None:
+        while True:
+            gevent.sleep(self.block_time)
+            self.mine_block()
+            if self.reorg_rate and self._random.random() < self.reorg_rate:
+                self.reorg(min(self.reorg_depth, len(self.blocks) - 1))
+
+    def transaction(
+        self,
+        sender: bytes,
+        to: Optional[bytes],
+        *,
+        nonce: Optional[int] = None,
+        transaction_hash: Optional[bytes] = None,
+        data: bytes = b"",
+        value: int = 0,
+    ) -> _TransactionContext:
+        """Context of a transaction included in the next block, with the logs emitted"""
+        sender = to_canonical_address(sender)
+        if nonce is None:
+            nonce = self.nonces[sender]
+        self.nonces[sender] = max(self.nonces[sender], nonce + 1)
+        if transaction_hash is None:
+            transaction_hash = keccak(
+                int_to_big_endian(self.chain_id)
+                + b"simulated"
+                + int_to_big_endian(next(self._transaction_counter))
+            )
+        return _TransactionContext(
+            self,
+            SimulatedTransaction(
+                hash=transaction_hash,
+                sender=sender,
+                to=to,
+                nonce=nonce,
+                data=data,
+                value=value,
+            ),
+        )
+
+    def add_log(self, log: SimulatedLog) -> None:
+        if self._current_transaction is None:
+            raise RuntimeError("Logs can only be emitted within a transaction")
+        self._current_transaction.logs.append(log)
+
+    def call(self, to: bytes, data: bytes, sender: bytes = bytes(20)) -> bytes:
+        contract = self.contracts.get(to_canonical_address(to))
+        if contract is None:
+            return b""
+        return contract.execute(sender, data)
+
+    def send_raw_transaction(self, raw_transaction: bytes) -> bytes:
+        nonce, gas_price, gas, to, value, data, v, r, s = rlp.decode(raw_transaction)
+        nonce = big_endian_to_int(nonce)
+        sender = to_canonical_address(Account.recover_transaction(raw_transaction))
+        if nonce < self.nonces[sender]:
+            raise SimulatedRpcError(
+                "Transaction nonce is too low. Try incrementing the nonce.", -32010
+            )
+
+        transaction_hash = keccak(raw_transaction)
+        with self.transaction(
+            sender,
+            to or None,
+            nonce=nonce,
+            transaction_hash=transaction_hash,
+            data=data,
+            value=big_endian_to_int(value),
+        ):
+            contract = self.contracts.get(to)
+            if contract is not None:
+                contract.execute(sender, data)
+        return transaction_hash
+
+    def get_block(self, block_identifier: str) -> Optional[SimulatedBlock]:
+        if block_identifier in ("latest", "pending"):
+            return self.latest_block
+        if block_identifier == "earliest":
+            return self.blocks[0]
+        number = int(block_identifier, 16)
+        if number >= len(self.blocks):
+            return None
+        return self.blocks[number]
+
+    def iter_logs(
+        self,
+        from_block: int,
+        to_block: int,
+        addresses: Optional[Set[bytes]] = None,
+        topics: Sequence[Any] = (),
+    ):
+        """Yield block, transaction index, transaction, log index and log of the
+        matching logs"""
+        for block in self.blocks[from_block : to_block + 1]:
+            log_index = 0
+            for transaction_index, transaction in enumerate(block.transactions):
+                for log in transaction.logs:
+                    if (
+                        addresses is None or log.address in addresses
+                    ) and _match_topics(log.topics, topics):
+                        yield block, transaction_index, transaction, log_index, log
+                    log_index += 1
+
+
+def _match_topics(log_topics: Sequence[bytes], topic_filters: Sequence[Any]) -> bool:
+    if len(topic_filters) > len(log_topics):
+        return False
+    for log_topic, topic_filter in zip(log_topics, topic_filters):
+        if topic_filter is None:
+            continue
+        if isinstance(topic_filter, list):
+            if not any(log_topic == decode_hex(topic) for topic in topic_filter):
+                return False
+        elif log_topic != decode_hex(topic_filter):
+            return False
+    return True
+
+
+def _encode_log(block, transaction_index, transaction, log_index, log):
+    return {
+        "address": to_checksum_address(log.address),
+        "topics": [encode_hex(topic) for topic in log.topics],
+        "data": encode_hex(log.data),
+        "blockNumber": hex(block.number),
+        "blockHash": encode_hex(block.hash),
+        "transactionHash": encode_hex(transaction.hash),
+        "transactionIndex": hex(transaction_index),
+        "logIndex": hex(log_index),
+        "removed": False,
+    }
+
+
+def _encode_block(block: SimulatedBlock):
+    return {
+        "number": hex(block.number),
+        "hash": encode_hex(block.hash),
+        "parentHash": encode_hex(block.parent_hash),
+        "timestamp": hex(block.timestamp),
+        "transactions": [
+            encode_hex(transaction.hash) for transaction in block.transactions
+        ],
+        "gasLimit": hex(BLOCK_GAS_LIMIT),
+        "gasUsed": "0x0",
+        "miner": to_checksum_address(bytes(20)),
+        "difficulty": "0x1",
+        "totalDifficulty": hex(block.number + 1),
+        "extraData": "0x",
+        "logsBloom": encode_hex(bytes(256)),
+        "uncles": [],
+    }
+
+
+class SimulatedProvider(BaseProvider):
+    """Answers the JSON-RPC requests of the bridge from a simulated chain
+
+    Every request is delayed by `latency` seconds, fails with probability
+    `error_rate` as if the node could not be reached, and with probability
+    `timeout_rate` times out after `timeout` seconds. eth_getLogs is delayed by
+    another `log_latency` seconds per log, and fails for more than `max_logs` logs or
+    more than `max_block_range` blocks. The requests are counted by method.
+
+    While `synced_block_number` is set, the node is syncing and does not know the
+    later blocks. With a `block_gap` the node is a parity node in warp sync, which
+    knows the latest blocks but not the blocks in the gap yet.
+    """
+
+    def __init__(
+        self,
+        chain: SimulatedChain,
+        *,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        timeout: float = 0.0,
+        log_latency: float = 0.0,
+        max_logs: Optional[int] = None,
+        max_block_range: Optional[int] = None,
+        seed: Optional[int] = None,
+        client_version: str = DEFAULT_CLIENT_VERSION,
+    ) -> None:
+        self.chain = chain
+        self.latency = latency
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.timeout = timeout
+        self.log_latency = log_latency
+        self.max_logs = max_logs
+        self.max_block_range = max_block_range
+        self.client_version = client_version
+        self.synced_block_number: Optional[int] = None
+        # first and last block number of the gap
+        self.block_gap: Optional[Tuple[int, int]] = None
+        self.request_counts: Dict[str, int] = collections.Counter()
+        self._random = random.Random(seed)
+        self._request_ids = itertools.count()
+        self.handlers: Dict[str, Callable] = {
+            "web3_clientVersion": lambda: self.client_version,
+            "net_version": lambda: str(self.chain.chain_id),
+            "eth_chainId": lambda: hex(self.chain.chain_id),
+            "eth_blockNumber": lambda: hex(self.head_block_number),
+            "eth_syncing": self._syncing,
+            "parity_chainStatus": self._parity_chain_status,
+            "parity_nodeKind": lambda: {"availability": "public", "capability": "full"},
+            "eth_gasPrice": lambda: hex(10 ** 9),
+            "eth_getBalance": self._get_balance,
+            "eth_getTransactionCount": self._get_transaction_count,
+            "eth_getCode": self._get_code,
+            "eth_call": self._call,
+            "eth_sendRawTransaction": self._send_raw_transaction,
+            "eth_getTransactionReceipt": self._get_transaction_receipt,
+            "eth_getBlockByNumber": self._get_block_by_number,
+            "eth_getLogs": self._get_logs,
+        }
+
+    @property
+    def number_of_requests(self) -> int:
+        return sum(self.request_counts.values())
+
+    @property
+    def head_block_number(self) -> int:
+        """The number of the latest block known to the node"""
+        if self.synced_block_number is None:
+            return self.chain.latest_block.number
+        return min(self.synced_block_number, self.chain.latest_block.number)
+
+    def is_block_known(self, block_number: int) -> bool:
+        if block_number > self.head_block_number:
+            return False
+        return self.block_gap is None or not (
+            self.block_gap[0] <= block_number <= self.block_gap[1]
+        )
+
+    def sync(self, blocks_per_second: float) -> None:
+        """Sync the blocks not known yet at the given rate, then follow the chain
+
+        The gap of a warp sync is filled from its start, after the latest blocks.
+        """
+        while self.synced_block_number is not None:
+            gevent.sleep(1 / blocks_per_second)
+            self.synced_block_number += 1
+            if self.synced_block_number >= self.chain.latest_block.number:
+                self.synced_block_number = None
+        while self.block_gap is not None:
+            gevent.sleep(1 / blocks_per_second)
+            start, end = self.block_gap
+            self.block_gap = (start + 1, end) if start < end else None
+
+    def make_request(self, method, params):
+        self.request_counts[method] += 1
+        if self.latency:
+            gevent.sleep(self.latency)
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise SimulatedNodeError(f"Injected error for {method}")
+        if self.timeout_rate and self._random.random() < self.timeout_rate:
+            gevent.sleep(self.timeout)
+            raise requests.exceptions.ReadTimeout(
+                f"Injected timeout for {method} after {self.timeout}s"
+            )
+
+        response: Dict[str, Any] = {"jsonrpc": "2.0", "id": next(self._request_ids)}
+        handler = self.handlers.get(method)
+        if handler is None:
+            response["error"] = {
+                "code": -32601,
+                "message": f"The method {method} does not exist/is not available",
+            }
+            return response
+        try:
+            response["result"] = handler(*params)
+        except SimulatedRpcError as error:
+            response["error"] = {"code": error.code, "message": error.message}
+        return response
+
+    def isConnected(self):  # noqa: N802
+        return True
+
+    def _syncing(self):
+        if self.synced_block_number is None:
+            return False
+        return {
+            "startingBlock": "0x0",
+            "currentBlock": hex(self.head_block_number),
+            "highestBlock": hex(self.chain.latest_block.number),
+        }
+
+    def _parity_chain_status(self):
+        if self.block_gap is None:
+            return {"blockGap": None}
+        return {"blockGap": [hex(number) for number in self.block_gap]}
+
+    def _get_block(self, block_identifier) -> Optional[SimulatedBlock]:
+        if block_identifier in ("latest", "pending"):
+            block_identifier = hex(self.head_block_number)
+        block = self.chain.get_block(block_identifier)
+        if block is None or not self.is_block_known(block.number):
+            return None
+        return block
+
+    def _get_balance(self, address, block_identifier="latest"):
+        return hex(self.chain.balances[to_canonical_address(address)])
+
+    def _get_transaction_count(self, address, block_identifier="latest"):
+        return hex(self.chain.nonces[to_canonical_address(address)])
+
+    def _get_code(self, address, block_identifier="latest"):
+        contract = self.chain.contracts.get(to_canonical_address(address))
+        return encode_hex(contract.code if contract is not None else b"")
+
+    def _call(self, transaction, block_identifier="latest"):
+        try:
+            return encode_hex(
+                self.chain.call(
+                    decode_hex(transaction["to"]),
+                    decode_hex(transaction.get("data", "0x")),
+                    decode_hex(transaction.get("from", "0x" + "00" * 20)),
+                )
+            )
+        except RevertError as revert:
+            raise SimulatedRpcError(f"execution reverted: {revert}")
+
+    def _send_raw_transaction(self, raw_transaction):
+        return encode_hex(self.chain.send_raw_transaction(decode_hex(raw_transaction)))
+
+    def _get_transaction_receipt(self, transaction_hash):
+        location = self.chain.transaction_locations.get(decode_hex(transaction_hash))
+        if location is None:
+            return None
+        block, transaction_index = location.block, location.index
+        transaction = block.transactions[transaction_index]
+        first_log_index = sum(
+            len(previous_transaction.logs)
+            for previous_transaction in block.transactions[:transaction_index]
+        )
+        return {
+            "transactionHash": encode_hex(transaction.hash),
+            "transactionIndex": hex(transaction_index),
+            "blockHash": encode_hex(block.hash),
+            "blockNumber": hex(block.number),
+            "from": to_checksum_address(transaction.sender),
+            "to": to_checksum_address(transaction.to) if transaction.to else None,
+            "cumulativeGasUsed": "0x0",
+            "gasUsed": "0x0",
+            "contractAddress": None,
+            "logs": [
+                _encode_log(
+                    block, transaction_index, transaction, first_log_index + index, log
+                )
+                for index, log in enumerate(transaction.logs)
+            ],
+            "logsBloom": encode_hex(bytes(256)),
+            "status": hex(transaction.status),
+        }
+
+    def _get_block_by_number(self, block_identifier, full_transactions=False):
+        block = self._get_block(block_identifier)
+        return _encode_block(block) if block is not None else None
+
+    def _get_logs(self, filter_params):
+        from_block = self.chain.get_block(filter_params.get("fromBlock", "latest"))
+        to_block = self.chain.get_block(filter_params.get("toBlock", "latest"))
+        if from_block is None or to_block is None:
+            return []
+        to_block_number = min(to_block.number, self.head_block_number)
+        if (
+            self.max_block_range is not None
+            and to_block_number - from_block.number + 1 > self.max_block_range
+        ):
+            raise SimulatedRpcError(
+                f"exceed maximum block range: {self.max_block_range}", -32005
+            )
+        address = filter_params.get("address")
+        if address is None:
+            addresses = None
+        elif isinstance(address, list):
+            addresses = {to_canonical_address(item) for item in address}
+        else:
+            addresses = {to_canonical_address(address)}
+        logs = [
+            _encode_log(*location)
+            for location in self.chain.iter_logs(
+                from_block.number,
+                to_block_number,
+                addresses,
+                filter_params.get("topics") or (),
+            )
+            # a node in warp sync has no logs for the blocks in the gap
+            if self.block_gap is None or self.is_block_known(location[0].number)
+        ]
+        if self.max_logs is not None and len(logs) > self.max_logs:
+            raise SimulatedRpcError(
+                f"query returned more than {self.max_logs} results", -32005
+            )
+        if self.log_latency:
+            gevent.sleep(len(logs) * self.log_latency)
+        return logs
+
+
+@contextlib.contextmanager
+def simulated_providers(providers: Dict[str, SimulatedProvider]) -> Iterator[None]:
+    """Let `bridge.main` use the providers instead of connecting to their rpc urls"""
+    make_provider = bridge.main.make_provider
+
+    def make_simulated_provider(config, chain: ChainRole):
+        rpc_url = config[chain.configuration_key]["rpc_url"]
+        if rpc_url in providers:
+            return providers[rpc_url]
+        return make_provider(config, chain)
+
+    bridge.main.make_provider = make_simulated_provider
+    try:
+        yield
+    finally:
+        bridge.main.make_provider = make_provider
@@ -0,0 +1,340 @@
+"""Benchmark of the event fetcher against a simulated foreign chain
+
+Two scenarios are measured for every `--event-fetch-limit`:
+
+catch-up: the chain already has `--blocks` blocks with `--transfers` transfers to the
+foreign bridge spread over them. The fetcher starts at block 0 and runs until it
+reports that it reached the head. With `--sync-rate` the node is still syncing at
+the start and syncs that many blocks per second. With `--block-gap` the node is a
+parity node in warp sync, which fills the gap at the sync rate.
+
+head-following: the chain produces a block with `--transfers-per-block` transfers
+every `--block-time` seconds, followed by a reorg of `--reorg-depth` blocks with
+probability `--reorg-rate`. The fetcher follows the chain for `--duration` seconds.
+Besides the delay from mining a block to its transfers being fetched, the events are
+checked against the chain at the end: events of blocks that were replaced by a reorg
+after they were fetched, transfers fetched twice, and transfers of fetched blocks
+that were never fetched.
+
+Usage: python benchmarks/fetcher_benchmark.py --event-fetch-limit 100 --event-fetch-limit 950
+"""
+# fmt: off
+from gevent import monkey; monkey.patch_all()  # noqa: E402, E702 isort:skip
+# fmt: on
+
+import collections
+import random
+import time
+from typing import Any, Dict, List
+
+import click
+import gevent
+from benchmark_utils import setup_logging, write_report
+from chain_simulator import (
+    DEFAULT_CLIENT_VERSION,
+    PARITY_CLIENT_VERSION,
+    SimulatedChain,
+    SimulatedProvider,
+    SimulatedToken,
+)
+from eth_utils import to_checksum_address
+from gevent.queue import Queue
+from web3 import Web3
+
+from bridge import tracing
+from bridge.constants import TRANSFER_EVENT_NAME
+from bridge.contract_abis import MINIMAL_ERC20_TOKEN_ABI
+from bridge.event_fetcher import EventFetcher
+from bridge.events import ChainRole, FetcherReachedHeadEvent
+from bridge.utils import compute_transfer_hash
+
+FOREIGN_BRIDGE_ADDRESS = b"\x20" * 20
+TOKEN_ADDRESS = b"\x21" * 20
+SENDER = b"\x22" * 20
+OTHER_RECIPIENT = b"\x23" * 20
+
+
+def make_event_fetcher(
+    provider: SimulatedProvider,
+    event_queue: Queue,
+    event_fetch_limit: int,
+    max_reorg_depth: int,
+) -> EventFetcher:
+    """The fetcher of the transfers to the foreign bridge, like bridge.main builds it"""
+    w3 = Web3(provider)
+    return EventFetcher(
+        web3=w3,
+        contract=w3.eth.contract(
+            address=to_checksum_address(TOKEN_ADDRESS), abi=MINIMAL_ERC20_TOKEN_ABI
+        ),
+        filter_definition={
+            TRANSFER_EVENT_NAME: {"to": to_checksum_address(FOREIGN_BRIDGE_ADDRESS)}
+        },
+        event_fetch_limit=event_fetch_limit,
+        event_queue=event_queue,
+        max_reorg_depth=max_reorg_depth,
+        start_block_number=0,
+        chain_role=ChainRole.foreign,
+    )
+
+
+def add_transfers(token: SimulatedToken, number_of_transfers: int) -> None:
+    for _ in range(number_of_transfers):
+        token.transfer(SENDER, FOREIGN_BRIDGE_ADDRESS, 1)
+    # transfers to others are filtered out by the node
+    token.transfer(SENDER, OTHER_RECIPIENT, 1)
+
+
+def summarize_delays(delays: List[float]) -> Dict[str, Any]:
+    if not delays:
+        return {"count": 0}
+    delays = sorted(delays)
+    return {
+        "count": len(delays),
+        "mean": sum(delays) / len(delays),
+        "p50": delays[len(delays) // 2],
+        "p99": delays[min(int(len(delays) * 0.99), len(delays) - 1)],
+        "max": delays[-1],
+    }
+
+
+def run_catch_up(
+    options: Dict[str, Any], make_provider, event_fetch_limit: int
+) -> Dict[str, Any]:
+    chain = SimulatedChain(chain_id=2)
+    token = chain.deploy(SimulatedToken(TOKEN_ADDRESS))
+    number_of_blocks, number_of_transfers = options["blocks"], options["transfers"]
+    transfer_blocks = collections.Counter(
+        index * number_of_blocks // max(number_of_transfers, 1)
+        for index in range(number_of_transfers)
+    )
+    for block_number in range(number_of_blocks):
+        add_transfers(token, transfer_blocks[block_number])
+        chain.mine_block()
+
+    provider = make_provider(chain)
+    greenlets = []
+    if options["block_gap"]:
+        provider.block_gap = options["block_gap"]
+    elif options["sync_rate"]:
+        provider.synced_block_number = 0
+    if options["sync_rate"]:
+        greenlets.append(gevent.spawn(provider.sync, options["sync_rate"]))
+    event_queue: Queue = Queue()
+    fetcher = make_event_fetcher(
+        provider, event_queue, event_fetch_limit, options["max_reorg_depth"]
+    )
+
+    tracing.tracer = tracing.TransferTracer()
+    start_time = time.monotonic()
+    greenlets.append(gevent.spawn(fetcher.fetch_events, options["poll_interval"]))
+    number_of_events = 0
+    try:
+        with gevent.Timeout(
+            options["timeout"],
+            click.ClickException(f"Catch-up took longer than {options['timeout']}s"),
+        ):
+            while True:
+                event = event_queue.get()
+                if isinstance(event, FetcherReachedHeadEvent):
+                    break
+                number_of_events += 1
+        duration = time.monotonic() - start_time
+    finally:
+        gevent.killall(greenlets)
+
+    return {
+        "duration": duration,
+        "events": number_of_events,
+        "events_per_second": number_of_events / duration,
+        "blocks_per_second": fetcher.last_fetched_block_number / duration,
+        "rpc_calls": dict(provider.request_counts),
+        "rpc_calls_per_event": provider.number_of_requests / max(number_of_events, 1),
+    }
+
+
+def produce_blocks(
+    chain: SimulatedChain,
+    token: SimulatedToken,
+    options: Dict[str, Any],
+    mined_times: Dict[bytes, float],
+) -> None:
+    rng = random.Random(options["seed"])
+    while True:
+        add_transfers(token, options["transfers_per_block"])
+        block = chain.mine_block()
+        mined_times[block.hash] = time.monotonic()
+        if options["reorg_rate"] and rng.random() < options["reorg_rate"]:
+            chain.reorg(min(options["reorg_depth"], len(chain.blocks) - 1))
+            now = time.monotonic()
+            for block in chain.blocks[-(options["reorg_depth"] + 1) :]:
+                mined_times.setdefault(block.hash, now)
+        gevent.sleep(chain.block_time)
+
+
+def run_head_following(
+    options: Dict[str, Any], make_provider, event_fetch_limit: int
+) -> Dict[str, Any]:
+    chain = SimulatedChain(chain_id=2, block_time=options["block_time"])
+    token = chain.deploy(SimulatedToken(TOKEN_ADDRESS))
+    provider = make_provider(chain)
+    event_queue: Queue = Queue()
+    fetcher = make_event_fetcher(
+        provider, event_queue, event_fetch_limit, options["max_reorg_depth"]
+    )
+
+    tracing.tracer = tracing.TransferTracer()
+    mined_times: Dict[bytes, float] = {}
+    events = []
+    delays = []
+    greenlets = [
+        gevent.spawn(produce_blocks, chain, token, options, mined_times),
+        gevent.spawn(fetcher.fetch_events, options["poll_interval"]),
+    ]
+    try:
+        with gevent.Timeout(options["duration"], False):
+            while True:
+                event = event_queue.get()
+                if isinstance(event, FetcherReachedHeadEvent):
+                    continue
+                events.append(event)
+                delays.append(time.monotonic() - mined_times[bytes(event.blockHash)])
+    finally:
+        gevent.killall(greenlets)
+
+    canonical_hashes = {block.hash for block in chain.blocks}
+    fetched_transfer_hashes = collections.Counter(
+        compute_transfer_hash(event) for event in events
+    )
+    expected_transfer_hashes = {
+        compute_transfer_hash(event)
+        for event in make_event_fetcher(
+            SimulatedProvider(chain), Queue(), 10 ** 9, 0
+        ).fetch_events_in_range(0, fetcher.last_fetched_block_number)
+    }
+    number_of_blocks = chain.latest_block.number
+    return {
+        "blocks": number_of_blocks,
+        "reorgs": chain.number_of_reorgs,
+        "events": len(events),
+        "stale_events": sum(
+            bytes(event.blockHash) not in canonical_hashes for event in events
+        ),
+        "duplicate_events": sum(
+            count - 1 for count in fetched_transfer_hashes.values()
+        ),
+        "missing_events": len(expected_transfer_hashes - set(fetched_transfer_hashes)),
+        "delay": summarize_delays(delays),
+        "rpc_calls": dict(provider.request_counts),
+        "rpc_calls_per_block": provider.number_of_requests / max(number_of_blocks, 1),
+    }
+
+
+SCENARIOS = {"catch-up": run_catch_up, "head-following": run_head_following}
+
+
+@click.command()
+@click.option(
+    "--scenario",
+    "scenarios",
+    type=click.Choice(list(SCENARIOS)),
+    multiple=True,
+    default=tuple(SCENARIOS),
+    show_default=True,
+)
+@click.option(
+    "--event-fetch-limit",
+    "event_fetch_limits",
+    type=int,
+    multiple=True,
+    default=(950,),
+    show_default=True,
+    help="blocks fetched per eth_getLogs, can be given several times",
+)
+@click.option("--max-reorg-depth", default=10, show_default=True)
+@click.option("--poll-interval", default=1.0, show_default=True)
+@click.option("--blocks", default=100_000, show_default=True, help="for catch-up")
+@click.option("--transfers", default=10_000, show_default=True, help="for catch-up")
+@click.option(
+    "--sync-rate",
+    default=0.0,
+    show_default=True,
+    help="for catch-up, blocks per second synced by the node, 0 if already synced",
+)
+@click.option("--duration", default=60.0, show_default=True, help="for head-following")
+@click.option("--block-time", default=1.0, show_default=True, help="for head-following")
+@click.option(
+    "--transfers-per-block", default=5, show_default=True, help="for head-following"
+)
+@click.option(
+    "--reorg-rate",
+    default=0.0,
+    show_default=True,
+    help="for head-following, probability of a reorg after every block",
+)
+@click.option("--reorg-depth", default=1, show_default=True, help="for head-following")
+@click.option("--latency", default=0.0, show_default=True)
+@click.option(
+    "--log-latency", default=0.0, show_default=True, help="seconds per log returned"
+)
+@click.option("--max-logs", type=int, help="most logs returned by one eth_getLogs")
+@click.option("--max-block-range", type=int, help="most blocks of one eth_getLogs")
+@click.option("--error-rate", default=0.0, show_default=True)
+@click.option("--timeout-rate", default=0.0, show_default=True)
+@click.option("--timeout", "request_timeout", default=10.0, show_default=True)
+@click.option(
+    "--block-gap",
+    nargs=2,
+    type=int,
+    help="for catch-up, a parity node in warp sync misses these blocks",
+)
+@click.option("--seed", default=0, show_default=True)
+@click.option(
+    "--catch-up-timeout",
+    "timeout",
+    default=600.0,
+    show_default=True,
+    help="give up the catch-up after this many seconds",
+)
+@click.option(
+    "--output", type=click.Path(dir_okay=False), help="also write report here"
+)
+@click.option("-v", "--verbose", is_flag=True, help="show the logs of the bridge")
+def main(scenarios, event_fetch_limits, output, verbose, **options):
+    """Measure the catch-up and head-following cost of the event fetcher"""
+    setup_logging(verbose)
+
+    def make_provider(chain):
+        provider = SimulatedProvider(
+            chain,
+            latency=options["latency"],
+            error_rate=options["error_rate"],
+            timeout_rate=options["timeout_rate"],
+            timeout=options["request_timeout"],
+            log_latency=options["log_latency"],
+            max_logs=options["max_logs"],
+            max_block_range=options["max_block_range"],
+            seed=options["seed"],
+            client_version=PARITY_CLIENT_VERSION
+            if options["block_gap"]
+            else DEFAULT_CLIENT_VERSION,
+        )
+        return provider
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for scenario in scenarios:
+        for event_fetch_limit in event_fetch_limits:
+            click.echo(
+                f"Running {scenario} with event fetch limit {event_fetch_limit}",
+                err=True,
+            )
+            run_scenario = SCENARIOS[scenario]
+            results.setdefault(scenario, {})[str(event_fetch_limit)] = run_scenario(
+                options, make_provider, event_fetch_limit
+            )
+
+    write_report({"parameters": options, "results": results}, output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""End-to-end throughput benchmark of the bridge against simulated chains
+
+The services built by `bridge.main.make_main_services` run against a simulated home
+and foreign chain in this process. The foreign chain gets `--transfers` transfers to
+the foreign bridge, `--transfers-per-block` per block, and the benchmark ends once
+all of them are completed on the simulated home bridge.
+
+Usage: python benchmarks/pipeline_benchmark.py --transfers 1000 --latency 0.005
+"""
+# fmt: off
+from gevent import monkey; monkey.patch_all()  # noqa: E402, E702 isort:skip
+# fmt: on
+
+import time
+from typing import Any, Dict, List
+
+import click
+import gevent
+from benchmark_utils import setup_logging, write_report
+from chain_simulator import (
+    SimulatedChain,
+    SimulatedHomeBridge,
+    SimulatedProvider,
+    SimulatedToken,
+    SimulatedValidatorProxy,
+    simulated_providers,
+)
+from eth_account import Account
+from eth_utils import to_canonical_address, to_checksum_address
+
+import bridge.main
+from bridge.config import ConfigSchema
+from bridge.memory import get_max_rss
+from bridge.service import start_services
+from bridge.signer import make_validator_signer
+from bridge.startup import StartupTimings
+
+HOME_RPC_URL = "http://home.simulated"
+FOREIGN_RPC_URL = "http://foreign.simulated"
+
+HOME_BRIDGE_ADDRESS = b"\x10" * 20
+VALIDATOR_PROXY_ADDRESS = b"\x11" * 20
+FOREIGN_BRIDGE_ADDRESS = b"\x20" * 20
+TOKEN_ADDRESS = b"\x21" * 20
+
+# a fixed key so the transactions are the same in every run
+VALIDATOR_PRIVATE_KEY = b"\x42" * 32
+
+
+def make_config(
+    *, home_block_time: float, foreign_block_time: float, max_reorg_depth: int
+) -> Dict[str, Any]:
+    return ConfigSchema().load(
+        {
+            "home_chain": {
+                "rpc_url": HOME_RPC_URL,
+                "bridge_contract_address": to_checksum_address(HOME_BRIDGE_ADDRESS),
+                "max_reorg_depth": max_reorg_depth,
+                "event_poll_interval": home_block_time,
+                "max_pending_transactions_per_block": 128,
+            },
+            "foreign_chain": {
+                "rpc_url": FOREIGN_RPC_URL,
+                "bridge_contract_address": to_checksum_address(FOREIGN_BRIDGE_ADDRESS),
+                "token_contract_address": to_checksum_address(TOKEN_ADDRESS),
+                "max_reorg_depth": max_reorg_depth,
+                "event_poll_interval": foreign_block_time,
+            },
+            "validator_private_key": {"raw": "0x" + VALIDATOR_PRIVATE_KEY.hex()},
+        }
+    )
+
+
+def produce_transfers(
+    chain: SimulatedChain,
+    token: SimulatedToken,
+    number_of_transfers: int,
+    transfers_per_block: int,
+    transfer_times: List[float],
+) -> None:
+    """Mine blocks with the transfers to the foreign bridge, then keep mining"""
+    senders = [bytes([0xA0 + index % 16]) * 20 for index in range(16)]
+    while len(transfer_times) < number_of_transfers:
+        for _ in range(
+            min(transfers_per_block, number_of_transfers - len(transfer_times))
+        ):
+            token.transfer(
+                senders[len(transfer_times) % len(senders)],
+                FOREIGN_BRIDGE_ADDRESS,
+                len(transfer_times) + 1,
+            )
+            transfer_times.append(time.monotonic())
+        chain.mine_block()
+        gevent.sleep(chain.block_time)
+    chain.run()
+
+
+@click.command()
+@click.option("--transfers", "number_of_transfers", default=1000, show_default=True)
+@click.option("--transfers-per-block", default=100, show_default=True)
+@click.option("--home-block-time", default=1.0, show_default=True)
+@click.option("--foreign-block-time", default=1.0, show_default=True)
+@click.option("--max-reorg-depth", default=1, show_default=True)
+@click.option(
+    "--latency", default=0.0, show_default=True, help="seconds added to every request"
+)
+@click.option(
+    "--error-rate",
+    default=0.0,
+    show_default=True,
+    help="probability of a request failing as if the node could not be reached",
+)
+@click.option("--seed", default=0, show_default=True, help="seed of the errors")
+@click.option("--timeout", default=600.0, show_default=True)
+@click.option(
+    "--output", type=click.Path(dir_okay=False), help="also write report here"
+)
+@click.option("-v", "--verbose", is_flag=True, help="show the logs of the bridge")
+def main(
+    number_of_transfers,
+    transfers_per_block,
+    home_block_time,
+    foreign_block_time,
+    max_reorg_depth,
+    latency,
+    error_rate,
+    seed,
+    timeout,
+    output,
+    verbose,
+):
+    """Measure the throughput of the bridge from transfers to completions"""
+    setup_logging(verbose)
+    validator_address = Account.from_key(VALIDATOR_PRIVATE_KEY).address
+
+    home_chain = SimulatedChain(chain_id=1, block_time=home_block_time)
+    validator_proxy = home_chain.deploy(
+        SimulatedValidatorProxy(VALIDATOR_PROXY_ADDRESS, [validator_address])
+    )
+    home_bridge = home_chain.deploy(
+        SimulatedHomeBridge(HOME_BRIDGE_ADDRESS, validator_proxy)
+    )
+    home_chain.balances[HOME_BRIDGE_ADDRESS] = 10 ** 24
+    home_chain.balances[to_canonical_address(validator_address)] = 10 ** 24
+
+    foreign_chain = SimulatedChain(chain_id=2, block_time=foreign_block_time)
+    token = foreign_chain.deploy(SimulatedToken(TOKEN_ADDRESS))
+
+    providers = {
+        "home": SimulatedProvider(
+            home_chain, latency=latency, error_rate=error_rate, seed=seed
+        ),
+        "foreign": SimulatedProvider(
+            foreign_chain, latency=latency, error_rate=error_rate, seed=seed + 1
+        ),
+    }
+
+    config = make_config(
+        home_block_time=home_block_time,
+        foreign_block_time=foreign_block_time,
+        max_reorg_depth=max_reorg_depth,
+    )
+    signer = make_validator_signer(config)
+
+    greenlets = []
+    transfer_times: List[float] = []
+    try:
+        start_time = time.monotonic()
+        recorder = bridge.main.make_recorder(config)
+        with simulated_providers(
+            {HOME_RPC_URL: providers["home"], FOREIGN_RPC_URL: providers["foreign"]}
+        ):
+            main_services = bridge.main.make_main_services(
+                config, recorder, signer, StartupTimings()
+            )
+        greenlets += start_services(home_chain.services)
+        greenlets.append(
+            gevent.spawn(
+                produce_transfers,
+                foreign_chain,
+                token,
+                number_of_transfers,
+                transfers_per_block,
+                transfer_times,
+            )
+        )
+        greenlets += start_services(main_services)
+
+        with gevent.Timeout(timeout):
+            while len(home_bridge.completed_transfers) < number_of_transfers:
+                failed = [greenlet for greenlet in greenlets if greenlet.dead]
+                if failed:
+                    raise click.ClickException(
+                        f"Service {failed[0].name} died: {failed[0].exception!r}"
+                    )
+                gevent.sleep(0.05)
+        end_time = time.monotonic()
+    finally:
+        gevent.killall(greenlets)
+
+    first_transfer_time = transfer_times[0]
+    duration = end_time - first_transfer_time
+    request_counts = {
+        name: dict(provider.request_counts) for name, provider in providers.items()
+    }
+    write_report(
+        {
+            "parameters": {
+                "transfers": number_of_transfers,
+                "transfers_per_block": transfers_per_block,
+                "home_block_time": home_block_time,
+                "foreign_block_time": foreign_block_time,
+                "max_reorg_depth": max_reorg_depth,
+                "latency": latency,
+                "error_rate": error_rate,
+                "seed": seed,
+            },
+            "startup_time": first_transfer_time - start_time,
+            "duration": duration,
+            "transfers_per_second": number_of_transfers / duration,
+            # from the last transfer on the foreign chain until everything completed
+            "drain_time": end_time - transfer_times[-1],
+            "rpc_calls_per_transfer": sum(
+                provider.number_of_requests for provider in providers.values()
+            )
+            / number_of_transfers,
+            "rpc_calls": request_counts,
+            "max_rss": get_max_rss(),
+        },
+        output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""Micro-benchmarks of the transfer recorder and the confirmation task planner
+
+Synthetic transfers arrive in batches, like the results of one poll of the foreign
+event fetcher. The confirmations and completions of a batch arrive `--lag` batches
+later, and the planner pulls the transfers to confirm after every batch, like after
+every poll of the home event fetcher. Every transfer has one confirmation and one
+completion, so `--events` is three times the number of transfers.
+
+Each size is run three times: once timing every operation, once under tracemalloc
+to measure the memory allocated by every operation, and once through the event
+queue of the confirmation task planner. The times and allocations of
+pull_transfers_to_confirm include the clear_transfers it calls.
+
+Usage: python benchmarks/recorder_benchmark.py --events 10000 --events 1000000
+"""
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterator, List
+
+import click
+import gevent
+from benchmark_utils import setup_logging, write_report
+from gevent.queue import Queue
+from hexbytes import HexBytes
+from web3.datastructures import AttributeDict
+
+from bridge import tracing
+from bridge.confirmation_task_planner import ConfirmationTaskPlanner
+from bridge.constants import (
+    COMPLETION_EVENT_NAME,
+    CONFIRMATION_EVENT_NAME,
+    TRANSFER_EVENT_NAME,
+)
+from bridge.event_fetcher import FetcherReachedHeadEvent
+from bridge.events import BalanceCheck, ChainRole, IsValidatorCheck
+from bridge.memory import get_deep_size
+from bridge.transfer_recorder import TransferRecorder
+from bridge.utils import compute_transfer_hash
+
+OPERATION_BY_EVENT_NAME = {
+    TRANSFER_EVENT_NAME: "apply_transfer",
+    CONFIRMATION_EVENT_NAME: "apply_confirmation",
+    COMPLETION_EVENT_NAME: "apply_completion",
+}
+OPERATIONS = tuple(OPERATION_BY_EVENT_NAME.values()) + (
+    "pull_transfers_to_confirm",
+    "clear_transfers",
+)
+
+SENDER = "0x345DeAd084E056dc78a0832E70B40C14B6323458"
+FOREIGN_BRIDGE = "0x1ADb0A4853bf1D564BbAD7565b5D50b33D20af60"
+VALIDATOR = "0x5C5BE5Ef2b2F7A5b7ab2Fd1B5A36C4d8C05E2E28"
+
+
+def make_transfer_event(index: int, block_number: int) -> AttributeDict:
+    return AttributeDict(
+        {
+            "event": TRANSFER_EVENT_NAME,
+            "transactionHash": HexBytes(index.to_bytes(32, "big")),
+            "blockNumber": block_number,
+            "transactionIndex": index % 100,
+            "logIndex": 0,
+            "args": AttributeDict(
+                {"from": SENDER, "to": FOREIGN_BRIDGE, "value": index + 1}
+            ),
+        }
+    )
+
+
+def make_home_bridge_event(
+    event_name: str,
+    transfer_event: AttributeDict,
+    transfer_hash: HexBytes,
+    block_number: int,
+) -> AttributeDict:
+    return AttributeDict(
+        {
+            "event": event_name,
+            "transactionHash": transfer_hash,
+            "blockNumber": block_number,
+            "transactionIndex": transfer_event.transactionIndex,
+            "logIndex": 0 if event_name == CONFIRMATION_EVENT_NAME else 1,
+            "args": AttributeDict(
+                {
+                    "transferHash": transfer_hash,
+                    "transactionHash": transfer_event.transactionHash,
+                    "amount": transfer_event.args.value,
+                    "recipient": SENDER,
+                    "validator": VALIDATOR,
+                }
+            ),
+        }
+    )
+
+
+def generate_batches(
+    number_of_transfers: int, batch_size: int, lag: int
+) -> Iterator[List[AttributeDict]]:
+    """Yield the events fetched between two pulls of the transfers to confirm"""
+    transfer_batches: List[List[AttributeDict]] = []
+    number_of_batches = -(-number_of_transfers // batch_size)
+    for batch_number in range(number_of_batches + lag):
+        start = batch_number * batch_size
+        transfers = [
+            make_transfer_event(index, batch_number + 1)
+            for index in range(start, min(start + batch_size, number_of_transfers))
+        ]
+        transfer_batches.append(transfers)
+
+        home_bridge_events = []
+        if batch_number >= lag:
+            for transfer_event in transfer_batches[batch_number - lag]:
+                transfer_hash = HexBytes(compute_transfer_hash(transfer_event))
+                for event_name in (CONFIRMATION_EVENT_NAME, COMPLETION_EVENT_NAME):
+                    home_bridge_events.append(
+                        make_home_bridge_event(
+                            event_name, transfer_event, transfer_hash, batch_number + 1
+                        )
+                    )
+            # the events are not needed anymore, let them be garbage collected
+            transfer_batches[batch_number - lag] = []
+        yield transfers + home_bridge_events
+
+
+def make_validating_recorder() -> TransferRecorder:
+    recorder = TransferRecorder(minimum_balance=1)
+    recorder.apply_event(IsValidatorCheck(True))
+    recorder.apply_event(BalanceCheck(10 ** 18))
+    return recorder
+
+
+def reset_tracer() -> None:
+    # every run starts with an empty tracer, so the runs do not influence each other
+    tracing.tracer = tracing.TransferTracer()
+
+
+def run_operations(
+    batches: Iterator[List[AttributeDict]],
+    measure: Callable[[str, Callable, tuple], None],
+) -> TransferRecorder:
+    """Feed the batches to a recorder, every operation is run via `measure`"""
+    recorder = make_validating_recorder()
+    clear_transfers = recorder.clear_transfers
+    # pull_transfers_to_confirm calls clear_transfers, which is measured on its own
+    recorder.clear_transfers = lambda: measure(  # type: ignore
+        "clear_transfers", clear_transfers, ()
+    )
+    for batch in batches:
+        for event in batch:
+            measure(
+                OPERATION_BY_EVENT_NAME[event.event], recorder.apply_event, (event,)
+            )
+        measure("pull_transfers_to_confirm", recorder.pull_transfers_to_confirm, ())
+    return recorder
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    return sorted_values[
+        min(int(len(sorted_values) * fraction), len(sorted_values) - 1)
+    ]
+
+
+def measure_latencies(batches: Iterator[List[AttributeDict]]) -> Dict[str, Dict]:
+    durations: Dict[str, List[float]] = {operation: [] for operation in OPERATIONS}
+    perf_counter = time.perf_counter
+
+    def measure(operation, function, args):
+        start = perf_counter()
+        result = function(*args)
+        durations[operation].append(perf_counter() - start)
+        return result
+
+    reset_tracer()
+    run_operations(batches, measure)
+
+    latencies = {}
+    for operation, values in durations.items():
+        values.sort()
+        latencies[operation] = {
+            "count": len(values),
+            "total_seconds": sum(values),
+            "mean_us": sum(values) / len(values) * 1e6,
+            "p50_us": percentile(values, 0.5) * 1e6,
+            "p99_us": percentile(values, 0.99) * 1e6,
+            "max_us": values[-1] * 1e6,
+        }
+    return latencies
+
+
+def measure_allocations(batches: Iterator[List[AttributeDict]]) -> Dict[str, Dict]:
+    """The memory and blocks every operation left allocated, and the peak
+
+    The numbers are net, an operation freeing more than it allocates, like clearing
+    the completed transfers, has negative numbers.
+    """
+    allocated_bytes = {operation: 0 for operation in OPERATIONS}
+    allocated_blocks = {operation: 0 for operation in OPERATIONS}
+    counts = {operation: 0 for operation in OPERATIONS}
+
+    def measure(operation, function, args):
+        bytes_before = tracemalloc.get_traced_memory()[0]
+        blocks_before = sys.getallocatedblocks()
+        result = function(*args)
+        allocated_bytes[operation] += tracemalloc.get_traced_memory()[0] - bytes_before
+        allocated_blocks[operation] += sys.getallocatedblocks() - blocks_before
+        counts[operation] += 1
+        return result
+
+    reset_tracer()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        recorder = run_operations(batches, measure)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "operations": {
+            operation: {
+                "net_bytes_per_operation": allocated_bytes[operation]
+                / counts[operation],
+                "net_blocks_per_operation": allocated_blocks[operation]
+                / counts[operation],
+            }
+            for operation in OPERATIONS
+        },
+        "peak_traced_memory": peak - baseline,
+        "retained_traced_memory": current - baseline,
+        "recorder_size": get_deep_size(recorder),
+    }
+
+
+def measure_planner(batches: Iterator[List[AttributeDict]]) -> Dict[str, float]:
+    """The throughput of the event queues of the confirmation task planner"""
+    reset_tracer()
+    recorder = make_validating_recorder()
+    home_bridge_event_queue: Queue = Queue()
+    confirmation_task_queue: Queue = Queue()
+    planner = ConfirmationTaskPlanner(
+        recorder=recorder,
+        # the head events are processed right away, they are never too old
+        sync_persistence_time=float("inf"),
+        control_queue=Queue(),
+        transfer_event_queue=Queue(),
+        home_bridge_event_queue=home_bridge_event_queue,
+        confirmation_task_queue=confirmation_task_queue,
+    )
+    greenlet = gevent.spawn(planner.process_events_from_queue, home_bridge_event_queue)
+    number_of_events = 0
+    duration = 0.0
+    try:
+        for batch in batches:
+            for event in batch:
+                home_bridge_event_queue.put(event)
+            home_bridge_event_queue.put(
+                FetcherReachedHeadEvent(
+                    timestamp=time.time(),
+                    chain_role=ChainRole.home,
+                    last_fetched_block_number=batch[-1].blockNumber if batch else 0,
+                )
+            )
+            number_of_events += len(batch) + 1
+
+            start = time.perf_counter()
+            # the planner runs until the queue is empty and it waits for more
+            while not home_bridge_event_queue.empty():
+                gevent.sleep(0)
+            duration += time.perf_counter() - start
+    finally:
+        greenlet.kill()
+
+    return {
+        "events": number_of_events,
+        "confirmation_tasks": confirmation_task_queue.qsize(),
+        "total_seconds": duration,
+        "events_per_second": number_of_events / duration,
+    }
+
+
+@click.command()
+@click.option(
+    "--events",
+    "event_counts",
+    multiple=True,
+    type=int,
+    default=(10_000, 100_000),
+    show_default=True,
+    help="number of synthetic events, can be given several times",
+)
+@click.option(
+    "--batch-size",
+    default=1000,
+    show_default=True,
+    help="transfers between two pulls of the transfers to confirm",
+)
+@click.option(
+    "--lag",
+    default=2,
+    show_default=True,
+    help="batches until the confirmation and completion of a transfer arrive",
+)
+@click.option(
+    "--output", type=click.Path(dir_okay=False), help="also write report here"
+)
+@click.option("-v", "--verbose", is_flag=True, help="show the logs of the bridge")
+def main(event_counts, batch_size, lag, output, verbose):
+    """Measure the operations of the transfer recorder and planner at scale"""
+    setup_logging(verbose)
+    results = {}
+    for number_of_events in event_counts:
+        number_of_transfers = max(number_of_events // 3, 1)
+
+        def batches():
+            return generate_batches(number_of_transfers, batch_size, lag)
+
+        click.echo(f"Running with {number_of_events} events", err=True)
+        results[str(number_of_events)] = {
+            "transfers": number_of_transfers,
+            "latencies": measure_latencies(batches()),
+            "allocations": measure_allocations(batches()),
+            "planner": measure_planner(batches()),
+        }
+
+    write_report(
+        {"parameters": {"batch_size": batch_size, "lag": lag}, "results": results},
+        output,
+    )
+
+
+if __name__ == "__main__":
+    main()
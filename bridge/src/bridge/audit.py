@@ -0,0 +1,270 @@
+"""Offline audit of the transfers to the foreign bridge not completed on the home chain
+
+The whole history of both chains, from the configured start blocks up to the reorg
+safe block, is scanned with the event fetchers of the bridge. The ranges of
+`event_fetch_limit` blocks are fetched concurrently, as they are independent of each
+other. The events are matched with a TransferRecorder like in the running bridge,
+which is fed only the confirmations of the audited validator, while the
+confirmations of all validators are counted.
+"""
+import collections
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import attr
+import gevent.pool
+from eth_typing import Hash32
+from eth_utils import to_canonical_address, to_checksum_address
+from web3.datastructures import AttributeDict
+
+from bridge import node_status
+from bridge.constants import CONFIRMATION_EVENT_NAME
+from bridge.event_fetcher import EventFetcher
+from bridge.transfer_recorder import TransferRecorder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 8
+
+
+@attr.s(auto_attribs=True)
+class ScanResult:
+    events: List[AttributeDict]
+    from_block_number: int
+    to_block_number: int
+    duration: float
+
+
+@attr.s(auto_attribs=True)
+class OutstandingTransfer:
+    transfer_hash: Hash32
+    transfer_event: AttributeDict
+    number_of_confirmations: int
+    is_confirmed_by_validator: bool
+    timestamp: Optional[int] = None
+
+    def get_age(self, now: float) -> Optional[float]:
+        if self.timestamp is None:
+            return None
+        return now - self.timestamp
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        return {
+            "transfer_hash": "0x" + bytes(self.transfer_hash).hex(),
+            "transaction_hash": "0x"
+            + bytes(self.transfer_event["transactionHash"]).hex(),
+            "block_number": self.transfer_event["blockNumber"],
+            "sender": to_checksum_address(self.transfer_event["args"]["from"]),
+            "value": self.transfer_event["args"]["value"],
+            "age": self.get_age(now),
+            "number_of_confirmations": self.number_of_confirmations,
+            "is_confirmed_by_validator": self.is_confirmed_by_validator,
+        }
+
+
+@attr.s(auto_attribs=True)
+class AuditReport:
+    validator_address: bytes
+    foreign_scan: ScanResult
+    home_scan: ScanResult
+    outstanding_transfers: List[OutstandingTransfer]
+    number_of_transfers: int
+    number_of_confirmations: int
+    number_of_completions: int
+
+    def filter_by_age(self, min_age: float, now: float) -> None:
+        """Drop the outstanding transfers younger than min_age, they may be in flight"""
+        self.outstanding_transfers = [
+            transfer
+            for transfer in self.outstanding_transfers
+            if transfer.timestamp is None or now - transfer.timestamp >= min_age
+        ]
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        return {
+            "validator_address": to_checksum_address(self.validator_address),
+            "foreign_blocks": [
+                self.foreign_scan.from_block_number,
+                self.foreign_scan.to_block_number,
+            ],
+            "home_blocks": [
+                self.home_scan.from_block_number,
+                self.home_scan.to_block_number,
+            ],
+            "scan_duration": {
+                "foreign": self.foreign_scan.duration,
+                "home": self.home_scan.duration,
+            },
+            "number_of_transfers": self.number_of_transfers,
+            "number_of_confirmations": self.number_of_confirmations,
+            "number_of_completions": self.number_of_completions,
+            "outstanding_transfers": [
+                transfer.to_dict(now) for transfer in self.outstanding_transfers
+            ],
+        }
+
+
+def split_range(
+    from_block_number: int, to_block_number: int, chunk_size: int
+) -> List[Tuple[int, int]]:
+    return [
+        (start, min(start + chunk_size - 1, to_block_number))
+        for start in range(from_block_number, to_block_number + 1, chunk_size)
+    ]
+
+
+def get_reorg_safe_block_number(fetcher: EventFetcher) -> int:
+    status = node_status.get_node_status(fetcher.web3)
+    if status.is_syncing:
+        logger.warning(
+            f"The {fetcher.chain_role.name} node is still syncing, "
+            f"the audit only covers the blocks up to {status.latest_synced_block}"
+        )
+    return status.latest_synced_block - fetcher.max_reorg_depth
+
+
+def scan_events(fetcher: EventFetcher, pool: gevent.pool.Pool) -> ScanResult:
+    """Fetch the events of the fetcher up to the reorg safe block
+
+    The scan starts after the last block fetched by the fetcher and fetches
+    `event_fetch_limit` blocks per request, the requests run in the pool. The events
+    are returned in the order of the chain.
+    """
+    from_block_number = fetcher.last_fetched_block_number + 1
+    to_block_number = get_reorg_safe_block_number(fetcher)
+    start_time = time.monotonic()
+    events: List[AttributeDict] = []
+    # imap keeps the order of the ranges
+    for range_events in pool.imap(
+        lambda block_range: fetcher.fetch_events_in_range(*block_range),
+        split_range(from_block_number, to_block_number, fetcher.event_fetch_limit),
+    ):
+        events += range_events
+    duration = time.monotonic() - start_time
+    logger.info(
+        f"Fetched {len(events)} events of the {fetcher.chain_role.name} chain from "
+        f"block {from_block_number} to {to_block_number} in {duration:.1f}s"
+    )
+    return ScanResult(
+        events=events,
+        from_block_number=from_block_number,
+        to_block_number=to_block_number,
+        duration=duration,
+    )
+
+
+def match_transfers(
+    transfer_events: List[AttributeDict],
+    home_bridge_events: List[AttributeDict],
+    validator_address: bytes,
+) -> Tuple[List[OutstandingTransfer], TransferRecorder, int]:
+    """Find the transfers without a completion on the home chain
+
+    Returns the outstanding transfers in the order of the foreign chain, the recorder
+    they were matched with, and the number of confirmations of all validators.
+    """
+    validator_address = to_canonical_address(validator_address)
+    recorder = TransferRecorder(minimum_balance=0)
+    confirmation_counts: Dict[Hash32, int] = collections.Counter()
+    for event in transfer_events:
+        recorder.apply_event(event)
+    for event in home_bridge_events:
+        if event["event"] == CONFIRMATION_EVENT_NAME:
+            confirmation_counts[Hash32(bytes(event["args"]["transferHash"]))] += 1
+            if to_canonical_address(event["args"]["validator"]) != validator_address:
+                continue
+        recorder.apply_event(event)
+
+    outstanding_transfers = [
+        OutstandingTransfer(
+            transfer_hash=transfer_hash,
+            transfer_event=transfer_event,
+            number_of_confirmations=confirmation_counts[transfer_hash],
+            is_confirmed_by_validator=transfer_hash in recorder.confirmation_hashes,
+        )
+        for transfer_hash, transfer_event in recorder.iter_pending_transfers()
+    ]
+    return outstanding_transfers, recorder, sum(confirmation_counts.values())
+
+
+def add_timestamps(
+    fetcher: EventFetcher,
+    outstanding_transfers: List[OutstandingTransfer],
+    pool: gevent.pool.Pool,
+) -> None:
+    """Set the timestamps of the blocks of the transfers, fetched concurrently"""
+    block_numbers = sorted(
+        {transfer.transfer_event["blockNumber"] for transfer in outstanding_transfers}
+    )
+    timestamps = dict(
+        zip(block_numbers, pool.imap(fetcher.get_block_timestamp, block_numbers),)
+    )
+    for transfer in outstanding_transfers:
+        transfer.timestamp = timestamps[transfer.transfer_event["blockNumber"]]
+
+
+def audit(
+    *,
+    transfer_event_fetcher: EventFetcher,
+    home_bridge_event_fetcher: EventFetcher,
+    validator_address: bytes,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> AuditReport:
+    """Audit the transfers, the home bridge fetcher has to fetch all confirmations"""
+    foreign_pool = gevent.pool.Pool(concurrency)
+    # both chains are scanned at the same time, each with its own pool
+    foreign_scan_greenlet = gevent.spawn(
+        scan_events, transfer_event_fetcher, foreign_pool
+    )
+    home_scan = scan_events(home_bridge_event_fetcher, gevent.pool.Pool(concurrency))
+    foreign_scan = foreign_scan_greenlet.get()
+
+    outstanding_transfers, recorder, number_of_confirmations = match_transfers(
+        foreign_scan.events, home_scan.events, validator_address
+    )
+    add_timestamps(transfer_event_fetcher, outstanding_transfers, foreign_pool)
+    return AuditReport(
+        validator_address=to_canonical_address(validator_address),
+        foreign_scan=foreign_scan,
+        home_scan=home_scan,
+        outstanding_transfers=outstanding_transfers,
+        number_of_transfers=len(recorder.transfer_events),
+        number_of_confirmations=number_of_confirmations,
+        number_of_completions=len(recorder.completion_hashes),
+    )
+
+
+def format_report(report: AuditReport, now: float) -> str:
+    unconfirmed = [
+        transfer
+        for transfer in report.outstanding_transfers
+        if not transfer.is_confirmed_by_validator
+    ]
+    lines = [
+        f"Scanned foreign blocks {report.foreign_scan.from_block_number} to "
+        f"{report.foreign_scan.to_block_number} in {report.foreign_scan.duration:.1f}s "
+        f"and home blocks {report.home_scan.from_block_number} to "
+        f"{report.home_scan.to_block_number} in {report.home_scan.duration:.1f}s",
+        f"{report.number_of_transfers} transfers, "
+        f"{report.number_of_confirmations} confirmations, "
+        f"{report.number_of_completions} completions",
+        f"{len(report.outstanding_transfers)} outstanding transfers, "
+        f"{len(unconfirmed)} not confirmed by "
+        f"{to_checksum_address(report.validator_address)}",
+    ]
+    for transfer in sorted(
+        report.outstanding_transfers,
+        key=lambda transfer: transfer.transfer_event["blockNumber"],
+    ):
+        transfer_dict = transfer.to_dict(now)
+        age = transfer_dict["age"]
+        lines.append(
+            f"  {transfer_dict['transfer_hash']} block {transfer_dict['block_number']} "
+            f"age {'-' if age is None else f'{age / 3600:.1f}h'} "
+            f"confirmations {transfer_dict['number_of_confirmations']}"
+            f"{'' if transfer.is_confirmed_by_validator else ' unconfirmed'} "
+            f"value {transfer_dict['value']} from {transfer_dict['sender']} "
+            f"transaction {transfer_dict['transaction_hash']}"
+        )
+    return "\n".join(lines)
@@ -129,6 +129,47 @@ class WebserviceSchema(Schema):
                 )
 
 
+class ProfilingSchema(Schema):
+    enabled = fields.Bool(missing=False)
+    # seconds a greenlet may run without yielding before it is reported
+    max_blocking_time = fields.Float(missing=0.1, validate=validate.Range(min=0.001))
+
+
+class MemoryProfilingSchema(Schema):
+    enabled = fields.Bool(missing=False)
+    mode = fields.String(
+        missing="sampled", validate=validate.OneOf(("sampled", "continuous"))
+    )
+    snapshot_interval = fields.Float(missing=600, validate=validate.Range(min=1))
+    # seconds of every snapshot interval during which allocations are traced in sampled mode
+    trace_duration = fields.Float(missing=10, validate=validate.Range(min=1))
+    traceback_limit = fields.Integer(missing=1, validate=validate.Range(min=1))
+    max_snapshots = fields.Integer(missing=10, validate=validate.Range(min=2))
+
+    @validates_schema
+    def validate_trace_duration(self, in_data, **kwargs):
+        if in_data["trace_duration"] > in_data["snapshot_interval"]:
+            raise ValidationError(
+                "'memory_profiling.trace_duration' must not be longer than "
+                "'memory_profiling.snapshot_interval'"
+            )
+
+
+class RpcRecordingSchema(Schema):
+    mode = fields.String(required=True, validate=validate.OneOf(("record", "replay")))
+    path = fields.String(required=True)
+    # replay the recorded timing accelerated by this factor, as fast as possible if not given
+    replay_speed = fields.Float(validate=validate.Range(min=0.001))
+
+
+class DryRunSchema(Schema):
+    enabled = fields.Bool(missing=False)
+    # seconds from signing a confirmation until its simulated inclusion, by default
+    # the time until it would be reorg-safe on the home chain
+    inclusion_delay = fields.Float(validate=validate_non_negative)
+    report_interval = fields.Float(missing=60, validate=validate.Range(min=1))
+
+
 class ChainSchema(Schema):
     rpc_url = fields.Url(required=True, require_tld=False)
     rpc_timeout = fields.Integer(missing=180, validate=validate_non_negative)
@@ -165,13 +206,34 @@ class HomeChainSchema(ChainSchema):
     )
 
 
+class ExternalSignerSchema(Schema):
+    url = fields.Url(required=True, require_tld=False)
+    timeout = fields.Integer(missing=180, validate=validate_non_negative)
+    address = AddressField(required=True)
+
+
 class ConfigSchema(Schema):
     foreign_chain = fields.Nested(ForeignChainSchema(), required=True)
     home_chain = fields.Nested(HomeChainSchema(), required=True)
 
-    validator_private_key = fields.Nested(PrivateKeySchema, required=True)
+    validator_private_key = fields.Nested(PrivateKeySchema)
+    external_signer = fields.Nested(ExternalSignerSchema)
     logging = LoggingField(missing=lambda: dict(FORCED_LOGGING_CONFIG))
     webservice = fields.Nested(WebserviceSchema, missing=dict)
+    profiling = fields.Nested(ProfilingSchema, missing=dict)
+    memory_profiling = fields.Nested(MemoryProfilingSchema, missing=dict)
+    rpc_recording = fields.Nested(RpcRecordingSchema)
+    dry_run = fields.Nested(DryRunSchema, missing=dict)
+
+    @validates_schema
+    def validate_key_or_external_signer(self, in_data, **kwargs):
+        private_key_given = "validator_private_key" in in_data
+        external_signer_given = "external_signer" in in_data
+
+        if private_key_given == external_signer_given:
+            raise ValidationError(
+                "Either 'validator_private_key' or 'external_signer' must be given, but not both"
+            )
 
 
 def load_config(path: str) -> Dict[str, Any]:
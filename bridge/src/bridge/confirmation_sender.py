@@ -3,20 +3,21 @@ from typing import Callable
 
 import gevent
 import tenacity
-from eth_keys.datatypes import PrivateKey
-from eth_utils import is_checksum_address, to_checksum_address
+from eth_utils import is_checksum_address
 from gevent.queue import Queue
 from web3 import types as web3types
 from web3.contract import Contract
 from web3.datastructures import AttributeDict
 from web3.exceptions import TransactionNotFound
 
+from bridge import metrics, tracing
 from bridge.constants import (
     CONFIRMATION_TRANSACTION_GAS_LIMIT,
     HOME_CHAIN_STEP_DURATION,
 )
 from bridge.contract_validation import is_bridge_validator
 from bridge.service import Service
+from bridge.signer import Signer
 from bridge.utils import compute_transfer_hash
 
 logger = logging.getLogger(__name__)
@@ -60,18 +61,18 @@ class ConfirmationSender:
         *,
         transfer_event_queue: Queue,
         home_bridge_contract: Contract,
-        private_key: bytes,
+        signer: Signer,
         gas_price: web3types.Wei,
         max_reorg_depth: int,
         pending_transaction_queue: Queue,
         sanity_check_transfer: Callable,
     ):
-        self.private_key = private_key
-        self.address = PrivateKey(self.private_key).public_key.to_canonical_address()
-        self.address_hex = PrivateKey(self.private_key).public_key.to_checksum_address()
+        self.signer = signer
+        self.address = signer.address
+        self.address_hex = signer.address_hex
         if not is_bridge_validator(home_bridge_contract, self.address):
             logger.warning(
-                f"The address {to_checksum_address(self.address)} is not a bridge validator to confirm "
+                f"The address {self.address_hex} is not a bridge validator to confirm "
                 f"transfers on the home bridge contract!"
             )
 
@@ -139,7 +140,8 @@ class ConfirmationSender:
             transfer_event=transfer_event, nonce=nonce, chain_id=self.chain_id
         )
         assert transaction is not None
-        self.send_confirmation_transaction(transaction)
+        tx_hash = self.send_confirmation_transaction(transaction)
+        tracing.tracer.record_sent(compute_transfer_hash(transfer_event), tx_hash)
 
     def send_confirmation_transactions(self):
         while True:
@@ -187,14 +189,11 @@ class ConfirmationSender:
                 "chainId": chain_id,
             }
         )
-        signed_transaction = self.w3.eth.account.sign_transaction(
-            transaction, self.private_key
-        )
-
-        return signed_transaction
+        return self.signer.sign_transaction(transaction)
 
     def send_confirmation_transaction(self, transaction):
         tx_hash = self._rpc_send_raw_transaction(transaction.rawTransaction)
+        metrics.confirmations_sent.inc()
         self.pending_transaction_queue.put(transaction)
         logger.info(f"Sent confirmation transaction {tx_hash.hex()}")
         return tx_hash
@@ -222,6 +221,13 @@ class ConfirmationWatcher:
         else:
             logger.info(f"Transaction confirmed: {receipt.transactionHash.hex()}")
 
+    def _record_txreceipt(self, receipt):
+        if receipt.status == 0:
+            metrics.confirmations_failed.inc()
+        else:
+            metrics.confirmations_mined.inc()
+            tracing.tracer.record_mined(receipt.transactionHash)
+
     @watcher_retry
     def _rpc_get_receipt(self, txhash):
         try:
@@ -249,6 +255,7 @@ class ConfirmationWatcher:
             )
             receipt = self.wait_for_transaction(oldest_pending_transaction)
             self._log_txreceipt(receipt)
+            self._record_txreceipt(receipt)
 
     run = watch_pending_transactions
 
@@ -4,10 +4,9 @@ TRANSFER_EVENT_NAME = "Transfer"
 CONFIRMATION_EVENT_NAME = "Confirmation"
 COMPLETION_EVENT_NAME = "TransferCompleted"
 
-# Gas limit used for confirmation transactions. The actual gas usage can be determined with
-# test_measure_gas_home_bridge.py found in the smart contract test directory. Currently this is
-# 422074, but will increase to 630437 after Istanbul fork on home chain
-# On changing this value, update the corresponding constant in the test script accordingly.
+# Gas limit used for confirmation transactions. The actual gas usage is measured by the gas
+# benchmarks in contracts/gas_benchmarks, which also check that this limit covers the gas
+# budgets of confirmTransfer in contracts/gas_benchmarks/gas_budgets.json.
 CONFIRMATION_TRANSACTION_GAS_LIMIT = 650_000
 
 # maximum amount of time in seconds application greenlets have to cleanup before shutdown
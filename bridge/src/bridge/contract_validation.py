@@ -1,3 +1,4 @@
+import functools
 import logging
 
 import tenacity
@@ -42,7 +43,7 @@ def validate_contract_existence(contract: Contract) -> None:
         assert description_type in ("function", "event")
 
         signature = abi_to_signature(description)
-        signature_hash = Web3.keccak(text=signature)
+        signature_hash = get_signature_hash(signature)
 
         if description_type == "function":
             description_exists_in_code = signature_hash[:4] in contract_code
@@ -57,6 +58,11 @@ def validate_contract_existence(contract: Contract) -> None:
             )
 
 
+@functools.lru_cache(maxsize=None)
+def get_signature_hash(signature: str) -> bytes:
+    return Web3.keccak(text=signature)
+
+
 def get_validator_proxy_contract(home_bridge_contract: Contract) -> Contract:
     validator_proxy_address = retrying(
         home_bridge_contract.functions.validatorProxy().call
@@ -0,0 +1,205 @@
+"""Shadow mode of the bridge, planning and signing the confirmations without sending them
+
+In a dry run, the fetchers, the recorder, the planner and the signing of the
+confirmation transactions run like in the live bridge. The confirmation sender only
+records the transactions it would send, and the confirmation watcher simulates their
+inclusion after `inclusion_delay` seconds. The nonces are counted locally from the
+next nonce of the validator, so no gas or nonces are used and a dry run can be
+tuned beside the live bridge of the same validator.
+
+The throughput and the latency from the block of a transfer until its confirmation
+would have been sent are logged every `report_interval` seconds.
+"""
+import collections
+import logging
+import time
+from typing import Any, Deque, Dict, Optional
+
+import attr
+import gevent
+from eth_typing import Hash32
+
+from bridge import tracing
+from bridge.confirmation_sender import ConfirmationSender, ConfirmationWatcher
+from bridge.service import Service
+from bridge.signer import SignedTransaction
+from bridge.utils import compute_transfer_hash
+
+logger = logging.getLogger(__name__)
+
+# the most recent transactions the latencies are computed from
+MAX_RECORDED_TRANSACTIONS = 10_000
+
+
+@attr.s(auto_attribs=True)
+class DryRunTransaction:
+    transfer_hash: Hash32
+    transaction_hash: bytes
+    nonce: int
+    signed_at: float
+    # seconds from the block of the transfer until the transaction was signed
+    latency: Optional[float] = None
+    included_at: Optional[float] = None
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[
+        min(int(len(sorted_values) * fraction), len(sorted_values) - 1)
+    ]
+
+
+class DryRun:
+    def __init__(
+        self,
+        *,
+        inclusion_delay: float,
+        report_interval: float,
+        max_recorded_transactions: int = MAX_RECORDED_TRANSACTIONS,
+    ) -> None:
+        self.inclusion_delay = inclusion_delay
+        self.report_interval = report_interval
+        self.start_time = time.time()
+
+        self.transactions: Dict[bytes, DryRunTransaction] = {}
+        self.recent_transactions: Deque[DryRunTransaction] = collections.deque(
+            maxlen=max_recorded_transactions
+        )
+        self.number_of_signed_transactions = 0
+        self.number_of_included_transactions = 0
+
+        self.services = [Service("report-dry-run", self.report_periodically)]
+
+    def record_signed(
+        self, transfer_hash: Hash32, transaction: SignedTransaction, nonce: int
+    ) -> DryRunTransaction:
+        now = time.time()
+        trace = tracing.tracer.traces.get(transfer_hash)
+        block_timestamp = trace.timestamps.get("block") if trace is not None else None
+        dry_run_transaction = DryRunTransaction(
+            transfer_hash=transfer_hash,
+            transaction_hash=bytes(transaction.hash),
+            nonce=nonce,
+            signed_at=now,
+            latency=None if block_timestamp is None else now - block_timestamp,
+        )
+        self.transactions[dry_run_transaction.transaction_hash] = dry_run_transaction
+        self.recent_transactions.append(dry_run_transaction)
+        self.number_of_signed_transactions += 1
+        return dry_run_transaction
+
+    def wait_for_inclusion(self, transaction_hash: bytes) -> None:
+        """Wait until the transaction would be included, then record its inclusion"""
+        dry_run_transaction = self.transactions.pop(bytes(transaction_hash))
+        gevent.sleep(
+            max(dry_run_transaction.signed_at + self.inclusion_delay - time.time(), 0)
+        )
+        dry_run_transaction.included_at = time.time()
+        self.number_of_included_transactions += 1
+
+    def get_summary(self, since: Optional[float] = None) -> Dict:
+        """The throughput and latency of the transactions signed since `since`
+
+        By default since the start of the dry run, the latencies only cover the most
+        recent transactions.
+        """
+        now = time.time()
+        if since is None:
+            since = self.start_time
+        transactions = [
+            transaction
+            for transaction in self.recent_transactions
+            if transaction.signed_at >= since
+        ]
+        latencies = sorted(
+            transaction.latency
+            for transaction in transactions
+            if transaction.latency is not None
+        )
+        summary: Dict[str, Any] = {
+            "duration": now - since,
+            "signed": len(transactions),
+            "signed_per_second": len(transactions) / max(now - since, 1e-9),
+            "total_signed": self.number_of_signed_transactions,
+            "total_included": self.number_of_included_transactions,
+            "awaiting_inclusion": len(self.transactions),
+            "latency": None,
+        }
+        if latencies:
+            summary["latency"] = {
+                "mean": sum(latencies) / len(latencies),
+                "p50": percentile(latencies, 0.5),
+                "p99": percentile(latencies, 0.99),
+                "max": latencies[-1],
+            }
+        return summary
+
+    def log_summary(self, since: Optional[float] = None) -> None:
+        summary = self.get_summary(since)
+        latency = summary["latency"]
+        if latency is None:
+            latency_message = "no latency known"
+        else:
+            latency_message = (
+                f"latency from the transfer block p50 {latency['p50']:.1f}s, "
+                f"p99 {latency['p99']:.1f}s, max {latency['max']:.1f}s"
+            )
+        logger.info(
+            f"Dry run: {summary['signed']} confirmations signed in the last "
+            f"{summary['duration']:.0f}s ({summary['signed_per_second']:.2f}/s), "
+            f"{latency_message}, {summary['total_signed']} signed and "
+            f"{summary['total_included']} included in total, "
+            f"{summary['awaiting_inclusion']} awaiting inclusion"
+        )
+
+    def report_periodically(self) -> None:
+        while True:
+            since = time.time()
+            gevent.sleep(self.report_interval)
+            self.log_summary(since)
+
+
+class DryRunConfirmationSender(ConfirmationSender):
+    """Sign the confirmations like the ConfirmationSender, but only record them"""
+
+    def __init__(self, *, dry_run: DryRun, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.dry_run = dry_run
+        self._next_nonce: Optional[int] = None
+
+    def get_next_nonce(self):
+        # the nonce of the validator does not advance, as nothing is sent
+        if self._next_nonce is None:
+            self._next_nonce = super().get_next_nonce()
+        nonce = self._next_nonce
+        self._next_nonce += 1
+        return nonce
+
+    def send_confirmation_from_transfer_event(self, transfer_event):
+        nonce = self.get_next_nonce()
+        transaction = self.prepare_confirmation_transaction(
+            transfer_event=transfer_event, nonce=nonce, chain_id=self.chain_id
+        )
+        transfer_hash = compute_transfer_hash(transfer_event)
+        self.dry_run.record_signed(transfer_hash, transaction, nonce)
+        tracing.tracer.record_sent(transfer_hash, transaction.hash)
+        self.pending_transaction_queue.put(transaction)
+        logger.info(f"Dry run, not sending confirmation {transaction.hash.hex()}")
+
+
+class DryRunConfirmationWatcher(ConfirmationWatcher):
+    """Simulate the inclusion of the transactions recorded by the dry run"""
+
+    def __init__(self, *, dry_run: DryRun, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.dry_run = dry_run
+
+    def watch_pending_transactions(self):
+        while True:
+            oldest_pending_transaction = self.pending_transaction_queue.get()
+            self.dry_run.wait_for_inclusion(oldest_pending_transaction.hash)
+            logger.debug(
+                "Simulated inclusion of %s", oldest_pending_transaction.hash.hex()
+            )
+            tracing.tracer.record_mined(oldest_pending_transaction.hash)
+
+    run = watch_pending_transactions
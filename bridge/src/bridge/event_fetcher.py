@@ -1,15 +1,16 @@
 import logging
 import time
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import tenacity
 from web3 import Web3
 from web3.contract import Contract
 from web3.datastructures import AttributeDict
 
-from bridge import node_status
+from bridge import node_status, tracing
+from bridge.constants import TRANSFER_EVENT_NAME
 from bridge.events import ChainRole, FetcherReachedHeadEvent
-from bridge.utils import sort_events
+from bridge.utils import compute_transfer_hash, sort_events
 
 NODE_STATUS_CACHE_TIME_SECONDS = 1
 
@@ -76,6 +77,14 @@ class EventFetcher:
     def _rpc_cached_is_syncing(self):
         return self._rpc_get_cached_node_status().is_syncing
 
+    def get_block_lag(self) -> Optional[int]:
+        """Number of blocks the fetcher is behind the latest synced block, if known yet"""
+        if self._node_status is None:
+            return None
+        return max(
+            self._node_status.latest_synced_block - self.last_fetched_block_number, 0
+        )
+
     def _rpc_get_logs(
         self,
         event_name: str,
@@ -146,6 +155,47 @@ class EventFetcher:
             if events:
                 return events
 
+    def get_block_timestamp(self, block_number: int) -> int:
+        return self._retrying.call(self.web3.eth.getBlock, block_number)["timestamp"]
+
+    def is_catching_up(self) -> bool:
+        """Whether there are reorg safe blocks left to fetch"""
+        return (
+            self.last_fetched_block_number
+            < self._rpc_cached_latest_block() - self.max_reorg_depth
+        )
+
+    def trace_transfer_events(self, events: List) -> None:
+        """Record the time of fetching and the block time of the transfers for tracing
+
+        The block times are fetched best-effort without retrying, the transfers are
+        traced without them if the node does not answer.
+        """
+        transfer_events = [
+            event for event in events if event.get("event") == TRANSFER_EVENT_NAME
+        ]
+        for event in transfer_events:
+            tracing.tracer.record(compute_transfer_hash(event), "fetched")
+
+        block_timestamps: Dict[int, Optional[int]] = {}
+        for event in transfer_events:
+            if event.blockNumber not in block_timestamps:
+                try:
+                    block_timestamps[event.blockNumber] = self.web3.eth.getBlock(
+                        event.blockNumber
+                    )["timestamp"]
+                except Exception as exception:
+                    self.logger.debug(
+                        f"Could not fetch the timestamp of block {event.blockNumber} "
+                        f"for tracing: {exception}"
+                    )
+                    block_timestamps[event.blockNumber] = None
+            block_timestamp = block_timestamps[event.blockNumber]
+            if block_timestamp is not None:
+                tracing.tracer.record(
+                    compute_transfer_hash(event), "block", block_timestamp
+                )
+
     def fetch_events(self, poll_interval: int) -> None:
         if poll_interval <= 0:
             raise ValueError(
@@ -158,6 +208,10 @@ class EventFetcher:
             events = self.fetch_some_events()
             for event in events:
                 self.event_queue.put(event)
+            # the latencies of old transfers fetched while catching up are of no
+            # interest, tracing them would only slow down the catch-up
+            if events and not self.is_catching_up():
+                self.trace_transfer_events(events)
 
             if not events:
                 # instantiate this event here in order to use the
@@ -1,22 +1,31 @@
+import functools
+import json
 import logging
 import logging.config
 import os
 import signal
 import sys
+import time
 
 import click
 import gevent
 import gevent.pool
-from eth_keys.datatypes import PrivateKey
-from eth_utils import to_checksum_address
+from eth_utils import is_address, to_canonical_address, to_checksum_address
 from gevent.queue import Queue
 from marshmallow.exceptions import ValidationError
 from toml.decoder import TomlDecodeError
 from web3 import HTTPProvider, Web3
 
+import bridge.audit
+import bridge.dry_run
+import bridge.memory
+import bridge.metrics
 import bridge.node_status
+import bridge.profiling
+import bridge.rpc_recording
+import bridge.tracing
 import bridge.version
-from bridge.config import load_config
+from bridge.config import DryRunSchema, load_config
 from bridge.confirmation_sender import (
     ConfirmationSender,
     ConfirmationWatcher,
@@ -38,11 +47,12 @@ from bridge.contract_validation import (
 from bridge.event_fetcher import EventFetcher
 from bridge.events import ChainRole
 from bridge.service import Service, start_services
+from bridge.signer import make_validator_signer
+from bridge.startup import CheckCache, StartupTimings, build_concurrently
 from bridge.transfer_recorder import TransferRecorder
-from bridge.utils import get_validator_private_key
 from bridge.validator_balance_watcher import ValidatorBalanceWatcher
 from bridge.validator_status_watcher import ValidatorStatusWatcher
-from bridge.webservice import InternalState, Webservice
+from bridge.webservice import InternalState, PeriodicSummary, Webservice
 
 logger = logging.getLogger(__name__)
 
@@ -67,13 +77,44 @@ def configure_logging(config):
     )
 
 
-def make_w3(config, chain: ChainRole):
+def make_provider(config, chain: ChainRole):
     chaincfg = config[chain.configuration_key]
-    return Web3(
-        HTTPProvider(
-            chaincfg["rpc_url"], request_kwargs={"timeout": chaincfg["rpc_timeout"]}
+    rpc_recording = config.get("rpc_recording")
+    if rpc_recording and rpc_recording["mode"] == "replay":
+        return make_replay_provider(rpc_recording, chain)
+    return HTTPProvider(
+        chaincfg["rpc_url"], request_kwargs={"timeout": chaincfg["rpc_timeout"]}
+    )
+
+
+def make_w3(config, chain: ChainRole):
+    rpc_recording = config.get("rpc_recording")
+    w3 = Web3(make_provider(config, chain))
+    w3.middleware_onion.add(
+        bridge.metrics.make_rpc_metrics_middleware(chain.name), "rpc_metrics"
+    )
+    if rpc_recording and rpc_recording["mode"] == "record":
+        # innermost, to record the raw responses of the node
+        w3.middleware_onion.inject(
+            bridge.rpc_recording.make_rpc_recording_middleware(
+                bridge.rpc_recording.get_rpc_recorder(rpc_recording["path"]),
+                chain.name,
+            ),
+            "rpc_recording",
+            layer=0,
         )
+    return w3
+
+
+def make_replay_provider(rpc_recording, chain: ChainRole):
+    providers = bridge.rpc_recording.get_replay_providers(
+        rpc_recording["path"], rpc_recording.get("replay_speed")
     )
+    if chain.name not in providers:
+        raise SetupError(
+            f"No requests to the {chain.name} chain in {rpc_recording['path']}"
+        )
+    return providers[chain.name]
 
 
 def make_w3_home(config):
@@ -92,12 +133,19 @@ def get_max_pending_transactions(config):
     )
 
 
-def make_validator_address(config):
-    private_key_bytes = get_validator_private_key(config)
-    return PrivateKey(private_key_bytes).public_key.to_canonical_address()
+# the verdicts of the startup sanity checks, every check only runs once per process
+startup_checks = CheckCache()
 
 
 def sanity_check_home_bridge_contracts(home_bridge_contract):
+    startup_checks.run_once(
+        ("home-bridge-contracts", home_bridge_contract.address),
+        check_home_bridge_contracts,
+        home_bridge_contract,
+    )
+
+
+def check_home_bridge_contracts(home_bridge_contract):
     validate_contract_existence(home_bridge_contract)
 
     validator_proxy_contract = get_validator_proxy_contract(home_bridge_contract)
@@ -136,18 +184,23 @@ def make_transfer_event_fetcher(config, transfer_event_queue):
     )
 
 
-def make_home_bridge_event_fetcher(config, home_bridge_event_queue):
+def make_home_bridge_event_fetcher(config, home_bridge_event_queue, validator_address):
+    """The fetcher of the completions and the confirmations of the validator
+
+    With validator_address None the confirmations of all validators are fetched.
+    """
     w3_home = make_w3_home(config)
     home_bridge_contract = w3_home.eth.contract(
         address=config["home_chain"]["bridge_contract_address"], abi=HOME_BRIDGE_ABI
     )
-    validator_address = make_validator_address(config)
 
     return EventFetcher(
         web3=w3_home,
         contract=home_bridge_contract,
         filter_definition={
-            CONFIRMATION_EVENT_NAME: {"validator": validator_address},
+            CONFIRMATION_EVENT_NAME: {}
+            if validator_address is None
+            else {"validator": validator_address},
             COMPLETION_EVENT_NAME: {},
         },
         event_queue=home_bridge_event_queue,
@@ -159,7 +212,23 @@ def make_home_bridge_event_fetcher(config, home_bridge_event_queue):
 
 def make_recorder(config):
     minimum_balance = config["home_chain"]["minimum_validator_balance"]
-    return TransferRecorder(minimum_balance)
+    recorder = TransferRecorder(minimum_balance)
+    for set_name in (
+        "transfer_events",
+        "transfer_hashes",
+        "confirmation_hashes",
+        "completion_hashes",
+        "scheduled_hashes",
+        "pending_transfers",
+    ):
+        bridge.metrics.recorder_size.set_function(
+            functools.partial(lambda name: len(getattr(recorder, name)), set_name),
+            set_name,
+        )
+        bridge.memory.track(
+            f"recorder.{set_name}", functools.partial(getattr, recorder, set_name)
+        )
+    return recorder
 
 
 def make_confirmation_task_planner(
@@ -180,8 +249,26 @@ def make_confirmation_task_planner(
     )
 
 
+def is_dry_run_enabled(config):
+    return bool(config["dry_run"]) and config["dry_run"]["enabled"]
+
+
+def make_dry_run(config):
+    if not is_dry_run_enabled(config):
+        return None
+    inclusion_delay = config["dry_run"].get("inclusion_delay")
+    if inclusion_delay is None:
+        inclusion_delay = (
+            config["home_chain"]["max_reorg_depth"] + 1
+        ) * HOME_CHAIN_STEP_DURATION
+    return bridge.dry_run.DryRun(
+        inclusion_delay=inclusion_delay,
+        report_interval=config["dry_run"]["report_interval"],
+    )
+
+
 def make_confirmation_sender(
-    *, config, pending_transaction_queue, confirmation_task_queue
+    *, config, signer, pending_transaction_queue, confirmation_task_queue, dry_run=None
 ):
     w3_home = make_w3_home(config)
 
@@ -189,10 +276,16 @@ def make_confirmation_sender(
         address=config["home_chain"]["bridge_contract_address"], abi=HOME_BRIDGE_ABI
     )
     sanity_check_home_bridge_contracts(home_bridge_contract)
-    return ConfirmationSender(
+    if dry_run is None:
+        sender_class = ConfirmationSender
+    else:
+        sender_class = functools.partial(
+            bridge.dry_run.DryRunConfirmationSender, dry_run=dry_run
+        )
+    return sender_class(
         transfer_event_queue=confirmation_task_queue,
         home_bridge_contract=home_bridge_contract,
-        private_key=get_validator_private_key(config),
+        signer=signer,
         gas_price=config["home_chain"]["gas_price"],
         max_reorg_depth=config["home_chain"]["max_reorg_depth"],
         pending_transaction_queue=pending_transaction_queue,
@@ -204,17 +297,23 @@ def make_confirmation_sender(
     )
 
 
-def make_confirmation_watcher(*, config, pending_transaction_queue):
+def make_confirmation_watcher(*, config, pending_transaction_queue, dry_run=None):
     w3_home = make_w3_home(config)
     max_reorg_depth = config["home_chain"]["max_reorg_depth"]
-    return ConfirmationWatcher(
+    if dry_run is None:
+        watcher_class = ConfirmationWatcher
+    else:
+        watcher_class = functools.partial(
+            bridge.dry_run.DryRunConfirmationWatcher, dry_run=dry_run
+        )
+    return watcher_class(
         w3=w3_home,
         pending_transaction_queue=pending_transaction_queue,
         max_reorg_depth=max_reorg_depth,
     )
 
 
-def make_validator_status_watcher(config, control_queue):
+def make_validator_status_watcher(config, control_queue, validator_address):
     w3_home = make_w3_home(config)
 
     home_bridge_contract = w3_home.eth.contract(
@@ -223,8 +322,6 @@ def make_validator_status_watcher(config, control_queue):
     sanity_check_home_bridge_contracts(home_bridge_contract)
     validator_proxy_contract = get_validator_proxy_contract(home_bridge_contract)
 
-    validator_address = make_validator_address(config)
-
     return ValidatorStatusWatcher(
         validator_proxy_contract,
         validator_address,
@@ -234,11 +331,9 @@ def make_validator_status_watcher(config, control_queue):
     )
 
 
-def make_validator_balance_watcher(config, control_queue):
+def make_validator_balance_watcher(config, control_queue, validator_address):
     w3 = make_w3_home(config)
 
-    validator_address = make_validator_address(config)
-
     poll_interval = config["home_chain"]["balance_warn_poll_interval"]
 
     return ValidatorBalanceWatcher(
@@ -252,7 +347,20 @@ def make_validator_balance_watcher(config, control_queue):
 public_config_keys = ()
 
 
-def make_webservice(*, config, recorder):
+def make_memory_profiler(config):
+    d = config["memory_profiling"]
+    if not (d and d["enabled"]):
+        return None
+    return bridge.memory.MemoryProfiler(
+        mode=d["mode"],
+        snapshot_interval=d["snapshot_interval"],
+        trace_duration=d["trace_duration"],
+        traceback_limit=d["traceback_limit"],
+        max_snapshots=d["max_snapshots"],
+    )
+
+
+def make_webservice(*, config, recorder, memory_profiler=None):
     d = config["webservice"]
     if d and d["enabled"]:
         ws = Webservice(host=d["host"], port=d["port"])
@@ -267,47 +375,119 @@ def make_webservice(*, config, recorder):
 
     public_config = {k: encode_address(config[k]) for k in public_config_keys}
 
-    ws.enable_internal_state(InternalState(recorder=recorder, config=public_config))
+    ws.enable_internal_state(
+        InternalState(
+            recorder=recorder,
+            config=public_config,
+            transfer_latencies=PeriodicSummary(
+                bridge.tracing.get_transfer_latency_summary
+            ),
+        )
+    )
+    ws.enable_pending_transfers(recorder)
+    ws.enable_metrics(bridge.metrics.registry)
+    if is_profiling_enabled(config):
+        ws.enable_profiling(
+            bridge.profiling.SamplingProfiler(bridge.profiling.cpu_tracker)
+        )
+    if memory_profiler is not None:
+        ws.enable_memory_profiling(memory_profiler)
     return ws
 
 
-def make_main_services(config, recorder):
-    control_queue = Queue()
-    transfer_event_queue = Queue()
-    home_bridge_event_queue = Queue()
-    confirmation_task_queue = Queue()
+def is_profiling_enabled(config):
+    return bool(config["profiling"]) and config["profiling"]["enabled"]
 
-    transfer_event_fetcher = make_transfer_event_fetcher(config, transfer_event_queue)
-    home_bridge_event_fetcher = make_home_bridge_event_fetcher(
-        config, home_bridge_event_queue
-    )
 
-    confirmation_task_planner = make_confirmation_task_planner(
-        config,
-        recorder=recorder,
-        control_queue=control_queue,
-        transfer_event_queue=transfer_event_queue,
-        home_bridge_event_queue=home_bridge_event_queue,
-        confirmation_task_queue=confirmation_task_queue,
+def enable_profiling(config):
+    """Report greenlets blocking the hub and track the CPU time of all greenlets"""
+    max_blocking_time = config["profiling"]["max_blocking_time"]
+    logger.info(
+        f"Enabling profiling, reporting greenlets blocking for more than {max_blocking_time}s"
     )
+    bridge.profiling.enable_blocking_detection(max_blocking_time)
+    bridge.profiling.cpu_tracker.install()
 
-    validator_status_watcher = make_validator_status_watcher(config, control_queue)
+
+def make_main_services(config, recorder, signer, timings):
+    control_queue = Queue()
+    transfer_event_queue = Queue()
+    home_bridge_event_queue = Queue()
+    confirmation_task_queue = Queue()
 
     max_pending_transactions = get_max_pending_transactions(config)
     logger.info("maximum number of pending transactions: %s", max_pending_transactions)
     pending_transaction_queue = Queue(max_pending_transactions)
-    sender = make_confirmation_sender(
-        config=config,
-        pending_transaction_queue=pending_transaction_queue,
-        confirmation_task_queue=confirmation_task_queue,
+    dry_run = make_dry_run(config)
+
+    # the components only share the queues, so they can be built at the same time
+    components = build_concurrently(
+        {
+            "transfer-event-fetcher": functools.partial(
+                make_transfer_event_fetcher, config, transfer_event_queue
+            ),
+            "home-bridge-event-fetcher": functools.partial(
+                make_home_bridge_event_fetcher,
+                config,
+                home_bridge_event_queue,
+                signer.address,
+            ),
+            "confirmation-task-planner": functools.partial(
+                make_confirmation_task_planner,
+                config,
+                recorder=recorder,
+                control_queue=control_queue,
+                transfer_event_queue=transfer_event_queue,
+                home_bridge_event_queue=home_bridge_event_queue,
+                confirmation_task_queue=confirmation_task_queue,
+            ),
+            "validator-status-watcher": functools.partial(
+                make_validator_status_watcher, config, control_queue, signer.address
+            ),
+            "confirmation-sender": functools.partial(
+                make_confirmation_sender,
+                config=config,
+                signer=signer,
+                pending_transaction_queue=pending_transaction_queue,
+                confirmation_task_queue=confirmation_task_queue,
+                dry_run=dry_run,
+            ),
+            "confirmation-watcher": functools.partial(
+                make_confirmation_watcher,
+                config=config,
+                pending_transaction_queue=pending_transaction_queue,
+                dry_run=dry_run,
+            ),
+            "validator-balance-watcher": functools.partial(
+                make_validator_balance_watcher, config, control_queue, signer.address
+            ),
+        },
+        timings,
     )
-    watcher = make_confirmation_watcher(
-        config=config, pending_transaction_queue=pending_transaction_queue
+    transfer_event_fetcher = components["transfer-event-fetcher"]
+    home_bridge_event_fetcher = components["home-bridge-event-fetcher"]
+    confirmation_task_planner = components["confirmation-task-planner"]
+    validator_status_watcher = components["validator-status-watcher"]
+    sender = components["confirmation-sender"]
+    watcher = components["confirmation-watcher"]
+    validator_balance_watcher = components["validator-balance-watcher"]
+
+    register_queue_metrics(
+        {
+            "control": control_queue,
+            "transfer_events": transfer_event_queue,
+            "home_bridge_events": home_bridge_event_queue,
+            "confirmation_tasks": confirmation_task_queue,
+            "pending_transactions": pending_transaction_queue,
+        }
     )
+    bridge.metrics.pending_transactions_limit.set(max_pending_transactions)
+    for fetcher in (transfer_event_fetcher, home_bridge_event_fetcher):
+        bridge.metrics.fetcher_lag.set_function(
+            fetcher.get_block_lag, fetcher.chain_role.name
+        )
 
-    validator_balance_watcher = make_validator_balance_watcher(config, control_queue)
-
-    return (
+    services = (
         [
             Service(
                 "fetch-foreign-bridge-events",
@@ -327,6 +507,15 @@ def make_main_services(config, recorder):
         + watcher.services
         + confirmation_task_planner.services
     )
+    if dry_run is not None:
+        services += dry_run.services
+    return services
+
+
+def register_queue_metrics(queues_by_name):
+    for name, queue in queues_by_name.items():
+        bridge.metrics.queue_size.set_function(queue.qsize, name)
+        bridge.memory.track(f"queue.{name}", functools.partial(getattr, queue, "queue"))
 
 
 def reload_logging_config(config_path):
@@ -377,10 +566,12 @@ def shutdown_raw(timeout=APPLICATION_CLEANUP_TIMEOUT, exitcode=0):
         else:
             logger.error("Bridge didn't clean up in time, doing a hard exit")
 
+        bridge.rpc_recording.close_rpc_recorders()
         sys.stderr.flush()
         sys.stdout.flush()
 
         os._exit(os.EX_SOFTWARE)
+    bridge.rpc_recording.close_rpc_recorders()
     os._exit(exitcode)
 
 
@@ -442,17 +633,28 @@ def wait_until_foreign_node_is_ready(config):
         address=config["foreign_chain"]["token_contract_address"],
         abi=MINIMAL_ERC20_TOKEN_ABI,
     )
-    validate_contract_existence(token_contract)
+    startup_checks.run_once(
+        ("token-contract", token_contract.address),
+        validate_contract_existence,
+        token_contract,
+    )
     logger.info("foreign node has passed the sanity checks")
 
 
-def start_system(config):
+def start_system(config, signer):
+    timings = StartupTimings()
     recorder = make_recorder(config)
     install_signal_handler(
         signal.SIGUSR1, "report-internal-state", recorder.log_current_state
     )
 
-    webservice = make_webservice(config=config, recorder=recorder)
+    memory_profiler = make_memory_profiler(config)
+    if memory_profiler is not None:
+        start_services_in_main_pool(memory_profiler.services)
+
+    webservice = make_webservice(
+        config=config, recorder=recorder, memory_profiler=memory_profiler
+    )
     if webservice is not None:
         start_services_in_main_pool(webservice.services)
 
@@ -461,15 +663,20 @@ def start_system(config):
         Service("foreign_wait_ready", wait_until_foreign_node_is_ready, config),
     ]
 
-    gevent.joinall(
-        start_services_in_main_pool(wait_node_ready_services), raise_error=True
-    )
+    with timings.phase("wait for nodes"):
+        gevent.joinall(
+            start_services_in_main_pool(wait_node_ready_services), raise_error=True
+        )
+
+    with timings.phase("build components"):
+        main_services = make_main_services(config, recorder, signer, timings)
 
-    main_services = make_main_services(config, recorder)
-    start_services_in_main_pool(main_services)
+    with timings.phase("start services"):
+        start_services_in_main_pool(main_services)
+    timings.log_summary()
 
 
-@click.command()
+@click.group(invoke_without_command=True)
 @click.version_option(version=bridge.version.version)
 @click.option(
     "-c",
@@ -480,13 +687,20 @@ def start_system(config):
     envvar="BRIDGE_CONFIG",
     help="Path to a config file",
 )
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="Plan and sign the confirmations, but do not send them",
+)
 @click.pass_context
-def main(ctx, config_path: str) -> None:
+def main(ctx, config_path: str, dry_run: bool) -> None:
     """The Trustlines Bridge Validation Server
 
     Configuration can be made using a TOML file.
 
     See config.py for valid configuration options and defaults.
+
+    Without a command the server is started.
     """
 
     try:
@@ -499,12 +713,27 @@ def main(ctx, config_path: str) -> None:
             f"Invalid config file: {validation_error}"
         ) from validation_error
 
+    if dry_run:
+        config["dry_run"] = DryRunSchema().load({**config["dry_run"], "enabled": True})
+
     configure_logging(config)
+    if ctx.invoked_subcommand is not None:
+        ctx.obj = config
+        return
 
-    validator_address = make_validator_address(config)
+    if is_profiling_enabled(config):
+        enable_profiling(config)
+
+    # the keystore is decrypted only here, the components get the signer
+    try:
+        signer = make_validator_signer(config)
+    except ValueError as error:
+        raise click.UsageError(str(error)) from error
     logger.info(
-        f"Starting Trustlines Bridge Validation Server for address {to_checksum_address(validator_address)}"
+        f"Starting Trustlines Bridge Validation Server for address {signer.address_hex}"
     )
+    if is_dry_run_enabled(config):
+        logger.info("Dry run, the confirmation transactions are not sent")
     install_signal_handler(
         signal.SIGHUP, "reload-logging-config", reload_logging_config, config_path
     )
@@ -513,9 +742,67 @@ def main(ctx, config_path: str) -> None:
         install_signal_handler(signum, "terminator", shutdown_raw, exitcode=0)
 
     try:
-        start_services_in_main_pool([Service("start_system", start_system, config)])
+        start_services_in_main_pool(
+            [Service("start_system", start_system, config, signer)]
+        )
     except Exception as exception:
         logger.exception("Application error", exc_info=exception)
         os._exit(os.EX_SOFTWARE)
     finally:
         gevent.hub.get_hub().join()
+
+
+@main.command()
+@click.option(
+    "--validator",
+    "validator_address",
+    help="Address of the validator to audit, the configured validator by default",
+)
+@click.option(
+    "--concurrency",
+    default=bridge.audit.DEFAULT_CONCURRENCY,
+    show_default=True,
+    help="Number of block ranges fetched at the same time per chain",
+)
+@click.option(
+    "--min-age",
+    default=0.0,
+    show_default=True,
+    help="Only report transfers older than this many seconds",
+)
+@click.option("--json", "as_json", is_flag=True, help="Print the report as JSON")
+@click.pass_obj
+def audit(config, validator_address, concurrency, min_age, as_json) -> None:
+    """Report the transfers to the foreign bridge not completed on the home chain
+
+    Both chains are scanned from the configured start blocks, the outstanding
+    transfers are reported with their ages and numbers of confirmations. Exits with
+    status 1 if there are outstanding transfers.
+    """
+    if concurrency <= 0:
+        raise click.BadParameter("must be positive", param_hint="--concurrency")
+    if validator_address is None:
+        try:
+            validator_address = make_validator_signer(config).address
+        except ValueError as error:
+            raise click.UsageError(str(error)) from error
+    elif is_address(validator_address):
+        validator_address = to_canonical_address(validator_address)
+    else:
+        raise click.BadParameter("not an address", param_hint="--validator")
+
+    report = bridge.audit.audit(
+        transfer_event_fetcher=make_transfer_event_fetcher(config, None),
+        home_bridge_event_fetcher=make_home_bridge_event_fetcher(config, None, None),
+        validator_address=validator_address,
+        concurrency=concurrency,
+    )
+    now = time.time()
+    if min_age > 0:
+        report.filter_by_age(min_age, now)
+    if as_json:
+        click.echo(json.dumps(report.to_dict(now), indent=2, sort_keys=True))
+    else:
+        click.echo(bridge.audit.format_report(report, now))
+    if report.outstanding_transfers:
+        sys.exit(1)
@@ -0,0 +1,237 @@
+"""Memory profiling of the bridge process
+
+The sizes of the long lived structures, like the sets of the transfer recorder and
+the backlogs of the queues, are computed exactly, including the objects they hold.
+
+Allocations are traced with tracemalloc. Tracing slows down every allocation, so by
+default it only runs in a sampled mode: for `trace_duration` seconds out of every
+`snapshot_interval` seconds, with a snapshot taken at the end of every window. The
+snapshot of a window shows the allocations made in that window and still alive at its
+end, which is where a leak shows up. In the continuous mode the tracing is never
+stopped and the snapshots show all live allocations since the start.
+"""
+import collections
+import itertools
+import logging
+import resource
+import sys
+import time
+import tracemalloc
+import types
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional
+
+import attr
+import gevent
+
+from bridge.service import Service
+
+logger = logging.getLogger(__name__)
+
+SAMPLED_MODE = "sampled"
+CONTINUOUS_MODE = "continuous"
+MODES = (SAMPLED_MODE, CONTINUOUS_MODE)
+
+KEY_TYPES = ("lineno", "filename", "traceback")
+
+# objects shared by everyone, they are not counted for the size of anything else
+SHARED_TYPES = (type, types.ModuleType, types.FunctionType, types.MethodType)
+
+# the allocations of tracemalloc itself are of no interest
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+tracked_objects: Dict[str, Callable[[], Any]] = {}
+
+
+def track(name: str, get_object: Callable[[], Any]) -> None:
+    """Report the size of the object returned by `get_object` under `name`"""
+    tracked_objects[name] = get_object
+
+
+def get_deep_size(obj: Any) -> int:
+    """The size of the object and all objects it references, each counted once"""
+    seen = set()
+    size = 0
+    objects_to_visit = [obj]
+    while objects_to_visit:
+        current = objects_to_visit.pop()
+        if id(current) in seen or isinstance(current, SHARED_TYPES):
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+
+        if isinstance(current, (str, bytes, bytearray)):
+            continue
+        if isinstance(current, Mapping):
+            objects_to_visit.extend(current.keys())
+            objects_to_visit.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset, collections.deque)):
+            objects_to_visit.extend(current)
+        if hasattr(current, "__dict__"):
+            objects_to_visit.append(vars(current))
+    return size
+
+
+def get_tracked_object_sizes() -> Dict[str, Dict[str, int]]:
+    sizes = {}
+    for name, get_object in tracked_objects.items():
+        obj = get_object()
+        sizes[name] = {"length": len(obj), "size": get_deep_size(obj)}
+    return sizes
+
+
+def get_max_rss() -> int:
+    """The maximum resident set size of the process in bytes"""
+    # ru_maxrss is given in kilobytes on linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@attr.s(auto_attribs=True)
+class SnapshotRecord:
+    id: int
+    timestamp: float
+    traced_size: int
+    snapshot: tracemalloc.Snapshot
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "timestamp": self.timestamp,
+            "traced_size": self.traced_size,
+        }
+
+
+class UnknownSnapshotError(KeyError):
+    pass
+
+
+class MemoryProfiler:
+    def __init__(
+        self,
+        *,
+        mode: str = SAMPLED_MODE,
+        snapshot_interval: float = 600,
+        trace_duration: float = 10,
+        traceback_limit: int = 1,
+        max_snapshots: int = 10,
+    ) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown memory profiling mode {mode}")
+        if mode == SAMPLED_MODE and trace_duration > snapshot_interval:
+            raise ValueError(
+                "The trace duration must not be longer than the snapshot interval"
+            )
+        self.mode = mode
+        self.snapshot_interval = snapshot_interval
+        self.trace_duration = trace_duration
+        self.traceback_limit = traceback_limit
+
+        self.snapshots: Deque[SnapshotRecord] = collections.deque(maxlen=max_snapshots)
+        self._snapshot_ids = itertools.count(1)
+
+        self.services = [Service("memory-profiler", self.run)]
+
+    @property
+    def is_tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def take_snapshot(self) -> SnapshotRecord:
+        if not self.is_tracing:
+            raise RuntimeError("Memory allocations are not being traced at the moment")
+        record = SnapshotRecord(
+            id=next(self._snapshot_ids),
+            timestamp=time.time(),
+            traced_size=tracemalloc.get_traced_memory()[0],
+            snapshot=tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS),
+        )
+        self.snapshots.append(record)
+        return record
+
+    def get_snapshot(self, snapshot_id: int) -> SnapshotRecord:
+        for record in self.snapshots:
+            if record.id == snapshot_id:
+                return record
+        raise UnknownSnapshotError(snapshot_id)
+
+    def get_top_allocations(
+        self,
+        snapshot_id: int,
+        *,
+        limit: int = 20,
+        key_type: str = "lineno",
+        compare_to: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """The allocation sites with the most memory, or the biggest growth since the
+        snapshot `compare_to`"""
+        if key_type not in KEY_TYPES:
+            raise ValueError(f"Unknown key type {key_type}")
+        snapshot = self.get_snapshot(snapshot_id).snapshot
+
+        if compare_to is None:
+            return [
+                {
+                    "site": stat.traceback.format(),
+                    "size": stat.size,
+                    "count": stat.count,
+                }
+                for stat in snapshot.statistics(key_type)[:limit]
+            ]
+
+        old_snapshot = self.get_snapshot(compare_to).snapshot
+        return [
+            {
+                "site": stat.traceback.format(),
+                "size": stat.size,
+                "size_diff": stat.size_diff,
+                "count": stat.count,
+                "count_diff": stat.count_diff,
+            }
+            for stat in snapshot.compare_to(old_snapshot, key_type)[:limit]
+        ]
+
+    def get_summary(self) -> Dict[str, Any]:
+        if self.is_tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            traced_memory: Optional[Dict[str, int]] = {"current": current, "peak": peak}
+        else:
+            traced_memory = None
+        return {
+            "mode": self.mode,
+            "tracing": self.is_tracing,
+            "traced_memory": traced_memory,
+            "max_rss": get_max_rss(),
+            "snapshots": [record.to_dict() for record in self.snapshots],
+            "objects": get_tracked_object_sizes(),
+        }
+
+    def run(self) -> None:
+        if self.mode == CONTINUOUS_MODE:
+            self._run_continuous()
+        else:
+            self._run_sampled()
+
+    def _run_continuous(self) -> None:
+        if not self.is_tracing:
+            tracemalloc.start(self.traceback_limit)
+        while True:
+            gevent.sleep(self.snapshot_interval)
+            self.take_snapshot()
+
+    def _run_sampled(self) -> None:
+        while True:
+            gevent.sleep(self.snapshot_interval - self.trace_duration)
+            if self.is_tracing:
+                # started by someone else, e.g. via PYTHONTRACEMALLOC, leave it running
+                gevent.sleep(self.trace_duration)
+                self.take_snapshot()
+                continue
+
+            tracemalloc.start(self.traceback_limit)
+            try:
+                gevent.sleep(self.trace_duration)
+                self.take_snapshot()
+            finally:
+                tracemalloc.stop()
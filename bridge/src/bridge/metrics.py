@@ -0,0 +1,294 @@
+"""Metrics of the bridge in the Prometheus text exposition format
+
+The bridge runs in greenlets of a single thread, so updating a metric is just a
+dictionary update without any locking and cheap enough for hot paths. Values that
+can be read from somewhere else, like queue sizes, are not updated at all but
+computed by a function when the metrics are collected.
+"""
+import bisect
+import logging
+import math
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def format_labels(labelnames: Sequence[str], labelvalues: Sequence[str]) -> str:
+    if not labelnames:
+        return ""
+    labels = ",".join(
+        f'{name}="{escape_label_value(value)}"'
+        for name, value in zip(labelnames, labelvalues)
+    )
+    return f"{{{labels}}}"
+
+
+def escape_label_value(value: str) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _check_labelvalues(self, labelvalues: LabelValues) -> None:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name} has the labels {self.labelnames}, but got {labelvalues}"
+            )
+
+    def samples(self) -> List[Tuple[str, LabelValues, float]]:
+        raise NotImplementedError()
+
+    def expose(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for name, labelvalues, value in self.samples():
+            labelnames = self.labelnames + (("le",) if name.endswith("_bucket") else ())
+            lines.append(
+                f"{name}{format_labels(labelnames, labelvalues)} {format_value(value)}"
+            )
+        return lines
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        if not self.labelnames:
+            self._values[()] = 0
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        try:
+            self._values[labelvalues] += amount
+        except KeyError:
+            self._check_labelvalues(labelvalues)
+            self._values[labelvalues] = amount
+
+    def get(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def samples(self):
+        return [
+            (self.name, labelvalues, value)
+            for labelvalues, value in self._values.items()
+        ]
+
+
+class Gauge(Metric):
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._functions: Dict[LabelValues, Callable[[], float]] = {}
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        self._check_labelvalues(labelvalues)
+        self._values[labelvalues] = value
+
+    def set_function(self, function: Callable[[], float], *labelvalues: str) -> None:
+        """Compute the value with `function` whenever the metrics are collected"""
+        self._check_labelvalues(labelvalues)
+        self._functions[labelvalues] = function
+
+    def get(self, *labelvalues: str) -> float:
+        if labelvalues in self._functions:
+            return self._functions[labelvalues]()
+        return self._values[labelvalues]
+
+    def samples(self):
+        samples = [
+            (self.name, labelvalues, value)
+            for labelvalues, value in self._values.items()
+        ]
+        for labelvalues, function in self._functions.items():
+            try:
+                value = function()
+            except Exception:
+                logger.exception(f"Could not compute the value of {self.name}")
+                continue
+            if value is not None:
+                samples.append((self.name, labelvalues, value))
+        return samples
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label values: the count of every bucket, without the +Inf bucket, and the sum
+        self._bucket_counts: Dict[LabelValues, List[int]] = {}
+        self._counts: Dict[LabelValues, int] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        try:
+            bucket_counts = self._bucket_counts[labelvalues]
+        except KeyError:
+            self._check_labelvalues(labelvalues)
+            bucket_counts = self._bucket_counts[labelvalues] = [0] * len(self.buckets)
+            self._counts[labelvalues] = 0
+            self._sums[labelvalues] = 0.0
+
+        # only the first matching bucket is counted, they are summed up on collection
+        bucket_index = bisect.bisect_left(self.buckets, value)
+        if bucket_index < len(bucket_counts):
+            bucket_counts[bucket_index] += 1
+        self._counts[labelvalues] += 1
+        self._sums[labelvalues] += value
+
+    def get_count(self, *labelvalues: str) -> int:
+        return self._counts.get(labelvalues, 0)
+
+    def samples(self):
+        samples = []
+        for labelvalues, bucket_counts in self._bucket_counts.items():
+            cumulative_count = 0
+            for upper_bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative_count += bucket_count
+                samples.append(
+                    (
+                        f"{self.name}_bucket",
+                        labelvalues + (format_value(upper_bound),),
+                        cumulative_count,
+                    )
+                )
+            samples.append(
+                (
+                    f"{self.name}_bucket",
+                    labelvalues + ("+Inf",),
+                    self._counts[labelvalues],
+                )
+            )
+            samples.append(
+                (f"{self.name}_count", labelvalues, self._counts[labelvalues])
+            )
+            samples.append((f"{self.name}_sum", labelvalues, self._sums[labelvalues]))
+        return samples
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"A metric with the name {metric.name} already exists")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, *args, **kwargs) -> Counter:
+        return self.register(Counter(*args, **kwargs))  # type: ignore
+
+    def gauge(self, *args, **kwargs) -> Gauge:
+        return self.register(Gauge(*args, **kwargs))  # type: ignore
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        return self.register(Histogram(*args, **kwargs))  # type: ignore
+
+    def expose(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+rpc_requests = registry.counter(
+    "bridge_rpc_requests_total",
+    "Number of JSON-RPC requests by chain and method",
+    ["chain", "method"],
+)
+rpc_request_duration = registry.histogram(
+    "bridge_rpc_request_duration_seconds",
+    "Duration of JSON-RPC requests by chain and method",
+    ["chain", "method"],
+)
+confirmations_sent = registry.counter(
+    "bridge_confirmations_sent_total", "Number of sent confirmation transactions"
+)
+confirmations_mined = registry.counter(
+    "bridge_confirmations_mined_total",
+    "Number of successful confirmation transactions past the maximum reorg depth",
+)
+confirmations_failed = registry.counter(
+    "bridge_confirmations_failed_total",
+    "Number of failed confirmation transactions past the maximum reorg depth",
+)
+queue_size = registry.gauge(
+    "bridge_queue_size", "Number of items waiting in the queues", ["queue"]
+)
+pending_transactions_limit = registry.gauge(
+    "bridge_pending_transactions_limit",
+    "Maximum number of confirmation transactions waiting to be mined",
+)
+fetcher_lag = registry.gauge(
+    "bridge_fetcher_lag_blocks",
+    "Number of blocks between the head of the chain and the last fetched block",
+    ["chain"],
+)
+recorder_size = registry.gauge(
+    "bridge_recorder_size",
+    "Number of transfers and hashes kept by the transfer recorder",
+    ["set"],
+)
+
+
+def make_rpc_metrics_middleware(chain_name: str):
+    """Web3 middleware counting and timing all requests to the node of the chain"""
+
+    def rpc_metrics_middleware(make_request, w3):
+        def middleware(method, params):
+            start_time = time.monotonic()
+            try:
+                return make_request(method, params)
+            finally:
+                rpc_requests.inc(chain_name, method)
+                rpc_request_duration.observe(
+                    time.monotonic() - start_time, chain_name, method
+                )
+
+        return middleware
+
+    return rpc_metrics_middleware
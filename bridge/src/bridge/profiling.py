@@ -0,0 +1,171 @@
+"""Instrumentation of the gevent hub shared by all services of the bridge
+
+A greenlet running for long without yielding, e.g. while decoding lots of events or
+signing, stalls every other service. This module reports such greenlets with their
+stack, accounts the CPU time of the greenlets by name, and samples the stacks of the
+hub thread on demand, formatted as folded stacks for flamegraph tools.
+"""
+import collections
+import logging
+import os
+import re
+import sys
+import time
+from typing import Counter, Optional
+
+import gevent
+import gevent.events
+import greenlet
+from gevent import monkey
+
+from bridge import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BLOCKING_TIME = 0.1
+MAX_PROFILE_DURATION = 60
+MIN_PROFILE_INTERVAL = 0.001
+
+greenlet_cpu_time = metrics.registry.counter(
+    "bridge_greenlet_cpu_seconds_total",
+    "CPU time spent running the greenlets by name",
+    ["greenlet"],
+)
+hub_blocked = metrics.registry.counter(
+    "bridge_hub_blocked_total",
+    "Number of times the monitoring thread found a greenlet blocking the hub",
+    ["greenlet"],
+)
+
+
+def get_greenlet_name(glet) -> str:
+    """The name of the greenlet without the counter gevent appends to unnamed greenlets
+
+    The names are used as metric labels, so there must not be a new one per greenlet.
+    """
+    name = getattr(glet, "name", None)
+    if not isinstance(name, str) or not name:
+        return type(glet).__name__
+    return re.sub(r"-\d+$", "", name)
+
+
+def report_blocked_hub(event) -> None:
+    if not isinstance(event, gevent.events.EventLoopBlocked):
+        return
+    name = get_greenlet_name(event.greenlet)
+    hub_blocked.inc(name)
+    logger.warning(
+        f"Greenlet {name} blocked the hub for more than {event.blocking_time}s\n"
+        + "\n".join(event.info)
+    )
+
+
+def enable_blocking_detection(
+    max_blocking_time: float = DEFAULT_MAX_BLOCKING_TIME,
+) -> None:
+    """Report every greenlet that runs longer than `max_blocking_time` without yielding
+
+    The hub is checked from a separate monitoring thread, so this does not slow down
+    the greenlets.
+    """
+    gevent.config.monitor_thread = True
+    gevent.config.max_blocking_time = max_blocking_time
+    if report_blocked_hub not in gevent.events.subscribers:
+        gevent.events.subscribers.append(report_blocked_hub)
+    gevent.get_hub().start_periodic_monitoring_thread()
+
+
+class GreenletCpuTracker:
+    """Accounts the CPU time of the thread to the greenlet running at the time
+
+    Installed as trace function of greenlet, called on every switch.
+    """
+
+    def __init__(self) -> None:
+        self.current_name = get_greenlet_name(greenlet.getcurrent())
+        self._switch_time = time.thread_time()
+        self._previous_trace = None
+        self.installed = False
+
+    def install(self) -> None:
+        if self.installed:
+            return
+        self.current_name = get_greenlet_name(greenlet.getcurrent())
+        self._switch_time = time.thread_time()
+        self._previous_trace = greenlet.settrace(self)
+        self.installed = True
+
+    def uninstall(self) -> None:
+        if not self.installed:
+            return
+        greenlet.settrace(self._previous_trace)
+        self._previous_trace = None
+        self.installed = False
+
+    def __call__(self, event, args):
+        if event in ("switch", "throw"):
+            origin, target = args
+            now = time.thread_time()
+            greenlet_cpu_time.inc(self.current_name, amount=now - self._switch_time)
+            self._switch_time = now
+            self.current_name = get_greenlet_name(target)
+
+        if self._previous_trace is not None:
+            self._previous_trace(event, args)
+
+
+cpu_tracker = GreenletCpuTracker()
+
+
+def format_frame(frame) -> str:
+    code = frame.f_code
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+class SamplingProfiler:
+    """Samples the stacks of the thread running the hub from a native thread
+
+    The stacks are prefixed with the name of the running greenlet if the greenlet CPU
+    tracker is installed, and counted in the folded format "a;b;c count" understood
+    by flamegraph.pl, speedscope and similar tools.
+    """
+
+    def __init__(self, tracker: Optional[GreenletCpuTracker] = None) -> None:
+        # the monkey patched get_ident would return the id of the current greenlet
+        self.thread_id = monkey.get_original("threading", "get_ident")()
+        self.tracker = tracker
+
+    def profile(self, duration: float, interval: float) -> Counter[str]:
+        """Sample the stacks for `duration` seconds every `interval` seconds
+
+        The sampling runs in the threadpool of the hub, the calling greenlet waits
+        for it without blocking the other greenlets.
+        """
+        return gevent.get_hub().threadpool.apply(self._sample, (duration, interval))
+
+    def _sample(self, duration: float, interval: float) -> Counter[str]:
+        sleep = monkey.get_original("time", "sleep")
+        stacks: Counter[str] = collections.Counter()
+        end_time = time.monotonic() + duration
+        while time.monotonic() < end_time:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                stacks[self._fold_stack(frame)] += 1
+            del frame
+            sleep(interval)
+        return stacks
+
+    def _fold_stack(self, frame) -> str:
+        frames = []
+        while frame is not None:
+            frames.append(format_frame(frame))
+            frame = frame.f_back
+        if self.tracker is not None and self.tracker.installed:
+            frames.append(self.tracker.current_name)
+        return ";".join(reversed(frames))
+
+
+def format_folded_stacks(stacks: Counter[str]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
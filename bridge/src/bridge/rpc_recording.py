@@ -0,0 +1,256 @@
+"""Recording of the JSON-RPC traffic of the bridge and its replay
+
+The recording middleware writes every request to the nodes, with its response and
+timing, as a line of JSON to a recording file, compressed with gzip if the name of
+the file ends with `.gz`. The replay provider answers the requests of the bridge
+with the recorded responses instead of a node, so a recorded session can be run
+again locally, e.g. to profile or benchmark changes against real traffic.
+"""
+import collections
+import functools
+import gzip
+import json
+import logging
+import time
+from typing import IO, Any, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import attr
+import gevent
+from hexbytes import HexBytes
+from web3.providers.base import BaseProvider
+
+logger = logging.getLogger(__name__)
+
+# seconds between two flushes of the recording file
+FLUSH_INTERVAL = 1.0
+
+
+def open_recording_file(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")  # type: ignore
+    return open(path, mode, encoding="utf-8")
+
+
+def _encode_json(value):
+    if isinstance(value, (bytes, bytearray)):
+        return HexBytes(value).hex()
+    raise TypeError(f"Can not encode {value!r} as JSON")
+
+
+def make_request_key(method: str, params: Any) -> Tuple[str, str]:
+    return method, json.dumps(params, sort_keys=True, default=_encode_json)
+
+
+@attr.s(auto_attribs=True)
+class RecordedCall:
+    chain: str
+    # seconds since the start of the recording
+    time: float
+    duration: float
+    method: str
+    params: Any
+    response: Optional[Dict[str, Any]] = None
+    # the error if no response was received, e.g. because of a timeout
+    error: Optional[str] = None
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return make_request_key(self.method, self.params)
+
+
+class RpcRecorder:
+    """Writes the calls of all chains to one recording file"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open_recording_file(path, "w")
+        self._start_time = time.monotonic()
+        self._last_flush_time = self._start_time
+
+    def record(
+        self,
+        chain: str,
+        method: str,
+        params: Any,
+        start_time: float,
+        response: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        now = time.monotonic()
+        recorded_call = RecordedCall(
+            chain=chain,
+            time=round(start_time - self._start_time, 6),
+            duration=round(now - start_time, 6),
+            method=method,
+            params=params,
+            response=response,
+            error=error,
+        )
+        self._file.write(
+            json.dumps(
+                attr.asdict(recorded_call), separators=(",", ":"), default=_encode_json
+            )
+            + "\n"
+        )
+        if now - self._last_flush_time > FLUSH_INTERVAL:
+            self._file.flush()
+            self._last_flush_time = now
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def make_rpc_recording_middleware(recorder: RpcRecorder, chain_name: str):
+    """Web3 middleware writing every request with its response to the recorder
+
+    It has to be the innermost middleware, so it sees the raw JSON-RPC responses.
+    """
+
+    def rpc_recording_middleware(make_request, w3):
+        def middleware(method, params):
+            start_time = time.monotonic()
+            try:
+                response = make_request(method, params)
+            except Exception as error:
+                recorder.record(
+                    chain_name, method, params, start_time, error=repr(error)
+                )
+                raise
+            recorder.record(chain_name, method, params, start_time, response=response)
+            return response
+
+        return middleware
+
+    return rpc_recording_middleware
+
+
+def read_recording(path: str) -> Iterator[RecordedCall]:
+    with open_recording_file(path, "r") as recording_file:
+        for line in recording_file:
+            if line.strip():
+                yield RecordedCall(**json.loads(line))
+
+
+class UnrecordedRequestError(LookupError):
+    pass
+
+
+class RecordedRequestError(IOError):
+    """The recorded request failed without a response, e.g. because of a timeout"""
+
+
+class ReplayProvider(BaseProvider):
+    """Answers the requests with the recorded responses of one chain
+
+    The requests are matched by method and parameters, in the order they were
+    recorded. The last recorded response for a request is repeated once all its
+    responses have been used, e.g. the block number once the recording ended. A
+    request that was never recorded in this form, e.g. a transaction signed with
+    another key, gets the next recorded response of the same method.
+
+    Without a speed the responses are returned immediately. With a speed the
+    recorded timing is replayed, accelerated by the speed: a response is not
+    returned before the time it was recorded at, older responses to the same
+    request are skipped, and the duration of every request is waited for.
+    """
+
+    def __init__(
+        self, recorded_calls: Iterable[RecordedCall], speed: Optional[float] = None
+    ) -> None:
+        if speed is not None and speed <= 0:
+            raise ValueError(f"The replay speed must be positive, got {speed}")
+        self.speed = speed
+        self.calls_by_key: Dict[
+            Tuple[str, str], Deque[RecordedCall]
+        ] = collections.defaultdict(collections.deque)
+        self.calls_by_method: Dict[str, Deque[RecordedCall]] = collections.defaultdict(
+            collections.deque
+        )
+        for recorded_call in recorded_calls:
+            self.calls_by_key[recorded_call.key].append(recorded_call)
+            self.calls_by_method[recorded_call.method].append(recorded_call)
+        # the ids of the calls whose responses have been used up
+        self._used_call_ids: Set[int] = set()
+        self.number_of_requests = 0
+        self._start_time: Optional[float] = None
+
+    def _elapsed_recording_time(self) -> float:
+        assert self._start_time is not None and self.speed is not None
+        return (time.monotonic() - self._start_time) * self.speed
+
+    def _next_call(self, calls: Deque[RecordedCall]) -> RecordedCall:
+        # the same call is in the queue of its request and in the one of its method
+        while len(calls) > 1 and id(calls[0]) in self._used_call_ids:
+            calls.popleft()
+        if self.speed is not None:
+            now = self._elapsed_recording_time()
+            while len(calls) > 1 and calls[1].time <= now:
+                self._used_call_ids.add(id(calls.popleft()))
+        # the last call is kept to be repeated
+        recorded_call = calls.popleft() if len(calls) > 1 else calls[0]
+        self._used_call_ids.add(id(recorded_call))
+        return recorded_call
+
+    def make_request(self, method, params):
+        if self._start_time is None:
+            self._start_time = time.monotonic()
+        self.number_of_requests += 1
+
+        calls = self.calls_by_key.get(make_request_key(method, params))
+        if not calls:
+            calls = self.calls_by_method.get(method)
+        if not calls:
+            raise UnrecordedRequestError(
+                f"No {method} request with the params {params} has been recorded"
+            )
+        recorded_call = self._next_call(calls)
+
+        if self.speed is not None:
+            gevent.sleep(
+                max(recorded_call.time - self._elapsed_recording_time(), 0.0)
+                / self.speed
+                + recorded_call.duration / self.speed
+            )
+
+        if recorded_call.response is None:
+            raise RecordedRequestError(recorded_call.error)
+        return recorded_call.response
+
+    def isConnected(self):  # noqa: N802
+        return True
+
+
+def make_replay_providers(
+    recorded_calls: Iterable[RecordedCall], speed: Optional[float] = None
+) -> Dict[str, ReplayProvider]:
+    calls_by_chain: Dict[str, List[RecordedCall]] = collections.defaultdict(list)
+    for recorded_call in recorded_calls:
+        calls_by_chain[recorded_call.chain].append(recorded_call)
+    return {
+        chain: ReplayProvider(calls, speed) for chain, calls in calls_by_chain.items()
+    }
+
+
+# all web3 instances of the bridge share the recorder or replay providers of a file
+_rpc_recorders: Dict[str, RpcRecorder] = {}
+
+
+def get_rpc_recorder(path: str) -> RpcRecorder:
+    if path not in _rpc_recorders:
+        logger.info(f"Recording the JSON-RPC traffic to {path}")
+        _rpc_recorders[path] = RpcRecorder(path)
+    return _rpc_recorders[path]
+
+
+def close_rpc_recorders() -> None:
+    for recorder in _rpc_recorders.values():
+        recorder.close()
+    _rpc_recorders.clear()
+
+
+@functools.lru_cache(maxsize=None)
+def get_replay_providers(
+    path: str, speed: Optional[float] = None
+) -> Dict[str, ReplayProvider]:
+    logger.info(f"Replaying the JSON-RPC traffic recorded in {path}")
+    return make_replay_providers(read_recording(path), speed)
@@ -0,0 +1,119 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Mapping, NamedTuple, Union, cast
+
+from eth_account import Account
+from eth_utils import keccak, to_canonical_address, to_checksum_address
+from hexbytes import HexBytes
+from web3 import HTTPProvider, Web3
+from web3.types import SignedTx, TxParams
+
+from bridge.utils import get_validator_private_key
+
+logger = logging.getLogger(__name__)
+
+# The transaction fields JSON-RPC expects as hex encoded quantities
+TRANSACTION_QUANTITY_FIELDS = ("chainId", "nonce", "gas", "gasPrice", "value")
+
+
+class SignedTransaction(NamedTuple):
+    rawTransaction: HexBytes  # noqa: N815
+    hash: HexBytes
+
+
+class Signer(ABC):
+    """Signs the transactions of the validator
+
+    The components of the bridge only get a signer and never see the key itself. The
+    address of the validator is derived once when the signer is created.
+    """
+
+    def __init__(self, address: bytes) -> None:
+        self.address = address
+        self.address_hex = to_checksum_address(address)
+
+    @abstractmethod
+    def sign_transaction(self, transaction: Mapping[str, Any]) -> SignedTransaction:
+        """Sign the transaction from the address of the signer and return it ready to be sent"""
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.address_hex}>"
+
+
+class LocalSigner(Signer):
+    """Signs with a private key held in memory
+
+    The key is only kept inside this object and is not part of its representation.
+    """
+
+    def __init__(self, private_key: bytes) -> None:
+        self._account = Account.from_key(private_key)
+        super().__init__(to_canonical_address(self._account.address))
+
+    def sign_transaction(self, transaction: Mapping[str, Any]) -> SignedTransaction:
+        signed_transaction = self._account.sign_transaction(transaction)
+        return SignedTransaction(
+            rawTransaction=HexBytes(signed_transaction.rawTransaction),
+            hash=HexBytes(signed_transaction.hash),
+        )
+
+
+class ExternalSigner(Signer):
+    """Signs with an external signer via the eth_signTransaction JSON-RPC method
+
+    The signer, e.g. clef or a hardware wallet bridge, holds the key of `address`.
+    The bridge never gets to see the key.
+    """
+
+    def __init__(self, w3: Web3, address: bytes) -> None:
+        super().__init__(address)
+        self.w3 = w3
+
+    def sign_transaction(self, transaction: Mapping[str, Any]) -> SignedTransaction:
+        transaction_params = cast(
+            TxParams,
+            {**encode_transaction_quantities(transaction), "from": self.address_hex},
+        )
+        result: Union[SignedTx, bytes, str] = self.w3.eth.signTransaction(
+            transaction_params
+        )
+        # some signers only return the raw transaction instead of {"raw": ..., "tx": ...}
+        if isinstance(result, Mapping):
+            raw_transaction = HexBytes(result["raw"])
+        else:
+            raw_transaction = HexBytes(result)
+        return SignedTransaction(
+            rawTransaction=raw_transaction, hash=HexBytes(keccak(raw_transaction))
+        )
+
+
+def encode_transaction_quantities(transaction: Mapping[str, Any]) -> Dict[str, Any]:
+    """Hex encode the integer quantities of the transaction for JSON-RPC"""
+    return {
+        key: hex(value)
+        if key in TRANSACTION_QUANTITY_FIELDS and isinstance(value, int)
+        else value
+        for key, value in transaction.items()
+    }
+
+
+def make_validator_signer(config) -> Signer:
+    """Create the signer of the validator from the configuration
+
+    A keystore is decrypted here, so this should only be called once at startup and
+    the signer be handed to the components that need it.
+    """
+    external_signer_config = config.get("external_signer")
+    if external_signer_config:
+        logger.info(f"Using external signer at {external_signer_config['url']}")
+        return ExternalSigner(
+            Web3(
+                HTTPProvider(
+                    external_signer_config["url"],
+                    request_kwargs={"timeout": external_signer_config["timeout"]},
+                )
+            ),
+            external_signer_config["address"],
+        )
+
+    return LocalSigner(get_validator_private_key(config))
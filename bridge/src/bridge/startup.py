@@ -0,0 +1,84 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable
+
+import gevent
+from gevent.event import AsyncResult
+
+logger = logging.getLogger(__name__)
+
+
+class CheckCache:
+    """Runs every check only once and remembers its verdict
+
+    A check that is requested again while it is still running is not started a second
+    time, the caller waits for the running check instead. If the check failed, the
+    exception is raised again for every caller.
+    """
+
+    def __init__(self) -> None:
+        self._results: Dict[Hashable, AsyncResult] = {}
+
+    def run_once(self, key: Hashable, check: Callable, *args, **kwargs) -> Any:
+        if key not in self._results:
+            result = AsyncResult()
+            self._results[key] = result
+            try:
+                result.set(check(*args, **kwargs))
+            except Exception as exception:
+                result.set_exception(exception)
+        return self._results[key].get()
+
+
+class StartupTimings:
+    """Durations of the phases of the startup, in the order they were started"""
+
+    def __init__(self) -> None:
+        self.durations: Dict[str, float] = {}
+        self._start_time = time.monotonic()
+
+    @contextmanager
+    def phase(self, name: str):
+        start_time = time.monotonic()
+        self.durations[name] = 0.0
+        try:
+            yield
+        finally:
+            self.durations[name] = time.monotonic() - start_time
+
+    @property
+    def total_duration(self) -> float:
+        return time.monotonic() - self._start_time
+
+    def log_summary(self) -> None:
+        breakdown = ", ".join(
+            f"{name} {duration:.2f}s" for name, duration in self.durations.items()
+        )
+        logger.info(f"Startup took {self.total_duration:.2f}s: {breakdown}")
+
+
+def build_concurrently(
+    factories: Dict[str, Callable[[], Any]], timings: StartupTimings
+) -> Dict[str, Any]:
+    """Call the factories concurrently, each in its own greenlet, and return their results by name
+
+    Raises the first exception of a failing factory, the other factories are stopped then.
+    """
+
+    def timed(name, factory):
+        with timings.phase(f"build {name}"):
+            return factory()
+
+    greenlets = {}
+    for name, factory in factories.items():
+        greenlet = gevent.Greenlet(timed, name, factory)
+        greenlet.name = f"build-{name}"
+        greenlet.start()
+        greenlets[name] = greenlet
+
+    try:
+        gevent.joinall(greenlets.values(), raise_error=True)
+    finally:
+        gevent.killall(greenlets.values())
+    return {name: greenlet.value for name, greenlet in greenlets.items()}
@@ -0,0 +1,183 @@
+"""Latency tracing of the transfers through the bridge
+
+Every transfer carries the times at which it passed the stages of the bridge, from
+the block of the transfer on the foreign chain to the completion on the home chain.
+The time spent in every stage is recorded in a histogram of `bridge.metrics`, and
+the slowest recently completed transfers are kept for the webservice.
+"""
+import collections
+import heapq
+import time
+from typing import Deque, Dict, List, Optional
+
+import attr
+from eth_typing import Hash32
+
+from bridge import metrics
+
+# the stages of a transfer in the order it passes them
+STAGES = (
+    "block",  # block with the transfer on the foreign chain
+    "fetched",  # fetched by the event fetcher of the foreign chain
+    "recorded",  # applied to the transfer recorder
+    "scheduled",  # scheduled for confirmation by the confirmation task planner
+    "sent",  # confirmation transaction signed and sent by the confirmation sender
+    "mined",  # confirmation transaction mined and reorg-safe
+    "completed",  # transfer completed on the home bridge
+)
+STAGE_INDEX = {stage: index for index, stage in enumerate(STAGES)}
+# only the event fetcher starts the trace of a transfer, so the transfers it does not
+# trace, e.g. while catching up, are not traced by the later stages either
+TRACE_START_STAGES = ("block", "fetched")
+
+MAX_TRACED_TRANSFERS = 10_000
+MAX_COMPLETED_TRANSFERS = 1000
+
+TRANSFER_STAGE_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+transfer_stage_duration = metrics.registry.histogram(
+    "bridge_transfer_stage_duration_seconds",
+    "Time a transfer spent from the previous stage until reaching the stage",
+    ["stage"],
+    buckets=TRANSFER_STAGE_BUCKETS,
+)
+
+
+@attr.s(auto_attribs=True)
+class TransferTrace:
+    transfer_hash: Hash32
+    timestamps: Dict[str, float] = attr.Factory(dict)
+
+    @property
+    def total_duration(self) -> Optional[float]:
+        if len(self.timestamps) < 2:
+            return None
+        return max(self.timestamps.values()) - min(self.timestamps.values())
+
+    def stage_durations(self) -> Dict[str, float]:
+        """The time spent until every reached stage, since the previous reached stage"""
+        durations: Dict[str, float] = {}
+        previous_timestamp = None
+        for stage in STAGES:
+            if stage not in self.timestamps:
+                continue
+            if previous_timestamp is not None:
+                durations[stage] = self.timestamps[stage] - previous_timestamp
+            previous_timestamp = self.timestamps[stage]
+        return durations
+
+    def to_dict(self):
+        return {
+            "transfer_hash": self.transfer_hash.hex(),
+            "total_duration": self.total_duration,
+            "timestamps": self.timestamps,
+            "stage_durations": self.stage_durations(),
+        }
+
+
+class TransferTracer:
+    def __init__(
+        self,
+        max_traced_transfers: int = MAX_TRACED_TRANSFERS,
+        max_completed_transfers: int = MAX_COMPLETED_TRANSFERS,
+    ) -> None:
+        self.max_traced_transfers = max_traced_transfers
+        # the traces of the transfers not completed yet, the oldest are dropped first
+        # if there are too many
+        self.traces: Dict[Hash32, TransferTrace] = collections.OrderedDict()
+        self.completed_traces: Deque[TransferTrace] = collections.deque(
+            maxlen=max_completed_transfers
+        )
+        # the traces by the hash of their sent confirmation transaction until it is mined
+        self.traces_by_transaction_hash: Dict[
+            bytes, TransferTrace
+        ] = collections.OrderedDict()
+
+    def record(
+        self, transfer_hash: Hash32, stage: str, timestamp: Optional[float] = None
+    ) -> None:
+        """Record that the transfer reached the stage at `timestamp`, by default now"""
+        trace = self.traces.get(transfer_hash)
+        if trace is None:
+            if stage not in TRACE_START_STAGES:
+                # a transfer not traced by the event fetcher
+                return
+            trace = self.traces[transfer_hash] = TransferTrace(transfer_hash)
+            if len(self.traces) > self.max_traced_transfers:
+                self.traces.pop(next(iter(self.traces)))
+
+        self._record_stage(trace, stage, timestamp)
+
+        if stage == "completed":
+            del self.traces[transfer_hash]
+            self.completed_traces.append(trace)
+
+    def record_sent(self, transfer_hash: Hash32, transaction_hash: bytes) -> None:
+        self.record(transfer_hash, "sent")
+        trace = self.traces.get(transfer_hash)
+        if trace is not None:
+            self.traces_by_transaction_hash[bytes(transaction_hash)] = trace
+            if len(self.traces_by_transaction_hash) > self.max_traced_transfers:
+                self.traces_by_transaction_hash.pop(
+                    next(iter(self.traces_by_transaction_hash))
+                )
+
+    def record_mined(self, transaction_hash: bytes) -> None:
+        # the transfer may already be completed by the confirmations of the other validators
+        trace = self.traces_by_transaction_hash.pop(bytes(transaction_hash), None)
+        if trace is not None:
+            self._record_stage(trace, "mined")
+
+    def _record_stage(
+        self, trace: TransferTrace, stage: str, timestamp: Optional[float] = None
+    ) -> None:
+        if stage in trace.timestamps:
+            return
+        if timestamp is None:
+            timestamp = time.time()
+        trace.timestamps[stage] = timestamp
+
+        previous_timestamps = [
+            trace.timestamps[previous_stage]
+            for previous_stage in STAGES[: STAGE_INDEX[stage]]
+            if previous_stage in trace.timestamps
+        ]
+        if previous_timestamps:
+            transfer_stage_duration.observe(
+                max(timestamp - previous_timestamps[-1], 0.0), stage
+            )
+            return
+
+        # a stage recorded after the following ones, like the block of a transfer
+        # whose timestamp is only fetched after the transfer was queued
+        next_stages = [
+            next_stage
+            for next_stage in STAGES[STAGE_INDEX[stage] + 1 :]
+            if next_stage in trace.timestamps
+        ]
+        if next_stages:
+            transfer_stage_duration.observe(
+                max(trace.timestamps[next_stages[0]] - timestamp, 0.0), next_stages[0]
+            )
+
+    def get_slowest_transfers(self, number: int = 10) -> List[TransferTrace]:
+        """The slowest of the recently completed transfers, slowest first"""
+        return heapq.nlargest(
+            number,
+            self.completed_traces,
+            key=lambda trace: trace.total_duration or 0.0,
+        )
+
+
+tracer = TransferTracer()
+
+
+def get_transfer_latency_summary(number_of_transfers: int = 10):
+    return {
+        "in_flight": len(tracer.traces),
+        "completed": len(tracer.completed_traces),
+        "slowest": [
+            trace.to_dict()
+            for trace in tracer.get_slowest_transfers(number_of_transfers)
+        ],
+    }
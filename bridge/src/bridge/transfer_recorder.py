@@ -1,10 +1,12 @@
+import bisect
 import logging
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 from eth_typing import Hash32
 from eth_utils import from_wei, is_same_address
 from web3.datastructures import AttributeDict
 
+from bridge import tracing
 from bridge.constants import (
     COMPLETION_EVENT_NAME,
     CONFIRMATION_EVENT_NAME,
@@ -19,7 +21,7 @@ from bridge.events import (
     IsValidatorCheck,
 )
 from bridge.utils import compute_transfer_hash, sort_events
-from bridge.webservice import get_internal_state_summary
+from bridge.webservice import get_internal_state_summary, get_state_version
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +36,13 @@ class TransferRecorder:
 
         self.scheduled_hashes: Set[Hash32] = set()
 
+        # the transfers not completed yet in the order they were recorded, keyed by a
+        # sequence number used to list them page by page, see get_pending_transfers_page
+        self.pending_transfers: Dict[int, Tuple[Hash32, AttributeDict]] = {}
+        self.pending_sequence_numbers: Dict[Hash32, int] = {}
+        self.pending_order: List[int] = []
+        self.next_sequence_number = 0
+
         self.home_chain_synced_until = 0.0
 
         self.minimum_balance = minimum_balance
@@ -44,6 +53,9 @@ class TransferRecorder:
             ChainRole, FetcherReachedHeadEvent
         ] = {}
 
+        # incremented on every change of the state, see get_state_version
+        self.state_version = 0
+
     def log_current_state(self):
         if self.is_validator:
             validator_status = "validating"
@@ -72,8 +84,49 @@ class TransferRecorder:
     def is_balance_sufficient(self):
         return self.balance is not None and self.balance >= self.minimum_balance
 
+    def iter_pending_transfers(self) -> Iterator[Tuple[Hash32, AttributeDict]]:
+        """Iterate over the transfers not completed yet, in the order they were recorded"""
+        yield from self.pending_transfers.values()
+
+    def get_number_of_pending_transfers(self) -> int:
+        return len(self.pending_transfers)
+
+    def get_pending_transfers_page(
+        self, limit: int, after: Optional[int] = None
+    ) -> Tuple[List[Tuple[int, Hash32, AttributeDict]], bool]:
+        """Return up to `limit` pending transfers recorded after the one with the sequence number
+        `after` together with their sequence numbers, and whether more pending transfers follow"""
+        start = 0 if after is None else bisect.bisect_right(self.pending_order, after)
+        page = [
+            (sequence_number,) + self.pending_transfers[sequence_number]
+            for sequence_number in self.pending_order[start : start + limit]
+        ]
+        return page, start + limit < len(self.pending_order)
+
+    def _add_pending_transfer(
+        self, transfer_hash: Hash32, transfer_event: AttributeDict
+    ) -> None:
+        if transfer_hash in self.completion_hashes:
+            return
+        sequence_number = self.pending_sequence_numbers.get(transfer_hash)
+        if sequence_number is None:
+            sequence_number = self.next_sequence_number
+            self.next_sequence_number += 1
+            self.pending_sequence_numbers[transfer_hash] = sequence_number
+            self.pending_order.append(sequence_number)
+        self.pending_transfers[sequence_number] = (transfer_hash, transfer_event)
+
+    def _remove_pending_transfer(self, transfer_hash: Hash32) -> None:
+        sequence_number = self.pending_sequence_numbers.pop(transfer_hash, None)
+        if sequence_number is None:
+            return
+        del self.pending_transfers[sequence_number]
+        del self.pending_order[bisect.bisect_left(self.pending_order, sequence_number)]
+
     def clear_transfers(self) -> None:
         transfer_hashes_to_remove = self.transfer_hashes & self.completion_hashes
+        if transfer_hashes_to_remove:
+            self.state_version += 1
 
         self.transfer_hashes -= transfer_hashes_to_remove
         self.confirmation_hashes -= transfer_hashes_to_remove
@@ -93,6 +146,10 @@ class TransferRecorder:
                 - self.scheduled_hashes
             )
             self.scheduled_hashes |= unconfirmed_transfer_hashes
+            if unconfirmed_transfer_hashes:
+                self.state_version += 1
+            for transfer_hash in unconfirmed_transfer_hashes:
+                tracing.tracer.record(transfer_hash, "scheduled")
             confirmation_tasks = [
                 self.transfer_events[transfer_hash]
                 for transfer_hash in unconfirmed_transfer_hashes
@@ -116,6 +173,8 @@ class TransferRecorder:
             transfer_hash = compute_transfer_hash(event)
             self.transfer_hashes.add(transfer_hash)
             self.transfer_events[transfer_hash] = event
+            self._add_pending_transfer(transfer_hash, event)
+            tracing.tracer.record(transfer_hash, "recorded")
         elif event_name == CONFIRMATION_EVENT_NAME:
             transfer_hash = Hash32(bytes(event.args.transferHash))
             assert len(transfer_hash) == 32
@@ -124,6 +183,8 @@ class TransferRecorder:
             transfer_hash = Hash32(bytes(event.args.transferHash))
             assert len(transfer_hash) == 32
             self.completion_hashes.add(transfer_hash)
+            self._remove_pending_transfer(transfer_hash)
+            tracing.tracer.record(transfer_hash, "completed")
         else:
             raise ValueError(f"Got unknown event {event}")
 
@@ -170,6 +231,12 @@ class TransferRecorder:
         if dispatch is None:
             raise ValueError(f"Received unknown event {event}")
         dispatch(self, event)
+        self.state_version += 1
+
+
+@get_state_version.register(TransferRecorder)
+def get_recorder_state_version(transfer_recorder):
+    return transfer_recorder.state_version
 
 
 @get_internal_state_summary.register(TransferRecorder)
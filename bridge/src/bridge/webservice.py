@@ -1,16 +1,32 @@
 import functools
+import hashlib
+import json
 import logging
 import os
+import time
 import types
+from typing import Tuple
 
 import falcon
 import pkg_resources
+from eth_utils import encode_hex
 from gevent.pywsgi import WSGIServer
 
+from bridge.memory import KEY_TYPES, UnknownSnapshotError
+from bridge.profiling import (
+    MAX_PROFILE_DURATION,
+    MIN_PROFILE_INTERVAL,
+    format_folded_stacks,
+)
 from bridge.service import Service
 
 logger = logging.getLogger(__name__)
 
+# seconds a summary of a PeriodicSummary is kept
+DEFAULT_SUMMARY_PERIOD = 5
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
 welcome_page = """
 <!DOCTYPE html>
 <html>
@@ -63,6 +79,45 @@ def _function_summary(f):
     return f()
 
 
+@functools.singledispatch
+def get_state_version(obj):
+    """The version of the state of a summary reporter
+
+    The version changes whenever the summary of the reporter may have changed. A
+    version of None means the summary has to be computed for every request.
+    """
+    return None
+
+
+@get_state_version.register(int)
+@get_state_version.register(str)
+@get_state_version.register(dict)
+def _constant_version(d):
+    return 0
+
+
+class PeriodicSummary:
+    """Summary of a function, computed at most once every `period` seconds"""
+
+    def __init__(self, function, period=DEFAULT_SUMMARY_PERIOD):
+        self.function = function
+        self.period = period
+
+    @property
+    def version(self):
+        return int(time.monotonic() // self.period)
+
+
+@get_internal_state_summary.register(PeriodicSummary)
+def _periodic_summary(periodic_summary):
+    return periodic_summary.function()
+
+
+@get_state_version.register(PeriodicSummary)
+def _periodic_version(periodic_summary):
+    return periodic_summary.version
+
+
 def get_process_summary():
     return {
         "pid": os.getpid(),
@@ -72,25 +127,176 @@ def get_process_summary():
     }
 
 
+@functools.lru_cache(maxsize=None)
 def get_bridge_version():
     return pkg_resources.get_distribution("tlbc-bridge").version
 
 
+def make_etag(body: str) -> str:
+    return '"' + hashlib.sha1(body.encode()).hexdigest() + '"'
+
+
+def is_not_modified(req, etag: str) -> bool:
+    if_none_match = req.get_header("If-None-Match")
+    if if_none_match is None:
+        return False
+    etags = {value.strip() for value in if_none_match.split(",")}
+    return "*" in etags or etag in etags or f"W/{etag}" in etags
+
+
 class InternalState:
+    """Serves the summaries of the reporters as JSON
+
+    The serialized summary is cached and only built again once the version of the
+    state of a reporter has changed. Clients can send the ETag of the last response
+    in If-None-Match to get a 304 if nothing has changed.
+    """
+
     def __init__(self, **summary_reporters):
         self.summary_reporters = {
             **summary_reporters,
-            "process": get_process_summary,
+            "process": PeriodicSummary(get_process_summary),
             "version": get_bridge_version(),
         }
+        self._versions = None
+        self._body = None
+        self._etag = None
+
+    def get_serialized_state(self) -> Tuple[str, str]:
+        """The serialized internal state and its ETag"""
+        versions = tuple(
+            get_state_version(reporter) for reporter in self.summary_reporters.values()
+        )
+        if self._body is None or None in versions or versions != self._versions:
+            body = json.dumps(
+                {
+                    "bridge": {
+                        name: get_internal_state_summary(reporter)
+                        for name, reporter in self.summary_reporters.items()
+                    }
+                }
+            )
+            self._versions, self._body, self._etag = versions, body, make_etag(body)
+        return self._body, self._etag
 
     def on_get(self, req, resp):
-        resp.media = {
-            "bridge": {
-                name: get_internal_state_summary(reporter)
-                for name, reporter in self.summary_reporters.items()
-            }
-        }
+        body, etag = self.get_serialized_state()
+        resp.set_header("ETag", etag)
+        if is_not_modified(req, etag):
+            resp.status = falcon.HTTP_NOT_MODIFIED
+            return
+        resp.body = body
+        resp.content_type = falcon.MEDIA_JSON
+
+
+class PendingTransfers:
+    """Lists the transfers of the recorder not completed yet, page by page
+
+    A page starts after the transfer with the sequence number given as `after`, which is
+    returned as `next_after` with the previous page. Transfers completed meanwhile do not
+    shift the following pages, and reading a page does not depend on the number of
+    transfers before it. The transfers are serialized one by one while the response is sent.
+    """
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+
+    def on_get(self, req, resp):
+        after = req.get_param_as_int("after", min_value=0)
+        limit = req.get_param_as_int(
+            "limit", min_value=1, max_value=MAX_PAGE_SIZE, default=DEFAULT_PAGE_SIZE
+        )
+        total = self.recorder.get_number_of_pending_transfers()
+        page, has_more = self.recorder.get_pending_transfers_page(limit, after)
+        next_after = page[-1][0] if has_more else None
+
+        resp.stream = self._serialize(page, total, next_after)
+        resp.content_type = falcon.MEDIA_JSON
+
+    def _serialize(self, page, total, next_after):
+        yield f'{{"total": {total}, "transfers": ['.encode()
+        for index, (_, transfer_hash, transfer_event) in enumerate(page):
+            transfer = json.dumps(
+                {
+                    "transfer_hash": encode_hex(transfer_hash),
+                    "transaction_hash": encode_hex(transfer_event.transactionHash),
+                    "block_number": transfer_event.blockNumber,
+                    "from": transfer_event.args["from"],
+                    "value": str(transfer_event.args.value),
+                    "scheduled": transfer_hash in self.recorder.scheduled_hashes,
+                    "confirmed": transfer_hash in self.recorder.confirmation_hashes,
+                }
+            )
+            yield (("," if index else "") + transfer).encode()
+        yield f'], "next_after": {json.dumps(next_after)}}}'.encode()
+
+
+class Metrics:
+    def __init__(self, registry):
+        self.registry = registry
+
+    def on_get(self, req, resp):
+        resp.body = self.registry.expose()
+        resp.content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Profile:
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def on_get(self, req, resp):
+        duration = req.get_param_as_float(
+            "seconds", min_value=0, max_value=MAX_PROFILE_DURATION, default=5
+        )
+        interval = req.get_param_as_float(
+            "interval", min_value=MIN_PROFILE_INTERVAL, default=0.01
+        )
+        resp.body = format_folded_stacks(self.profiler.profile(duration, interval))
+        resp.content_type = "text/plain; charset=utf-8"
+
+
+class MemorySummary:
+    def __init__(self, memory_profiler):
+        self.memory_profiler = memory_profiler
+
+    def on_get(self, req, resp):
+        resp.media = self.memory_profiler.get_summary()
+
+
+class MemorySnapshots:
+    def __init__(self, memory_profiler):
+        self.memory_profiler = memory_profiler
+
+    def on_get(self, req, resp):
+        resp.media = [record.to_dict() for record in self.memory_profiler.snapshots]
+
+    def on_post(self, req, resp):
+        if not self.memory_profiler.is_tracing:
+            raise falcon.HTTPConflict(
+                description="Memory allocations are not being traced at the moment"
+            )
+        resp.media = self.memory_profiler.take_snapshot().to_dict()
+        resp.status = falcon.HTTP_CREATED
+
+
+class MemorySnapshot:
+    def __init__(self, memory_profiler):
+        self.memory_profiler = memory_profiler
+
+    def on_get(self, req, resp, snapshot_id):
+        limit = req.get_param_as_int("limit", min_value=1, default=20)
+        key_type = req.get_param("key_type", default="lineno")
+        if key_type not in KEY_TYPES:
+            raise falcon.HTTPInvalidParam(f"must be one of {KEY_TYPES}", "key_type")
+        compare_to = req.get_param_as_int("compare_to")
+        try:
+            resp.media = self.memory_profiler.get_top_allocations(
+                snapshot_id, limit=limit, key_type=key_type, compare_to=compare_to
+            )
+        except UnknownSnapshotError as error:
+            raise falcon.HTTPNotFound(
+                description=f"There is no snapshot with the id {error.args[0]}"
+            )
 
 
 class Webservice:
@@ -105,6 +311,23 @@ class Webservice:
     def enable_internal_state(self, internal_state):
         self.app.add_route("/bridge/internal-state", internal_state)
 
+    def enable_pending_transfers(self, recorder):
+        self.app.add_route("/bridge/pending-transfers", PendingTransfers(recorder))
+
+    def enable_metrics(self, registry):
+        self.app.add_route("/metrics", Metrics(registry))
+
+    def enable_profiling(self, profiler):
+        self.app.add_route("/bridge/profile", Profile(profiler))
+
+    def enable_memory_profiling(self, memory_profiler):
+        self.app.add_route("/bridge/memory", MemorySummary(memory_profiler))
+        self.app.add_route("/bridge/memory/snapshots", MemorySnapshots(memory_profiler))
+        self.app.add_route(
+            "/bridge/memory/snapshots/{snapshot_id:int}",
+            MemorySnapshot(memory_profiler),
+        )
+
     def run(self):
         http_server = WSGIServer((self.host, self.port), self.app, log=logger)
         logger.info(f"Webservice is running on http://{self.host}:{self.port}".format())
@@ -1,3 +1,6 @@
+import pathlib
+import sys
+
 import gevent.monkey
 import gevent.pool
 import pytest
@@ -16,6 +19,9 @@ if "time" not in gevent.monkey.saved:
         "cannot run bridge tests without gevent's monkeypatching, please use the pytest wrapper"
     )
 
+# the tests share the chain simulator of the benchmarks
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "benchmarks"))
+
 
 @pytest.fixture()
 def pool():
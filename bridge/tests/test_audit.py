@@ -0,0 +1,174 @@
+import json
+
+import pytest
+from chain_simulator import (
+    SimulatedChain,
+    SimulatedHomeBridge,
+    SimulatedProvider,
+    SimulatedToken,
+    SimulatedValidatorProxy,
+    simulated_providers,
+)
+from click.testing import CliRunner
+from eth_account import Account
+from eth_utils import to_canonical_address, to_checksum_address
+
+import bridge.main
+from bridge.audit import audit, split_range
+from bridge.utils import compute_transfer_hash
+
+HOME_BRIDGE_ADDRESS = b"\x10" * 20
+VALIDATOR_PROXY_ADDRESS = b"\x11" * 20
+FOREIGN_BRIDGE_ADDRESS = b"\x20" * 20
+TOKEN_ADDRESS = b"\x21" * 20
+SENDER = b"\x22" * 20
+
+VALIDATOR_PRIVATE_KEY = b"\x42" * 32
+
+CONFIG = f"""
+[foreign_chain]
+rpc_url = "http://foreign.simulated"
+token_contract_address = "{to_checksum_address(TOKEN_ADDRESS)}"
+bridge_contract_address = "{to_checksum_address(FOREIGN_BRIDGE_ADDRESS)}"
+max_reorg_depth = 2
+
+[home_chain]
+rpc_url = "http://home.simulated"
+bridge_contract_address = "{to_checksum_address(HOME_BRIDGE_ADDRESS)}"
+max_reorg_depth = 2
+
+[validator_private_key]
+raw = "0x{VALIDATOR_PRIVATE_KEY.hex()}"
+"""
+
+
+@pytest.fixture()
+def validators():
+    # the first validator is the one of the configuration
+    return [to_canonical_address(Account.from_key(VALIDATOR_PRIVATE_KEY).address)] + [
+        to_canonical_address(Account.create().address) for _ in range(2)
+    ]
+
+
+@pytest.fixture()
+def config(load_config_from_string):
+    return load_config_from_string(CONFIG)
+
+
+@pytest.fixture()
+def transfer_events(config, validators):
+    """Four transfers to the foreign bridge, with confirmations on the home chain
+
+    The first transfer is confirmed by the validator and another one and completed,
+    the second is only confirmed by another validator, the third only by the
+    validator, the fourth is not confirmed.
+    """
+    foreign_chain = SimulatedChain(chain_id=2, start_timestamp=1000)
+    token = foreign_chain.deploy(SimulatedToken(TOKEN_ADDRESS))
+    home_chain = SimulatedChain(chain_id=1, start_timestamp=1000)
+    validator_proxy = home_chain.deploy(
+        SimulatedValidatorProxy(VALIDATOR_PROXY_ADDRESS, validators)
+    )
+    home_bridge = home_chain.deploy(
+        SimulatedHomeBridge(HOME_BRIDGE_ADDRESS, validator_proxy)
+    )
+    with simulated_providers(
+        {
+            "http://home.simulated": SimulatedProvider(home_chain),
+            "http://foreign.simulated": SimulatedProvider(foreign_chain),
+        }
+    ):
+        for value in range(1, 5):
+            token.transfer(SENDER, FOREIGN_BRIDGE_ADDRESS, value)
+            # transfers to others are not audited
+            token.transfer(SENDER, SENDER, value)
+            foreign_chain.mine_blocks(3)
+        events = bridge.main.make_transfer_event_fetcher(
+            config, None
+        ).fetch_events_in_range(0, foreign_chain.latest_block.number)
+        assert len(events) == 4
+
+        confirming_validators = [validators[:2], validators[1:2], validators[:1], []]
+        for event, confirming in zip(events, confirming_validators):
+            for validator in confirming:
+                with home_chain.transaction(validator, HOME_BRIDGE_ADDRESS):
+                    home_bridge.confirm_transfer(
+                        validator,
+                        compute_transfer_hash(event),
+                        bytes(event.transactionHash),
+                        event.args.value,
+                        to_checksum_address(SENDER),
+                    )
+            home_chain.mine_block()
+        home_chain.mine_blocks(2)
+
+        yield events
+
+
+def test_split_range():
+    assert split_range(3, 10, 3) == [(3, 5), (6, 8), (9, 10)]
+    assert split_range(3, 3, 3) == [(3, 3)]
+    assert split_range(3, 2, 3) == []
+
+
+@pytest.mark.parametrize("event_fetch_limit", [1, 2, 950])
+def test_audit(config, validators, transfer_events, event_fetch_limit):
+    transfer_event_fetcher = bridge.main.make_transfer_event_fetcher(config, None)
+    home_bridge_event_fetcher = bridge.main.make_home_bridge_event_fetcher(
+        config, None, None
+    )
+    for fetcher in (transfer_event_fetcher, home_bridge_event_fetcher):
+        fetcher.event_fetch_limit = event_fetch_limit
+
+    report = audit(
+        transfer_event_fetcher=transfer_event_fetcher,
+        home_bridge_event_fetcher=home_bridge_event_fetcher,
+        validator_address=validators[0],
+        concurrency=3,
+    )
+
+    assert report.number_of_transfers == 4
+    assert report.number_of_confirmations == 4
+    assert report.number_of_completions == 1
+    assert report.foreign_scan.to_block_number == 12 - 2
+    assert [
+        (
+            transfer.transfer_event,
+            transfer.number_of_confirmations,
+            transfer.is_confirmed_by_validator,
+        )
+        for transfer in report.outstanding_transfers
+    ] == [
+        (transfer_events[1], 1, False),
+        (transfer_events[2], 1, True),
+        (transfer_events[3], 0, False),
+    ]
+    assert all(transfer.timestamp > 1000 for transfer in report.outstanding_transfers)
+
+
+def test_audit_command(tmp_path, transfer_events):
+    config_path = tmp_path / "config.toml"
+    config_path.write_text(CONFIG)
+
+    result = CliRunner().invoke(
+        bridge.main.main, ["-c", str(config_path), "audit", "--json"]
+    )
+
+    assert result.exit_code == 1, result.output
+    report = json.loads(result.output)
+    assert [
+        (transfer["value"], transfer["is_confirmed_by_validator"])
+        for transfer in report["outstanding_transfers"]
+    ] == [(2, False), (3, True), (4, False)]
+
+
+def test_audit_command_min_age(tmp_path, transfer_events):
+    config_path = tmp_path / "config.toml"
+    config_path.write_text(CONFIG)
+
+    result = CliRunner().invoke(
+        bridge.main.main, ["-c", str(config_path), "audit", "--min-age", str(10 ** 12)]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "0 outstanding transfers" in result.output
@@ -0,0 +1,280 @@
+import pytest
+import requests
+from chain_simulator import (
+    PARITY_CLIENT_VERSION,
+    SimulatedChain,
+    SimulatedHomeBridge,
+    SimulatedNodeError,
+    SimulatedProvider,
+    SimulatedToken,
+    SimulatedValidatorProxy,
+    simulated_providers,
+)
+from eth_account import Account
+from eth_utils import to_checksum_address
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+
+import bridge.main
+from bridge.confirmation_sender import is_nonce_too_low_exception
+from bridge.contract_abis import HOME_BRIDGE_ABI, MINIMAL_ERC20_TOKEN_ABI
+from bridge.contract_validation import (
+    get_validator_proxy_contract,
+    is_bridge_validator,
+    validate_contract_existence,
+)
+from bridge.events import ChainRole
+from bridge.node_status import get_node_status
+
+HOME_BRIDGE_ADDRESS = b"\x10" * 20
+VALIDATOR_PROXY_ADDRESS = b"\x11" * 20
+TOKEN_ADDRESS = b"\x21" * 20
+RECIPIENT = b"\x22" * 20
+SENDER = b"\x23" * 20
+TRANSFER_HASH = b"\x31" * 32
+TRANSACTION_HASH = b"\x32" * 32
+
+
+@pytest.fixture()
+def validators():
+    return [Account.create() for _ in range(3)]
+
+
+@pytest.fixture()
+def simulated_chain():
+    return SimulatedChain(chain_id=5)
+
+
+@pytest.fixture()
+def simulated_w3(simulated_chain):
+    return Web3(SimulatedProvider(simulated_chain))
+
+
+@pytest.fixture()
+def home_bridge(simulated_chain, validators):
+    validator_proxy = simulated_chain.deploy(
+        SimulatedValidatorProxy(
+            VALIDATOR_PROXY_ADDRESS, [validator.address for validator in validators]
+        )
+    )
+    return simulated_chain.deploy(
+        SimulatedHomeBridge(HOME_BRIDGE_ADDRESS, validator_proxy)
+    )
+
+
+@pytest.fixture()
+def home_bridge_contract(simulated_w3, home_bridge):
+    return simulated_w3.eth.contract(
+        address=to_checksum_address(HOME_BRIDGE_ADDRESS), abi=HOME_BRIDGE_ABI
+    )
+
+
+def confirm_transfer(w3, home_bridge_contract, validator, nonce=0):
+    transaction = home_bridge_contract.functions.confirmTransfer(
+        TRANSFER_HASH, TRANSACTION_HASH, 100, to_checksum_address(RECIPIENT)
+    ).buildTransaction({"gas": 100_000, "gasPrice": 1, "nonce": nonce, "chainId": 5})
+    return w3.eth.sendRawTransaction(
+        validator.sign_transaction(transaction).rawTransaction
+    )
+
+
+def test_node_status(simulated_chain, simulated_w3):
+    simulated_chain.mine_blocks(3)
+    node_status = get_node_status(simulated_w3)
+    assert not node_status.is_syncing
+    assert node_status.latest_synced_block == 3
+
+
+def test_contracts_pass_validation(home_bridge_contract, validators):
+    validate_contract_existence(home_bridge_contract)
+    validate_contract_existence(get_validator_proxy_contract(home_bridge_contract))
+    assert is_bridge_validator(home_bridge_contract, validators[0].address)
+    assert not is_bridge_validator(home_bridge_contract, to_checksum_address(SENDER))
+
+
+def test_token_transfer_logs(simulated_chain, simulated_w3):
+    token = simulated_chain.deploy(SimulatedToken(TOKEN_ADDRESS))
+    token.transfer(SENDER, RECIPIENT, 10)
+    token.transfer(SENDER, SENDER, 20)
+    assert simulated_w3.eth.blockNumber == 0
+
+    simulated_chain.mine_block()
+    token_contract = simulated_w3.eth.contract(
+        address=to_checksum_address(TOKEN_ADDRESS), abi=MINIMAL_ERC20_TOKEN_ABI
+    )
+    events = token_contract.events.Transfer.getLogs(
+        fromBlock=0, argument_filters={"to": to_checksum_address(RECIPIENT)}
+    )
+    assert [(event.blockNumber, event.args.value) for event in events] == [(1, 10)]
+
+
+def test_confirmations_complete_transfer(
+    simulated_chain, simulated_w3, home_bridge, home_bridge_contract, validators
+):
+    transaction_hashes = [
+        confirm_transfer(simulated_w3, home_bridge_contract, validator)
+        for validator in validators[:2]
+    ]
+    simulated_chain.mine_block()
+
+    receipts = [simulated_w3.eth.getTransactionReceipt(h) for h in transaction_hashes]
+    assert [receipt.status for receipt in receipts] == [1, 1]
+    assert home_bridge_contract.functions.transferState(TRANSFER_HASH).call() == [
+        2,
+        True,
+    ]
+    (completion,) = home_bridge_contract.events.TransferCompleted.getLogs(fromBlock=0)
+    assert completion.args.transferHash == TRANSFER_HASH
+    assert completion.args.recipient == to_checksum_address(RECIPIENT)
+    assert TRANSFER_HASH in home_bridge.completed_transfers
+
+
+def test_duplicate_confirmation_reverts(
+    simulated_chain, simulated_w3, home_bridge_contract, validators
+):
+    confirm_transfer(simulated_w3, home_bridge_contract, validators[0], nonce=0)
+    transaction_hash = confirm_transfer(
+        simulated_w3, home_bridge_contract, validators[0], nonce=1
+    )
+    simulated_chain.mine_block()
+
+    receipt = simulated_w3.eth.getTransactionReceipt(transaction_hash)
+    assert receipt.status == 0
+    assert receipt.logs == []
+    assert simulated_w3.eth.getTransactionCount(validators[0].address, "pending") == 2
+
+
+def test_nonce_too_low(simulated_chain, simulated_w3, home_bridge_contract, validators):
+    confirm_transfer(simulated_w3, home_bridge_contract, validators[0])
+    with pytest.raises(ValueError) as excinfo:
+        confirm_transfer(simulated_w3, home_bridge_contract, validators[0])
+    assert is_nonce_too_low_exception(excinfo.value)
+
+
+def test_injected_errors(simulated_chain):
+    provider = SimulatedProvider(simulated_chain, error_rate=0.5, seed=1)
+    w3 = Web3(provider)
+    results = []
+    for _ in range(20):
+        try:
+            results.append(w3.eth.blockNumber)
+        except SimulatedNodeError:
+            pass
+    assert 0 < len(results) < 20
+    assert provider.request_counts["eth_blockNumber"] == 20
+
+
+def test_make_w3_uses_simulated_provider(simulated_chain, load_config_from_string):
+    provider = SimulatedProvider(simulated_chain)
+    config = load_config_from_string(
+        """
+        [foreign_chain]
+        rpc_url = "http://foreign.simulated"
+        token_contract_address = "0x731a10897d267e19B34503aD902d0A29173Ba4B1"
+        bridge_contract_address = "0xb4c79daB8f259C7Aee6E5b2Aa729821864227e84"
+
+        [home_chain]
+        rpc_url = "http://home.simulated"
+        bridge_contract_address = "0x771434486a221c6146F27B72fd160Bdf0eb1288e"
+
+        [validator_private_key]
+        raw = "0xb8dc8a6d5a2b0c9ddba1b2b6d3f4e1b4ac6b1ecf0cbbf6a7f58d9d4e1c0e8b5a"
+        """
+    )
+    with simulated_providers({"http://home.simulated": provider}):
+        w3 = bridge.main.make_w3(config, ChainRole.home)
+        assert w3.provider is provider
+        assert w3.eth.blockNumber == 0
+        assert not isinstance(
+            bridge.main.make_w3(config, ChainRole.foreign).provider, SimulatedProvider
+        )
+    assert bridge.main.make_w3(config, ChainRole.home).provider is not provider
+
+
+def test_reorg_replaces_blocks(simulated_chain):
+    token = simulated_chain.deploy(SimulatedToken(TOKEN_ADDRESS))
+    simulated_chain.mine_blocks(2)
+    token.transfer(SENDER, RECIPIENT, 10)
+    simulated_chain.mine_blocks(2)
+    replaced_hashes = [block.hash for block in simulated_chain.blocks[3:]]
+
+    simulated_chain.reorg(2)
+
+    assert simulated_chain.latest_block.number == 5
+    assert simulated_chain.number_of_reorgs == 1
+    assert not {block.hash for block in simulated_chain.blocks} & set(replaced_hashes)
+    # the transfer is included again in the first new block
+    assert [block.number for block, *_ in simulated_chain.iter_logs(0, 5)] == [3]
+
+
+def test_reorg_drops_transactions(simulated_chain, simulated_w3):
+    token = simulated_chain.deploy(SimulatedToken(TOKEN_ADDRESS))
+    transaction_hash = token.transfer(SENDER, RECIPIENT, 10)
+    simulated_chain.mine_block()
+
+    simulated_chain.reorg(1, drop_transactions=True)
+
+    assert list(simulated_chain.iter_logs(0, 2)) == []
+    with pytest.raises(TransactionNotFound):
+        simulated_w3.eth.getTransactionReceipt(transaction_hash)
+
+
+def test_get_logs_limits(simulated_chain):
+    token = simulated_chain.deploy(SimulatedToken(TOKEN_ADDRESS))
+    for _ in range(3):
+        token.transfer(SENDER, RECIPIENT, 10)
+        simulated_chain.mine_block()
+    w3 = Web3(SimulatedProvider(simulated_chain, max_logs=2, max_block_range=3))
+    token_contract = w3.eth.contract(
+        address=to_checksum_address(TOKEN_ADDRESS), abi=MINIMAL_ERC20_TOKEN_ABI
+    )
+
+    assert len(token_contract.events.Transfer.getLogs(fromBlock=1, toBlock=2)) == 2
+    with pytest.raises(ValueError, match="more than 2 results"):
+        token_contract.events.Transfer.getLogs(fromBlock=1, toBlock=3)
+    with pytest.raises(ValueError, match="block range"):
+        token_contract.events.Transfer.getLogs(fromBlock=0, toBlock=3)
+
+
+def test_injected_timeouts(simulated_chain):
+    w3 = Web3(SimulatedProvider(simulated_chain, timeout_rate=1.0, timeout=0.01))
+    with pytest.raises(requests.exceptions.Timeout):
+        w3.eth.blockNumber
+
+
+def test_syncing_geth_node(simulated_chain):
+    simulated_chain.mine_blocks(10)
+    provider = SimulatedProvider(simulated_chain)
+    provider.synced_block_number = 4
+    w3 = Web3(provider)
+
+    node_status = get_node_status(w3)
+    assert node_status.is_syncing
+    assert node_status.latest_synced_block == 4
+    assert node_status.syncing_map.highestBlock == 10
+    assert w3.eth.getBlock("latest").number == 4
+
+    provider.sync(blocks_per_second=1000)
+    node_status = get_node_status(w3)
+    assert not node_status.is_syncing
+    assert node_status.latest_synced_block == 10
+
+
+def test_parity_node_in_warp_sync(simulated_chain):
+    token = simulated_chain.deploy(SimulatedToken(TOKEN_ADDRESS))
+    token.transfer(SENDER, RECIPIENT, 10)
+    simulated_chain.mine_blocks(10)
+    provider = SimulatedProvider(simulated_chain, client_version=PARITY_CLIENT_VERSION)
+    provider.block_gap = (1, 7)
+    w3 = Web3(provider)
+
+    node_status = get_node_status(w3)
+    assert node_status.is_syncing
+    assert node_status.block_gap == [1, 7]
+    assert node_status.latest_synced_block == 0
+    assert node_status.block_number == 10
+
+    token_contract = w3.eth.contract(
+        address=to_checksum_address(TOKEN_ADDRESS), abi=MINIMAL_ERC20_TOKEN_ABI
+    )
+    assert token_contract.events.Transfer.getLogs(fromBlock=0, toBlock=10) == ()
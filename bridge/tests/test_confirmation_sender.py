@@ -15,6 +15,7 @@ from bridge.confirmation_sender import (
     make_sanity_check_transfer,
 )
 from bridge.constants import HOME_CHAIN_STEP_DURATION
+from bridge.signer import LocalSigner
 from bridge.utils import compute_transfer_hash
 
 
@@ -65,7 +66,7 @@ def confirmation_sender(
     return ConfirmationSender(
         transfer_event_queue=transfer_queue,
         home_bridge_contract=home_bridge_contract,
-        private_key=validator_key.to_bytes(),
+        signer=LocalSigner(validator_key.to_bytes()),
         gas_price=gas_price,
         max_reorg_depth=max_reorg_depth,
         pending_transaction_queue=pending_transaction_queue,
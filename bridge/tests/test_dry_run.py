@@ -0,0 +1,140 @@
+import gevent
+import pytest
+from chain_simulator import (
+    SimulatedChain,
+    SimulatedHomeBridge,
+    SimulatedProvider,
+    SimulatedToken,
+    SimulatedValidatorProxy,
+    simulated_providers,
+)
+from eth_account import Account
+from eth_utils import to_canonical_address, to_checksum_address
+from hexbytes import HexBytes
+
+import bridge.main
+from bridge import tracing
+from bridge.dry_run import DryRun
+from bridge.service import start_services
+from bridge.signer import SignedTransaction, make_validator_signer
+from bridge.startup import StartupTimings
+
+HOME_BRIDGE_ADDRESS = b"\x10" * 20
+VALIDATOR_PROXY_ADDRESS = b"\x11" * 20
+FOREIGN_BRIDGE_ADDRESS = b"\x20" * 20
+TOKEN_ADDRESS = b"\x21" * 20
+SENDER = b"\x22" * 20
+
+VALIDATOR_PRIVATE_KEY = b"\x42" * 32
+
+CONFIG = f"""
+[foreign_chain]
+rpc_url = "http://foreign.simulated"
+token_contract_address = "{to_checksum_address(TOKEN_ADDRESS)}"
+bridge_contract_address = "{to_checksum_address(FOREIGN_BRIDGE_ADDRESS)}"
+max_reorg_depth = 1
+event_poll_interval = 0.1
+
+[home_chain]
+rpc_url = "http://home.simulated"
+bridge_contract_address = "{to_checksum_address(HOME_BRIDGE_ADDRESS)}"
+max_reorg_depth = 1
+event_poll_interval = 0.1
+
+[validator_private_key]
+raw = "0x{VALIDATOR_PRIVATE_KEY.hex()}"
+
+[dry_run]
+enabled = true
+inclusion_delay = 0.5
+"""
+
+
+def make_signed_transaction(index):
+    return SignedTransaction(
+        rawTransaction=HexBytes(b""), hash=HexBytes(index.to_bytes(32, "big"))
+    )
+
+
+def test_dry_run_summary():
+    dry_run = DryRun(inclusion_delay=0.0, report_interval=60)
+    for index in range(3):
+        dry_run.record_signed(
+            index.to_bytes(32, "big"), make_signed_transaction(index), index
+        )
+    dry_run.wait_for_inclusion(make_signed_transaction(0).hash)
+
+    summary = dry_run.get_summary()
+    assert summary["signed"] == summary["total_signed"] == 3
+    assert summary["total_included"] == 1
+    assert summary["awaiting_inclusion"] == 2
+    # the transfers were not traced
+    assert summary["latency"] is None
+
+
+def test_dry_run_disabled_by_default(load_config_from_string):
+    config = load_config_from_string(CONFIG.replace("enabled = true", ""))
+    assert bridge.main.make_dry_run(config) is None
+
+
+def test_dry_run_default_inclusion_delay(load_config_from_string):
+    config = load_config_from_string(CONFIG.replace("inclusion_delay = 0.5", ""))
+    assert bridge.main.make_dry_run(config).inclusion_delay == 2 * 5
+
+
+@pytest.fixture()
+def home_chain():
+    validator_address = Account.from_key(VALIDATOR_PRIVATE_KEY).address
+    home_chain = SimulatedChain(chain_id=1, block_time=0.1)
+    validator_proxy = home_chain.deploy(
+        SimulatedValidatorProxy(VALIDATOR_PROXY_ADDRESS, [validator_address])
+    )
+    home_chain.deploy(SimulatedHomeBridge(HOME_BRIDGE_ADDRESS, validator_proxy))
+    home_chain.balances[HOME_BRIDGE_ADDRESS] = 10 ** 24
+    home_chain.balances[to_canonical_address(validator_address)] = 10 ** 24
+    home_chain.nonces[to_canonical_address(validator_address)] = 7
+    with simulated_providers({"http://home.simulated": SimulatedProvider(home_chain)}):
+        yield home_chain
+
+
+@pytest.fixture()
+def foreign_chain():
+    foreign_chain = SimulatedChain(chain_id=2, block_time=0.1)
+    token = foreign_chain.deploy(SimulatedToken(TOKEN_ADDRESS))
+    for value in range(1, 4):
+        token.transfer(SENDER, FOREIGN_BRIDGE_ADDRESS, value)
+    foreign_chain.mine_block()
+    with simulated_providers(
+        {"http://foreign.simulated": SimulatedProvider(foreign_chain)}
+    ):
+        yield foreign_chain
+
+
+def test_dry_run_signs_but_does_not_send(
+    load_config_from_string, home_chain, foreign_chain, monkeypatch
+):
+    config = load_config_from_string(CONFIG)
+    monkeypatch.setattr(tracing, "tracer", tracing.TransferTracer())
+    services = bridge.main.make_main_services(
+        config,
+        bridge.main.make_recorder(config),
+        make_validator_signer(config),
+        StartupTimings(),
+    )
+    dry_run = next(
+        service.run.__self__ for service in services if service.name == "report-dry-run"
+    )
+    greenlets = start_services(services + home_chain.services + foreign_chain.services)
+    try:
+        with gevent.Timeout(30):
+            while dry_run.number_of_included_transactions < 3:
+                gevent.sleep(0.05)
+    finally:
+        gevent.killall(greenlets)
+
+    nonces = [transaction.nonce for transaction in dry_run.recent_transactions]
+    assert sorted(nonces) == [7, 8, 9]
+    # nothing reached the home chain
+    assert home_chain.pending_transactions == []
+    assert all(not block.transactions for block in home_chain.blocks)
+    assert dry_run.get_summary()["latency"] is not None
@@ -0,0 +1,103 @@
+import sys
+import tracemalloc
+
+import gevent
+import pytest
+
+from bridge import memory
+
+
+@pytest.fixture
+def tracing():
+    tracemalloc.start()
+    yield
+    tracemalloc.stop()
+
+
+def test_get_deep_size_counts_referenced_objects():
+    items = [bytes(32) + bytes([i]) for i in range(10)]
+    assert memory.get_deep_size(items) == sys.getsizeof(items) + sum(
+        sys.getsizeof(item) for item in items
+    )
+
+
+def test_get_deep_size_counts_shared_objects_once():
+    item = bytes(1000)
+    assert memory.get_deep_size([item, item]) < memory.get_deep_size(
+        [item, bytes(1000)]
+    )
+
+
+def test_get_deep_size_follows_mappings_and_attributes():
+    class Holder:
+        def __init__(self):
+            self.data = {"key": bytes(1000)}
+
+    assert memory.get_deep_size(Holder()) > 1000
+
+
+def test_get_tracked_object_sizes(monkeypatch):
+    monkeypatch.setattr(memory, "tracked_objects", {})
+    hashes = {bytes([i]) * 32 for i in range(5)}
+    memory.track("hashes", lambda: hashes)
+
+    sizes = memory.get_tracked_object_sizes()
+    assert sizes == {"hashes": {"length": 5, "size": memory.get_deep_size(hashes)}}
+
+
+def test_take_snapshot_requires_tracing():
+    with pytest.raises(RuntimeError):
+        memory.MemoryProfiler().take_snapshot()
+
+
+def test_top_allocations(tracing):
+    profiler = memory.MemoryProfiler()
+    first = profiler.take_snapshot()
+    allocated = [bytearray(10_000) for _ in range(100)]  # noqa: F841
+    second = profiler.take_snapshot()
+
+    top = profiler.get_top_allocations(second.id, limit=5)
+    assert len(top) <= 5
+    assert top[0]["size"] >= 1_000_000
+    assert "test_memory.py" in "".join(top[0]["site"])
+
+    diff = profiler.get_top_allocations(second.id, compare_to=first.id, limit=1)
+    assert diff[0]["size_diff"] >= 1_000_000
+
+
+def test_unknown_snapshot(tracing):
+    profiler = memory.MemoryProfiler()
+    with pytest.raises(memory.UnknownSnapshotError):
+        profiler.get_top_allocations(1)
+
+
+def test_keeps_only_max_snapshots(tracing):
+    profiler = memory.MemoryProfiler(max_snapshots=2)
+    for _ in range(3):
+        profiler.take_snapshot()
+    assert [record.id for record in profiler.snapshots] == [2, 3]
+
+
+def test_sampled_mode_traces_only_in_windows():
+    profiler = memory.MemoryProfiler(
+        mode=memory.SAMPLED_MODE, snapshot_interval=0.1, trace_duration=0.05
+    )
+    greenlet = gevent.spawn(profiler.run)
+    try:
+        gevent.sleep(0.25)
+    finally:
+        greenlet.kill()
+
+    assert len(profiler.snapshots) == 2
+    assert not tracemalloc.is_tracing()
+
+
+def test_summary(tracing):
+    profiler = memory.MemoryProfiler()
+    profiler.take_snapshot()
+
+    summary = profiler.get_summary()
+    assert summary["tracing"]
+    assert summary["traced_memory"]["current"] > 0
+    assert summary["max_rss"] > 0
+    assert [snapshot["id"] for snapshot in summary["snapshots"]] == [1]
@@ -0,0 +1,96 @@
+import pytest
+from web3 import Web3
+from web3.providers.base import BaseProvider
+
+from bridge.metrics import MetricsRegistry, make_rpc_metrics_middleware, rpc_requests
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_counter(registry):
+    counter = registry.counter("test_total", "A counter", ["method"])
+
+    counter.inc("eth_call")
+    counter.inc("eth_call", amount=2)
+
+    assert counter.get("eth_call") == 3
+    assert registry.expose() == (
+        "# HELP test_total A counter\n"
+        "# TYPE test_total counter\n"
+        'test_total{method="eth_call"} 3.0\n'
+    )
+
+
+def test_counter_wrong_labels(registry):
+    counter = registry.counter("test_total", "A counter", ["method"])
+
+    with pytest.raises(ValueError):
+        counter.inc()
+
+
+def test_gauge_function(registry):
+    gauge = registry.gauge("test_size", "A gauge", ["queue"])
+    items = [1, 2]
+
+    gauge.set_function(lambda: len(items), "control")
+    items.append(3)
+
+    assert 'test_size{queue="control"} 3.0\n' in registry.expose()
+
+
+def test_gauge_function_without_value(registry):
+    gauge = registry.gauge("test_lag", "A gauge", ["chain"])
+
+    gauge.set_function(lambda: None, "home")
+
+    assert "test_lag{" not in registry.expose()
+
+
+def test_histogram(registry):
+    histogram = registry.histogram(
+        "test_seconds", "A histogram", ["method"], buckets=[0.1, 1.0]
+    )
+
+    for value in (0.05, 0.1, 0.5, 5.0):
+        histogram.observe(value, "eth_call")
+
+    assert registry.expose().splitlines()[2:] == [
+        'test_seconds_bucket{method="eth_call",le="0.1"} 2.0',
+        'test_seconds_bucket{method="eth_call",le="1.0"} 3.0',
+        'test_seconds_bucket{method="eth_call",le="+Inf"} 4.0',
+        'test_seconds_count{method="eth_call"} 4.0',
+        'test_seconds_sum{method="eth_call"} 5.65',
+    ]
+
+
+def test_escape_label_value(registry):
+    counter = registry.counter("test_total", "A counter", ["method"])
+
+    counter.inc('a"b\\c\nd')
+
+    assert 'test_total{method="a\\"b\\\\c\\nd"} 1.0' in registry.expose()
+
+
+def test_duplicate_metric(registry):
+    registry.counter("test_total", "A counter")
+
+    with pytest.raises(ValueError):
+        registry.counter("test_total", "Another counter")
+
+
+class BlockNumberProvider(BaseProvider):
+    def make_request(self, method, params):
+        return {"jsonrpc": "2.0", "id": 1, "result": "0x10"}
+
+
+def test_rpc_metrics_middleware():
+    w3 = Web3(BlockNumberProvider())
+    w3.middleware_onion.add(make_rpc_metrics_middleware("test"))
+    requests_before = rpc_requests.get("test", "eth_blockNumber")
+
+    assert w3.eth.blockNumber == 16
+
+    assert rpc_requests.get("test", "eth_blockNumber") == requests_before + 1
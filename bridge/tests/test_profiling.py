@@ -0,0 +1,74 @@
+import time
+
+import gevent
+import gevent.events
+import pytest
+
+from bridge import profiling
+
+
+def busy_wait(duration):
+    end_time = time.monotonic() + duration
+    while time.monotonic() < end_time:
+        pass
+
+
+def test_get_greenlet_name_strips_counter():
+    assert profiling.get_greenlet_name(gevent.Greenlet()).startswith("Greenlet")
+    assert profiling.get_greenlet_name(gevent.Greenlet()) == "Greenlet"
+
+    named_greenlet = gevent.Greenlet()
+    named_greenlet.name = "fetcher-home"
+    assert profiling.get_greenlet_name(named_greenlet) == "fetcher-home"
+
+    assert profiling.get_greenlet_name(gevent.get_hub()) == "Hub"
+
+
+def test_report_blocked_hub():
+    glet = gevent.Greenlet()
+    glet.name = "blocker"
+    before = profiling.hub_blocked.get("blocker")
+
+    profiling.report_blocked_hub(
+        gevent.events.EventLoopBlocked(glet, 0.1, ["stack line"])
+    )
+
+    assert profiling.hub_blocked.get("blocker") == before + 1
+
+
+@pytest.fixture
+def cpu_tracker():
+    tracker = profiling.GreenletCpuTracker()
+    tracker.install()
+    yield tracker
+    tracker.uninstall()
+
+
+def test_cpu_tracker_accounts_busy_greenlet(cpu_tracker):
+    glet = gevent.Greenlet(busy_wait, 0.05)
+    glet.name = "busy-worker"
+    before = profiling.greenlet_cpu_time.get("busy-worker")
+
+    glet.start()
+    glet.join()
+
+    assert profiling.greenlet_cpu_time.get("busy-worker") - before >= 0.03
+
+
+def test_sampling_profiler_samples_running_greenlet(cpu_tracker):
+    profiler = profiling.SamplingProfiler(cpu_tracker)
+
+    glet = gevent.Greenlet(busy_wait, 0.2)
+    glet.name = "busy-worker"
+    glet.start()
+    stacks = profiler.profile(0.1, 0.001)
+    glet.join()
+
+    assert any(
+        stack.startswith("busy-worker;") and "busy_wait" in stack for stack in stacks
+    )
+
+    folded = profiling.format_folded_stacks(stacks)
+    for line in folded.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert stacks[stack] == int(count)
@@ -0,0 +1,169 @@
+import time
+
+import pytest
+from web3 import Web3
+from web3.providers.base import BaseProvider
+
+import bridge.main
+from bridge.rpc_recording import (
+    RecordedCall,
+    RecordedRequestError,
+    ReplayProvider,
+    RpcRecorder,
+    UnrecordedRequestError,
+    make_replay_providers,
+    make_rpc_recording_middleware,
+    read_recording,
+)
+
+ADDRESS = "0x345DeAd084E056dc78a0832E70B40C14B6323458"
+BLOCK = {
+    "number": "0x10",
+    "hash": "0x" + "11" * 32,
+    "timestamp": "0x5e0be100",
+    "transactions": [],
+}
+
+
+class NodeStandIn(BaseProvider):
+    def __init__(self):
+        self.block_number = 0
+
+    def make_request(self, method, params):
+        if method == "eth_blockNumber":
+            self.block_number += 1
+            return {"jsonrpc": "2.0", "id": 1, "result": hex(self.block_number)}
+        if method == "eth_getBlockByNumber":
+            return {"jsonrpc": "2.0", "id": 1, "result": BLOCK}
+        raise ConnectionError("node not reachable")
+
+
+def make_call(method, params, result, *, time=0.0, duration=0.0, chain="home"):
+    return RecordedCall(
+        chain=chain,
+        time=time,
+        duration=duration,
+        method=method,
+        params=params,
+        response={"jsonrpc": "2.0", "id": 1, "result": result},
+    )
+
+
+@pytest.fixture(params=["recording.jsonl", "recording.jsonl.gz"])
+def recording_path(tmp_path, request):
+    return str(tmp_path / request.param)
+
+
+def test_record_and_replay(recording_path):
+    recorder = RpcRecorder(recording_path)
+    recorded_w3 = Web3(NodeStandIn())
+    recorded_w3.middleware_onion.inject(
+        make_rpc_recording_middleware(recorder, "home"), "rpc_recording", layer=0
+    )
+
+    block_numbers = [recorded_w3.eth.blockNumber for _ in range(3)]
+    block = recorded_w3.eth.getBlock(16)
+    with pytest.raises(ConnectionError):
+        recorded_w3.eth.getBalance(ADDRESS)
+    recorder.close()
+
+    recorded_calls = list(read_recording(recording_path))
+    assert [recorded_call.method for recorded_call in recorded_calls] == [
+        "eth_blockNumber",
+        "eth_blockNumber",
+        "eth_blockNumber",
+        "eth_getBlockByNumber",
+        "eth_getBalance",
+    ]
+    assert recorded_calls[3].params == ["0x10", False]
+    assert recorded_calls[3].response["result"] == BLOCK
+    assert "node not reachable" in recorded_calls[4].error
+
+    replay_w3 = Web3(ReplayProvider(recorded_calls))
+    assert [replay_w3.eth.blockNumber for _ in range(3)] == block_numbers
+    # the last response is repeated
+    assert replay_w3.eth.blockNumber == block_numbers[-1]
+    assert replay_w3.eth.getBlock(16) == block
+    with pytest.raises(RecordedRequestError):
+        replay_w3.eth.getBalance(ADDRESS)
+
+
+def test_replay_unrecorded_request():
+    replay_w3 = Web3(ReplayProvider([make_call("eth_blockNumber", [], "0x1")]))
+    with pytest.raises(UnrecordedRequestError):
+        replay_w3.eth.getBalance(ADDRESS)
+
+
+def test_replay_falls_back_to_method():
+    provider = ReplayProvider(
+        [
+            make_call("eth_sendRawTransaction", ["0x01"], "0x" + "01" * 32),
+            make_call("eth_sendRawTransaction", ["0x02"], "0x" + "02" * 32),
+            make_call("eth_sendRawTransaction", ["0x03"], "0x" + "03" * 32),
+        ]
+    )
+    assert provider.make_request("eth_sendRawTransaction", ["0x02"])["result"] == (
+        "0x" + "02" * 32
+    )
+    # the response already used for the exact request is not used again
+    assert provider.make_request("eth_sendRawTransaction", ["0xff"])["result"] == (
+        "0x" + "01" * 32
+    )
+    assert provider.make_request("eth_sendRawTransaction", ["0xff"])["result"] == (
+        "0x" + "03" * 32
+    )
+
+
+def test_replay_speed():
+    provider = ReplayProvider(
+        [
+            make_call("eth_blockNumber", [], "0x1", time=0.0, duration=0.5),
+            make_call("eth_blockNumber", [], "0x2", time=1.0, duration=0.5),
+            make_call("eth_blockNumber", [], "0x3", time=2.0, duration=0.5),
+        ],
+        speed=10,
+    )
+    start_time = time.monotonic()
+    assert provider.make_request("eth_blockNumber", [])["result"] == "0x1"
+    # the recorded duration accelerated ten times
+    assert 0.04 <= time.monotonic() - start_time < 0.09
+
+    # the second response is due only after a tenth of a second, the third skips it
+    time.sleep(0.25)
+    assert provider.make_request("eth_blockNumber", [])["result"] == "0x3"
+
+
+def test_make_replay_providers_by_chain():
+    providers = make_replay_providers(
+        [
+            make_call("eth_blockNumber", [], "0x1", chain="home"),
+            make_call("eth_blockNumber", [], "0x2", chain="foreign"),
+        ]
+    )
+    assert providers["home"].make_request("eth_blockNumber", [])["result"] == "0x1"
+    assert providers["foreign"].make_request("eth_blockNumber", [])["result"] == "0x2"
+
+
+def test_make_w3_replays_recording(tmp_path, minimal_config, load_config_from_string):
+    recording_path = str(tmp_path / "recording.jsonl")
+    recorder = RpcRecorder(recording_path)
+    recorder.record(
+        "home",
+        "eth_blockNumber",
+        [],
+        time.monotonic(),
+        response={"jsonrpc": "2.0", "id": 1, "result": "0x2a"},
+    )
+    recorder.close()
+
+    config = load_config_from_string(
+        minimal_config
+        + f"""
+[rpc_recording]
+mode = "replay"
+path = "{recording_path}"
+"""
+    )
+    assert bridge.main.make_w3_home(config).eth.blockNumber == 42
+    with pytest.raises(bridge.main.SetupError):
+        bridge.main.make_w3_foreign(config)
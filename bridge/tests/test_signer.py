@@ -0,0 +1,142 @@
+import pytest
+from eth_account import Account
+from eth_utils import decode_hex, to_canonical_address, to_int
+from web3 import Web3
+from web3.providers.base import BaseProvider
+
+import bridge.config
+from bridge.signer import ExternalSigner, LocalSigner, make_validator_signer
+
+PRIVATE_KEY = decode_hex(
+    "0x1888cfba6ca66478598dc65fa91bfce1272a005343751fa02ba6271b38ac8e08"
+)
+ADDRESS = Account.from_key(PRIVATE_KEY).address
+
+TRANSACTION = {
+    "to": "0x771434486a221c6146F27B72fd160Bdf0eb1288e",
+    "value": 0,
+    "data": "0x1234",
+    "gas": 100_000,
+    "gasPrice": 10 ** 9,
+    "nonce": 3,
+    "chainId": 61,
+}
+
+
+class LocalSignerStandIn(BaseProvider):
+    """Stands in for an external signer and answers eth_signTransaction with a local key"""
+
+    def __init__(self, private_key):
+        self.account = Account.from_key(private_key)
+        self.requested_transactions = []
+        self.signed_transactions = []
+
+    def make_request(self, method, params):
+        assert method == "eth_signTransaction"
+        (transaction,) = params
+        self.requested_transactions.append(dict(transaction))
+        assert transaction.pop("from") == self.account.address
+        transaction = {
+            key: to_int(hexstr=value)
+            if key in ("value", "gas", "gasPrice", "nonce", "chainId")
+            else value
+            for key, value in transaction.items()
+        }
+        self.signed_transactions.append(transaction)
+        signed_transaction = self.account.sign_transaction(transaction)
+        return {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "result": {"raw": signed_transaction.rawTransaction.hex(), "tx": {}},
+        }
+
+
+def test_local_signer_address():
+    signer = LocalSigner(PRIVATE_KEY)
+
+    assert signer.address == to_canonical_address(ADDRESS)
+    assert signer.address_hex == ADDRESS
+
+
+def test_local_signer_does_not_show_key():
+    signer = LocalSigner(PRIVATE_KEY)
+
+    assert PRIVATE_KEY.hex() not in repr(signer)
+    assert PRIVATE_KEY.hex() not in repr(vars(signer))
+
+
+def test_local_signer_sign_transaction():
+    signed_transaction = LocalSigner(PRIVATE_KEY).sign_transaction(TRANSACTION)
+
+    assert Account.recover_transaction(signed_transaction.rawTransaction) == ADDRESS
+    assert (
+        signed_transaction.hash
+        == Account.sign_transaction(TRANSACTION, PRIVATE_KEY).hash
+    )
+
+
+def test_external_signer_sign_transaction():
+    provider = LocalSignerStandIn(PRIVATE_KEY)
+    signer = ExternalSigner(Web3(provider), to_canonical_address(ADDRESS))
+
+    signed_transaction = signer.sign_transaction(TRANSACTION)
+
+    assert provider.signed_transactions == [TRANSACTION]
+    assert signed_transaction == LocalSigner(PRIVATE_KEY).sign_transaction(TRANSACTION)
+
+
+def test_external_signer_sends_hex_quantities():
+    provider = LocalSignerStandIn(PRIVATE_KEY)
+    signer = ExternalSigner(Web3(provider), to_canonical_address(ADDRESS))
+
+    signer.sign_transaction(TRANSACTION)
+
+    [requested_transaction] = provider.requested_transactions
+    assert requested_transaction == {
+        **TRANSACTION,
+        "from": ADDRESS,
+        "value": "0x0",
+        "gas": "0x186a0",
+        "gasPrice": "0x3b9aca00",
+        "nonce": "0x3",
+        "chainId": "0x3d",
+    }
+
+
+EXTERNAL_SIGNER_CONFIG = f"""
+[external_signer]
+url = "http://localhost:8550"
+address = "{ADDRESS}"
+"""
+
+
+@pytest.fixture
+def config_without_key(minimal_config):
+    return minimal_config[: minimal_config.index("[validator_private_key]")]
+
+
+def test_make_validator_signer_raw(load_config_from_string, minimal_config):
+    signer = make_validator_signer(load_config_from_string(minimal_config))
+
+    assert isinstance(signer, LocalSigner)
+
+
+def test_make_validator_signer_external(load_config_from_string, config_without_key):
+    signer = make_validator_signer(
+        load_config_from_string(config_without_key + EXTERNAL_SIGNER_CONFIG)
+    )
+
+    assert isinstance(signer, ExternalSigner)
+    assert signer.address_hex == ADDRESS
+
+
+def test_config_without_key_and_external_signer(
+    load_config_from_string, config_without_key
+):
+    with pytest.raises(bridge.config.ValidationError):
+        load_config_from_string(config_without_key)
+
+
+def test_config_with_key_and_external_signer(load_config_from_string, minimal_config):
+    with pytest.raises(bridge.config.ValidationError):
+        load_config_from_string(minimal_config + EXTERNAL_SIGNER_CONFIG)
@@ -0,0 +1,84 @@
+import gevent
+import pytest
+
+from bridge.startup import CheckCache, StartupTimings, build_concurrently
+
+
+def test_check_cache_runs_check_once():
+    calls = []
+    cache = CheckCache()
+
+    def check(value):
+        calls.append(value)
+        return value * 2
+
+    assert cache.run_once("key", check, 21) == 42
+    assert cache.run_once("key", check, 21) == 42
+    assert calls == [21]
+
+
+def test_check_cache_remembers_failure():
+    calls = []
+    cache = CheckCache()
+
+    def failing_check():
+        calls.append(None)
+        raise ValueError("not intact")
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            cache.run_once("key", failing_check)
+    assert len(calls) == 1
+
+
+def test_check_cache_waits_for_running_check():
+    calls = []
+    cache = CheckCache()
+
+    def slow_check():
+        calls.append(None)
+        gevent.sleep(0.01)
+        return True
+
+    greenlets = [gevent.spawn(cache.run_once, "key", slow_check) for _ in range(3)]
+    gevent.joinall(greenlets, raise_error=True)
+
+    assert [greenlet.value for greenlet in greenlets] == [True, True, True]
+    assert len(calls) == 1
+
+
+def test_build_concurrently():
+    timings = StartupTimings()
+
+    def factory(value):
+        gevent.sleep(0.05)
+        return value
+
+    with timings.phase("build"):
+        components = build_concurrently(
+            {"a": lambda: factory(1), "b": lambda: factory(2)}, timings
+        )
+
+    assert components == {"a": 1, "b": 2}
+    assert set(timings.durations) == {"build", "build a", "build b"}
+    # the factories did not run one after another
+    assert timings.durations["build"] < 0.09
+
+
+def test_build_concurrently_raises_error():
+    finished = []
+
+    def slow_factory():
+        gevent.sleep(0.05)
+        finished.append(None)
+
+    def failing_factory():
+        raise ValueError("setup error")
+
+    with pytest.raises(ValueError):
+        build_concurrently(
+            {"slow": slow_factory, "failing": failing_factory}, StartupTimings()
+        )
+
+    gevent.sleep(0.1)
+    assert not finished
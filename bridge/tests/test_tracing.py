@@ -0,0 +1,107 @@
+import pytest
+
+from bridge.tracing import STAGES, TransferTracer, transfer_stage_duration
+
+TRANSFER_HASH = b"\x01" * 32
+OTHER_TRANSFER_HASH = b"\x02" * 32
+TRANSACTION_HASH = b"\xaa" * 32
+
+
+@pytest.fixture
+def tracer():
+    return TransferTracer()
+
+
+def test_trace_transfer_through_all_stages(tracer):
+    for timestamp, stage in enumerate(STAGES):
+        if stage == "sent":
+            tracer.record_sent(TRANSFER_HASH, TRANSACTION_HASH)
+            tracer.traces[TRANSFER_HASH].timestamps["sent"] = timestamp
+        elif stage == "mined":
+            tracer.record_mined(TRANSACTION_HASH)
+            tracer.traces[TRANSFER_HASH].timestamps["mined"] = timestamp
+        else:
+            tracer.record(TRANSFER_HASH, stage, timestamp * 1.0)
+
+    assert not tracer.traces
+    (trace,) = tracer.completed_traces
+    assert trace.total_duration == len(STAGES) - 1
+    assert trace.stage_durations() == {stage: 1 for stage in STAGES[1:]}
+
+
+def test_stage_duration_is_observed(tracer):
+    count_before = transfer_stage_duration.get_count("recorded")
+
+    tracer.record(TRANSFER_HASH, "fetched", 10.0)
+    tracer.record(TRANSFER_HASH, "recorded", 12.0)
+
+    assert transfer_stage_duration.get_count("recorded") == count_before + 1
+
+
+def test_stage_recorded_late_is_observed(tracer):
+    count_before = transfer_stage_duration.get_count("fetched")
+
+    tracer.record(TRANSFER_HASH, "fetched", 10.0)
+    tracer.record(TRANSFER_HASH, "recorded", 11.0)
+    tracer.record(TRANSFER_HASH, "block", 4.0)
+
+    assert transfer_stage_duration.get_count("fetched") == count_before + 1
+    assert tracer.traces[TRANSFER_HASH].stage_durations() == {
+        "fetched": 6.0,
+        "recorded": 1.0,
+    }
+
+
+def test_stage_is_only_recorded_once(tracer):
+    tracer.record(TRANSFER_HASH, "fetched", 10.0)
+    tracer.record(TRANSFER_HASH, "fetched", 20.0)
+
+    assert tracer.traces[TRANSFER_HASH].timestamps == {"fetched": 10.0}
+
+
+def test_mined_after_completion(tracer):
+    tracer.record(TRANSFER_HASH, "fetched", 0.0)
+    tracer.record(TRANSFER_HASH, "scheduled", 1.0)
+    tracer.record_sent(TRANSFER_HASH, TRANSACTION_HASH)
+    tracer.record(TRANSFER_HASH, "completed")
+    tracer.record_mined(TRANSACTION_HASH)
+
+    (trace,) = tracer.completed_traces
+    assert "mined" in trace.timestamps
+    assert not tracer.traces_by_transaction_hash
+
+
+def test_completion_of_unknown_transfer_is_ignored(tracer):
+    tracer.record(TRANSFER_HASH, "completed")
+
+    assert not tracer.traces
+    assert not tracer.completed_traces
+
+
+def test_stages_of_untraced_transfer_are_ignored(tracer):
+    tracer.record(TRANSFER_HASH, "recorded")
+    tracer.record(TRANSFER_HASH, "scheduled")
+    tracer.record_sent(TRANSFER_HASH, TRANSACTION_HASH)
+
+    assert not tracer.traces
+    assert not tracer.traces_by_transaction_hash
+
+
+def test_oldest_traces_are_dropped():
+    tracer = TransferTracer(max_traced_transfers=1)
+
+    tracer.record(TRANSFER_HASH, "fetched")
+    tracer.record(OTHER_TRANSFER_HASH, "fetched")
+
+    assert list(tracer.traces) == [OTHER_TRANSFER_HASH]
+
+
+def test_slowest_transfers(tracer):
+    for transfer_hash, duration in [(TRANSFER_HASH, 5.0), (OTHER_TRANSFER_HASH, 50.0)]:
+        tracer.record(transfer_hash, "block", 0.0)
+        tracer.record(transfer_hash, "completed", duration)
+
+    slowest = tracer.get_slowest_transfers(1)
+
+    assert [trace.transfer_hash for trace in slowest] == [OTHER_TRANSFER_HASH]
+    assert slowest[0].to_dict()["total_duration"] == 50.0
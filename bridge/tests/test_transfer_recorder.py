@@ -253,3 +253,78 @@ def test_transfer_recorder_drops_completed_transfers(recorder, hashes):
     recorder.apply_event(transfer_event)
     recorder.apply_event(completion_event)
     assert len(recorder.pull_transfers_to_confirm()) == 0
+
+
+def test_state_version_changes_with_state(recorder, transfer_event):
+    state_version = recorder.state_version
+    recorder.apply_event(transfer_event)
+    assert recorder.state_version > state_version
+
+    state_version = recorder.state_version
+    recorder.pull_transfers_to_confirm()
+    assert recorder.state_version > state_version
+
+    state_version = recorder.state_version
+    recorder.pull_transfers_to_confirm()
+    assert recorder.state_version == state_version
+
+
+def test_iter_pending_transfers(recorder):
+    transfer_events = [
+        make_transfer_event(Hash32(bytes([index]) * 32)) for index in range(3)
+    ]
+    for event in transfer_events:
+        recorder.apply_event(event)
+    recorder.apply_event(
+        make_transfer_hash_event(
+            COMPLETION_EVENT_NAME,
+            compute_transfer_hash(transfer_events[1]),
+            Hash32(bytes(32)),
+        )
+    )
+
+    assert [event for _, event in recorder.iter_pending_transfers()] == [
+        transfer_events[0],
+        transfer_events[2],
+    ]
+    assert recorder.get_number_of_pending_transfers() == 2
+
+
+def test_transfer_completed_before_recorded_is_not_pending(recorder):
+    transfer_event = make_transfer_event()
+    recorder.apply_event(
+        make_transfer_hash_event(
+            COMPLETION_EVENT_NAME,
+            compute_transfer_hash(transfer_event),
+            Hash32(bytes(32)),
+        )
+    )
+    recorder.apply_event(transfer_event)
+
+    assert list(recorder.iter_pending_transfers()) == []
+    assert recorder.get_number_of_pending_transfers() == 0
+
+
+def test_get_pending_transfers_page(recorder):
+    transfer_events = [
+        make_transfer_event(Hash32(bytes([index]) * 32)) for index in range(5)
+    ]
+    for event in transfer_events:
+        recorder.apply_event(event)
+
+    first_page, has_more = recorder.get_pending_transfers_page(2)
+    assert [event for _, _, event in first_page] == transfer_events[:2]
+    assert has_more
+
+    recorder.apply_event(
+        make_transfer_hash_event(
+            COMPLETION_EVENT_NAME,
+            compute_transfer_hash(transfer_events[2]),
+            Hash32(bytes(32)),
+        )
+    )
+    second_page, has_more = recorder.get_pending_transfers_page(
+        2, after=first_page[-1][0]
+    )
+    assert [event for _, _, event in second_page] == transfer_events[3:]
+    assert not has_more
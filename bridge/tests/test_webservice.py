@@ -1,15 +1,26 @@
+import tracemalloc
+
 import falcon.testing
 import pytest
+from eth_utils import encode_hex
+from hexbytes import HexBytes
+from web3.datastructures import AttributeDict
 
 import bridge.main
+import bridge.memory
+from bridge.constants import COMPLETION_EVENT_NAME, TRANSFER_EVENT_NAME
+from bridge.utils import compute_transfer_hash
 
 
 @pytest.fixture
-def webservice(minimal_config, webservice_config, load_config_from_string):
+def recorder(minimal_config, load_config_from_string):
+    return bridge.main.make_recorder(load_config_from_string(minimal_config))
+
+
+@pytest.fixture
+def webservice(minimal_config, webservice_config, load_config_from_string, recorder):
     config = load_config_from_string(minimal_config + webservice_config)
-    ws = bridge.main.make_webservice(
-        config=config, recorder=bridge.main.make_recorder(config)
-    )
+    ws = bridge.main.make_webservice(config=config, recorder=recorder)
     assert isinstance(ws, bridge.webservice.Webservice)
     return ws
 
@@ -34,3 +45,229 @@ def test_internal_state(client):
     print(r)
     assert isinstance(r, dict)
     assert "bridge" in r
+
+
+def test_metrics(client):
+    result = client.simulate_get("/metrics")
+    assert result.status == "200 OK"
+    assert result.headers["content-type"].startswith("text/plain")
+    assert "# TYPE bridge_confirmations_sent_total counter" in result.text
+    assert 'bridge_recorder_size{set="transfer_hashes"} 0.0' in result.text
+
+
+def test_internal_state_transfer_latencies(client):
+    result = client.simulate_get("/bridge/internal-state")
+    transfer_latencies = result.json["bridge"]["transfer_latencies"]
+    assert set(transfer_latencies) == {"in_flight", "completed", "slowest"}
+
+
+@pytest.fixture
+def profiling_client(minimal_config, webservice_config, load_config_from_string):
+    config = load_config_from_string(
+        minimal_config + webservice_config + "\n[profiling]\nenabled = true\n"
+    )
+    ws = bridge.main.make_webservice(
+        config=config, recorder=bridge.main.make_recorder(config)
+    )
+    return falcon.testing.TestClient(ws.app)
+
+
+def test_profile_not_served_by_default(client):
+    result = client.simulate_get("/bridge/profile")
+    assert result.status == "404 Not Found"
+
+
+def test_profile(profiling_client):
+    result = profiling_client.simulate_get(
+        "/bridge/profile", params={"seconds": "0.05", "interval": "0.005"}
+    )
+    assert result.status == "200 OK"
+    assert result.headers["content-type"].startswith("text/plain")
+    for line in result.text.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+
+
+def test_profile_rejects_too_long_duration(profiling_client):
+    result = profiling_client.simulate_get(
+        "/bridge/profile", params={"seconds": "3600"}
+    )
+    assert result.status == "400 Bad Request"
+
+
+@pytest.fixture
+def memory_profiler():
+    tracemalloc.start()
+    yield bridge.memory.MemoryProfiler()
+    tracemalloc.stop()
+
+
+@pytest.fixture
+def memory_client(
+    minimal_config, webservice_config, load_config_from_string, memory_profiler
+):
+    config = load_config_from_string(minimal_config + webservice_config)
+    ws = bridge.main.make_webservice(
+        config=config,
+        recorder=bridge.main.make_recorder(config),
+        memory_profiler=memory_profiler,
+    )
+    return falcon.testing.TestClient(ws.app)
+
+
+def test_memory_not_served_by_default(client):
+    result = client.simulate_get("/bridge/memory")
+    assert result.status == "404 Not Found"
+
+
+def test_memory_summary(memory_client):
+    result = memory_client.simulate_get("/bridge/memory")
+    assert result.status == "200 OK"
+    summary = result.json
+    assert summary["tracing"]
+    assert summary["objects"]["recorder.transfer_hashes"]["length"] == 0
+
+
+def test_memory_snapshots(memory_client):
+    first = memory_client.simulate_post("/bridge/memory/snapshots")
+    second = memory_client.simulate_post("/bridge/memory/snapshots")
+    assert first.status == "201 Created"
+
+    snapshots = memory_client.simulate_get("/bridge/memory/snapshots").json
+    assert [snapshot["id"] for snapshot in snapshots] == [
+        first.json["id"],
+        second.json["id"],
+    ]
+
+    result = memory_client.simulate_get(
+        f"/bridge/memory/snapshots/{second.json['id']}",
+        params={"limit": "3", "compare_to": str(first.json["id"])},
+    )
+    assert result.status == "200 OK"
+    assert len(result.json) <= 3
+    assert all("size_diff" in stat for stat in result.json)
+
+
+def test_memory_unknown_snapshot(memory_client):
+    result = memory_client.simulate_get("/bridge/memory/snapshots/1000")
+    assert result.status == "404 Not Found"
+
+
+def test_memory_snapshot_requires_tracing(memory_client):
+    tracemalloc.stop()
+    result = memory_client.simulate_post("/bridge/memory/snapshots")
+    assert result.status == "409 Conflict"
+
+
+def test_internal_state_etag(client):
+    result = client.simulate_get("/bridge/internal-state")
+    etag = result.headers["etag"]
+
+    not_modified = client.simulate_get(
+        "/bridge/internal-state", headers={"If-None-Match": etag}
+    )
+    assert not_modified.status == "304 Not Modified"
+    assert not_modified.text == ""
+
+
+def test_internal_state_changes_with_recorder_state(client, recorder):
+    internal_state = client.simulate_get("/bridge/internal-state")
+
+    recorder.balance = 10 ** 18
+    recorder.state_version += 1
+
+    result = client.simulate_get(
+        "/bridge/internal-state",
+        headers={"If-None-Match": internal_state.headers["etag"]},
+    )
+    assert result.status == "200 OK"
+    assert result.json["bridge"]["recorder"]["balance"] == str(10 ** 18)
+    assert result.headers["etag"] != internal_state.headers["etag"]
+
+
+def make_transfer_event(index):
+    return AttributeDict(
+        {
+            "event": TRANSFER_EVENT_NAME,
+            "transactionHash": HexBytes(bytes([index]) * 32),
+            "blockNumber": index,
+            "transactionIndex": 0,
+            "logIndex": 0,
+            "args": AttributeDict(
+                {
+                    "from": "0x345DeAd084E056dc78a0832E70B40C14B6323458",
+                    "to": "0x1ADb0A4853bf1D564BbAD7565b5D50b33D20af60",
+                    "value": index + 1,
+                }
+            ),
+        }
+    )
+
+
+def test_pending_transfers(client, recorder):
+    for index in range(5):
+        recorder.apply_event(make_transfer_event(index))
+
+    first_page = client.simulate_get(
+        "/bridge/pending-transfers", params={"limit": "3"}
+    ).json
+    assert first_page["total"] == 5
+    assert [transfer["block_number"] for transfer in first_page["transfers"]] == [
+        0,
+        1,
+        2,
+    ]
+    assert first_page["transfers"][0] == {
+        "transfer_hash": encode_hex(compute_transfer_hash(make_transfer_event(0))),
+        "transaction_hash": "0x" + "00" * 32,
+        "block_number": 0,
+        "from": "0x345DeAd084E056dc78a0832E70B40C14B6323458",
+        "value": "1",
+        "scheduled": False,
+        "confirmed": False,
+    }
+
+    second_page = client.simulate_get(
+        "/bridge/pending-transfers",
+        params={"limit": "3", "after": str(first_page["next_after"])},
+    ).json
+    assert [transfer["block_number"] for transfer in second_page["transfers"]] == [
+        3,
+        4,
+    ]
+    assert second_page["next_after"] is None
+
+
+def test_pending_transfers_completed_between_pages(client, recorder):
+    for index in range(5):
+        recorder.apply_event(make_transfer_event(index))
+    first_page = client.simulate_get(
+        "/bridge/pending-transfers", params={"limit": "2"}
+    ).json
+
+    recorder.apply_event(
+        AttributeDict(
+            {
+                "event": COMPLETION_EVENT_NAME,
+                "args": AttributeDict(
+                    {"transferHash": compute_transfer_hash(make_transfer_event(0))}
+                ),
+            }
+        )
+    )
+    second_page = client.simulate_get(
+        "/bridge/pending-transfers",
+        params={"limit": "2", "after": str(first_page["next_after"])},
+    ).json
+
+    assert second_page["total"] == 4
+    assert [transfer["block_number"] for transfer in second_page["transfers"]] == [
+        2,
+        3,
+    ]
+
+
+def test_pending_transfers_empty(client):
+    result = client.simulate_get("/bridge/pending-transfers")
+    assert result.status == "200 OK"
+    assert result.json == {"total": 0, "transfers": [], "next_after": None}
@@ -39,20 +39,12 @@ contract ValidatorSlasher is Ownable {
         bytes calldata _rlpUnsignedHeaderTwo,
         bytes calldata _signatureTwo
     ) external {
-        EquivocationInspector.verifyEquivocationProof(
-            _rlpUnsignedHeaderOne,
-            _signatureOne,
-            _rlpUnsignedHeaderTwo,
-            _signatureTwo
-        );
-
-        // Since the proof has already verified, that both blocks have been
-        // issued by the same validator, it doesn't matter which one is used here
-        // to recover the address.
-        address validator =
-            EquivocationInspector.getSignerAddress(
+        (address validator, ) =
+            EquivocationInspector.proveEquivocation(
                 _rlpUnsignedHeaderOne,
-                _signatureOne
+                _signatureOne,
+                _rlpUnsignedHeaderTwo,
+                _signatureTwo
             );
 
         depositContract.slash(validator);
@@ -29,6 +29,26 @@ library EquivocationInspector {
         return ECDSA.recover(hash, _signature);
     }
 
+    /**
+     * Get the timestamp of a block header, which is its entry at position 11.
+     *
+     * @dev Only the timestamp gets parsed, the entries before it are skipped
+     *      without decoding the whole header.
+     *
+     * @param _rlpUnsignedHeader  the RLP encoded header of the block
+     * @return found              whether the header has an entry at position 11
+     * @return timestamp          the timestamp of the block if found
+     */
+    function getTimestamp(bytes memory _rlpUnsignedHeader)
+        private
+        pure
+        returns (bool found, uint timestamp)
+    {
+        RLPReader.RLPItem memory timestampItem;
+        (found, timestampItem) = _rlpUnsignedHeader.toRlpItem().tryItemAt(11);
+        if (found) timestamp = timestampItem.toUint();
+    }
+
     /**
      * Verify malicious behavior of an authority.
      * Prove the presence of equivocation by two given blocks.
@@ -56,6 +76,37 @@ library EquivocationInspector {
         bytes memory _rlpUnsignedHeaderTwo,
         bytes memory _signatureTwo
     ) internal pure {
+        proveEquivocation(
+            _rlpUnsignedHeaderOne,
+            _signatureOne,
+            _rlpUnsignedHeaderTwo,
+            _signatureTwo
+        );
+    }
+
+    /**
+     * Verify malicious behavior of an authority like `verifyEquivocationProof`
+     * and return the proven signer of both blocks together with their step.
+     *
+     * Each header gets hashed and parsed exactly once. Callers that need the
+     * address of the equivocating authority should use this function instead
+     * of recovering it a second time with `getSignerAddress`.
+     *
+     * The function fails if the proof can not be verified.
+     *
+     * @param _rlpUnsignedHeaderOne   the RLP encoded header of the first block
+     * @param _signatureOne           the signature related to the first block
+     * @param _rlpUnsignedHeaderTwo   the RLP encoded header of the second block
+     * @param _signatureTwo           the signature related to the second block
+     * @return signer                 the address that signed both blocks
+     * @return step                   the step both blocks have been issued in
+     */
+    function proveEquivocation(
+        bytes memory _rlpUnsignedHeaderOne,
+        bytes memory _signatureOne,
+        bytes memory _rlpUnsignedHeaderTwo,
+        bytes memory _signatureTwo
+    ) internal pure returns (address signer, uint step) {
         // Make sure two different blocks have been provided.
         bytes32 hashOne = keccak256(_rlpUnsignedHeaderOne);
         bytes32 hashTwo = keccak256(_rlpUnsignedHeaderTwo);
@@ -66,32 +117,32 @@ library EquivocationInspector {
             "Equivocation can be proved for two different blocks only."
         );
 
-        // Parse the RLP encoded block header list.
-        // Note that this can fail here, if the block header has no list format.
-        RLPReader.RLPItem[] memory blockOne =
-            _rlpUnsignedHeaderOne.toRlpItem().toList();
-        RLPReader.RLPItem[] memory blockTwo =
-            _rlpUnsignedHeaderTwo.toRlpItem().toList();
-
         // Header length rule.
         // Keep it open ended, since they could contain a list of empty messages for finality.
+        (bool hasTimestampOne, uint timestampOne) = getTimestamp(
+            _rlpUnsignedHeaderOne
+        );
+        (bool hasTimestampTwo, uint timestampTwo) = getTimestamp(
+            _rlpUnsignedHeaderTwo
+        );
         require(
-            blockOne.length >= 12 && blockTwo.length >= 12,
+            hasTimestampOne && hasTimestampTwo,
             "The number of provided header entries are not enough."
         );
 
         // Equal signer rule.
+        signer = ECDSA.recover(hashOne, _signatureOne);
         require(
-            getSignerAddress(_rlpUnsignedHeaderOne, _signatureOne) ==
-                getSignerAddress(_rlpUnsignedHeaderTwo, _signatureTwo),
+            signer == ECDSA.recover(hashTwo, _signatureTwo),
             "The two blocks have been signed by different identities."
         );
 
         // Equal block step rule.
-        uint stepOne = blockOne[11].toUint() / STEP_DURATION;
-        uint stepTwo = blockTwo[11].toUint() / STEP_DURATION;
-
-        require(stepOne == stepTwo, "The two blocks have different steps.");
+        step = timestampOne / STEP_DURATION;
+        require(
+            step == timestampTwo / STEP_DURATION,
+            "The two blocks have different steps."
+        );
     }
 }
 
@@ -28,6 +28,42 @@ contract TestEquivocationInspector {
             _signatureTwo
         );
     }
+
+    function testProveEquivocation(
+        bytes memory _rlpBlockOne,
+        bytes memory _signatureOne,
+        bytes memory _rlpBlockTwo,
+        bytes memory _signatureTwo
+    ) public pure returns (address signer, uint step) {
+        return
+            EquivocationInspector.proveEquivocation(
+                _rlpBlockOne,
+                _signatureOne,
+                _rlpBlockTwo,
+                _signatureTwo
+            );
+    }
+
+    /**
+     * @dev Verifies the proof and recovers the signer afterwards, the way
+     *      it was done before `proveEquivocation` existed. Used as a reference
+     *      for its gas usage.
+     */
+    function testVerifyEquivocationProofAndGetSignerAddress(
+        bytes memory _rlpBlockOne,
+        bytes memory _signatureOne,
+        bytes memory _rlpBlockTwo,
+        bytes memory _signatureTwo
+    ) public pure returns (address) {
+        EquivocationInspector.verifyEquivocationProof(
+            _rlpBlockOne,
+            _signatureOne,
+            _rlpBlockTwo,
+            _signatureTwo
+        );
+        return
+            EquivocationInspector.getSignerAddress(_rlpBlockOne, _signatureOne);
+    }
 }
 
 // SPDX-License-Identifier: MIT
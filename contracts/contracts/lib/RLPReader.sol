@@ -35,8 +35,6 @@ library RLPReader {
     uint8 constant LIST_SHORT_START = 0xc0;
     uint8 constant LIST_LONG_START = 0xf8;
 
-    uint8 constant WORD_SIZE = 32;
-
     struct RLPItem {
         uint len;
         uint memPtr;
@@ -96,6 +94,46 @@ library RLPReader {
         }
     }
 
+    /*
+     * @param item RLP encoded list in bytes
+     * @param index position of the wanted entry within the list
+     * @return the entry at the given position, without decoding the whole list
+     */
+    function itemAt(RLPItem memory item, uint index)
+        internal
+        pure
+        returns (RLPItem memory)
+    {
+        (bool found, RLPItem memory result) = tryItemAt(item, index);
+        require(found);
+
+        return result;
+    }
+
+    /*
+     * @param item RLP encoded list in bytes
+     * @param index position of the wanted entry within the list
+     * @return found indicator whether the item is a list with an entry at the given position
+     * @return result the entry at the given position if found, without decoding the whole list
+     */
+    function tryItemAt(RLPItem memory item, uint index)
+        internal
+        pure
+        returns (bool found, RLPItem memory result)
+    {
+        if (!isList(item)) return (false, result);
+
+        uint memPtr = item.memPtr + _payloadOffset(item.memPtr);
+        uint endPtr = item.memPtr + item.len;
+        for (uint i = 0; i < index; i++) {
+            if (memPtr >= endPtr) return (false, result);
+            memPtr = memPtr + _itemLength(memPtr); // skip over an item
+        }
+        if (memPtr >= endPtr) return (false, result);
+
+        return (true, RLPItem(_itemLength(memPtr), memPtr));
+    }
+
     // @return indicator whether encoded payload is a list. negate this function call for isData.
     function isList(RLPItem memory item) internal pure returns (bool) {
         if (item.len == 0) return false;
@@ -145,7 +183,7 @@ library RLPReader {
                 memPtr := add(memPtr, 1) // skip over the first byte
 
                 /* 32 byte word size */
-                let dataLen := div(mload(memPtr), exp(256, sub(32, byteLen))) // right shifting to get the len
+                let dataLen := shr(mul(8, sub(32, byteLen)), mload(memPtr)) // right shifting to get the len
                 len := add(dataLen, add(byteLen, 1))
             }
         } else if (byte0 < LIST_LONG_START) {
@@ -155,7 +193,7 @@ library RLPReader {
                 let byteLen := sub(byte0, 0xf7)
                 memPtr := add(memPtr, 1)
 
-                let dataLen := div(mload(memPtr), exp(256, sub(32, byteLen))) // right shifting to the correct length
+                let dataLen := shr(mul(8, sub(32, byteLen)), mload(memPtr)) // right shifting to the correct length
                 len := add(dataLen, add(byteLen, 1))
             }
         }
@@ -231,7 +269,7 @@ library RLPReader {
 
             // shift to the correct location if neccesary
             if lt(len, 32) {
-                result := div(result, exp(256, sub(32, len)))
+                result := shr(mul(8, sub(32, len)), result)
             }
         }
 
@@ -280,22 +318,28 @@ library RLPReader {
     ) private pure {
         if (len == 0) return;
 
-        // copy as many word sizes as possible
-        for (; len >= WORD_SIZE; len -= WORD_SIZE) {
-            assembly {
+        // The loop is written in assembly to avoid the overflow checks on
+        // the pointer arithmetic, which would otherwise dominate its cost.
+        assembly {
+            let rest := mod(len, 32)
+
+            // copy as many word sizes as possible
+            for {
+                let end := add(src, sub(len, rest))
+            } lt(src, end) {
+                src := add(src, 32)
+                dest := add(dest, 32)
+            } {
                 mstore(dest, mload(src))
             }
 
-            src += WORD_SIZE;
-            dest += WORD_SIZE;
-        }
-
-        // left over bytes. Mask is used to remove unwanted bytes from the word
-        uint mask = 256**(WORD_SIZE - len) - 1;
-        assembly {
-            let srcpart := and(mload(src), not(mask)) // zero out src
-            let destpart := and(mload(dest), mask) // retrieve the bytes
-            mstore(dest, or(destpart, srcpart))
+            // left over bytes. Mask is used to remove unwanted bytes from the word
+            if rest {
+                let mask := sub(shl(mul(8, sub(32, rest)), 1), 1)
+                let srcpart := and(mload(src), not(mask)) // zero out src
+                let destpart := and(mload(dest), mask) // retrieve the bytes
+                mstore(dest, or(destpart, srcpart))
+            }
         }
     }
 }
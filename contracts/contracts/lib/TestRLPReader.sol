@@ -72,6 +72,44 @@ contract TestRLPReader {
         RLPReader.RLPItem memory rlpItem = RLPReader.toRlpItem(_rlpEncodedItem);
         return RLPReader.toUint(RLPReader.toList(rlpItem)[index]);
     }
+
+    function testGetItemRlpBytes(uint index, bytes memory _rlpEncodedItem)
+        public
+        pure
+        returns (bytes memory)
+    {
+        RLPReader.RLPItem memory rlpItem = RLPReader.toRlpItem(_rlpEncodedItem);
+        return RLPReader.toRlpBytes(RLPReader.toList(rlpItem)[index]);
+    }
+
+    function testItemAtRlpBytes(uint index, bytes memory _rlpEncodedItem)
+        public
+        pure
+        returns (bytes memory)
+    {
+        RLPReader.RLPItem memory rlpItem = RLPReader.toRlpItem(_rlpEncodedItem);
+        return RLPReader.toRlpBytes(RLPReader.itemAt(rlpItem, index));
+    }
+
+    function testItemAtUint(uint index, bytes memory _rlpEncodedItem)
+        public
+        pure
+        returns (uint)
+    {
+        RLPReader.RLPItem memory rlpItem = RLPReader.toRlpItem(_rlpEncodedItem);
+        return RLPReader.toUint(RLPReader.itemAt(rlpItem, index));
+    }
+
+    function testTryItemAtRlpBytes(uint index, bytes memory _rlpEncodedItem)
+        public
+        pure
+        returns (bool found, bytes memory rlpBytes)
+    {
+        RLPReader.RLPItem memory rlpItem = RLPReader.toRlpItem(_rlpEncodedItem);
+        RLPReader.RLPItem memory entry;
+        (found, entry) = RLPReader.tryItemAt(rlpItem, index);
+        if (found) rlpBytes = RLPReader.toRlpBytes(entry);
+    }
 }
 
 // SPDX-License-Identifier: MIT
@@ -7,16 +7,13 @@ pragma solidity ^0.8.0;
 */
 
 contract ValidatorProxy {
-    mapping(address => bool) public isValidator;
     address public systemAddress = 0xffffFFFfFFffffffffffffffFfFFFfffFFFfFFfE;
     address[] public validators;
+    // Position of a validator in `validators` plus one, zero for non validators
+    mapping(address => uint) validatorIndexPlusOne;
 
     constructor(address[] memory _validators) {
-        validators = _validators;
-
-        for (uint i = 0; i < _validators.length; i++) {
-            isValidator[_validators[i]] = true;
-        }
+        _updateValidators(_validators);
     }
 
     function updateValidators(address[] memory newValidators) public {
@@ -25,15 +22,11 @@ contract ValidatorProxy {
             "Only the system address can be responsible for the call of this function."
         );
 
-        for (uint i = 0; i < validators.length; i++) {
-            isValidator[validators[i]] = false;
-        }
-
-        for (uint i = 0; i < newValidators.length; i++) {
-            isValidator[newValidators[i]] = true;
-        }
+        _updateValidators(newValidators);
+    }
 
-        validators = newValidators;
+    function isValidator(address _address) public view returns (bool) {
+        return validatorIndexPlusOne[_address] != 0;
     }
 
     function numberOfValidators() public view returns (uint) {
@@ -43,6 +36,57 @@ contract ValidatorProxy {
     function getValidators() public view returns (address[] memory) {
         return validators;
     }
+
+    /**
+     * Replace the validator set with `newValidators` while only writing to
+     * storage for addresses whose membership or position changed.
+     * The usual change coming from the ValidatorSet is the removal of a single
+     * validator, which is done by moving the last validator into its place.
+     * This results in a constant number of storage writes instead of rewriting
+     * the whole set.
+     * `newValidators` is expected to be free of duplicates, which is
+     * guaranteed by the ValidatorSet.
+     */
+    function _updateValidators(address[] memory newValidators) internal {
+        // Read the current set once, indexing into the storage array would
+        // read its length again on every access
+        address[] memory oldValidators = validators;
+        uint oldLength = oldValidators.length;
+        uint newLength = newValidators.length;
+
+        // Mark the current validators that are part of the new set, by their current position
+        bool[] memory isKept = new bool[](oldLength);
+        uint[] memory oldIndicesPlusOne = new uint[](newLength);
+        for (uint i = 0; i < newLength; i++) {
+            uint indexPlusOne = validatorIndexPlusOne[newValidators[i]];
+            oldIndicesPlusOne[i] = indexPlusOne;
+            if (indexPlusOne != 0) {
+                isKept[indexPlusOne - 1] = true;
+            }
+        }
+
+        for (uint i = 0; i < oldLength; i++) {
+            if (!isKept[i]) {
+                delete validatorIndexPlusOne[oldValidators[i]];
+            }
+        }
+
+        for (uint i = 0; i < newLength; i++) {
+            address validator = newValidators[i];
+            if (oldIndicesPlusOne[i] != i + 1) {
+                validatorIndexPlusOne[validator] = i + 1;
+            }
+            if (i >= oldLength) {
+                validators.push(validator);
+            } else if (oldValidators[i] != validator) {
+                validators[i] = validator;
+            }
+        }
+
+        for (uint i = newLength; i < oldLength; i++) {
+            validators.pop();
+        }
+    }
 }
 
 // SPDX-License-Identifier: MIT
@@ -0,0 +1,300 @@
+"""Fixtures for the gas benchmarks of the contracts
+
+The benchmarks run in a pytest session of their own and are not collected
+together with the tests in `contracts/tests`. Run them from the contracts
+directory with `pytest gas_benchmarks`. With `--gas-report <file>` the
+measurements are written as JSON together with their budgets.
+
+Every measured transaction has a budget in `gas_budgets.json`, a measurement
+exceeding its budget fails the benchmark. The budgets are the measured gas plus
+`GAS_BUDGET_HEADROOM`, with `--update-gas-budgets` they are set from the
+measurements of the run instead of being checked.
+"""
+
+import json
+import math
+from pathlib import Path
+from typing import Dict, List
+
+import attr
+import eth_tester
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from deploy_tools.deploy import wait_for_successful_transaction_receipt
+from eth_utils import to_checksum_address
+from tests.data_generation import make_block_header
+from tests.deploy_util import (
+    initialize_deposit_locker,
+    initialize_test_validator_slasher,
+    initialize_validator_set,
+)
+
+BLOCK_GAS_LIMIT = 12 * 10 ** 6
+
+GAS_BUDGETS_PATH = Path(__file__).parent / "gas_budgets.json"
+GAS_REPORT_OPTION = "--gas-report"
+UPDATE_GAS_BUDGETS_OPTION = "--update-gas-budgets"
+
+# fraction of the measured gas added to get the budget
+GAS_BUDGET_HEADROOM = 0.1
+
+RELEASE_TIMESTAMP_OFFSET = 3600 * 24 * 180
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        GAS_REPORT_OPTION,
+        help="Write the gas measurements and their budgets as JSON to the given file",
+    )
+    parser.addoption(
+        UPDATE_GAS_BUDGETS_OPTION,
+        action="store_true",
+        help=f"Set the budgets in {GAS_BUDGETS_PATH.name} from the measurements",
+    )
+
+
+def make_gas_budget(gas: int) -> int:
+    """The measured gas plus the headroom, rounded up to thousands"""
+    return math.ceil(gas * (1 + GAS_BUDGET_HEADROOM) / 1000) * 1000
+
+
+@attr.s(auto_attribs=True)
+class GasMeasurement:
+    function: str
+    case: str
+    gas: int
+    budget: int
+
+
+class GasBenchmark:
+    """Measures the gas used by transactions and checks it against the budgets"""
+
+    def __init__(
+        self, web3, budgets: Dict[str, Dict[str, int]], update_budgets: bool = False
+    ):
+        self.web3 = web3
+        self.budgets = budgets
+        self.update_budgets = update_budgets
+        self.measurements: List[GasMeasurement] = []
+
+    def get_budget(self, function: str, case: str) -> int:
+        try:
+            return self.budgets[function][case]
+        except KeyError:
+            raise KeyError(
+                f"There is no gas budget for {function} ({case}), add it to {GAS_BUDGETS_PATH.name}"
+            )
+
+    def measure(
+        self, function: str, case: str, tx_hash, expect_success: bool = True
+    ) -> int:
+        """Check the gas used by the given transaction against its budget"""
+        if expect_success:
+            receipt = wait_for_successful_transaction_receipt(self.web3, tx_hash)
+        else:
+            receipt = self.web3.eth.getTransactionReceipt(tx_hash)
+
+        return self.record(function, case, receipt.gasUsed)
+
+    def record(self, function: str, case: str, gas: int) -> int:
+        """Check the given gas usage against its budget"""
+        if self.update_budgets:
+            self.budgets.setdefault(function, {})[case] = make_gas_budget(gas)
+        budget = self.get_budget(function, case)
+        self.measurements.append(GasMeasurement(function, case, gas, budget))
+        print(f"{function} ({case}): {gas} gas, budget: {budget}")
+
+        assert (
+            gas <= budget
+        ), f"{function} ({case}) used {gas} gas, which exceeds its budget of {budget}"
+        return gas
+
+    def to_json(self):
+        return {
+            "budgetsFile": GAS_BUDGETS_PATH.name,
+            "budgetHeadroom": GAS_BUDGET_HEADROOM,
+            "measurements": [attr.asdict(m) for m in self.measurements],
+        }
+
+
+@pytest.fixture(scope="session")
+def gas_budgets():
+    with open(GAS_BUDGETS_PATH) as budgets_file:
+        return json.load(budgets_file)
+
+
+@pytest.fixture(scope="session")
+def gas_benchmark(web3, gas_budgets, pytestconfig):
+    update_budgets = pytestconfig.getoption(UPDATE_GAS_BUDGETS_OPTION)
+    benchmark = GasBenchmark(web3, gas_budgets, update_budgets=update_budgets)
+    yield benchmark
+
+    if update_budgets:
+        with open(GAS_BUDGETS_PATH, "w") as budgets_file:
+            json.dump(benchmark.budgets, budgets_file, indent=2)
+            budgets_file.write("\n")
+
+    report_path = pytestconfig.getoption(GAS_REPORT_OPTION)
+    if report_path:
+        with open(report_path, "w") as report_file:
+            json.dump(benchmark.to_json(), report_file, indent=2)
+
+
+@pytest.fixture(scope="session")
+def chain():
+    """The test chain, with a block gas limit above the 8 million of the chain
+
+    Sets of 123 validators are initialized in a single transaction. The gas usage
+    of the benchmarked transactions does not depend on the block gas limit.
+    """
+    monkeypatch = MonkeyPatch()
+    monkeypatch.setattr(
+        eth_tester.backends.pyevm.main, "GENESIS_GAS_LIMIT", BLOCK_GAS_LIMIT
+    )
+    try:
+        yield eth_tester.EthereumTester(eth_tester.PyEVMBackend())
+    finally:
+        monkeypatch.undo()
+
+
+@pytest.fixture(params=[50, 123])
+def number_of_validators(request):
+    """Realistic sizes of the validator set"""
+    return request.param
+
+
+@pytest.fixture(scope="session")
+def system_address(accounts):
+    return accounts[0]
+
+
+@pytest.fixture(scope="session")
+def release_timestamp(web3):
+    now = web3.eth.getBlock("latest").timestamp
+    return now + RELEASE_TIMESTAMP_OFFSET
+
+
+@pytest.fixture(scope="session")
+def validator_addresses():
+    """123 distinct addresses without keys to be used in validator sets"""
+    return [to_checksum_address(f"0x{i:040x}") for i in range(1000, 1123)]
+
+
+@pytest.fixture(scope="session")
+def funded_accounts(chain):
+    """123 accounts with keys and some ether, that can send transactions"""
+    account_0 = chain.get_accounts()[0]
+    accounts = []
+    for i in range(123):
+        # use an offset for the account number in order to not
+        # generate the keys of the default accounts
+        new_account = chain.add_account(f"0x{20000000 + i:064}")
+        chain.send_transaction(
+            {"from": account_0, "to": new_account, "gas": 21000, "value": 10 ** 20}
+        )
+        accounts.append(new_account)
+
+    return accounts
+
+
+@pytest.fixture(scope="session")
+def malicious_validator_key(account_keys):
+    return account_keys[3]
+
+
+@pytest.fixture(scope="session")
+def malicious_validator_address(accounts):
+    return accounts[3]
+
+
+@pytest.fixture
+def equivocation_proof(malicious_validator_key):
+    """Arguments to report the malicious validator for equivocation"""
+    signed_block_header_one = make_block_header(private_key=malicious_validator_key)
+    signed_block_header_two = make_block_header(private_key=malicious_validator_key)
+    return (
+        signed_block_header_one.unsignedBlockHeader,
+        signed_block_header_one.signature,
+        signed_block_header_two.unsignedBlockHeader,
+        signed_block_header_two.signature,
+    )
+
+
+@pytest.fixture
+def deploy_validator_proxy(deploy_contract, system_address):
+    def deploy(validators=()):
+        return deploy_contract(
+            "TestValidatorProxy", constructor_args=(list(validators), system_address)
+        )
+
+    return deploy
+
+
+@pytest.fixture
+def deploy_validator_set(deploy_contract, deploy_validator_proxy, system_address, web3):
+    def deploy(validators):
+        validator_set = deploy_contract(
+            "TestValidatorSet", constructor_args=(system_address,)
+        )
+        validator_proxy = deploy_validator_proxy(validators)
+        return initialize_validator_set(
+            validator_set, validators, validator_proxy.address, web3=web3
+        )
+
+    return deploy
+
+
+@pytest.fixture
+def deposit_and_slasher_contracts(deploy_contract, release_timestamp, accounts, web3):
+    """Initialized deposit locker and slasher, accounts[1] acts as the depositors proxy"""
+    slasher = deploy_contract("ValidatorSlasher")
+    deposit_locker = deploy_contract("ETHDepositLocker")
+    initialize_deposit_locker(
+        deposit_locker, release_timestamp, slasher.address, accounts[1], web3
+    )
+    initialize_test_validator_slasher(slasher, deposit_locker.address, web3)
+    return deposit_locker, slasher
+
+
+@pytest.fixture
+def deploy_eth_auction(deploy_contract, release_timestamp, web3):
+    def deploy(maximal_number_of_participants):
+        deposit_locker = deploy_contract("ETHDepositLocker")
+        auction = deploy_contract(
+            "ETHValidatorAuction",
+            constructor_args=(
+                10 ** 18,
+                14,
+                1,
+                maximal_number_of_participants,
+                deposit_locker.address,
+            ),
+        )
+        tx_hash = deposit_locker.functions.init(
+            _releaseTimestamp=release_timestamp,
+            _slasher="0x0000000000000000000000000000000000000000",
+            _depositorsProxy=auction.address,
+        ).transact()
+        wait_for_successful_transaction_receipt(web3, tx_hash)
+        return auction, deposit_locker
+
+    return deploy
+
+
+@pytest.fixture(scope="session")
+def token_holder(accounts):
+    return accounts[0]
+
+
+@pytest.fixture
+def token_contract(deploy_contract, token_holder):
+    return deploy_contract(
+        "TrustlinesNetworkToken",
+        constructor_args=(
+            "Trustlines Network Token",
+            "TLN",
+            18,
+            token_holder,
+            10 ** 24,
+        ),
+    )
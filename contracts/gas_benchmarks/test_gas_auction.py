@@ -0,0 +1,117 @@
+#! pytest -s
+
+"""Gas usage of the validator auction, deposit locker and validator slasher contracts"""
+
+import pytest
+
+MAXIMAL_NUMBER_OF_PARTICIPANTS = 3
+BID_VALUE = 10 ** 18
+
+
+@pytest.fixture()
+def bidders(funded_accounts):
+    return funded_accounts[:MAXIMAL_NUMBER_OF_PARTICIPANTS]
+
+
+@pytest.fixture()
+def started_auction(deploy_eth_auction, bidders, accounts):
+    auction, deposit_locker = deploy_eth_auction(MAXIMAL_NUMBER_OF_PARTICIPANTS)
+    auction.functions.addToWhitelist(bidders).transact({"from": accounts[0]})
+    auction.functions.startAuction().transact({"from": accounts[0]})
+    return auction, deposit_locker
+
+
+def test_gas_add_to_whitelist(
+    deploy_eth_auction, validator_addresses, number_of_validators, gas_benchmark
+):
+    auction, _ = deploy_eth_auction(MAXIMAL_NUMBER_OF_PARTICIPANTS)
+
+    gas_benchmark.measure(
+        "BaseValidatorAuction.addToWhitelist",
+        f"{number_of_validators} addresses",
+        auction.functions.addToWhitelist(
+            validator_addresses[:number_of_validators]
+        ).transact(),
+    )
+
+
+def test_gas_start_auction(deploy_eth_auction, bidders, accounts, gas_benchmark):
+    auction, _ = deploy_eth_auction(MAXIMAL_NUMBER_OF_PARTICIPANTS)
+    auction.functions.addToWhitelist(bidders).transact({"from": accounts[0]})
+
+    gas_benchmark.measure(
+        "BaseValidatorAuction.startAuction",
+        "start auction",
+        auction.functions.startAuction().transact({"from": accounts[0]}),
+    )
+
+
+def test_gas_complete_auction(
+    started_auction, bidders, chain, release_timestamp, gas_benchmark
+):
+    """Bid until the auction is filled, deposit the bids and withdraw after the release"""
+    auction, deposit_locker = started_auction
+
+    cases = ["first bid", "bid", "bid reaching the maximal number of participants"]
+    for bidder, case in zip(bidders, cases):
+        gas_benchmark.measure(
+            "BaseValidatorAuction.bid",
+            case,
+            auction.functions.bid().transact({"from": bidder, "value": BID_VALUE}),
+        )
+
+    gas_benchmark.measure(
+        "BaseValidatorAuction.depositBids",
+        "deposit bids",
+        auction.functions.depositBids().transact(),
+    )
+
+    chain.time_travel(release_timestamp + 1)
+    chain.mine_block()
+
+    gas_benchmark.measure(
+        "BaseDepositLocker.withdraw",
+        "withdraw",
+        deposit_locker.functions.withdraw().transact({"from": bidders[0]}),
+    )
+
+
+def test_gas_deposit_and_slash(
+    deposit_and_slasher_contracts,
+    malicious_validator_address,
+    equivocation_proof,
+    accounts,
+    gas_benchmark,
+):
+    deposit_locker, slasher = deposit_and_slasher_contracts
+    depositors_proxy = accounts[1]
+    depositors = [malicious_validator_address, accounts[4]]
+
+    gas_benchmark.measure(
+        "BaseDepositLocker.registerDepositor",
+        "first depositor",
+        deposit_locker.functions.registerDepositor(depositors[0]).transact(
+            {"from": depositors_proxy}
+        ),
+    )
+    gas_benchmark.measure(
+        "BaseDepositLocker.registerDepositor",
+        "depositor",
+        deposit_locker.functions.registerDepositor(depositors[1]).transact(
+            {"from": depositors_proxy}
+        ),
+    )
+    gas_benchmark.measure(
+        "BaseDepositLocker.deposit",
+        "deposit",
+        deposit_locker.functions.deposit(BID_VALUE).transact(
+            {"from": depositors_proxy, "value": BID_VALUE * len(depositors)}
+        ),
+    )
+
+    gas_benchmark.measure(
+        "ValidatorSlasher.reportMaliciousValidator",
+        "report malicious validator",
+        slasher.functions.reportMaliciousValidator(*equivocation_proof).transact(),
+    )
+    assert not deposit_locker.functions.canWithdraw(malicious_validator_address).call()
@@ -0,0 +1,183 @@
+#! pytest -s
+
+"""Gas usage of the home bridge contract
+
+The gas limit used by the bridge client for confirmation transactions is
+checked against the budgets of confirmTransfer.
+"""
+import ast
+from pathlib import Path
+
+import pytest
+
+BRIDGE_CONSTANTS_PATH = (
+    Path(__file__).parents[2] / "bridge" / "src" / "bridge" / "constants.py"
+)
+
+
+def read_bridge_constant(name):
+    """Read a constant of the bridge client without depending on its package"""
+    module = ast.parse(BRIDGE_CONSTANTS_PATH.read_text())
+    for node in module.body:
+        if (
+            isinstance(node, ast.Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], ast.Name)
+            and node.targets[0].id == name
+        ):
+            return ast.literal_eval(node.value)
+    raise ValueError(f"Could not find {name} in {BRIDGE_CONSTANTS_PATH}")
+
+
+@pytest.fixture()
+def required_confirmations(number_of_validators):
+    """the number of confirmations required"""
+    return (number_of_validators * 50 + 99) // 100
+
+
+@pytest.fixture()
+def proxy_validators(funded_accounts, number_of_validators):
+    return funded_accounts[:number_of_validators]
+
+
+@pytest.fixture()
+def validator_proxy(deploy_validator_proxy, proxy_validators):
+    return deploy_validator_proxy(proxy_validators)
+
+
+@pytest.fixture()
+def home_bridge_contract(deploy_contract, validator_proxy, accounts):
+    contract = deploy_contract(
+        "HomeBridge", constructor_args=(validator_proxy.address, 50)
+    )
+    contract.functions.fund().transact({"from": accounts[0], "value": 1_000_000})
+    return contract
+
+
+@pytest.fixture
+def confirm_nth(home_bridge_contract, proxy_validators, web3):
+    """confirm a transfer by the nth validator and return the transaction hash"""
+
+    def confirm(n, fail_ok=False):
+        transact_args = {"from": proxy_validators[n]}
+        if fail_ok:
+            # we pass in the gas here in order to not make it
+            # raise while estimating gas
+            transact_args["gas"] = 2_000_000
+
+        return home_bridge_contract.functions.confirmTransfer(
+            transferHash="0x" + b"     transfer-hash              ".hex(),
+            transactionHash="0x" + b"     tx-hash                    ".hex(),
+            amount=20000,
+            recipient="0xFCB047cCD297048b6F31fbb2fef14001FefFa0f3",
+        ).transact(transact_args)
+
+    return confirm
+
+
+def confirm_until_completion_is_missing(
+    confirm_nth, required_confirmations, number_of_validators, gas_benchmark, web3
+):
+    """Confirm by all but the last required validator and measure the confirmations"""
+    gas_benchmark.measure(
+        "HomeBridge.confirmTransfer",
+        f"first confirmation, {number_of_validators} validators",
+        confirm_nth(0),
+    )
+    gas_benchmark.record(
+        "HomeBridge.confirmTransfer",
+        f"confirmation, {number_of_validators} validators",
+        max(
+            web3.eth.getTransactionReceipt(confirm_nth(i)).gasUsed
+            for i in range(1, required_confirmations - 1)
+        ),
+    )
+
+
+def test_gas_fund(deploy_contract, validator_proxy, accounts, gas_benchmark):
+    contract = deploy_contract(
+        "HomeBridge", constructor_args=(validator_proxy.address, 50)
+    )
+    gas_benchmark.measure(
+        "HomeBridge.fund",
+        "fund",
+        contract.functions.fund().transact({"from": accounts[0], "value": 1_000_000}),
+    )
+
+
+def test_gas_complete_transfer(
+    home_bridge_contract,
+    confirm_nth,
+    web3,
+    number_of_validators,
+    required_confirmations,
+    gas_benchmark,
+):
+    """This walks through a complete Transfer on the home bridge"""
+    get_transfer_completed_events = home_bridge_contract.events.TransferCompleted.createFilter(
+        fromBlock=web3.eth.blockNumber
+    ).get_all_entries
+
+    confirm_until_completion_is_missing(
+        confirm_nth, required_confirmations, number_of_validators, gas_benchmark, web3
+    )
+    assert not get_transfer_completed_events()
+
+    gas_benchmark.measure(
+        "HomeBridge.confirmTransfer",
+        f"completing confirmation, {number_of_validators} validators",
+        confirm_nth(required_confirmations - 1),
+    )
+    assert get_transfer_completed_events()
+
+    gas_benchmark.measure(
+        "HomeBridge.confirmTransfer",
+        f"confirmation after completion, {number_of_validators} validators",
+        confirm_nth(required_confirmations, fail_ok=True),
+        expect_success=False,
+    )
+
+
+def test_gas_complete_transfer_with_validator_set_changed(
+    home_bridge_contract,
+    validator_proxy,
+    proxy_validators,
+    confirm_nth,
+    web3,
+    number_of_validators,
+    required_confirmations,
+    system_address,
+    gas_benchmark,
+):
+    """Complete a transfer after all but one confirming validators have been removed"""
+    get_transfer_completed_events = home_bridge_contract.events.TransferCompleted.createFilter(
+        fromBlock=web3.eth.blockNumber
+    ).get_all_entries
+
+    confirm_until_completion_is_missing(
+        confirm_nth, required_confirmations, number_of_validators, gas_benchmark, web3
+    )
+
+    validator_proxy.functions.updateValidators(
+        proxy_validators[required_confirmations - 1 : required_confirmations]
+    ).transact({"from": system_address})
+
+    gas_benchmark.measure(
+        "HomeBridge.confirmTransfer",
+        f"completing confirmation after validator set change, {number_of_validators} validators",
+        confirm_nth(required_confirmations - 1),
+    )
+    assert get_transfer_completed_events()
+
+
+def test_confirmation_transaction_gas_limit_covers_budgets(gas_budgets):
+    """The bridge client must not send confirmations with less gas than budgeted"""
+    confirmation_transaction_gas_limit = read_bridge_constant(
+        "CONFIRMATION_TRANSACTION_GAS_LIMIT"
+    )
+
+    for case, budget in gas_budgets["HomeBridge.confirmTransfer"].items():
+        assert budget <= confirmation_transaction_gas_limit, (
+            f"The budget of confirmTransfer ({case}) exceeds CONFIRMATION_TRANSACTION_GAS_LIMIT "
+            f"{confirmation_transaction_gas_limit} of the bridge"
+        )
@@ -0,0 +1,60 @@
+#! pytest -s
+
+"""Gas usage of the token and foreign bridge contracts"""
+
+TRANSFER_AMOUNT = 10 ** 18
+
+
+def test_gas_transfer(token_contract, token_holder, accounts, gas_benchmark):
+    receiver = accounts[1]
+
+    gas_benchmark.measure(
+        "TrustlinesNetworkToken.transfer",
+        "to a new holder",
+        token_contract.functions.transfer(receiver, TRANSFER_AMOUNT).transact(
+            {"from": token_holder}
+        ),
+    )
+    gas_benchmark.measure(
+        "TrustlinesNetworkToken.transfer",
+        "to an existing holder",
+        token_contract.functions.transfer(receiver, TRANSFER_AMOUNT).transact(
+            {"from": token_holder}
+        ),
+    )
+
+
+def test_gas_approve_and_transfer_from(
+    token_contract, token_holder, accounts, gas_benchmark
+):
+    spender = accounts[1]
+    receiver = accounts[2]
+
+    gas_benchmark.measure(
+        "TrustlinesNetworkToken.approve",
+        "approve",
+        token_contract.functions.approve(spender, TRANSFER_AMOUNT).transact(
+            {"from": token_holder}
+        ),
+    )
+    gas_benchmark.measure(
+        "TrustlinesNetworkToken.transferFrom",
+        "transfer from",
+        token_contract.functions.transferFrom(
+            token_holder, receiver, TRANSFER_AMOUNT
+        ).transact({"from": spender}),
+    )
+
+
+def test_gas_burn(deploy_contract, token_contract, token_holder, gas_benchmark):
+    foreign_bridge = deploy_contract(
+        "ForeignBridge", constructor_args=(token_contract.address,)
+    )
+    token_contract.functions.transfer(foreign_bridge.address, TRANSFER_AMOUNT).transact(
+        {"from": token_holder}
+    )
+
+    gas_benchmark.measure(
+        "ForeignBridge.burn", "burn", foreign_bridge.functions.burn().transact()
+    )
+    assert token_contract.functions.balanceOf(foreign_bridge.address).call() == 0
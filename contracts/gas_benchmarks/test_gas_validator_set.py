@@ -0,0 +1,115 @@
+#! pytest -s
+
+"""Gas usage of the validator set and validator proxy contracts"""
+
+import pytest
+
+
+@pytest.fixture()
+def validators(validator_addresses, number_of_validators):
+    return validator_addresses[:number_of_validators]
+
+
+@pytest.fixture()
+def validators_with_malicious_validator(
+    validator_addresses, number_of_validators, malicious_validator_address
+):
+    """The validators with the malicious validator in the middle of the set
+
+    In the middle the removal of the malicious validator has to move
+    another validator, which is the usual case.
+    """
+    validators = list(validator_addresses[: number_of_validators - 1])
+    validators.insert(len(validators) // 2, malicious_validator_address)
+    return validators
+
+
+def test_gas_update_validators_initial_set(
+    deploy_validator_proxy,
+    validators,
+    number_of_validators,
+    system_address,
+    gas_benchmark,
+):
+    validator_proxy = deploy_validator_proxy()
+
+    gas_benchmark.measure(
+        "ValidatorProxy.updateValidators",
+        f"initial set, {number_of_validators} validators",
+        validator_proxy.functions.updateValidators(validators).transact(
+            {"from": system_address}
+        ),
+    )
+    assert validator_proxy.functions.getValidators().call() == validators
+
+
+def test_gas_update_validators_unchanged_set(
+    deploy_validator_proxy,
+    validators,
+    number_of_validators,
+    system_address,
+    gas_benchmark,
+):
+    validator_proxy = deploy_validator_proxy(validators)
+
+    gas_benchmark.measure(
+        "ValidatorProxy.updateValidators",
+        f"unchanged set, {number_of_validators} validators",
+        validator_proxy.functions.updateValidators(validators).transact(
+            {"from": system_address}
+        ),
+    )
+
+
+def test_gas_update_validators_single_removal(
+    deploy_validator_proxy,
+    validators,
+    number_of_validators,
+    system_address,
+    gas_benchmark,
+):
+    """Remove a validator the way the validator set does it"""
+    validator_proxy = deploy_validator_proxy(validators)
+
+    new_validators = list(validators)
+    index = len(new_validators) // 2
+    new_validators[index] = new_validators[-1]
+    new_validators.pop()
+
+    gas_benchmark.measure(
+        "ValidatorProxy.updateValidators",
+        f"single removal, {number_of_validators} validators",
+        validator_proxy.functions.updateValidators(new_validators).transact(
+            {"from": system_address}
+        ),
+    )
+    assert validator_proxy.functions.getValidators().call() == new_validators
+
+
+def test_gas_report_malicious_validator_and_finalize_change(
+    deploy_validator_set,
+    validators_with_malicious_validator,
+    malicious_validator_address,
+    equivocation_proof,
+    number_of_validators,
+    system_address,
+    gas_benchmark,
+):
+    validator_set = deploy_validator_set(validators_with_malicious_validator)
+
+    gas_benchmark.measure(
+        "ValidatorSet.reportMaliciousValidator",
+        f"{number_of_validators} validators",
+        validator_set.functions.reportMaliciousValidator(
+            *equivocation_proof
+        ).transact(),
+    )
+    gas_benchmark.measure(
+        "ValidatorSet.finalizeChange",
+        f"after a report, {number_of_validators} validators",
+        validator_set.functions.finalizeChange().transact({"from": system_address}),
+    )
+    assert (
+        malicious_validator_address
+        not in validator_set.functions.getValidators().call()
+    )
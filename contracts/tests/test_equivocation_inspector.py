@@ -166,3 +166,60 @@ def test_prove_equivocation_successfully(
         signed_block_header_two.unsignedBlockHeader,
         signed_block_header_two.signature,
     ).call()
+
+
+@pytest.mark.parametrize("timestamp_one, timestamp_two", [(5, 9), (10, 10), (17, 15)])
+def test_prove_equivocation_returns_signer_and_step(
+    equivocation_inspector_contract_session,
+    malicious_validator_key,
+    malicious_validator_address,
+    timestamp_one,
+    timestamp_two,
+):
+    signed_block_header_one = make_block_header(
+        timestamp=timestamp_one, private_key=malicious_validator_key
+    )
+    signed_block_header_two = make_block_header(
+        timestamp=timestamp_two, private_key=malicious_validator_key
+    )
+
+    (
+        signer,
+        step,
+    ) = equivocation_inspector_contract_session.functions.testProveEquivocation(
+        signed_block_header_one.unsignedBlockHeader,
+        signed_block_header_one.signature,
+        signed_block_header_two.unsignedBlockHeader,
+        signed_block_header_two.signature,
+    ).call()
+
+    assert is_same_address(signer, malicious_validator_address)
+    assert step == timestamp_one // STEP_DURATION
+
+
+def test_prove_equivocation_saves_gas(
+    equivocation_inspector_contract_session, malicious_validator_key
+):
+    """Test that getting the signer from the proof is cheaper than recovering it again.
+
+    Recovering the signer a second time costs at least the 3000 gas of the ecrecover precompile.
+    """
+    contract = equivocation_inspector_contract_session
+    signed_block_header_one = make_block_header(private_key=malicious_validator_key)
+    signed_block_header_two = make_block_header(private_key=malicious_validator_key)
+    arguments = (
+        signed_block_header_one.unsignedBlockHeader,
+        signed_block_header_one.signature,
+        signed_block_header_two.unsignedBlockHeader,
+        signed_block_header_two.signature,
+    )
+
+    gas_prove = contract.functions.testProveEquivocation(*arguments).estimateGas()
+    gas_verify_and_recover = contract.functions.testVerifyEquivocationProofAndGetSignerAddress(
+        *arguments
+    ).estimateGas()
+    print(
+        f"\nproveEquivocation: {gas_prove} gas, verify and recover again: {gas_verify_and_recover} gas"
+    )
+
+    assert gas_verify_and_recover - gas_prove > 3000
@@ -1,9 +1,45 @@
 #! pytest
+import random
+
 import eth_tester.exceptions
 import pytest
 import rlp
+from tests.data_generation import make_block_header
 from web3 import Web3
 
+_random_generator = random.Random(0)
+
+
+def random_bytes(length):
+    return bytes(_random_generator.randint(0, 255) for _ in range(length))
+
+
+def make_fuzzed_header_list():
+    """Make a list shaped like a block header with randomly sized fields
+
+    The field sizes cover single bytes, short and long strings as well as nested lists
+    """
+    number_of_fields = _random_generator.randint(12, 16)
+    header_list = []
+    for _ in range(number_of_fields):
+        kind = _random_generator.choice(["byte", "short", "long", "number", "list"])
+        if kind == "byte":
+            header_list.append(random_bytes(1))
+        elif kind == "short":
+            header_list.append(random_bytes(_random_generator.randint(0, 55)))
+        elif kind == "long":
+            header_list.append(random_bytes(_random_generator.randint(56, 300)))
+        elif kind == "number":
+            header_list.append(_random_generator.randint(0, 2 ** 256 - 1))
+        else:
+            header_list.append(
+                [random_bytes(_random_generator.randint(0, 40)) for _ in range(3)]
+            )
+    return header_list
+
+
+fuzzed_header_lists = [make_fuzzed_header_list() for _ in range(10)]
+
 
 @pytest.fixture(scope="session")
 def test_rlp_reader_contract(deploy_contract):
@@ -184,3 +220,98 @@ def test_fails_is_list_false_empty_byte_string(test_rlp_reader_contract):
     contract = test_rlp_reader_contract
     with pytest.raises(eth_tester.exceptions.TransactionFailed):
         contract.functions.testIsList(b"").call()
+
+
+@pytest.mark.parametrize("length", [1, 2, 31, 32, 33, 55, 56, 64, 65, 300, 1024])
+def test_to_bytes_lengths(test_rlp_reader_contract, length):
+    """test conversion function to bytes around the word size of the copy"""
+    contract = test_rlp_reader_contract
+    data = random_bytes(length)
+
+    assert contract.functions.testToBytes(rlp.encode(data)).call() == data
+
+
+@pytest.mark.parametrize("header_list", fuzzed_header_lists)
+def test_item_at_fuzzed_headers(test_rlp_reader_contract, header_list):
+    """test accessing every entry of a list with and without decoding the full list"""
+    contract = test_rlp_reader_contract
+    rlp_encoded_item = rlp.encode(header_list)
+
+    for index, entry in enumerate(header_list):
+        rlp_encoded_entry = rlp.encode(entry)
+        assert (
+            contract.functions.testItemAtRlpBytes(index, rlp_encoded_item).call()
+            == rlp_encoded_entry
+        )
+        assert (
+            contract.functions.testGetItemRlpBytes(index, rlp_encoded_item).call()
+            == rlp_encoded_entry
+        )
+
+
+def test_item_at_block_header_timestamp(test_rlp_reader_contract):
+    contract = test_rlp_reader_contract
+    timestamp = 1234
+    block_header = make_block_header(timestamp=timestamp)
+
+    assert (
+        contract.functions.testItemAtUint(11, block_header.unsignedBlockHeader).call()
+        == timestamp
+    )
+
+
+def test_get_uint_with_item_at(test_rlp_reader_contract):
+    contract = test_rlp_reader_contract
+    list = [i * 2 ** 250 for i in range(3)]
+    rlp_encoded_item = rlp.encode(list)
+
+    for index, number in enumerate(list):
+        assert (
+            contract.functions.testItemAtUint(index, rlp_encoded_item).call() == number
+        )
+
+
+@pytest.mark.parametrize("index", [3, 4, 100])
+def test_fails_item_at_out_of_bounds(test_rlp_reader_contract, index):
+    contract = test_rlp_reader_contract
+    rlp_encoded_item = rlp.encode([1, 2, 3])
+
+    with pytest.raises(eth_tester.exceptions.TransactionFailed):
+        contract.functions.testItemAtUint(index, rlp_encoded_item).call()
+
+
+def test_fails_item_at_empty_list(test_rlp_reader_contract):
+    contract = test_rlp_reader_contract
+    rlp_encoded_item = rlp.encode([])
+
+    with pytest.raises(eth_tester.exceptions.TransactionFailed):
+        contract.functions.testItemAtUint(0, rlp_encoded_item).call()
+
+
+def test_fails_item_at_not_a_list(test_rlp_reader_contract):
+    contract = test_rlp_reader_contract
+    rlp_encoded_item = rlp.encode(3)
+
+    with pytest.raises(eth_tester.exceptions.TransactionFailed):
+        contract.functions.testItemAtUint(0, rlp_encoded_item).call()
+
+
+@pytest.mark.parametrize("index", [0, 1, 2, 3, 4, 100])
+def test_try_item_at(test_rlp_reader_contract, index):
+    contract = test_rlp_reader_contract
+    list = [1, 2, 3]
+    rlp_encoded_item = rlp.encode(list)
+
+    expected = (True, rlp.encode(list[index])) if index < len(list) else (False, b"")
+    assert (
+        tuple(contract.functions.testTryItemAtRlpBytes(index, rlp_encoded_item).call())
+        == expected
+    )
+
+
+def test_try_item_at_not_a_list(test_rlp_reader_contract):
+    contract = test_rlp_reader_contract
+    rlp_encoded_item = rlp.encode(3)
+
+    found, _ = contract.functions.testTryItemAtRlpBytes(0, rlp_encoded_item).call()
+    assert not found
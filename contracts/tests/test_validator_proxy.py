@@ -1,5 +1,6 @@
 import eth_tester.exceptions
 import pytest
+from eth_utils import to_checksum_address
 
 
 def test_update_validators(validator_proxy_contract, system_address, accounts):
@@ -47,3 +48,109 @@ def test_is_validator(validator_proxy_with_validators, proxy_validators, account
         validator_proxy_with_validators.functions.isValidator(non_validator).call()
         is False
     )
+
+
+def remove_by_swapping_with_last(validators, index):
+    """remove a validator the same way the ValidatorSet contract does"""
+    new_validators = list(validators)
+    new_validators[index] = new_validators[-1]
+    new_validators.pop()
+    return new_validators
+
+
+@pytest.fixture(scope="session")
+def many_validator_addresses():
+    """123 distinct addresses to be used for realistic validator sets"""
+    return [to_checksum_address(f"0x{i:040x}") for i in range(1000, 1123)]
+
+
+@pytest.mark.parametrize(
+    "new_validators_indices",
+    [
+        [0, 1, 2, 3, 4],
+        [0, 4, 2, 3],
+        [4, 1, 2, 3],
+        [0, 1, 2, 3],
+        [0, 1, 2, 3, 4, 5, 6],
+        [5, 6, 7],
+        [3, 2, 1, 0, 4],
+        [1],
+        [],
+    ],
+)
+def test_update_validators_changes(
+    validator_proxy_with_validators, system_address, accounts, new_validators_indices
+):
+    new_validators = [accounts[i] for i in new_validators_indices]
+    validator_proxy_with_validators.functions.updateValidators(new_validators).transact(
+        {"from": system_address}
+    )
+
+    assert (
+        validator_proxy_with_validators.functions.getValidators().call()
+        == new_validators
+    )
+    for account in accounts[:8]:
+        assert validator_proxy_with_validators.functions.isValidator(
+            account
+        ).call() is (account in new_validators)
+
+
+def test_update_validators_consecutive_removals(
+    validator_proxy_contract, system_address, many_validator_addresses
+):
+    validators = many_validator_addresses[:10]
+    validator_proxy_contract.functions.updateValidators(validators).transact(
+        {"from": system_address}
+    )
+
+    for index in [3, 0, 7, 6]:
+        removed_validator = validators[index]
+        validators = remove_by_swapping_with_last(validators, index)
+        validator_proxy_contract.functions.updateValidators(validators).transact(
+            {"from": system_address}
+        )
+
+        assert validator_proxy_contract.functions.getValidators().call() == validators
+        assert (
+            validator_proxy_contract.functions.isValidator(removed_validator).call()
+            is False
+        )
+        for validator in validators:
+            assert (
+                validator_proxy_contract.functions.isValidator(validator).call() is True
+            )
+
+
+@pytest.mark.parametrize("number_of_validators", [50, 123])
+def test_gas_update_validators(
+    validator_proxy_contract,
+    system_address,
+    many_validator_addresses,
+    number_of_validators,
+    web3,
+):
+    """The cost of removing a single validator must not depend on the size of the set
+
+    Unchanged validators must not be written to storage. Clearing and setting the
+    membership of every validator costs more than 5000 gas per validator.
+    """
+    validators = many_validator_addresses[:number_of_validators]
+
+    def update_validators_gas(new_validators):
+        tx_hash = validator_proxy_contract.functions.updateValidators(
+            new_validators
+        ).transact({"from": system_address, "gas": 7_000_000})
+        return web3.eth.getTransactionReceipt(tx_hash).gasUsed
+
+    update_validators_gas(validators)
+    unchanged_gas = update_validators_gas(validators)
+    removal_gas = update_validators_gas(
+        remove_by_swapping_with_last(validators, number_of_validators // 2)
+    )
+    print(
+        f"\n{number_of_validators} validators, unchanged set: {unchanged_gas} gas, single removal: {removal_gas} gas"
+    )
+
+    assert unchanged_gas < number_of_validators * 5000
+    assert removal_gas - unchanged_gas < 40_000
@@ -1,3 +1,4 @@
+import os
 from enum import Enum
 from os import linesep
 from typing import Optional
@@ -20,21 +21,30 @@ from deploy_tools.deploy import (
     build_transaction_options,
     send_function_call_transaction,
 )
-from deploy_tools.files import read_addresses_in_csv
+from eth_utils import to_checksum_address
 from web3.contract import Contract
 
 from auction_deploy.core import (
-    ZERO_ADDRESS,
     AuctionOptions,
-    DeployedAuctionContracts,
+    AuctionStatus,
     DeployedContractsAddresses,
-    deploy_auction_contracts,
-    get_bid_token_address,
+    WhitelistingError,
+    deploy_and_initialize_auction_contracts,
+    get_auction_status,
     get_deployed_auction_contracts,
-    initialize_auction_contracts,
+    get_deployed_auction_status,
     missing_whitelisted_addresses,
+    watch_auction_status,
     whitelist_addresses,
 )
+from auction_deploy.index import (
+    AuctionIndex,
+    create_auction_index,
+    export_participants_csv,
+    export_summary_json,
+    update_auction_index,
+)
+from deploy_tools_common.files import count_rows_in_csv, iter_addresses_in_csv
 
 ETH_IN_WEI = 10 ** 18
 
@@ -83,6 +93,13 @@ whitelist_file_option = click.option(
     type=click.Path(exists=True, dir_okay=False),
     required=True,
 )
+read_batch_size_option = click.option(
+    "--read-batch-size",
+    help="Number of addresses checked within one batch request to the node",
+    type=click.IntRange(min=1),
+    show_default=True,
+    default=100,
+)
 already_deployed_auction_option = click.option(
     "--auction",
     "already_deployed_auction",
@@ -109,42 +126,22 @@ already_deployed_slasher_option = click.option(
 )
 
 
-def get_errors_messages_on_contracts_links(all_contracts: DeployedAuctionContracts):
-
-    locker_address = all_contracts.locker.address
-
-    locker_address_in_auction_contract = (
-        all_contracts.auction.functions.depositLocker().call()
-    )
-    auction_address_in_locker_contract = (
-        all_contracts.locker.functions.depositorsProxy().call()
-    )
-    slasher_address_in_locker_contract = all_contracts.locker.functions.slasher().call()
-
-    locker_address_in_slasher_contract = ZERO_ADDRESS
-    if all_contracts.slasher is not None:
-        locker_address_in_slasher_contract = (
-            all_contracts.slasher.functions.depositContract().call()
-        )
-
-    slasher_address = ZERO_ADDRESS
-    if all_contracts.slasher is not None:
-        slasher_address = all_contracts.slasher.address
+def get_errors_messages_on_contracts_links(auction_status: AuctionStatus):
 
     warning_messages = []
-    if locker_address_in_auction_contract != locker_address:
+    if auction_status.locker_address_in_auction != auction_status.locker_address:
         warning_messages.append(
             "The locker address in the auction contract does not match to the locker address."
         )
-    if auction_address_in_locker_contract != all_contracts.auction.address:
+    if auction_status.auction_address_in_locker != auction_status.auction_address:
         warning_messages.append(
             "The auction address in the locker contract does not match the auction address."
         )
-    if slasher_address_in_locker_contract != slasher_address:
+    if auction_status.slasher_address_in_locker != auction_status.slasher_address:
         warning_messages.append(
             "The slasher address in the locker contract does not match the slasher address."
         )
-    if locker_address_in_slasher_contract != locker_address:
+    if auction_status.locker_address_in_slasher != auction_status.locker_address:
         warning_messages.append(
             "The locker address in the slasher contract does not match the locker address."
         )
@@ -297,7 +294,7 @@ def deploy(
         gas=gas, gas_price=gas_price, nonce=nonce
     )
 
-    contracts = deploy_auction_contracts(
+    contracts = deploy_and_initialize_auction_contracts(
         web3=web3,
         transaction_options=transaction_options,
         private_key=private_key,
@@ -306,21 +303,14 @@ def deploy(
             already_deployed_locker, already_deployed_slasher, already_deployed_auction
         ),
     )
-
-    initialize_auction_contracts(
-        web3=web3,
-        transaction_options=transaction_options,
-        contracts=contracts,
-        release_timestamp=release_timestamp,
-        token_address=token_address,
-        private_key=private_key,
-    )
     slasher: Contract = contracts.slasher
 
     click.echo("Auction address: " + contracts.auction.address)
     click.echo("Deposit locker address: " + contracts.locker.address)
     click.echo("Validator slasher address: " + slasher.address)
-    warning_messages = get_errors_messages_on_contracts_links(contracts)
+    warning_messages = get_errors_messages_on_contracts_links(
+        get_auction_status(web3, contracts)
+    )
     if warning_messages:
         warning_messages.append("Verify what is wrong with `auction-deploy status`.")
         click.secho(linesep.join(warning_messages), fg="red")
@@ -459,48 +449,31 @@ def format_timestamp(timestamp: int):
 )
 @auction_address_option
 @jsonrpc_option
-def status(auction_address, jsonrpc):
+@click.option(
+    "--watch",
+    help="Keep printing the variables of the auction for every new block",
+    is_flag=True,
+    default=False,
+)
+@click.option(
+    "--poll-interval",
+    help="Seconds to wait between checks for a new block when watching the auction",
+    type=click.FloatRange(min=0),
+    show_default=True,
+    default=1.0,
+)
+def status(auction_address, jsonrpc, watch, poll_interval):
 
     web3 = connect_to_json_rpc(jsonrpc)
 
-    contracts = get_deployed_auction_contracts(web3, auction_address)
+    contracts, auction_status = get_deployed_auction_status(web3, auction_address)
 
-    # constants throughout auction
-    duration_in_days = contracts.auction.functions.auctionDurationInDays().call()
-    start_price_in_biggest_unit = (
-        contracts.auction.functions.startPrice().call() / ETH_IN_WEI
-    )
-    minimal_number_of_participants = (
-        contracts.auction.functions.minimalNumberOfParticipants().call()
-    )
-    maximal_number_of_participants = (
-        contracts.auction.functions.maximalNumberOfParticipants().call()
-    )
-    bid_token_address = get_bid_token_address(web3, auction_address)
-    locker_address = contracts.locker.address
-    locker_initialized = contracts.locker.functions.initialized().call()
-    locker_release_timestamp = contracts.locker.functions.releaseTimestamp().call()
-
-    slasher_address = ZERO_ADDRESS
-    slasher_initialized = False
-    if contracts.slasher is not None:
-        slasher_address = contracts.slasher.address
-        slasher_initialized = contracts.slasher.functions.initialized().call()
-
-    # variables
-    auction_state_value = contracts.auction.functions.auctionState().call()
-    auction_state = AuctionState(auction_state_value)
-    start_time = contracts.auction.functions.startTime().call()
-    close_time = contracts.auction.functions.closeTime().call()
-    last_slot_price = contracts.auction.functions.lowestSlotPrice().call()
-    current_price_in_eth = 0
-    if auction_state == AuctionState.Started:
-        current_price_in_eth = (
-            contracts.auction.functions.currentPrice().call() / ETH_IN_WEI
-        )
+    start_price_in_biggest_unit = auction_status.start_price / ETH_IN_WEI
 
     click.echo(
-        "The auction duration is:                " + str(duration_in_days) + " days"
+        "The auction duration is:                "
+        + str(auction_status.duration_in_days)
+        + " days"
     )
     click.echo(
         "The starting price is:                  "
@@ -508,19 +481,33 @@ def status(auction_address, jsonrpc):
         + " ETH/TLN"
     )
     click.echo(
-        "The minimal number of participants is:  " + str(minimal_number_of_participants)
+        "The minimal number of participants is:  "
+        + str(auction_status.minimal_number_of_participants)
     )
     click.echo(
-        "The maximal number of participants is:  " + str(maximal_number_of_participants)
+        "The maximal number of participants is:  "
+        + str(auction_status.maximal_number_of_participants)
+    )
+    if auction_status.bid_token_address is not None:
+        click.echo(
+            "The address of the bid token is:        "
+            + str(auction_status.bid_token_address)
+        )
+    click.echo(
+        "The address of the locker contract is:  " + str(auction_status.locker_address)
+    )
+    click.echo(
+        "The locker initialized value is:        "
+        + str(auction_status.locker_initialized)
     )
-    if bid_token_address is not None:
-        click.echo("The address of the bid token is:        " + str(bid_token_address))
-    click.echo("The address of the locker contract is:  " + str(locker_address))
-    click.echo("The locker initialized value is:        " + str(locker_initialized))
     if contracts.slasher is not None:
-        click.echo("The address of the slasher contract is: " + str(slasher_address))
         click.echo(
-            "The slasher initialized value is:       " + str(slasher_initialized)
+            "The address of the slasher contract is: "
+            + str(auction_status.slasher_address)
+        )
+        click.echo(
+            "The slasher initialized value is:       "
+            + str(auction_status.slasher_initialized)
         )
     else:
         click.secho("The slasher contract cannot be found.", fg="red")
@@ -529,38 +516,86 @@ def status(auction_address, jsonrpc):
         "------------------------------------    ------------------------------------------"
     )
 
+    echo_auction_variables(auction_status)
+
+    click.echo(
+        "------------------------------------    ------------------------------------------"
+    )
+
+    warning_messages = get_errors_messages_on_contracts_links(auction_status)
+    if warning_messages:
+        click.secho(linesep.join(warning_messages), fg="red")
+
+    if watch:
+        for auction_status in watch_auction_status(
+            web3, contracts, auction_status, poll_interval=poll_interval
+        ):
+            click.echo(
+                "The block number is:                    "
+                + str(auction_status.block_number)
+            )
+            echo_auction_variables(auction_status)
+            click.echo(
+                "------------------------------------    ------------------------------------------"
+            )
+
+
+def echo_auction_variables(auction_status: AuctionStatus):
+    auction_state = AuctionState(auction_status.auction_state)
+
     click.echo(
         "The auction state is:                   "
-        + str(auction_state_value)
+        + str(auction_status.auction_state)
         + " ("
         + str(auction_state.name)
         + ")"
     )
     click.echo(
-        "The start time is:                      " + format_timestamp(start_time)
+        "The start time is:                      "
+        + format_timestamp(auction_status.start_time)
     )
     click.echo(
-        "The close time is:                      " + format_timestamp(close_time)
+        "The close time is:                      "
+        + format_timestamp(auction_status.close_time)
     )
-    if auction_state == auction_state.Started:
+    if (
+        auction_state == AuctionState.Started
+        and auction_status.current_price is not None
+    ):
         click.echo(
             "The current price is:                   "
-            + str(current_price_in_eth)
+            + str(auction_status.current_price / ETH_IN_WEI)
             + " ETH/TLN"
         )
-    click.echo("The last slot price is:                 " + str(last_slot_price))
     click.echo(
-        "Deposits will be locked until:          "
-        + format_timestamp(locker_release_timestamp)
+        "The last slot price is:                 "
+        + str(auction_status.lowest_slot_price)
     )
-
     click.echo(
-        "------------------------------------    ------------------------------------------"
+        "Deposits will be locked until:          "
+        + format_timestamp(auction_status.locker_release_timestamp)
     )
 
-    warning_messages = get_errors_messages_on_contracts_links(contracts)
-    if warning_messages:
-        click.secho(linesep.join(warning_messages), fg="red")
+
+def iter_whitelist_addresses(whitelist_file):
+    """The addresses of the whitelist file, duplicates are skipped with a warning"""
+
+    def warn_about_duplicate(address: str, line_number: int) -> None:
+        click.secho(
+            f"Skipping duplicate address {address} in line {line_number} of {whitelist_file}",
+            fg="yellow",
+            err=True,
+        )
+
+    return iter_addresses_in_csv(whitelist_file, on_duplicate=warn_about_duplicate)
+
+
+def whitelist_check_progress_bar(whitelist_file):
+    """Progress bar for checking the whitelisted addresses, only shown on a terminal"""
+    return click.progressbar(
+        length=count_rows_in_csv(whitelist_file),
+        label="Checking whitelisted addresses",
+    )
 
 
 @main.command(short_help="Whitelists addresses for the auction")
@@ -568,11 +603,12 @@ def status(auction_address, jsonrpc):
 @auction_address_option
 @click.option(
     "--batch-size",
-    help="Number of addresses to be whitelisted within one transaction",
+    help="Maximal number of addresses to be whitelisted within one transaction, "
+    "by default as many as fit into the gas limit",
     type=click.IntRange(min=1),
-    show_default=True,
-    default=100,
+    required=False,
 )
+@read_batch_size_option
 @keystore_option
 @gas_option
 @gas_price_option
@@ -582,7 +618,8 @@ def status(auction_address, jsonrpc):
 def whitelist(
     whitelist_file: str,
     auction_address: str,
-    batch_size: int,
+    batch_size: Optional[int],
+    read_batch_size: int,
     keystore: str,
     jsonrpc: str,
     gas: int,
@@ -592,7 +629,6 @@ def whitelist(
 ) -> None:
 
     web3 = connect_to_json_rpc(jsonrpc)
-    whitelist = read_addresses_in_csv(whitelist_file)
     private_key = retrieve_private_key(keystore)
 
     nonce = get_nonce(
@@ -605,14 +641,28 @@ def whitelist(
 
     contracts = get_deployed_auction_contracts(web3, auction_address)
 
-    number_of_whitelisted_addresses = whitelist_addresses(
-        contracts.auction,
-        whitelist,
-        batch_size=batch_size,
-        web3=web3,
-        transaction_options=transaction_options,
-        private_key=private_key,
-    )
+    try:
+        with whitelist_check_progress_bar(whitelist_file) as progress_bar:
+            number_of_whitelisted_addresses = whitelist_addresses(
+                contracts.auction,
+                iter_whitelist_addresses(whitelist_file),
+                batch_size=batch_size,
+                web3=web3,
+                transaction_options=transaction_options,
+                private_key=private_key,
+                read_batch_size=read_batch_size,
+                on_read_progress=progress_bar.update,
+            )
+    except WhitelistingError as error:
+        click.echo(
+            "Number of whitelisted addresses: "
+            + str(error.number_of_whitelisted_addresses)
+        )
+        raise click.ClickException(
+            f"{len(error.failed_addresses)} addresses could not be whitelisted, "
+            "run the command again to whitelist them."
+        )
+
     click.echo(
         "Number of whitelisted addresses: " + str(number_of_whitelisted_addresses)
     )
@@ -623,19 +673,127 @@ def whitelist(
 )
 @whitelist_file_option
 @auction_address_option
+@read_batch_size_option
 @jsonrpc_option
-def check_whitelist(whitelist_file: str, auction_address: str, jsonrpc: str) -> None:
+def check_whitelist(
+    whitelist_file: str, auction_address: str, read_batch_size: int, jsonrpc: str
+) -> None:
     web3 = connect_to_json_rpc(jsonrpc)
-    whitelist = read_addresses_in_csv(whitelist_file)
     contracts = get_deployed_auction_contracts(web3, auction_address)
 
-    number_of_missing_addresses = len(
-        missing_whitelisted_addresses(contracts.auction, whitelist)
-    )
+    number_of_checked_addresses = 0
+
+    with whitelist_check_progress_bar(whitelist_file) as progress_bar:
+
+        def on_progress(number_of_addresses: int) -> None:
+            nonlocal number_of_checked_addresses
+            number_of_checked_addresses += number_of_addresses
+            progress_bar.update(number_of_addresses)
+
+        number_of_missing_addresses = len(
+            missing_whitelisted_addresses(
+                contracts.auction,
+                iter_whitelist_addresses(whitelist_file),
+                batch_size=read_batch_size,
+                on_progress=on_progress,
+            )
+        )
 
     if number_of_missing_addresses == 0:
-        click.echo(f"All {len(whitelist)} addresses have been whitelisted")
+        click.echo(f"All {number_of_checked_addresses} addresses have been whitelisted")
     else:
         click.echo(
-            f"{number_of_missing_addresses} of {len(whitelist)} addresses have not been whitelisted yet"
+            f"{number_of_missing_addresses} of {number_of_checked_addresses} addresses have not been whitelisted yet"
         )
+
+
+@main.command(
+    "index",
+    short_help="Index the events of the auction and its deposit locker in a local file.",
+)
+@auction_address_option
+@click.option(
+    "--index-file",
+    help="Path to the json file of the index, it is created if it does not exist yet",
+    type=click.Path(dir_okay=False),
+    required=True,
+)
+@click.option(
+    "--start-block",
+    help="Block number to start indexing from when creating the index",
+    type=click.IntRange(min=0),
+    show_default=True,
+    default=0,
+)
+@click.option(
+    "--confirmations",
+    help="Number of the latest blocks which are not indexed yet, as they could still be reorganized",
+    type=click.IntRange(min=0),
+    show_default=True,
+    default=10,
+)
+@jsonrpc_option
+def index_auction(
+    auction_address: str,
+    index_file: str,
+    start_block: int,
+    confirmations: int,
+    jsonrpc: str,
+) -> None:
+    web3 = connect_to_json_rpc(jsonrpc)
+
+    if os.path.exists(index_file):
+        auction_index = AuctionIndex.load(index_file)
+        if to_checksum_address(auction_index.auction_address) != to_checksum_address(
+            auction_address
+        ):
+            raise click.BadParameter(
+                f"The index file is for the auction at {auction_index.auction_address}",
+                param_hint="--address",
+            )
+    else:
+        auction_index = create_auction_index(web3, auction_address, start_block)
+
+    number_of_new_events = update_auction_index(
+        web3,
+        auction_index,
+        to_block_number=web3.eth.blockNumber - confirmations,
+        on_checkpoint=lambda updated_index: updated_index.save(index_file),
+    )
+    auction_index.save(index_file)
+
+    click.echo(
+        f"Indexed {number_of_new_events} new events up to block {auction_index.last_block_number}"
+    )
+
+
+@main.command(
+    short_help="Export the participants of the auction as csv or a summary as json from the index."
+)
+@click.option(
+    "--index-file",
+    help="Path to the json file of the index created with `auction-deploy index`",
+    type=click.Path(exists=True, dir_okay=False),
+    required=True,
+)
+@click.option(
+    "--format",
+    "export_format",
+    help="csv exports one row per participant, json the summary of the auction including the participants",
+    type=click.Choice(["csv", "json"]),
+    show_default=True,
+    default="csv",
+)
+@click.option(
+    "--output",
+    help="Path of the file to export to, by default the export is printed",
+    type=click.File("w"),
+    default="-",
+)
+def export_index(index_file: str, export_format: str, output) -> None:
+    auction_index = AuctionIndex.load(index_file)
+
+    if export_format == "csv":
+        export_participants_csv(auction_index, output)
+    else:
+        export_summary_json(auction_index, output)
@@ -0,0 +1,4 @@
+"""The compiled contracts shipped in the contracts.json of the package"""
+from deploy_tools_common.contracts import ContractRegistry
+
+contract_registry = ContractRegistry("auction_deploy")
@@ -1,16 +1,54 @@
-from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
 
+import rlp
 from deploy_tools.deploy import (
-    deploy_compiled_contract,
     increase_transaction_options_nonce,
-    load_contracts_json,
-    send_function_call_transaction,
+    wait_for_successful_transaction_receipt,
 )
-from web3.contract import Contract
-from web3.exceptions import BadFunctionCallOutput
+from eth_account import Account
+from eth_utils import keccak, to_canonical_address, to_checksum_address
+from hexbytes import HexBytes
+from web3 import HTTPProvider
+from web3.contract import Contract, ContractConstructor, ContractFunction
+from web3.exceptions import BadFunctionCallOutput, TimeExhausted
+from web3.types import TxParams
+
+from auction_deploy.contracts import contract_registry
+from deploy_tools_common.files import iter_chunks
+from deploy_tools_common.rpc import make_batch_request
 
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 
+# Number of batches of read requests that are sent to the node at the same time
+MAX_CONCURRENT_READ_BATCHES = 4
+# Share of the block gas limit a single whitelisting transaction may use
+WHITELIST_TRANSACTION_BLOCK_GAS_SHARE = 0.8
+# Factor applied to the estimated gas of a whitelisting transaction to get its gas limit
+WHITELIST_GAS_ESTIMATE_MARGIN = 1.1
+# Gas limit of the init transactions of the locker and slasher. They are sent together with the
+# deployment of the contracts, so their gas cannot be estimated.
+INIT_TRANSACTION_GAS_LIMIT = 200_000
+# Fields of the auction status which may fail to be read, bidToken only exists on token auctions
+# and currentPrice can only be called while the auction is started
+OPTIONAL_AUCTION_STATUS_FIELDS = {"bid_token_address", "current_price"}
+
 
 class AuctionOptions(NamedTuple):
     start_price: int
@@ -33,7 +71,85 @@ class DeployedContractsAddresses(NamedTuple):
     auction: Optional[str] = None
 
 
-def deploy_auction_contracts(
+class AuctionStatus(NamedTuple):
+    """The fields of the auction contracts, all read at block `block_number`"""
+
+    block_number: int
+    auction_address: str
+    # constants throughout auction
+    duration_in_days: int
+    start_price: int
+    minimal_number_of_participants: int
+    maximal_number_of_participants: int
+    bid_token_address: Optional[str]
+    locker_address: str
+    locker_initialized: bool
+    locker_release_timestamp: int
+    slasher_address: str
+    slasher_initialized: bool
+    locker_address_in_auction: str
+    auction_address_in_locker: str
+    slasher_address_in_locker: str
+    locker_address_in_slasher: str
+    # variables
+    auction_state: int
+    start_time: int
+    close_time: int
+    lowest_slot_price: int
+    current_price: Optional[int]
+
+
+class WhitelistingGasEstimate(NamedTuple):
+    base_gas: int
+    gas_per_address: int
+
+    def gas_for(self, number_of_addresses: int) -> int:
+        return self.base_gas + self.gas_per_address * number_of_addresses
+
+    def max_number_of_addresses(self, gas_limit: int) -> int:
+        return max(1, (gas_limit - self.base_gas) // self.gas_per_address)
+
+
+class WhitelistingError(Exception):
+    """Some of the whitelisting transactions failed
+
+    The addresses of the successful transactions are whitelisted,
+    whitelisting again will only send the failed addresses."""
+
+    def __init__(
+        self, failed_addresses: Sequence[str], number_of_whitelisted_addresses
+    ):
+        super().__init__(f"{len(failed_addresses)} addresses could not be whitelisted")
+        self.failed_addresses = failed_addresses
+        self.number_of_whitelisted_addresses = number_of_whitelisted_addresses
+
+
+def load_auction_contracts_assets(use_token: bool) -> Tuple[Dict, Dict, Dict]:
+    """Returns the compiled locker, slasher and auction contracts"""
+    compiled_contracts = contract_registry.compiled_contracts
+
+    if use_token:
+        return (
+            compiled_contracts["TokenDepositLocker"],
+            compiled_contracts["ValidatorSlasher"],
+            compiled_contracts["TokenValidatorAuction"],
+        )
+    else:
+        return (
+            compiled_contracts["ETHDepositLocker"],
+            compiled_contracts["ValidatorSlasher"],
+            compiled_contracts["ETHValidatorAuction"],
+        )
+
+
+def compute_contract_address(sender: str, nonce: int) -> str:
+    """Returns the address of the contract created by `sender` with the transaction of the given nonce"""
+    return to_checksum_address(
+        keccak(rlp.encode([to_canonical_address(sender), nonce]))[12:]
+    )
+
+
+def deploy_and_initialize_auction_contracts(
     *,
     web3,
     transaction_options: Dict = None,
@@ -41,9 +157,12 @@ def deploy_auction_contracts(
     auction_options: AuctionOptions,
     already_deployed_contracts: DeployedContractsAddresses = DeployedContractsAddresses(),
 ) -> DeployedAuctionContracts:
+    """Deploys and initializes the auction contracts sending all transactions at once.
 
-    use_token = auction_options.token_address is not None
-
+    The addresses of the contracts to be deployed are computed from the sender and the nonces, so that
+    the auction and the init transactions can use them before the contracts are mined.
+    The links between the contracts are verified once all transactions are mined.
+    """
     if transaction_options is None:
         transaction_options = {}
 
@@ -55,162 +174,114 @@ def deploy_auction_contracts(
             "Cannot deploy new locker if auction already deployed due to constructor of auction."
         )
 
-    compiled_contracts = load_contracts_json(__name__)
-
-    deposit_locker_abi = (
-        compiled_contracts["TokenDepositLocker"]["abi"]
-        if use_token
-        else compiled_contracts["ETHDepositLocker"]["abi"]
-    )
-    deposit_locker_bin = (
-        compiled_contracts["TokenDepositLocker"]["bytecode"]
-        if use_token
-        else compiled_contracts["ETHDepositLocker"]["bytecode"]
+    use_token = auction_options.token_address is not None
+    locker_assets, slasher_assets, auction_assets = load_auction_contracts_assets(
+        use_token
     )
 
-    validator_slasher_abi = compiled_contracts["ValidatorSlasher"]["abi"]
-    validator_slasher_bin = compiled_contracts["ValidatorSlasher"]["bytecode"]
+    sender = get_sender_address(web3, transaction_options, private_key)
+    options = dict(transaction_options)
+    if "nonce" not in options:
+        options["nonce"] = web3.eth.getTransactionCount(
+            sender, block_identifier="pending"
+        )
 
-    auction_abi = (
-        compiled_contracts["TokenValidatorAuction"]["abi"]
-        if use_token
-        else compiled_contracts["ETHValidatorAuction"]["abi"]
-    )
-    auction_bin = (
-        compiled_contracts["TokenValidatorAuction"]["bytecode"]
-        if use_token
-        else compiled_contracts["ETHValidatorAuction"]["bytecode"]
-    )
+    transactions: List[Tuple[Union[ContractFunction, ContractConstructor], int]] = []
+    deployed_addresses: Dict[str, str] = {}
+
+    def plan_contract(name, assets, address, constructor_args=()):
+        if address is None:
+            constructor = web3.eth.contract(
+                abi=assets["abi"], bytecode=assets["bytecode"]
+            ).constructor(*constructor_args)
+            gas = options.get("gas") or constructor.estimateGas({"from": sender})
+            address = compute_contract_address(
+                sender, options["nonce"] + len(transactions)
+            )
+            transactions.append((constructor, gas))
+            deployed_addresses[name] = address
 
-    if already_deployed_contracts.locker is not None:
-        deposit_locker_contract: Contract = web3.eth.contract(
-            abi=deposit_locker_abi,
-            bytecode=deposit_locker_bin,
-            address=already_deployed_contracts.locker,
-        )
-    else:
-        deposit_locker_contract = deploy_compiled_contract(
-            abi=deposit_locker_abi,
-            bytecode=deposit_locker_bin,
-            web3=web3,
-            transaction_options=transaction_options,
-            private_key=private_key,
+        return web3.eth.contract(
+            abi=assets["abi"], bytecode=assets["bytecode"], address=address
         )
-        increase_transaction_options_nonce(transaction_options)
 
-    if already_deployed_contracts.slasher is not None:
-        validator_slasher_contract = web3.eth.contract(
-            abi=validator_slasher_abi,
-            bytecode=validator_slasher_bin,
-            address=already_deployed_contracts.slasher,
-        )
-    else:
-        validator_slasher_contract = deploy_compiled_contract(
-            abi=validator_slasher_abi,
-            bytecode=validator_slasher_bin,
-            web3=web3,
-            transaction_options=transaction_options,
-            private_key=private_key,
-        )
-        increase_transaction_options_nonce(transaction_options)
+    locker = plan_contract("locker", locker_assets, already_deployed_contracts.locker)
+    slasher = plan_contract(
+        "slasher", slasher_assets, already_deployed_contracts.slasher
+    )
+    auction_constructor_args: Tuple = (
+        auction_options.start_price,
+        auction_options.auction_duration,
+        auction_options.minimal_number_of_participants,
+        auction_options.maximal_number_of_participants,
+        locker.address,
+    )
+    if use_token:
+        auction_constructor_args += (auction_options.token_address,)
+    auction = plan_contract(
+        "auction",
+        auction_assets,
+        already_deployed_contracts.auction,
+        auction_constructor_args,
+    )
 
-    if already_deployed_contracts.auction is not None:
-        auction_contract: Contract = web3.eth.contract(
-            abi=auction_abi,
-            bytecode=auction_bin,
-            address=already_deployed_contracts.auction,
-        )
-    else:
-        auction_constructor_args: Tuple = (
-            auction_options.start_price,
-            auction_options.auction_duration,
-            auction_options.minimal_number_of_participants,
-            auction_options.maximal_number_of_participants,
-            deposit_locker_contract.address,
+    # The gas of the init transactions cannot be estimated before the contracts are deployed
+    init_gas = options.get("gas", INIT_TRANSACTION_GAS_LIMIT)
+    if "locker" in deployed_addresses or not locker.functions.initialized().call():
+        locker_init_args: Tuple = (
+            auction_options.release_timestamp,
+            slasher.address,
+            auction.address,
         )
         if use_token:
-            auction_constructor_args += (auction_options.token_address,)
-
-        auction_contract = deploy_compiled_contract(
-            abi=auction_abi,
-            bytecode=auction_bin,
-            web3=web3,
-            constructor_args=auction_constructor_args,
-            transaction_options=transaction_options,
-            private_key=private_key,
-        )
-        increase_transaction_options_nonce(transaction_options)
+            locker_init_args += (auction_options.token_address,)
+        transactions.append((locker.functions.init(*locker_init_args), init_gas))
+    if "slasher" in deployed_addresses or not slasher.functions.initialized().call():
+        transactions.append((slasher.functions.init(locker.address), init_gas))
 
-    contracts = DeployedAuctionContracts(
-        deposit_locker_contract, validator_slasher_contract, auction_contract
+    tx_hashes = send_function_call_transactions(
+        transactions, web3=web3, transaction_options=options, private_key=private_key
     )
+    if "nonce" in transaction_options:
+        transaction_options["nonce"] = options["nonce"]
 
+    for tx_hash in tx_hashes:
+        if tx_hash is not None:
+            wait_for_successful_transaction_receipt(web3, tx_hash)
+    if None in tx_hashes:
+        raise ValueError(
+            f"The node did not accept all deployment transactions, deployed contracts: {deployed_addresses}"
+        )
+
+    contracts = DeployedAuctionContracts(locker, slasher, auction)
+    verify_auction_contracts_links(contracts)
     return contracts
 
 
-def initialize_auction_contracts(
-    *,
-    web3,
-    transaction_options=None,
-    contracts: DeployedAuctionContracts,
-    release_timestamp,
-    token_address=None,
-    private_key=None,
-) -> None:
-    if transaction_options is None:
-        transaction_options = {}
-
+def verify_auction_contracts_links(contracts: DeployedAuctionContracts) -> None:
+    """Raises a ValueError if the auction, locker and slasher contracts do not reference each other"""
     if contracts.slasher is None:
-        raise RuntimeError("Slasher contract not set")
+        raise ValueError("Slasher contract not set")
+
+    status = get_auction_status(contracts.auction.web3, contracts)
+    if not status.locker_initialized:
+        raise ValueError("Locker is not initialized")
+    if not status.slasher_initialized:
+        raise ValueError("Slasher is not initialized")
 
-    if not contracts.locker.functions.initialized().call():
-        init_args: Tuple = (
-            release_timestamp,
-            contracts.slasher.address,
-            contracts.auction.address,
+    if status.auction_address_in_locker != contracts.auction.address:
+        raise ValueError(
+            "Address of auction in locker and given auction contract do not match"
         )
-        if token_address is not None:
-            init_args += (token_address,)
-
-        deposit_init = contracts.locker.functions.init(*init_args)
-        send_function_call_transaction(
-            deposit_init,
-            web3=web3,
-            transaction_options=transaction_options,
-            private_key=private_key,
+    if status.slasher_address_in_locker != contracts.slasher.address:
+        raise ValueError(
+            "Address of slasher in locker and given slasher contract do not match"
         )
-        increase_transaction_options_nonce(transaction_options)
-    else:
-        if (
-            contracts.locker.functions.depositorsProxy().call()
-            != contracts.auction.address
-        ):
-            raise ValueError(
-                "Locker is already initialized but address of auction in locker and given auction contract do not match"
-            )
-        if contracts.locker.functions.slasher().call() != contracts.slasher.address:
-            raise ValueError(
-                "Locker is already initialized but address of slasher in locker and given slasher contract do not match"
-            )
-
-    if not contracts.slasher.functions.initialized().call():
-        slasher_init = contracts.slasher.functions.init(contracts.locker.address)
-        send_function_call_transaction(
-            slasher_init,
-            web3=web3,
-            transaction_options=transaction_options,
-            private_key=private_key,
+    if status.locker_address_in_slasher != contracts.locker.address:
+        raise ValueError(
+            "Address of locker in slasher and given locker contract do not match"
         )
-        increase_transaction_options_nonce(transaction_options)
-    else:
-        if (
-            contracts.slasher.functions.depositContract().call()
-            != contracts.locker.address
-        ):
-            raise ValueError(
-                "Slasher is already initialized but address of locker in slasher and given locker contract do not match"
-            )
-    if contracts.auction.functions.depositLocker().call() != contracts.locker.address:
+    if status.locker_address_in_auction != contracts.locker.address:
         raise ValueError(
             "Address of deposit locker in auction contract does not match with address of locker"
         )
@@ -220,22 +291,20 @@ def get_deployed_auction_contracts(
     web3, auction_address: str
 ) -> DeployedAuctionContracts:
 
-    compiled_contracts = load_contracts_json(__name__)
-
-    auction_abi = compiled_contracts["BaseValidatorAuction"]["abi"]
-    locker_abi = compiled_contracts["BaseDepositLocker"]["abi"]
-    slasher_abi = compiled_contracts["ValidatorSlasher"]["abi"]
-
-    auction = web3.eth.contract(address=auction_address, abi=auction_abi)
+    auction = contract_registry.get_contract(
+        web3, "BaseValidatorAuction", auction_address
+    )
 
     locker_address = auction.functions.depositLocker().call()
-    locker = web3.eth.contract(address=locker_address, abi=locker_abi)
+    locker = contract_registry.get_contract(web3, "BaseDepositLocker", locker_address)
 
     slasher_address = locker.functions.slasher().call()
     if slasher_address == ZERO_ADDRESS:
         slasher = None
     else:
-        slasher = web3.eth.contract(address=slasher_address, abi=slasher_abi)
+        slasher = contract_registry.get_contract(
+            web3, "ValidatorSlasher", slasher_address
+        )
 
     deployed_auction_contracts: DeployedAuctionContracts = DeployedAuctionContracts(
         locker, slasher, auction
@@ -244,66 +313,497 @@ def get_deployed_auction_contracts(
     return deployed_auction_contracts
 
 
-def get_bid_token_address(web3, auction_address: str):
-    compiled_contracts = load_contracts_json(__name__)
-    auction_abi = compiled_contracts["TokenValidatorAuction"]["abi"]
-    auction = web3.eth.contract(address=auction_address, abi=auction_abi)
-    try:
-        return auction.functions.bidToken().call()
-    except BadFunctionCallOutput:
-        # Thrown by web3 when function does not exist on contract
-        return None
+def get_auction_status(
+    web3, contracts: DeployedAuctionContracts, block_number: Optional[int] = None
+) -> AuctionStatus:
+    """Reads all fields of the auction contracts with one batch request
+
+    All fields are read at the same block, `block_number` or the latest block if not given."""
+    if block_number is None:
+        block_number = web3.eth.blockNumber
+
+    fields = get_auction_fields(web3, contracts.auction) + get_locker_fields(
+        contracts.locker
+    )
+    if contracts.slasher is not None:
+        fields += get_slasher_fields(contracts.slasher)
+    return make_auction_status(
+        block_number, contracts, read_auction_status_fields(web3, fields, block_number)
+    )
+
+
+def get_deployed_auction_status(
+    web3, auction_address: str, block_number: Optional[int] = None
+) -> Tuple[DeployedAuctionContracts, AuctionStatus]:
+    """Reads the auction contracts linked to the auction at `auction_address` and all their fields
+
+    The address of the locker is read together with the fields of the auction and the address of the
+    slasher together with the fields of the locker, so there is one batch request per contract.
+    All fields are read at the same block, `block_number` or the latest block if not given."""
+    if block_number is None:
+        block_number = web3.eth.blockNumber
+
+    auction = contract_registry.get_contract(
+        web3, "BaseValidatorAuction", auction_address
+    )
+    values = read_auction_status_fields(
+        web3, get_auction_fields(web3, auction), block_number
+    )
+    locker = contract_registry.get_contract(
+        web3, "BaseDepositLocker", values["locker_address_in_auction"]
+    )
+    values.update(
+        read_auction_status_fields(web3, get_locker_fields(locker), block_number)
+    )
+    slasher = None
+    if values["slasher_address_in_locker"] != ZERO_ADDRESS:
+        slasher = contract_registry.get_contract(
+            web3, "ValidatorSlasher", values["slasher_address_in_locker"]
+        )
+        values.update(
+            read_auction_status_fields(web3, get_slasher_fields(slasher), block_number)
+        )
+
+    contracts = DeployedAuctionContracts(locker, slasher, auction)
+    return contracts, make_auction_status(block_number, contracts, values)
+
+
+def get_auction_fields(web3, auction: Contract) -> List[Tuple[str, Contract, str]]:
+    token_auction = contract_registry.get_contract(
+        web3, "TokenValidatorAuction", auction.address
+    )
+    return [
+        ("duration_in_days", auction, "auctionDurationInDays"),
+        ("start_price", auction, "startPrice"),
+        ("minimal_number_of_participants", auction, "minimalNumberOfParticipants"),
+        ("maximal_number_of_participants", auction, "maximalNumberOfParticipants"),
+        ("bid_token_address", token_auction, "bidToken"),
+        ("locker_address_in_auction", auction, "depositLocker"),
+    ] + get_variable_auction_status_fields(auction)
+
+
+def get_locker_fields(locker: Contract) -> List[Tuple[str, Contract, str]]:
+    return [
+        ("locker_initialized", locker, "initialized"),
+        ("locker_release_timestamp", locker, "releaseTimestamp"),
+        ("auction_address_in_locker", locker, "depositorsProxy"),
+        ("slasher_address_in_locker", locker, "slasher"),
+    ]
+
+
+def get_slasher_fields(slasher: Contract) -> List[Tuple[str, Contract, str]]:
+    return [
+        ("slasher_initialized", slasher, "initialized"),
+        ("locker_address_in_slasher", slasher, "depositContract"),
+    ]
+
+
+def make_auction_status(
+    block_number: int, contracts: DeployedAuctionContracts, values: Dict[str, Any]
+) -> AuctionStatus:
+    """Builds the auction status from the values read by field name"""
+    if contracts.slasher is None:
+        slasher_address = ZERO_ADDRESS
+        slasher_initialized = False
+        locker_address_in_slasher = ZERO_ADDRESS
+    else:
+        slasher_address = contracts.slasher.address
+        slasher_initialized = values["slasher_initialized"]
+        locker_address_in_slasher = values["locker_address_in_slasher"]
+
+    return AuctionStatus(
+        block_number=block_number,
+        auction_address=contracts.auction.address,
+        duration_in_days=values["duration_in_days"],
+        start_price=values["start_price"],
+        minimal_number_of_participants=values["minimal_number_of_participants"],
+        maximal_number_of_participants=values["maximal_number_of_participants"],
+        bid_token_address=values["bid_token_address"],
+        locker_address=contracts.locker.address,
+        locker_initialized=values["locker_initialized"],
+        locker_release_timestamp=values["locker_release_timestamp"],
+        slasher_address=slasher_address,
+        slasher_initialized=slasher_initialized,
+        locker_address_in_auction=values["locker_address_in_auction"],
+        auction_address_in_locker=values["auction_address_in_locker"],
+        slasher_address_in_locker=values["slasher_address_in_locker"],
+        locker_address_in_slasher=locker_address_in_slasher,
+        auction_state=values["auction_state"],
+        start_time=values["start_time"],
+        close_time=values["close_time"],
+        lowest_slot_price=values["lowest_slot_price"],
+        current_price=values["current_price"],
+    )
+
+
+def refresh_auction_status(
+    web3,
+    contracts: DeployedAuctionContracts,
+    status: AuctionStatus,
+    block_number: Optional[int] = None,
+) -> AuctionStatus:
+    """Returns `status` at a newer block, only the fields changing throughout the auction are read again"""
+    if block_number is None:
+        block_number = web3.eth.blockNumber
+
+    return status._replace(
+        block_number=block_number,
+        **read_auction_status_fields(
+            web3, get_variable_auction_status_fields(contracts.auction), block_number
+        ),
+    )
+
+
+def watch_auction_status(
+    web3,
+    contracts: DeployedAuctionContracts,
+    status: AuctionStatus,
+    *,
+    poll_interval: float = 1.0,
+) -> Iterator[AuctionStatus]:
+    """Yields the refreshed auction status for every new block, polling the block number every `poll_interval` seconds"""
+    while True:
+        block_number = web3.eth.blockNumber
+        if block_number > status.block_number:
+            status = refresh_auction_status(web3, contracts, status, block_number)
+            yield status
+        else:
+            time.sleep(poll_interval)
+
+
+def get_variable_auction_status_fields(
+    auction_contract: Contract,
+) -> List[Tuple[str, Contract, str]]:
+    return [
+        ("auction_state", auction_contract, "auctionState"),
+        ("start_time", auction_contract, "startTime"),
+        ("close_time", auction_contract, "closeTime"),
+        ("lowest_slot_price", auction_contract, "lowestSlotPrice"),
+        ("current_price", auction_contract, "currentPrice"),
+    ]
+
+
+def read_auction_status_fields(
+    web3, fields: Sequence[Tuple[str, Contract, str]], block_number: int
+) -> Dict[str, Any]:
+    """Reads the (field name, contract, function name) fields and returns the values by field name"""
+    results = call_contract_functions(
+        web3,
+        [(contract, function_name, []) for _, contract, function_name in fields],
+        block_identifier=block_number,
+        allow_errors=True,
+    )
+    values = {field_name: result for (field_name, _, _), result in zip(fields, results)}
+
+    unreadable_fields = [
+        field_name
+        for field_name, value in values.items()
+        if value is None and field_name not in OPTIONAL_AUCTION_STATUS_FIELDS
+    ]
+    if unreadable_fields:
+        raise ValueError(
+            f"Could not read {', '.join(unreadable_fields)} of the auction contracts"
+        )
+    return values
 
 
 def whitelist_addresses(
     auction_contract: Contract,
-    whitelist: Sequence[str],
+    whitelist: Iterable[str],
     *,
-    batch_size,
+    batch_size: Optional[int] = None,
     web3,
     transaction_options=None,
     private_key=None,
+    read_batch_size: int = 100,
+    on_read_progress: Optional[Callable[[int], None]] = None,
 ) -> int:
     """Add all not yet whitelisted addresses in `whitelist` to the whitelisted addresses in the auction contract.
-    Returns the number of new whitelisted addresses"""
+    Returns the number of new whitelisted addresses
+
+    The number of addresses per transaction is chosen so that a transaction fits into the gas limit given in
+    `transaction_options` or into a share of the block gas limit, and is at most `batch_size` if given.
+    All transactions are sent before waiting for them to be mined.
+    Raises `WhitelistingError` if some of the transactions fail."""
 
     if transaction_options is None:
         transaction_options = {}
 
     # only whitelist addresses that are not whitelisted yet
-    filtered_whitelist = missing_whitelisted_addresses(auction_contract, whitelist)
+    filtered_whitelist = missing_whitelisted_addresses(
+        auction_contract,
+        whitelist,
+        batch_size=read_batch_size,
+        on_progress=on_read_progress,
+    )
+    if not filtered_whitelist:
+        return 0
+
+    gas_estimate = estimate_whitelisting_gas(
+        auction_contract,
+        filtered_whitelist,
+        sender=get_sender_address(web3, transaction_options, private_key),
+    )
+    block_gas_limit = web3.eth.getBlock("latest").gasLimit
+    max_gas = transaction_options.get(
+        "gas", int(block_gas_limit * WHITELIST_TRANSACTION_BLOCK_GAS_SHARE)
+    )
+    chunk_size = gas_estimate.max_number_of_addresses(max_gas)
+    if batch_size is not None:
+        assert batch_size > 0
+        chunk_size = min(chunk_size, batch_size)
 
-    assert batch_size > 0
     chunks = [
-        filtered_whitelist[i : i + batch_size]
-        for i in range(0, len(filtered_whitelist), batch_size)
+        filtered_whitelist[i : i + chunk_size]
+        for i in range(0, len(filtered_whitelist), chunk_size)
     ]
 
-    for chunk in chunks:
-        assert len(chunk) <= batch_size
+    def get_gas_limit(chunk):
+        if "gas" in transaction_options:
+            return transaction_options["gas"]
+        return min(
+            int(gas_estimate.gas_for(len(chunk)) * WHITELIST_GAS_ESTIMATE_MARGIN),
+            block_gas_limit,
+        )
 
-        add_to_whitelist_call = auction_contract.functions.addToWhitelist(chunk)
+    tx_hashes = send_function_call_transactions(
+        [
+            (auction_contract.functions.addToWhitelist(chunk), get_gas_limit(chunk))
+            for chunk in chunks
+        ],
+        web3=web3,
+        transaction_options=transaction_options,
+        private_key=private_key,
+    )
 
-        send_function_call_transaction(
-            add_to_whitelist_call,
-            web3=web3,
-            transaction_options=transaction_options,
-            private_key=private_key,
-        )
+    failed_addresses: List[str] = []
+    for chunk, tx_hash in zip(chunks, tx_hashes):
+        if tx_hash is None or not is_transaction_successful(web3, tx_hash):
+            failed_addresses.extend(chunk)
+
+    number_of_whitelisted_addresses = len(filtered_whitelist) - len(failed_addresses)
+    if failed_addresses:
+        raise WhitelistingError(failed_addresses, number_of_whitelisted_addresses)
+
+    return number_of_whitelisted_addresses
 
+
+def estimate_whitelisting_gas(
+    auction_contract: Contract, addresses: Sequence[str], *, sender: str
+) -> WhitelistingGasEstimate:
+    """Estimate the gas used by addToWhitelist with the first two of the given not yet whitelisted addresses"""
+    gas_for_one = auction_contract.functions.addToWhitelist(addresses[:1]).estimateGas(
+        {"from": sender}
+    )
+    if len(addresses) == 1:
+        return WhitelistingGasEstimate(0, gas_for_one)
+
+    gas_for_two = auction_contract.functions.addToWhitelist(addresses[:2]).estimateGas(
+        {"from": sender}
+    )
+    gas_per_address = gas_for_two - gas_for_one
+    return WhitelistingGasEstimate(gas_for_one - gas_per_address, gas_per_address)
+
+
+def get_sender_address(web3, transaction_options: Dict, private_key=None) -> str:
+    if private_key is not None:
+        return Account.from_key(private_key).address
+    if "from" in transaction_options:
+        return transaction_options["from"]
+    return web3.eth.defaultAccount or web3.eth.accounts[0]
+
+
+def send_function_call_transactions(
+    function_calls_with_gas: Sequence[
+        Tuple[Union[ContractFunction, ContractConstructor], int]
+    ],
+    *,
+    web3,
+    transaction_options: Dict,
+    private_key=None,
+) -> List[Optional[HexBytes]]:
+    """Send a transaction for every function call or contract constructor with the given gas limit,
+    without waiting for them to be mined.
+    With a private key, all transactions are signed with consecutive nonces before the first one is sent.
+
+    Returns the transaction hashes. If the node rejects a transaction, the following ones are not sent
+    and their transaction hash is None.
+    The nonce in `transaction_options` is increased for every sent transaction.
+    """
+    options = dict(transaction_options)
+    if private_key is not None:
+        account = Account.from_key(private_key)
+        if "from" in options and options["from"] != account.address:
+            raise ValueError(
+                "From can not be set in transaction_options if a private key is used"
+            )
+        options["from"] = account.address
+        if "nonce" not in options:
+            options["nonce"] = web3.eth.getTransactionCount(
+                account.address, block_identifier="pending"
+            )
+        if "gasPrice" not in options:
+            options["gasPrice"] = web3.eth.gasPrice
+
+        raw_transactions = []
+        for function_call, gas in function_calls_with_gas:
+            transaction = function_call.buildTransaction(
+                cast(TxParams, {**options, "gas": gas})
+            )
+            raw_transactions.append(
+                account.sign_transaction(transaction).rawTransaction
+            )
+            increase_transaction_options_nonce(options)
+
+        def send(index):
+            return web3.eth.sendRawTransaction(raw_transactions[index])
+
+    else:
+        options["from"] = get_sender_address(web3, options)
+
+        def send(index):
+            function_call, gas = function_calls_with_gas[index]
+            tx_hash = function_call.transact(cast(TxParams, {**options, "gas": gas}))
+            increase_transaction_options_nonce(options)
+            return tx_hash
+
+    tx_hashes: List[Optional[HexBytes]] = [None] * len(function_calls_with_gas)
+    for index in range(len(function_calls_with_gas)):
+        try:
+            tx_hashes[index] = send(index)
+        except ValueError:
+            # the nonces of the following transactions can not be used anymore
+            break
         increase_transaction_options_nonce(transaction_options)
 
-    return len(filtered_whitelist)
+    return tx_hashes
+
+
+def is_transaction_successful(web3, tx_hash, timeout=180) -> bool:
+    """Wait for the transaction to be mined and returns whether it was successful"""
+    try:
+        receipt = web3.eth.waitForTransactionReceipt(tx_hash, timeout=timeout)
+    except TimeExhausted:
+        return False
+    return receipt.get("status") == 1
 
 
 def missing_whitelisted_addresses(
-    auction_contract: Contract, whitelist: Sequence[str]
+    auction_contract: Contract,
+    whitelist: Iterable[str],
+    *,
+    batch_size: int = 100,
+    max_concurrent_batches: int = MAX_CONCURRENT_READ_BATCHES,
+    on_progress: Optional[Callable[[int], None]] = None,
 ) -> Sequence[str]:
     """
     Returns the addresses in `whitelist` which are not yet whitelisted in the auction contract
+
+    The whitelist is read with JSON-RPC batch requests of `batch_size` calls. Against an http node up to
+    `max_concurrent_batches` batches are sent at the same time. `on_progress` is called with the number
+    of checked addresses after every batch. The whitelist is consumed lazily, so the first batches are
+    sent while a streamed whitelist is still being read.
     """
-    return [
-        address
-        for address in whitelist
-        if not auction_contract.functions.whitelist(address).call()
+    assert max_concurrent_batches > 0
+
+    web3 = auction_contract.web3
+    chunks = iter_chunks(whitelist, batch_size)
+
+    def get_whitelisted_statuses(chunk: Sequence[str]) -> List[bool]:
+        return call_contract_functions(
+            web3, [(auction_contract, "whitelist", [address]) for address in chunk]
+        )
+
+    missing_addresses: List[str] = []
+
+    def collect_missing(chunk, statuses):
+        missing_addresses.extend(
+            address
+            for address, is_whitelisted in zip(chunk, statuses)
+            if not is_whitelisted
+        )
+        if on_progress is not None:
+            on_progress(len(chunk))
+
+    if isinstance(web3.provider, HTTPProvider):
+        with ThreadPoolExecutor(max_workers=max_concurrent_batches) as executor:
+            # At most `max_concurrent_batches` chunks are in flight, the results are
+            # collected in the order of the chunks
+            pending: Deque[Tuple[Sequence[str], Future]] = deque()
+            for chunk in chunks:
+                if len(pending) == max_concurrent_batches:
+                    pending_chunk, future = pending.popleft()
+                    collect_missing(pending_chunk, future.result())
+                pending.append(
+                    (chunk, executor.submit(get_whitelisted_statuses, chunk))
+                )
+            for pending_chunk, future in pending:
+                collect_missing(pending_chunk, future.result())
+    else:
+        for chunk in chunks:
+            collect_missing(chunk, get_whitelisted_statuses(chunk))
+
+    return missing_addresses
+
+
+def call_contract_functions(
+    web3,
+    function_calls: Sequence[Tuple[Contract, str, Sequence]],
+    *,
+    block_identifier: Union[int, str] = "latest",
+    allow_errors: bool = False,
+) -> List[Any]:
+    """Calls the given (contract, function name, arguments) with one batch request and returns the decoded results in order.
+
+    With `allow_errors` the result of a failing call is None instead of raising an error.
+    """
+    if isinstance(block_identifier, int):
+        block_identifier = hex(block_identifier)
+
+    results = make_batch_request(
+        web3,
+        [
+            (
+                "eth_call",
+                [
+                    {
+                        "to": contract.address,
+                        "data": contract.encodeABI(fn_name=function_name, args=args),
+                    },
+                    block_identifier,
+                ],
+            )
+            for contract, function_name, args in function_calls
+        ],
+        allow_errors=allow_errors,
+    )
+
+    decoded_results = []
+    for (contract, function_name, _), result in zip(function_calls, results):
+        if result is not None and len(HexBytes(result)) == 0:
+            # The node returns no data when the function does not exist on the contract
+            if not allow_errors:
+                raise BadFunctionCallOutput(
+                    f"Could not decode the output of {function_name} at {contract.address}"
+                )
+            result = None
+        if result is not None:
+            result = decode_function_output(web3, contract, function_name, result)
+        decoded_results.append(result)
+    return decoded_results
+
+
+def decode_function_output(web3, contract: Contract, function_name: str, output):
+    output_types = [
+        output_abi["type"]
+        for output_abi in contract.get_function_by_name(function_name).abi["outputs"]
+    ]
+    values = [
+        to_checksum_address(value) if output_type == "address" else value
+        for output_type, value in zip(
+            output_types, web3.codec.decode_abi(output_types, HexBytes(output))
+        )
     ]
+    if len(values) == 1:
+        return values[0]
+    return values
@@ -0,0 +1,319 @@
+"""Incremental index of the events of an auction and its deposit locker
+
+The index is kept in a json file. Updating it only fetches the events of the blocks
+after the last indexed block, and the summaries are computed from the index without
+accessing the chain.
+"""
+import csv
+import json
+import os
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    cast,
+)
+
+from eth_utils import event_abi_to_log_topic, to_checksum_address
+from hexbytes import HexBytes
+from web3.contract import Contract
+
+from auction_deploy.contracts import contract_registry
+
+INDEX_FORMAT_VERSION = 1
+
+INDEXED_AUCTION_EVENTS = [
+    "AddressWhitelisted",
+    "AuctionStarted",
+    "BidSubmitted",
+    "AuctionDepositPending",
+    "AuctionEnded",
+    "AuctionFailed",
+]
+INDEXED_LOCKER_EVENTS = ["DepositorRegistered", "Deposit", "Withdraw", "Slash"]
+
+# Number of blocks of the first eth_getLogs request
+INITIAL_BLOCK_RANGE = 1000
+MAX_BLOCK_RANGE = 100_000
+# The block range is doubled after a request returned less logs than this
+FEW_LOGS_THRESHOLD = 100
+# Number of block ranges after which the index is saved while it is updated
+CHECKPOINT_INTERVAL = 50
+
+PARTICIPANTS_CSV_FIELDS = [
+    "address",
+    "whitelisted",
+    "bid_value",
+    "slot_price",
+    "bid_timestamp",
+    "depositor_registered",
+    "withdrawn_value",
+    "slashed_value",
+]
+
+
+class AuctionIndex:
+    """The events of an auction and its deposit locker up to block `last_block_number`"""
+
+    def __init__(
+        self,
+        *,
+        auction_address: str,
+        locker_address: str,
+        last_block_number: int = -1,
+        events: Optional[List[Dict[str, Any]]] = None,
+    ):
+        self.auction_address = auction_address
+        self.locker_address = locker_address
+        self.last_block_number = last_block_number
+        self.events = events if events is not None else []
+
+    @classmethod
+    def load(cls, path: str) -> "AuctionIndex":
+        with open(path) as file:
+            index = json.load(file)
+        if index.get("version") != INDEX_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported auction index version {index.get('version')} in {path}"
+            )
+        return cls(
+            auction_address=to_checksum_address(index["auctionAddress"]),
+            locker_address=to_checksum_address(index["lockerAddress"]),
+            last_block_number=index["lastBlockNumber"],
+            events=index["events"],
+        )
+
+    def save(self, path: str) -> None:
+        """Writes the index to `path`, replacing the file at once so an interrupted save keeps the old index"""
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(
+                {
+                    "version": INDEX_FORMAT_VERSION,
+                    "auctionAddress": self.auction_address,
+                    "lockerAddress": self.locker_address,
+                    "lastBlockNumber": self.last_block_number,
+                    "events": self.events,
+                },
+                file,
+            )
+        os.replace(temporary_path, path)
+
+    def get_participants(self) -> List[Dict[str, Any]]:
+        """Returns one row per whitelisted, bidding or depositing address, in the order of their first event"""
+        participants: Dict[str, Dict[str, Any]] = {}
+
+        def participant(address: str) -> Dict[str, Any]:
+            if address not in participants:
+                participants[address] = {
+                    "address": address,
+                    "whitelisted": False,
+                    "bid_value": 0,
+                    "slot_price": 0,
+                    "bid_timestamp": None,
+                    "depositor_registered": False,
+                    "withdrawn_value": 0,
+                    "slashed_value": 0,
+                }
+            return participants[address]
+
+        for event in self.events:
+            args = event["args"]
+            name = event["event"]
+            if name == "AddressWhitelisted":
+                participant(args["whitelistedAddress"])["whitelisted"] = True
+            elif name == "BidSubmitted":
+                bidder = participant(args["bidder"])
+                bidder["bid_value"] = args["bidValue"]
+                bidder["slot_price"] = args["slotPrice"]
+                bidder["bid_timestamp"] = args["timestamp"]
+            elif name == "DepositorRegistered":
+                participant(args["depositorAddress"])["depositor_registered"] = True
+            elif name == "Withdraw":
+                participant(args["withdrawer"])["withdrawn_value"] += args["value"]
+            elif name == "Slash":
+                participant(args["slashedDepositor"])["slashed_value"] += args[
+                    "slashedValue"
+                ]
+
+        return list(participants.values())
+
+    def get_summary(self) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {
+            "auction_address": self.auction_address,
+            "locker_address": self.locker_address,
+            "last_block_number": self.last_block_number,
+            "start_time": None,
+            "close_time": None,
+            "lowest_slot_price": None,
+            "final_state": None,
+        }
+        for event in self.events:
+            name = event["event"]
+            args = event["args"]
+            if name == "AuctionStarted":
+                summary["start_time"] = args["startTime"]
+            elif name in ("AuctionDepositPending", "AuctionEnded", "AuctionFailed"):
+                summary["close_time"] = args["closeTime"]
+                summary["lowest_slot_price"] = args.get("lowestSlotPrice")
+                summary["final_state"] = name[len("Auction") :]
+
+        participants = self.get_participants()
+        summary["number_of_whitelisted_addresses"] = sum(
+            participant["whitelisted"] for participant in participants
+        )
+        summary["number_of_bidders"] = sum(
+            participant["bid_timestamp"] is not None for participant in participants
+        )
+        summary["participants"] = participants
+        return summary
+
+
+def create_auction_index(
+    web3, auction_address: str, start_block_number: int = 0
+) -> AuctionIndex:
+    """Creates an empty index of the auction, which will be updated starting with `start_block_number`"""
+    auction = contract_registry.get_contract(
+        web3, "BaseValidatorAuction", auction_address
+    )
+    return AuctionIndex(
+        auction_address=auction.address,
+        locker_address=auction.functions.depositLocker().call(),
+        last_block_number=start_block_number - 1,
+    )
+
+
+def update_auction_index(
+    web3,
+    index: AuctionIndex,
+    *,
+    to_block_number: int,
+    initial_block_range: int = INITIAL_BLOCK_RANGE,
+    max_block_range: int = MAX_BLOCK_RANGE,
+    checkpoint_interval: int = CHECKPOINT_INTERVAL,
+    on_checkpoint: Optional[Callable[[AuctionIndex], None]] = None,
+) -> int:
+    """Adds the events from the block after the last indexed block up to `to_block_number` to the index
+
+    All events of the auction and locker are fetched with one eth_getLogs request per block range.
+    `on_checkpoint` is called after every `checkpoint_interval` ranges, e.g. to save the index so an
+    interrupted update can be resumed. Returns the number of new events.
+    """
+    auction = contract_registry.get_contract(
+        web3, "BaseValidatorAuction", index.auction_address
+    )
+    locker = contract_registry.get_contract(
+        web3, "BaseDepositLocker", index.locker_address
+    )
+    events_by_topic = {
+        **get_events_by_topic(auction, INDEXED_AUCTION_EVENTS, "auction"),
+        **get_events_by_topic(locker, INDEXED_LOCKER_EVENTS, "locker"),
+    }
+
+    number_of_new_events = 0
+    for range_number, (range_to_block_number, logs) in enumerate(
+        fetch_logs_in_adaptive_ranges(
+            web3,
+            [index.auction_address, index.locker_address],
+            from_block_number=index.last_block_number + 1,
+            to_block_number=to_block_number,
+            initial_block_range=initial_block_range,
+            max_block_range=max_block_range,
+        ),
+        start=1,
+    ):
+        for log in logs:
+            topic = HexBytes(log["topics"][0]) if log["topics"] else None
+            if topic not in events_by_topic:
+                continue
+            contract_name, event = events_by_topic[topic]
+            index.events.append(decode_log(contract_name, event, log))
+            number_of_new_events += 1
+        index.last_block_number = range_to_block_number
+        if on_checkpoint is not None and range_number % checkpoint_interval == 0:
+            on_checkpoint(index)
+
+    return number_of_new_events
+
+
+def get_events_by_topic(
+    contract: Contract, event_names: Sequence[str], contract_name: str
+) -> Dict[HexBytes, Tuple[str, Any]]:
+    """Returns the (contract name, event) of the given events by the topic of their logs"""
+    return {
+        HexBytes(event_abi_to_log_topic(cast(Dict[str, Any], event_abi))): (
+            contract_name,
+            getattr(contract.events, event_abi["name"])(),
+        )
+        for event_abi in contract.abi
+        if event_abi["type"] == "event" and event_abi["name"] in event_names
+    }
+
+
+def decode_log(contract_name: str, event, log) -> Dict[str, Any]:
+    event_data = event.processLog(log)
+    return {
+        "contract": contract_name,
+        "event": event_data["event"],
+        "blockNumber": event_data["blockNumber"],
+        "transactionHash": HexBytes(event_data["transactionHash"]).hex(),
+        "logIndex": event_data["logIndex"],
+        "args": dict(event_data["args"]),
+    }
+
+
+def fetch_logs_in_adaptive_ranges(
+    web3,
+    addresses: Sequence[str],
+    *,
+    from_block_number: int,
+    to_block_number: int,
+    initial_block_range: int = INITIAL_BLOCK_RANGE,
+    max_block_range: int = MAX_BLOCK_RANGE,
+) -> Iterator[Tuple[int, List]]:
+    """Yields (last block number of the range, logs of the range) for consecutive block ranges
+
+    The range is halved when the node fails to answer, e.g. because a range contains too many
+    logs, and doubled after a range with few logs.
+    """
+    block_range = initial_block_range
+    while from_block_number <= to_block_number:
+        range_to_block_number = min(
+            from_block_number + block_range - 1, to_block_number
+        )
+        try:
+            logs = web3.eth.getLogs(
+                {
+                    "address": list(addresses),
+                    "fromBlock": from_block_number,
+                    "toBlock": range_to_block_number,
+                }
+            )
+        except ValueError:
+            if block_range == 1:
+                raise
+            block_range = max(1, block_range // 2)
+            continue
+
+        yield range_to_block_number, logs
+
+        from_block_number = range_to_block_number + 1
+        if len(logs) < FEW_LOGS_THRESHOLD:
+            block_range = min(block_range * 2, max_block_range)
+
+
+def export_participants_csv(index: AuctionIndex, file: IO[str]) -> None:
+    writer = csv.DictWriter(file, fieldnames=PARTICIPANTS_CSV_FIELDS)
+    writer.writeheader()
+    writer.writerows(index.get_participants())
+
+
+def export_summary_json(index: AuctionIndex, file: IO[str]) -> None:
+    json.dump(index.get_summary(), file, indent=2)
+    file.write("\n")
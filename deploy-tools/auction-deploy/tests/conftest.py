@@ -12,9 +12,16 @@ import pytest
 from deploy_tools.cli import test_json_rpc
 from deploy_tools.deploy import deploy_compiled_contract, load_contracts_json
 from eth_keyfile import create_keyfile_json
+from eth_tester.exceptions import TransactionFailed
 from eth_utils import to_canonical_address
 
-from auction_deploy.core import AuctionOptions
+import auction_deploy.core
+import deploy_tools_common.rpc
+from auction_deploy.core import (
+    AuctionOptions,
+    DeployedAuctionContracts,
+    load_auction_contracts_assets,
+)
 
 RELEASE_TIMESTAMP_OFFSET = 3600 * 24 * 180
 
@@ -33,6 +40,17 @@ def remove_click_options_environment_variables():
 remove_click_options_environment_variables()
 
 
+@pytest.fixture(autouse=True)
+def replace_bad_function_call_output(monkeypatch):
+    # TransactionFailed is raised by eth_tester for reverting calls
+    # when BadFunctionCallOutput or a ValueError would be raised by web3,
+    # e.g. when reading the bid token or current price in `get_auction_status`
+    monkeypatch.setattr(auction_deploy.core, "BadFunctionCallOutput", TransactionFailed)
+    monkeypatch.setattr(
+        deploy_tools_common.rpc, "BadFunctionCallOutput", TransactionFailed
+    )
+
+
 def create_address_string(i: int):
     return f"0x{str(i).rjust(40, '0')}"
 
@@ -146,3 +164,37 @@ def auction_options(release_timestamp, use_token, token_contract):
     )
 
     return contract_options
+
+
+@pytest.fixture()
+def deploy_uninitialized_auction_contracts(auction_options):
+    """return a function deploying the auction contracts without initializing the locker and slasher"""
+
+    def deploy(web3) -> DeployedAuctionContracts:
+        locker_assets, slasher_assets, auction_assets = load_auction_contracts_assets(
+            auction_options.token_address is not None
+        )
+        locker = deploy_compiled_contract(
+            abi=locker_assets["abi"], bytecode=locker_assets["bytecode"], web3=web3
+        )
+        slasher = deploy_compiled_contract(
+            abi=slasher_assets["abi"], bytecode=slasher_assets["bytecode"], web3=web3
+        )
+        auction_constructor_args: tuple = (
+            auction_options.start_price,
+            auction_options.auction_duration,
+            auction_options.minimal_number_of_participants,
+            auction_options.maximal_number_of_participants,
+            locker.address,
+        )
+        if auction_options.token_address is not None:
+            auction_constructor_args += (auction_options.token_address,)
+        auction = deploy_compiled_contract(
+            abi=auction_assets["abi"],
+            bytecode=auction_assets["bytecode"],
+            web3=web3,
+            constructor_args=auction_constructor_args,
+        )
+        return DeployedAuctionContracts(locker, slasher, auction)
+
+    return deploy
@@ -1,19 +1,14 @@
 import csv
+import json
 import re
 
 import pytest
 from click.testing import CliRunner
 from deploy_tools.cli import test_json_rpc, test_provider
-from eth_tester.exceptions import TransactionFailed
 from eth_utils import to_checksum_address
 
-import auction_deploy.core
 from auction_deploy.cli import AuctionState, main
-from auction_deploy.core import (
-    DeployedAuctionContracts,
-    deploy_auction_contracts,
-    get_deployed_auction_contracts,
-)
+from auction_deploy.core import DeployedAuctionContracts, get_deployed_auction_contracts
 
 
 @pytest.fixture
@@ -85,14 +80,11 @@ def contracts(deployed_auction_address) -> DeployedAuctionContracts:
 
 
 @pytest.fixture
-def contracts_not_initialized(auction_options) -> DeployedAuctionContracts:
+def contracts_not_initialized(
+    deploy_uninitialized_auction_contracts,
+) -> DeployedAuctionContracts:
     """return the three auction related contracts where locker and slasher are not initialized"""
-
-    contracts = deploy_auction_contracts(
-        web3=test_json_rpc, auction_options=auction_options
-    )
-
-    return contracts
+    return deploy_uninitialized_auction_contracts(test_json_rpc)
 
 
 @pytest.fixture
@@ -301,17 +293,6 @@ def test_cli_deposit_bids(runner, deposit_pending_auction, ensure_auction_state)
     ensure_auction_state(AuctionState.Ended)
 
 
-@pytest.fixture()
-def replace_bad_function_call_output():
-    # TransactionFailed is raised by eth_tester
-    # when BadFunctionCallOutput would be raised by web3 in `get_bid_token_address`
-    bad_function_call = auction_deploy.core.BadFunctionCallOutput
-    auction_deploy.core.BadFunctionCallOutput = TransactionFailed
-    yield
-    auction_deploy.core.BadFunctionCallOutput = bad_function_call
-
-
-@pytest.mark.usefixtures("replace_bad_function_call_output")
 def test_cli_auction_status(runner, deployed_auction_address):
 
     result = runner.invoke(
@@ -320,7 +301,6 @@ def test_cli_auction_status(runner, deployed_auction_address):
     assert result.exit_code == 0
 
 
-@pytest.mark.usefixtures("replace_bad_function_call_output")
 def test_cli_auction_status_locker_not_init(runner, contracts_not_initialized):
 
     result = runner.invoke(
@@ -342,6 +322,18 @@ def test_cli_whitelist(runner, deployed_auction_address, whitelist_file, whiteli
     assert result.output == f"Number of whitelisted addresses: {len(whitelist)}\n"
 
 
+def test_cli_whitelist_without_batch_size(
+    runner, deployed_auction_address, whitelist_file, whitelist
+):
+    result = runner.invoke(
+        main,
+        args=f"whitelist --file {whitelist_file} --address {deployed_auction_address} "
+        + "--jsonrpc test",
+    )
+    assert result.exit_code == 0
+    assert result.output == f"Number of whitelisted addresses: {len(whitelist)}\n"
+
+
 def test_cli_check_whitelist_not_whitelisted(
     runner, deployed_auction_address, whitelist_file, whitelist
 ):
@@ -369,7 +361,6 @@ def test_cli_check_whitelist_all_whitelisted(
     assert result.output == f"All {len(whitelist)} addresses have been whitelisted\n"
 
 
-@pytest.mark.usefixtures("replace_bad_function_call_output")
 def test_cli_not_checksummed_address(runner, deployed_auction_address):
 
     address = deployed_auction_address.lower()
@@ -392,3 +383,82 @@ def test_cli_incorrect_address_parameter_fails(runner):
         in result.output
     )
     assert result.exit_code == 2
+
+
+def test_cli_check_whitelist_read_batch_size(
+    runner, whitelisted_auction_address, whitelist_file, whitelist
+):
+    result = runner.invoke(
+        main,
+        args=f"check-whitelist --file {whitelist_file} --address {whitelisted_auction_address} "
+        + "--read-batch-size 7 --jsonrpc test",
+    )
+    assert result.exit_code == 0
+    assert result.output == f"All {len(whitelist)} addresses have been whitelisted\n"
+
+
+def test_cli_index_and_export(
+    runner, deposit_pending_auction, ether_owning_whitelist, tmp_path
+):
+    index_file = tmp_path / "index.json"
+
+    result = runner.invoke(
+        main,
+        args=f"index --address {deposit_pending_auction.address} --index-file {index_file} "
+        + "--confirmations 0 --jsonrpc test",
+    )
+    assert result.exit_code == 0
+
+    result = runner.invoke(main, args=f"export-index --index-file {index_file}")
+    assert result.exit_code == 0
+
+    participants = list(csv.DictReader(result.output.splitlines()))
+    assert len(participants) == len(ether_owning_whitelist)
+    bidders = [
+        participant["address"]
+        for participant in participants
+        if participant["bid_timestamp"]
+    ]
+    assert bidders == ether_owning_whitelist[:2]
+
+
+def test_cli_index_resumes(runner, deposit_pending_auction, tmp_path):
+    index_file = tmp_path / "index.json"
+    index_command = (
+        f"index --address {deposit_pending_auction.address} --index-file {index_file} "
+        + "--confirmations 0 --jsonrpc test"
+    )
+    runner.invoke(main, args=index_command)
+
+    runner.invoke(
+        main,
+        args=f"deposit-bids --jsonrpc test --address {deposit_pending_auction.address}",
+    )
+    result = runner.invoke(main, args=index_command)
+    assert result.exit_code == 0
+    assert result.output.startswith("Indexed 2 new events")
+
+    result = runner.invoke(
+        main, args=f"export-index --index-file {index_file} --format json"
+    )
+    assert result.exit_code == 0
+    assert json.loads(result.output)["final_state"] == "Ended"
+
+
+def test_cli_index_resumes_with_lowercase_address(
+    runner, deposit_pending_auction, tmp_path
+):
+    index_file = tmp_path / "index.json"
+    index_command = (
+        f"index --address {deposit_pending_auction.address} --index-file {index_file} "
+        + "--confirmations 0 --jsonrpc test"
+    )
+    runner.invoke(main, args=index_command)
+
+    index = json.loads(index_file.read_text())
+    index["auctionAddress"] = index["auctionAddress"].lower()
+    index_file.write_text(json.dumps(index))
+
+    result = runner.invoke(main, args=index_command)
+    assert result.exit_code == 0
+    assert result.output.startswith("Indexed 0 new events")
@@ -0,0 +1,10 @@
+from auction_deploy.contracts import contract_registry
+
+
+def test_contract_registry_ships_the_auction_contracts(web3):
+    factory = contract_registry.get_contract_factory(web3, "ETHValidatorAuction")
+
+    assert (
+        contract_registry.get_contract_factory(web3, "ETHValidatorAuction") is factory
+    )
+    assert factory.bytecode
@@ -1,58 +1,22 @@
 import pytest
 
 from auction_deploy.core import (
-    AuctionOptions,
     DeployedAuctionContracts,
     DeployedContractsAddresses,
-    deploy_auction_contracts,
-    initialize_auction_contracts,
+    compute_contract_address,
+    deploy_and_initialize_auction_contracts,
+    estimate_whitelisting_gas,
+    get_auction_status,
+    get_deployed_auction_status,
     missing_whitelisted_addresses,
+    watch_auction_status,
     whitelist_addresses,
 )
 
 
 @pytest.fixture()
-def deployed_contracts(web3, auction_options):
-
-    deployed_contracts: DeployedAuctionContracts = deploy_auction_contracts(
-        web3=web3, auction_options=auction_options
-    )
-
-    return deployed_contracts
-
-
-def test_deploy_contracts(web3, auction_options: AuctionOptions):
-
-    deployed_contracts: DeployedAuctionContracts = deploy_auction_contracts(
-        web3=web3, auction_options=auction_options
-    )
-
-    assert (
-        deployed_contracts.auction.functions.startPrice().call()
-        == auction_options.start_price
-    )
-    assert (
-        deployed_contracts.auction.functions.auctionDurationInDays().call()
-        == auction_options.auction_duration
-    )
-    assert (
-        deployed_contracts.auction.functions.minimalNumberOfParticipants().call()
-        == auction_options.minimal_number_of_participants
-    )
-    assert (
-        deployed_contracts.auction.functions.maximalNumberOfParticipants().call()
-        == auction_options.maximal_number_of_participants
-    )
-    if auction_options.token_address is not None:
-        assert (
-            deployed_contracts.auction.functions.bidToken().call()
-            == auction_options.token_address
-        )
-
-    assert deployed_contracts.locker.functions.initialized().call() is False
-
-    assert deployed_contracts.slasher is not None
-    assert deployed_contracts.slasher.functions.initialized().call() is False
+def deployed_contracts(web3, deploy_uninitialized_auction_contracts):
+    return deploy_uninitialized_auction_contracts(web3)
 
 
 @pytest.fixture(params=[True, False])
@@ -132,7 +96,78 @@ def already_initialized_contract_addresses(
     )
 
 
-def test_resume_deploy_contracts(
+def test_deploy_and_initialize_contracts(web3, auction_options):
+
+    block_number = web3.eth.blockNumber
+    contracts = deploy_and_initialize_auction_contracts(
+        web3=web3, auction_options=auction_options
+    )
+
+    # three deployments and two init transactions
+    assert web3.eth.blockNumber == block_number + 5
+    assert (
+        contracts.auction.functions.startPrice().call() == auction_options.start_price
+    )
+    assert (
+        contracts.auction.functions.auctionDurationInDays().call()
+        == auction_options.auction_duration
+    )
+    assert (
+        contracts.auction.functions.minimalNumberOfParticipants().call()
+        == auction_options.minimal_number_of_participants
+    )
+    assert (
+        contracts.auction.functions.maximalNumberOfParticipants().call()
+        == auction_options.maximal_number_of_participants
+    )
+    if auction_options.token_address is not None:
+        assert (
+            contracts.auction.functions.bidToken().call()
+            == auction_options.token_address
+        )
+    assert (
+        contracts.locker.functions.releaseTimestamp().call()
+        == auction_options.release_timestamp
+    )
+    assert contracts.locker.functions.initialized().call() is True
+    assert contracts.slasher.functions.initialized().call() is True
+    assert (
+        contracts.locker.functions.depositorsProxy().call() == contracts.auction.address
+    )
+    assert contracts.locker.functions.slasher().call() == contracts.slasher.address
+    assert (
+        contracts.slasher.functions.depositContract().call() == contracts.locker.address
+    )
+    assert (
+        contracts.auction.functions.depositLocker().call() == contracts.locker.address
+    )
+
+
+def test_deploy_and_initialize_contracts_with_private_key_and_nonce(
+    web3, auction_options, default_account, account_keys
+):
+    nonce = web3.eth.getTransactionCount(default_account)
+    transaction_options = {"nonce": nonce}
+
+    contracts = deploy_and_initialize_auction_contracts(
+        web3=web3,
+        transaction_options=transaction_options,
+        private_key=account_keys[0],
+        auction_options=auction_options,
+    )
+
+    assert transaction_options["nonce"] == nonce + 5
+    assert contracts.locker.address == compute_contract_address(default_account, nonce)
+    assert contracts.slasher.address == compute_contract_address(
+        default_account, nonce + 1
+    )
+    assert contracts.auction.address == compute_contract_address(
+        default_account, nonce + 2
+    )
+    assert contracts.locker.functions.initialized().call() is True
+
+
+def test_resume_deploy_and_initialize_contracts(
     web3, auction_options, already_deployed_contract_addresses
 ):
     if (
@@ -140,66 +175,52 @@ def test_resume_deploy_contracts(
         and already_deployed_contract_addresses.locker is None
     ):
         with pytest.raises(ValueError):
-            deploy_auction_contracts(
+            deploy_and_initialize_auction_contracts(
                 web3=web3,
                 auction_options=auction_options,
                 already_deployed_contracts=already_deployed_contract_addresses,
             )
-    else:
-        deployed_contracts: DeployedAuctionContracts = deploy_auction_contracts(
-            web3=web3,
-            auction_options=auction_options,
-            already_deployed_contracts=already_deployed_contract_addresses,
-        )
+        return
 
-        if already_deployed_contract_addresses.auction is not None:
-            assert (
-                deployed_contracts.auction.address
-                == already_deployed_contract_addresses.auction
-            )
-        if already_deployed_contract_addresses.locker is not None:
-            assert (
-                deployed_contracts.locker.address
-                == already_deployed_contract_addresses.locker
-            )
-        if already_deployed_contract_addresses.slasher is not None:
-            assert (
-                deployed_contracts.slasher.address
-                == already_deployed_contract_addresses.slasher
-            )
+    contracts = deploy_and_initialize_auction_contracts(
+        web3=web3,
+        auction_options=auction_options,
+        already_deployed_contracts=already_deployed_contract_addresses,
+    )
 
+    for name in ("auction", "locker", "slasher"):
+        already_deployed_address = getattr(already_deployed_contract_addresses, name)
+        if already_deployed_address is not None:
+            assert getattr(contracts, name).address == already_deployed_address
+    assert contracts.locker.functions.initialized().call() is True
+    assert contracts.slasher.functions.initialized().call() is True
 
-def test_init_contracts(deployed_contracts, web3, release_timestamp, auction_options):
 
-    initialize_auction_contracts(
-        web3=web3,
-        contracts=deployed_contracts,
-        release_timestamp=release_timestamp,
-        token_address=auction_options.token_address,
-    )
+def test_compute_contract_address(web3, default_account):
+    nonce = web3.eth.getTransactionCount(default_account)
+    # minimal init code deploying an empty contract
+    tx_hash = web3.eth.sendTransaction({"from": default_account, "data": "0x00"})
 
-    assert deployed_contracts.locker.functions.initialized().call() is True
-    assert deployed_contracts.slasher.functions.initialized().call() is True
+    assert web3.eth.getTransactionReceipt(
+        tx_hash
+    ).contractAddress == compute_contract_address(default_account, nonce)
 
 
-def test_resume_init_contracts(
-    already_initialized_contract_addresses, web3, release_timestamp, auction_options
+def test_resume_initialize_contracts(
+    already_initialized_contract_addresses, web3, auction_options
 ):
-    initialize_auction_contracts(
+    contracts = deploy_and_initialize_auction_contracts(
         web3=web3,
-        contracts=already_initialized_contract_addresses,
-        release_timestamp=release_timestamp,
-        token_address=auction_options.token_address,
+        auction_options=auction_options,
+        already_deployed_contracts=DeployedContractsAddresses(
+            locker=already_initialized_contract_addresses.locker.address,
+            slasher=already_initialized_contract_addresses.slasher.address,
+            auction=already_initialized_contract_addresses.auction.address,
+        ),
     )
 
-    assert (
-        already_initialized_contract_addresses.locker.functions.initialized().call()
-        is True
-    )
-    assert (
-        already_initialized_contract_addresses.slasher.functions.initialized().call()
-        is True
-    )
+    assert contracts.locker.functions.initialized().call() is True
+    assert contracts.slasher.functions.initialized().call() is True
 
 
 def test_whitelist_addresses(deployed_contracts, whitelist, web3):
@@ -264,3 +285,160 @@ def test_whitelist_only_not_whitelisted(deployed_contracts, whitelist, web3):
     number2 = whitelist_addresses(auction_contract, whitelist, batch_size=10, web3=web3)
 
     assert number2 == len(whitelist) - number1
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 1000])
+def test_whitelist_filter_batch_size(deployed_contracts, whitelist, web3, batch_size):
+
+    auction_contract = deployed_contracts.auction
+
+    whitelist_addresses(auction_contract, whitelist[::2], batch_size=10, web3=web3)
+
+    assert (
+        missing_whitelisted_addresses(
+            auction_contract, whitelist, batch_size=batch_size
+        )
+        == whitelist[1::2]
+    )
+
+
+def test_whitelist_filter_progress(deployed_contracts, whitelist):
+
+    progress = []
+    missing_whitelisted_addresses(
+        deployed_contracts.auction,
+        whitelist,
+        batch_size=7,
+        on_progress=progress.append,
+    )
+
+    assert sum(progress) == len(whitelist)
+    assert all(number_of_addresses <= 7 for number_of_addresses in progress)
+
+
+def test_whitelist_addresses_without_batch_size(deployed_contracts, whitelist, web3):
+    auction_contract = deployed_contracts.auction
+
+    block_number = web3.eth.blockNumber
+    amount = whitelist_addresses(auction_contract, whitelist, web3=web3)
+
+    assert amount == len(whitelist)
+    assert missing_whitelisted_addresses(auction_contract, whitelist) == []
+    # all addresses fit into one transaction
+    assert web3.eth.blockNumber == block_number + 1
+
+
+def test_whitelist_addresses_chunked_by_gas_limit(
+    deployed_contracts, whitelist, web3, default_account
+):
+    auction_contract = deployed_contracts.auction
+    gas_estimate = estimate_whitelisting_gas(
+        auction_contract, whitelist, sender=default_account
+    )
+
+    block_number = web3.eth.blockNumber
+    amount = whitelist_addresses(
+        auction_contract,
+        whitelist,
+        web3=web3,
+        transaction_options={"gas": gas_estimate.gas_for(10)},
+    )
+
+    assert amount == len(whitelist)
+    assert missing_whitelisted_addresses(auction_contract, whitelist) == []
+    assert web3.eth.blockNumber == block_number + len(whitelist) // 10
+
+
+def test_estimate_whitelisting_gas(deployed_contracts, whitelist, default_account):
+    auction_contract = deployed_contracts.auction
+
+    gas_estimate = estimate_whitelisting_gas(
+        auction_contract, whitelist, sender=default_account
+    )
+
+    estimated_gas = auction_contract.functions.addToWhitelist(whitelist).estimateGas(
+        {"from": default_account}
+    )
+    assert gas_estimate.gas_for(len(whitelist)) == pytest.approx(
+        estimated_gas, rel=0.01
+    )
+
+
+def test_get_auction_status(deployed_contracts, web3, auction_options):
+    status = get_auction_status(web3, deployed_contracts)
+
+    assert status.block_number == web3.eth.blockNumber
+    assert status.auction_address == deployed_contracts.auction.address
+    assert status.start_price == auction_options.start_price
+    assert status.duration_in_days == auction_options.auction_duration
+    assert (
+        status.maximal_number_of_participants
+        == auction_options.maximal_number_of_participants
+    )
+    assert status.bid_token_address == auction_options.token_address
+    assert status.locker_initialized is False
+    assert status.slasher_address == deployed_contracts.slasher.address
+    assert status.auction_state == 0
+    # currentPrice can only be called on a started auction
+    assert status.current_price is None
+
+
+def test_get_auction_status_at_block(deployed_contracts, web3, auction_options):
+    block_number = web3.eth.blockNumber
+    deploy_and_initialize_auction_contracts(
+        web3=web3,
+        auction_options=auction_options,
+        already_deployed_contracts=DeployedContractsAddresses(
+            locker=deployed_contracts.locker.address,
+            slasher=deployed_contracts.slasher.address,
+            auction=deployed_contracts.auction.address,
+        ),
+    )
+
+    assert get_auction_status(web3, deployed_contracts).locker_initialized is True
+    assert (
+        get_auction_status(
+            web3, deployed_contracts, block_number=block_number
+        ).locker_initialized
+        is False
+    )
+
+
+def test_get_deployed_auction_status(web3, auction_options):
+    contracts = deploy_and_initialize_auction_contracts(
+        web3=web3, auction_options=auction_options
+    )
+
+    read_contracts, status = get_deployed_auction_status(
+        web3, contracts.auction.address
+    )
+
+    assert read_contracts.locker.address == contracts.locker.address
+    assert read_contracts.slasher.address == contracts.slasher.address
+    assert status == get_auction_status(web3, contracts, status.block_number)
+
+
+def test_watch_auction_status(web3, auction_options):
+    contracts = deploy_and_initialize_auction_contracts(
+        web3=web3, auction_options=auction_options
+    )
+    status = get_auction_status(web3, contracts)
+
+    contracts.auction.functions.startAuction().transact()
+    refreshed_status = next(
+        watch_auction_status(web3, contracts, status, poll_interval=0)
+    )
+
+    assert refreshed_status.block_number == status.block_number + 1
+    assert refreshed_status.auction_state == 1
+    assert refreshed_status.start_time > 0
+    assert refreshed_status.current_price is not None
+    assert (
+        refreshed_status._replace(
+            block_number=status.block_number,
+            auction_state=status.auction_state,
+            start_time=status.start_time,
+            current_price=status.current_price,
+        )
+        == status
+    )
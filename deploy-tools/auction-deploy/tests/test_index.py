@@ -0,0 +1,170 @@
+import csv
+import io
+
+import pytest
+
+from auction_deploy.index import (
+    AuctionIndex,
+    export_participants_csv,
+    fetch_logs_in_adaptive_ranges,
+)
+
+AUCTION_ADDRESS = "0x" + "1" * 40
+LOCKER_ADDRESS = "0x" + "2" * 40
+BIDDER = "0x" + "a" * 40
+WHITELISTED = "0x" + "b" * 40
+
+
+class FakeEth:
+    """Answers eth_getLogs with one log per block and fails for ranges over `max_range` blocks"""
+
+    def __init__(self, max_range):
+        self.max_range = max_range
+        self.requested_ranges = []
+
+    def getLogs(self, filter_params):  # noqa: N802
+        from_block, to_block = filter_params["fromBlock"], filter_params["toBlock"]
+        self.requested_ranges.append((from_block, to_block))
+        if to_block - from_block + 1 > self.max_range:
+            raise ValueError("query returned more than 10000 results")
+        return [{"blockNumber": block} for block in range(from_block, to_block + 1)]
+
+
+class FakeWeb3:
+    def __init__(self, max_range):
+        self.eth = FakeEth(max_range)
+
+
+def make_event(name, block_number, **args):
+    return {
+        "contract": "auction",
+        "event": name,
+        "blockNumber": block_number,
+        "transactionHash": "0x" + "0" * 64,
+        "logIndex": 0,
+        "args": args,
+    }
+
+
+@pytest.fixture()
+def auction_index():
+    return AuctionIndex(
+        auction_address=AUCTION_ADDRESS,
+        locker_address=LOCKER_ADDRESS,
+        last_block_number=20,
+        events=[
+            make_event("AddressWhitelisted", 1, whitelistedAddress=BIDDER),
+            make_event("AddressWhitelisted", 1, whitelistedAddress=WHITELISTED),
+            make_event("AuctionStarted", 2, startTime=1000),
+            make_event(
+                "BidSubmitted",
+                3,
+                bidder=BIDDER,
+                bidValue=500,
+                slotPrice=400,
+                timestamp=1010,
+            ),
+            make_event(
+                "AuctionEnded",
+                4,
+                closeTime=2000,
+                lowestSlotPrice=400,
+                totalParticipants=1,
+            ),
+            make_event("Withdraw", 10, withdrawer=BIDDER, value=400),
+        ],
+    )
+
+
+@pytest.mark.parametrize("max_range", [1, 7, 1000])
+def test_fetch_logs_in_adaptive_ranges(max_range):
+    web3 = FakeWeb3(max_range)
+
+    ranges = list(
+        fetch_logs_in_adaptive_ranges(
+            web3,
+            [AUCTION_ADDRESS],
+            from_block_number=5,
+            to_block_number=300,
+            initial_block_range=16,
+        )
+    )
+
+    logs = [log for _, logs in ranges for log in logs]
+    assert [log["blockNumber"] for log in logs] == list(range(5, 301))
+    assert ranges[-1][0] == 300
+
+
+def test_fetch_logs_in_adaptive_ranges_grows_range():
+    web3 = FakeWeb3(max_range=1000)
+
+    list(
+        fetch_logs_in_adaptive_ranges(
+            web3,
+            [AUCTION_ADDRESS],
+            from_block_number=0,
+            to_block_number=69,
+            initial_block_range=10,
+        )
+    )
+
+    assert web3.eth.requested_ranges == [(0, 9), (10, 29), (30, 69)]
+
+
+def test_fetch_logs_in_adaptive_ranges_fails_for_single_block():
+    web3 = FakeWeb3(max_range=0)
+
+    with pytest.raises(ValueError):
+        list(
+            fetch_logs_in_adaptive_ranges(
+                web3, [AUCTION_ADDRESS], from_block_number=0, to_block_number=10
+            )
+        )
+
+
+def test_auction_index_save_and_load(auction_index, tmp_path):
+    path = str(tmp_path / "index.json")
+
+    auction_index.save(path)
+    loaded_index = AuctionIndex.load(path)
+
+    assert loaded_index.auction_address == AUCTION_ADDRESS
+    assert loaded_index.locker_address == LOCKER_ADDRESS
+    assert loaded_index.last_block_number == 20
+    assert loaded_index.events == auction_index.events
+
+
+def test_auction_index_participants(auction_index):
+    participants = auction_index.get_participants()
+
+    assert [participant["address"] for participant in participants] == [
+        BIDDER,
+        WHITELISTED,
+    ]
+    assert participants[0]["bid_value"] == 500
+    assert participants[0]["slot_price"] == 400
+    assert participants[0]["withdrawn_value"] == 400
+    assert participants[1]["whitelisted"] is True
+    assert participants[1]["bid_timestamp"] is None
+
+
+def test_auction_index_summary(auction_index):
+    summary = auction_index.get_summary()
+
+    assert summary["start_time"] == 1000
+    assert summary["close_time"] == 2000
+    assert summary["lowest_slot_price"] == 400
+    assert summary["final_state"] == "Ended"
+    assert summary["number_of_whitelisted_addresses"] == 2
+    assert summary["number_of_bidders"] == 1
+
+
+def test_export_participants_csv(auction_index):
+    file = io.StringIO()
+
+    export_participants_csv(auction_index, file)
+
+    rows = list(csv.DictReader(io.StringIO(file.getvalue())))
+    assert len(rows) == 2
+    assert rows[0]["address"] == BIDDER
+    assert rows[0]["bid_value"] == "500"
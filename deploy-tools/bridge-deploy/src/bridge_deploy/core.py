@@ -1,18 +1,10 @@
-import json
-import os
 from typing import Dict
 
 from deploy_tools.deploy import deploy_compiled_contract
 from web3 import Web3
 from web3.contract import Contract
 
-SCRIPT_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
-
-
-def load_contract(contract_name, file_name="contracts"):
-    with open(f"{SCRIPT_DIRECTORY}/{file_name}.json") as json_file:
-        contract_data = json.load(json_file)
-        return contract_data[contract_name]
+from bridge_deploy.contracts import contract_registry
 
 
 def deploy_foreign_bridge_contract(
@@ -26,11 +18,9 @@ def deploy_foreign_bridge_contract(
     if transaction_options is None:
         transaction_options = {}
 
-    foreign_bridge_src = load_contract("ForeignBridge")
-
     return deploy_compiled_contract(
-        abi=foreign_bridge_src["abi"],
-        bytecode=foreign_bridge_src["bytecode"],
+        abi=contract_registry.get_abi("ForeignBridge"),
+        bytecode=contract_registry.get_bytecode("ForeignBridge"),
         constructor_args=(token_contract_address,),
         web3=web3,
         transaction_options=transaction_options,
@@ -50,11 +40,9 @@ def deploy_home_bridge_contract(
     if transaction_options is None:
         transaction_options = {}
 
-    home_bridge_src = load_contract("HomeBridge")
-
     return deploy_compiled_contract(
-        abi=home_bridge_src["abi"],
-        bytecode=home_bridge_src["bytecode"],
+        abi=contract_registry.get_abi("HomeBridge"),
+        bytecode=contract_registry.get_bytecode("HomeBridge"),
         constructor_args=(
             validator_proxy_contract_address,
             validators_required_percent,
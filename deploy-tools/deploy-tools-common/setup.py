@@ -0,0 +1,4 @@
+from setuptools import setup
+
+# configuration is read from setup.cfg
+setup()
@@ -0,0 +1,112 @@
+"""Registry of the compiled contracts shipped in the contracts.json of a deploy tool
+
+The contracts.json is parsed once per process, on first use. If the environment variable
+`DEPLOY_TOOLS_CONTRACTS_CACHE_DIR` is set, the abi and bytecode of the contracts are also
+cached in that directory, keyed by the hash of the contracts.json, so that later processes
+do not need to parse the json again.
+"""
+import hashlib
+import json
+import marshal
+import os
+import sys
+import weakref
+from typing import Dict, Optional, Type
+
+import pkg_resources
+from eth_utils import to_checksum_address
+from web3.contract import Contract
+
+CACHE_DIRECTORY_ENV_VAR = "DEPLOY_TOOLS_CONTRACTS_CACHE_DIR"
+
+# The fields of the compiled contracts that are kept in the cache
+COMPILED_CONTRACT_FIELDS = ("abi", "bytecode")
+
+
+class ContractRegistry:
+    """The compiled contracts in the file `filename` of the package `package_name`"""
+
+    def __init__(
+        self,
+        package_name: str,
+        filename: str = "contracts.json",
+        cache_directory: Optional[str] = None,
+    ):
+        self.package_name = package_name
+        self.filename = filename
+        self.cache_directory = cache_directory
+        self._compiled_contracts: Optional[Dict[str, Dict]] = None
+        self._contract_factories: weakref.WeakKeyDictionary = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @property
+    def compiled_contracts(self) -> Dict[str, Dict]:
+        if self._compiled_contracts is None:
+            self._compiled_contracts = self._load_compiled_contracts()
+        return self._compiled_contracts
+
+    def get_abi(self, contract_name: str):
+        return self.compiled_contracts[contract_name]["abi"]
+
+    def get_bytecode(self, contract_name: str) -> str:
+        return self.compiled_contracts[contract_name]["bytecode"]
+
+    def get_contract_factory(self, web3, contract_name: str) -> Type[Contract]:
+        """Returns the contract class of `contract_name` for `web3`, it is only built once per web3 instance"""
+        factories = self._contract_factories.setdefault(web3, {})
+        if contract_name not in factories:
+            factories[contract_name] = web3.eth.contract(
+                abi=self.get_abi(contract_name),
+                bytecode=self.get_bytecode(contract_name),
+            )
+        return factories[contract_name]
+
+    def get_contract(self, web3, contract_name: str, address: str) -> Contract:
+        return self.get_contract_factory(web3, contract_name)(
+            address=to_checksum_address(address)
+        )
+
+    def _load_compiled_contracts(self) -> Dict[str, Dict]:
+        contracts_json = pkg_resources.resource_string(self.package_name, self.filename)
+        cache_directory = self.cache_directory or os.environ.get(
+            CACHE_DIRECTORY_ENV_VAR
+        )
+        if not cache_directory:
+            return json.loads(contracts_json)
+
+        # marshal is not compatible between python versions
+        cache_path = os.path.join(
+            cache_directory,
+            f"{self.package_name}-{hashlib.sha256(contracts_json).hexdigest()}"
+            f"-py{sys.version_info.major}{sys.version_info.minor}.marshal",
+        )
+        try:
+            with open(cache_path, "rb") as cache_file:
+                # loads of the whole content is a lot faster than load from the file
+                return marshal.loads(cache_file.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+
+        compiled_contracts = digest_compiled_contracts(json.loads(contracts_json))
+        try:
+            os.makedirs(cache_directory, exist_ok=True)
+            temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(temporary_path, "wb") as cache_file:
+                marshal.dump(compiled_contracts, cache_file)
+            os.replace(temporary_path, cache_path)
+        except OSError:
+            # The cache is optional, the contracts could still be loaded
+            pass
+        return compiled_contracts
+
+
+def digest_compiled_contracts(compiled_contracts: Dict) -> Dict[str, Dict]:
+    return {
+        contract_name: {
+            field: compiled_contract[field]
+            for field in COMPILED_CONTRACT_FIELDS
+            if field in compiled_contract
+        }
+        for contract_name, compiled_contract in compiled_contracts.items()
+    }
@@ -0,0 +1,132 @@
+"""Reading and comparing lists of addresses, e.g. whitelists or validator lists
+
+The csv files are read row by row, so that large files can be processed while they are
+read. The memory used still grows with the number of distinct addresses, as the set of
+already seen addresses is kept to find duplicates.
+"""
+import csv
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+)
+
+from deploy_tools.files import InvalidAddressException, validate_and_format_address
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class AddressDiff(NamedTuple):
+    # in the expected and in the actual addresses, in the order of the actual addresses
+    common: List[str]
+    # only in the expected addresses, in the order of the expected addresses
+    missing: List[str]
+    # only in the actual addresses, in the order of the actual addresses
+    unexpected: List[str]
+
+
+class DuplicateAddressException(Exception):
+    pass
+
+
+def iter_addresses_in_csv(
+    file_path: str, *, on_duplicate: Optional[Callable[[str, int], None]] = None
+) -> Iterator[str]:
+    """Yields the checksummed addresses of the first column of the csv file
+
+    Empty rows are skipped. Raises `InvalidAddressException` for the first invalid address.
+    Raises `DuplicateAddressException` for the first address that was already in the file,
+    unless `on_duplicate` is given, which is then called with the address and its line number
+    and the address is skipped."""
+    seen_addresses: Set[str] = set()
+    with open(file_path, newline="") as file:
+        for line_number, row in enumerate(csv.reader(file), start=1):
+            if not row or not row[0].strip():
+                continue
+            try:
+                address = validate_and_format_address(row[0].strip())
+            except InvalidAddressException:
+                raise InvalidAddressException(
+                    f"Invalid address {row[0]!r} in line {line_number} of {file_path}"
+                )
+            if address in seen_addresses:
+                if on_duplicate is None:
+                    raise DuplicateAddressException(
+                        f"Duplicate address {address} in line {line_number} of {file_path}"
+                    )
+                on_duplicate(address, line_number)
+                continue
+            seen_addresses.add(address)
+            yield address
+
+
+def iter_address_chunks_in_csv(
+    file_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    *,
+    on_duplicate: Optional[Callable[[str, int], None]] = None,
+) -> Iterator[List[str]]:
+    """Yields the addresses of the csv file in lists of at most `chunk_size` addresses"""
+    return iter_chunks(
+        iter_addresses_in_csv(file_path, on_duplicate=on_duplicate), chunk_size
+    )
+
+
+def read_addresses_in_csv(
+    file_path: str, *, on_duplicate: Optional[Callable[[str, int], None]] = None
+) -> List[str]:
+    return list(iter_addresses_in_csv(file_path, on_duplicate=on_duplicate))
+
+
+def count_rows_in_csv(file_path: str) -> int:
+    """Returns the number of non empty rows of the csv file without validating them
+
+    This is a cheap upper bound of the number of addresses in the file, e.g. for a progress bar."""
+    with open(file_path, newline="") as file:
+        return sum(1 for row in csv.reader(file) if row and row[0].strip())
+
+
+def iter_chunks(items: Iterable, chunk_size: int) -> Iterator[List]:
+    assert chunk_size > 0
+    chunk: List = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def diff_addresses(
+    expected_addresses: Iterable[str], actual_addresses: Sequence[str]
+) -> AddressDiff:
+    """Compares the expected addresses, e.g. of a file, to the actual addresses, e.g. of a contract
+
+    Runs in linear time, the expected addresses are consumed only once and can be streamed."""
+    actual_address_set = set(actual_addresses)
+    expected_address_set: Set[str] = set()
+    missing = []
+    for address in expected_addresses:
+        if address in expected_address_set:
+            continue
+        expected_address_set.add(address)
+        if address not in actual_address_set:
+            missing.append(address)
+
+    return AddressDiff(
+        common=[
+            address for address in actual_addresses if address in expected_address_set
+        ],
+        missing=missing,
+        unexpected=[
+            address
+            for address in actual_addresses
+            if address not in expected_address_set
+        ],
+    )
@@ -0,0 +1,95 @@
+"""JSON-RPC batch requests, which web3 does not support"""
+import json
+from typing import Any, Dict, List, Sequence, Tuple
+
+from eth_utils import to_bytes
+from web3 import HTTPProvider
+from web3._utils.request import make_post_request
+from web3.exceptions import BadFunctionCallOutput
+
+
+class BatchRequestError(Exception):
+    """The node did not answer a JSON-RPC batch request with a response for every call"""
+
+
+def make_batch_request(
+    web3, method_calls: Sequence[Tuple[str, List]], *, allow_errors: bool = False
+) -> List[Any]:
+    """Send the given (method, params) calls as one JSON-RPC batch request and returns their results in order.
+
+    Batch requests are only supported over http, with other providers the calls are made one after another.
+    The batch is posted like the requests of the http provider, with its session, headers and timeout. The
+    middlewares of web3 do not support batch requests and are not applied: a failed batch is not retried
+    and the results are returned as sent by the node, without e.g. the handling of the extra data of
+    geth proof of authority blocks.
+    With `allow_errors` the result of a failing call is None instead of raising an error.
+    """
+    if not method_calls:
+        return []
+    if not isinstance(web3.provider, HTTPProvider):
+        results = []
+        for method, params in method_calls:
+            try:
+                results.append(web3.manager.request_blocking(method, params))
+            except (ValueError, BadFunctionCallOutput):
+                if not allow_errors:
+                    raise
+                results.append(None)
+        return results
+
+    endpoint_uri = web3.provider.endpoint_uri
+    if endpoint_uri is None:
+        raise ValueError(
+            "The http provider has no endpoint uri to send the batch request to"
+        )
+
+    batch = [
+        {"jsonrpc": "2.0", "method": method, "params": params, "id": request_id}
+        for request_id, (method, params) in enumerate(method_calls)
+    ]
+    responses = web3.provider.decode_rpc_response(
+        make_post_request(
+            endpoint_uri,
+            to_bytes(text=json.dumps(batch)),
+            **web3.provider.get_request_kwargs(),
+        )
+    )
+    if not isinstance(responses, list):
+        # A node rejecting the whole batch answers with a single error response
+        if isinstance(responses, dict) and "error" in responses:
+            raise BatchRequestError(
+                f"The node rejected the batch request: {responses['error']}"
+            )
+        raise BatchRequestError(
+            f"Expected a list of responses to the batch request, got {responses!r}"
+        )
+
+    responses_by_id = {
+        response.get("id"): response
+        for response in responses
+        if isinstance(response, dict)
+    }
+    results = []
+    for request in batch:
+        if request["id"] not in responses_by_id:
+            raise BatchRequestError(
+                f"The node did not answer the call of {request['method']} with id {request['id']}"
+            )
+        results.append(
+            get_json_rpc_result(
+                responses_by_id[request["id"]], allow_errors=allow_errors
+            )
+        )
+    return results
+
+
+def get_json_rpc_result(response: Dict, *, allow_errors: bool = False) -> Any:
+    if "error" in response:
+        if allow_errors:
+            return None
+        raise ValueError(response["error"])
+    if "result" not in response:
+        raise BatchRequestError(
+            f"The response to the call with id {response['id']} has neither a result nor an error"
+        )
+    return response["result"]
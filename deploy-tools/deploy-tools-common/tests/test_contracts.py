@@ -0,0 +1,92 @@
+import json
+
+import pytest
+from web3 import EthereumTesterProvider, Web3
+
+from deploy_tools_common.contracts import ContractRegistry
+
+COMPILED_CONTRACTS = {
+    "Empty": {
+        "abi": [],
+        "bytecode": "0x6080604052",
+        "metadata": "not needed to deploy or call the contract",
+    }
+}
+
+
+@pytest.fixture()
+def contracts_package(tmp_path, monkeypatch):
+    """Name of a package shipping a contracts.json"""
+    package_path = tmp_path / "package" / "contracts_package"
+    package_path.mkdir(parents=True)
+    (package_path / "__init__.py").write_text("")
+    (package_path / "contracts.json").write_text(json.dumps(COMPILED_CONTRACTS))
+    monkeypatch.syspath_prepend(str(tmp_path / "package"))
+    return "contracts_package"
+
+
+@pytest.fixture()
+def cache_directory(tmp_path):
+    path = tmp_path / "cache"
+    path.mkdir()
+    return path
+
+
+def test_contract_registry_loads_contracts_once(contracts_package, monkeypatch):
+    registry = ContractRegistry(contracts_package)
+    compiled_contracts = registry.compiled_contracts
+
+    def fail_loading():
+        raise AssertionError("The contracts were loaded again")
+
+    monkeypatch.setattr(registry, "_load_compiled_contracts", fail_loading)
+    assert registry.compiled_contracts is compiled_contracts
+    assert registry.get_abi("Empty") == []
+    assert registry.get_bytecode("Empty") == "0x6080604052"
+
+
+def test_contract_registry_cache(contracts_package, cache_directory):
+    registry = ContractRegistry(contracts_package, cache_directory=str(cache_directory))
+    registry.compiled_contracts
+
+    assert len(list(cache_directory.iterdir())) == 1
+
+    cached_registry = ContractRegistry(
+        contracts_package, cache_directory=str(cache_directory)
+    )
+    # only the fields needed to deploy and call the contracts are cached
+    assert cached_registry.compiled_contracts == {
+        "Empty": {"abi": [], "bytecode": "0x6080604052"}
+    }
+
+
+def test_contract_registry_cache_from_environment(
+    contracts_package, cache_directory, monkeypatch
+):
+    monkeypatch.setenv("DEPLOY_TOOLS_CONTRACTS_CACHE_DIR", str(cache_directory))
+    ContractRegistry(contracts_package).compiled_contracts
+
+    assert len(list(cache_directory.iterdir())) == 1
+
+
+def test_contract_registry_ignores_broken_cache(contracts_package, cache_directory):
+    ContractRegistry(
+        contracts_package, cache_directory=str(cache_directory)
+    ).compiled_contracts
+    for cache_file in cache_directory.iterdir():
+        cache_file.write_bytes(b"broken")
+
+    registry = ContractRegistry(contracts_package, cache_directory=str(cache_directory))
+    assert registry.get_bytecode("Empty") == "0x6080604052"
+
+
+def test_contract_factory_is_built_once(contracts_package):
+    registry = ContractRegistry(contracts_package)
+    web3 = Web3(EthereumTesterProvider())
+    factory = registry.get_contract_factory(web3, "Empty")
+
+    assert registry.get_contract_factory(web3, "Empty") is factory
+    assert factory.bytecode
+
+    other_web3 = Web3(EthereumTesterProvider())
+    assert registry.get_contract_factory(other_web3, "Empty") is not factory
@@ -0,0 +1,83 @@
+import pytest
+from deploy_tools.files import InvalidAddressException
+from eth_utils import to_checksum_address
+
+from deploy_tools_common.files import (
+    DuplicateAddressException,
+    count_rows_in_csv,
+    diff_addresses,
+    iter_address_chunks_in_csv,
+    iter_chunks,
+    read_addresses_in_csv,
+)
+
+ADDRESSES = [to_checksum_address(f"0x{i:040x}") for i in range(1, 6)]
+
+
+@pytest.fixture()
+def address_file(tmp_path):
+    file_path = tmp_path / "addresses.csv"
+    file_path.write_text(
+        "\n".join([ADDRESSES[0].lower(), ADDRESSES[1], "", ADDRESSES[0], ADDRESSES[2]])
+        + "\n"
+    )
+    return str(file_path)
+
+
+def test_read_addresses_in_csv_duplicate_address(address_file):
+    with pytest.raises(DuplicateAddressException, match="line 4"):
+        read_addresses_in_csv(address_file)
+
+
+def test_read_addresses_in_csv_skip_duplicates(address_file):
+    duplicates = []
+
+    addresses = read_addresses_in_csv(
+        address_file,
+        on_duplicate=lambda address, line_number: duplicates.append(
+            (address, line_number)
+        ),
+    )
+
+    assert addresses == ADDRESSES[:3]
+    assert duplicates == [(ADDRESSES[0], 4)]
+
+
+def test_read_addresses_in_csv_invalid_address(tmp_path):
+    file_path = tmp_path / "addresses.csv"
+    file_path.write_text(f"{ADDRESSES[0]}\n0x1234\n")
+
+    with pytest.raises(InvalidAddressException, match="line 2"):
+        read_addresses_in_csv(str(file_path))
+
+
+def test_iter_address_chunks_in_csv(address_file):
+    assert list(
+        iter_address_chunks_in_csv(
+            address_file, chunk_size=2, on_duplicate=lambda *args: None
+        )
+    ) == [ADDRESSES[:2], ADDRESSES[2:3]]
+
+
+def test_count_rows_in_csv(address_file):
+    assert count_rows_in_csv(address_file) == 4
+
+
+def test_iter_chunks_is_lazy():
+    def items():
+        yield 1
+        yield 2
+        raise AssertionError("Read too far")
+
+    assert next(iter_chunks(items(), 2)) == [1, 2]
+
+
+def test_diff_addresses():
+    diff = diff_addresses(
+        iter([ADDRESSES[0], ADDRESSES[1], ADDRESSES[1], ADDRESSES[2]]),
+        [ADDRESSES[3], ADDRESSES[2], ADDRESSES[0]],
+    )
+
+    assert diff.common == [ADDRESSES[2], ADDRESSES[0]]
+    assert diff.missing == [ADDRESSES[1]]
+    assert diff.unexpected == [ADDRESSES[3]]
@@ -0,0 +1,113 @@
+import json
+
+import pytest
+from web3 import EthereumTesterProvider, HTTPProvider, Web3
+
+import deploy_tools_common.rpc
+from deploy_tools_common.rpc import BatchRequestError, make_batch_request
+
+
+@pytest.fixture()
+def http_web3():
+    return Web3(HTTPProvider("http://node.test:8545", request_kwargs={"timeout": 3}))
+
+
+@pytest.fixture()
+def posted_batches(monkeypatch):
+    """Stub the http requests of the batch requests, answering with `responses`"""
+    posted = []
+    responses = []
+
+    def make_post_request(endpoint_uri, data, **kwargs):
+        posted.append((endpoint_uri, json.loads(data), kwargs))
+        return json.dumps(responses.pop(0)).encode()
+
+    monkeypatch.setattr(deploy_tools_common.rpc, "make_post_request", make_post_request)
+    return posted, responses
+
+
+def test_make_batch_request(http_web3, posted_batches):
+    posted, responses = posted_batches
+    # the node may answer the calls of a batch in any order
+    responses.append(
+        [
+            {"jsonrpc": "2.0", "id": 1, "result": "0x2"},
+            {"jsonrpc": "2.0", "id": 0, "result": "0x1"},
+        ]
+    )
+
+    results = make_batch_request(
+        http_web3, [("eth_blockNumber", []), ("eth_chainId", [])]
+    )
+
+    assert results == ["0x1", "0x2"]
+    [(endpoint_uri, batch, kwargs)] = posted
+    assert endpoint_uri == "http://node.test:8545"
+    assert [request["method"] for request in batch] == [
+        "eth_blockNumber",
+        "eth_chainId",
+    ]
+    assert kwargs["timeout"] == 3
+
+
+@pytest.mark.parametrize("allow_errors", [True, False])
+def test_make_batch_request_call_error(http_web3, posted_batches, allow_errors):
+    posted, responses = posted_batches
+    responses.append(
+        [
+            {"jsonrpc": "2.0", "id": 0, "result": "0x1"},
+            {"jsonrpc": "2.0", "id": 1, "error": {"code": -32000, "message": "fail"}},
+        ]
+    )
+    method_calls = [("eth_call", []), ("eth_call", [])]
+
+    if allow_errors:
+        assert make_batch_request(http_web3, method_calls, allow_errors=True) == [
+            "0x1",
+            None,
+        ]
+    else:
+        with pytest.raises(ValueError):
+            make_batch_request(http_web3, method_calls)
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "fail"}},
+        {"jsonrpc": "2.0", "id": 0, "result": "0x1"},
+        [{"jsonrpc": "2.0", "id": 0, "result": "0x1"}],
+        [{"jsonrpc": "2.0", "id": 0}, {"jsonrpc": "2.0", "id": 1, "result": "0x1"}],
+    ],
+)
+def test_make_batch_request_invalid_response(http_web3, posted_batches, response):
+    posted, responses = posted_batches
+    responses.append(response)
+
+    with pytest.raises(BatchRequestError):
+        make_batch_request(http_web3, [("eth_call", []), ("eth_call", [])])
+
+
+def test_make_batch_request_empty(http_web3, posted_batches):
+    posted, responses = posted_batches
+
+    assert make_batch_request(http_web3, []) == []
+    assert posted == []
+
+
+def test_make_batch_request_without_http_provider():
+    web3 = Web3(EthereumTesterProvider())
+
+    assert make_batch_request(web3, [("eth_blockNumber", []), ("eth_chainId", [])]) == [
+        web3.eth.blockNumber,
+        web3.eth.chainId,
+    ]
+
+
+def test_make_batch_request_without_endpoint_uri(http_web3, posted_batches):
+    posted, responses = posted_batches
+    http_web3.provider.endpoint_uri = None
+
+    with pytest.raises(ValueError):
+        make_batch_request(http_web3, [("eth_blockNumber", [])])
+    assert posted == []
@@ -1,3 +1,5 @@
+from typing import List
+
 import click
 from deploy_tools.cli import (
     auto_nonce_option,
@@ -11,19 +13,26 @@ from deploy_tools.cli import (
     retrieve_private_key,
 )
 from deploy_tools.deploy import build_transaction_options
-from deploy_tools.files import (
-    InvalidAddressException,
-    read_addresses_in_csv,
-    validate_and_format_address,
-)
+from deploy_tools.files import InvalidAddressException, validate_and_format_address
 from web3 import EthereumTesterProvider, Web3
 
+from deploy_tools_common.files import (
+    DuplicateAddressException,
+    diff_addresses,
+    iter_addresses_in_csv,
+    read_addresses_in_csv,
+)
 from validator_set_deploy.core import (
     deploy_validator_proxy_contract,
     deploy_validator_set_contract,
     get_validator_contract,
     initialize_validator_set_contract,
 )
+from validator_set_deploy.history import (
+    get_new_epoch_changes,
+    read_history,
+    write_history,
+)
 
 # we need test_provider and test_json_rpc for running the tests in test_cli
 # they need to persist between multiple calls to runner.invoke and are
@@ -55,6 +64,15 @@ validator_set_address_option = click.option(
     envvar="VALIDATOR_CONTRACT_ADDRESS",
 )
 
+
+def read_validators_in_csv(validators_file: str) -> List[str]:
+    """Reads the validators of the csv file, a duplicate validator is an error"""
+    try:
+        return read_addresses_in_csv(validators_file)
+    except DuplicateAddressException as error:
+        raise click.BadParameter(str(error), param_hint="--validators")
+
+
 validator_file_option = click.option(
     "--validators",
     "validators_file",
@@ -100,6 +118,9 @@ def deploy(
     auto_nonce: bool,
 ) -> None:
 
+    # read the validators first, so that an invalid file is found before deploying
+    validators = read_validators_in_csv(validators_file)
+
     web3 = connect_to_json_rpc(jsonrpc)
     private_key = retrieve_private_key(keystore)
 
@@ -113,7 +134,6 @@ def deploy(
     validator_set_contract = deploy_validator_set_contract(
         web3=web3, transaction_options=transaction_options, private_key=private_key
     )
-    validators = read_addresses_in_csv(validators_file)
     initialize_validator_set_contract(
         web3=web3,
         transaction_options=transaction_options,
@@ -158,7 +178,7 @@ def deploy_proxy(
 
     validators: list = []
     if validators_file:
-        validators = read_addresses_in_csv(validators_file)
+        validators = read_validators_in_csv(validators_file)
 
     nonce = get_nonce(
         web3=web3, nonce=nonce, auto_nonce=auto_nonce, private_key=private_key
@@ -186,25 +206,30 @@ def deploy_proxy(
 def check_validators(validator_contract_address, validators_file, jsonrpc):
 
     web3 = connect_to_json_rpc(jsonrpc)
-    validators_from_file = read_addresses_in_csv(validators_file)
 
     validator_contract = get_validator_contract(
         web3=web3, address=validator_contract_address
     )
     current_validators = validator_contract.functions.getValidators().call()
+    try:
+        validators_diff = diff_addresses(
+            iter_addresses_in_csv(validators_file), current_validators
+        )
+    except DuplicateAddressException as error:
+        raise click.BadParameter(str(error), param_hint="--validators")
+    unexpected_validators = set(validators_diff.unexpected)
 
     click.echo("The current validators are:")
     for validator in current_validators:
-        if validator in validators_from_file:
+        if validator not in unexpected_validators:
             click.echo(validator)
         else:
             click.secho(f"+{validator}", fg="green")
 
     click.echo()
     click.echo("The missing validators in the contract are:")
-    for validator in validators_from_file:
-        if validator not in current_validators:
-            click.secho(f"-{validator}", fg="red")
+    for validator in validators_diff.missing:
+        click.secho(f"-{validator}", fg="red")
 
     click.echo()
     click.echo("Legend:")
@@ -213,7 +238,7 @@ def check_validators(validator_contract_address, validators_file, jsonrpc):
     click.secho("-0xaddress: in csv file but not in contract", fg="red")
     click.echo()
 
-    if validators_from_file == current_validators:
+    if not validators_diff.missing and not validators_diff.unexpected:
         click.echo(
             f"The current validators of the contract are matching the validators in the file {validators_file}"
         )
@@ -239,3 +264,42 @@ def print_validators(validator_contract_address, jsonrpc):
     click.echo()
     for validator in current_validators:
         click.echo(validator)
+
+
+@main.command(
+    short_help="Writes the added and removed validators of every epoch to a json or csv file."
+)
+@validator_set_address_option
+@click.option(
+    "--output",
+    "history_file",
+    help="Path to the json or csv file of the history, depending on the file extension. "
+    "An existing history is extended with the new epochs.",
+    type=click.Path(dir_okay=False),
+    required=True,
+)
+@click.option(
+    "--batch-size",
+    help="Number of epochs read within one batch request to the node",
+    type=click.IntRange(min=1),
+    show_default=True,
+    default=100,
+)
+@jsonrpc_option
+def history(validator_contract_address, history_file, batch_size, jsonrpc):
+
+    web3 = connect_to_json_rpc(jsonrpc)
+    validator_contract = get_validator_contract(
+        web3=web3, address=validator_contract_address
+    )
+
+    epoch_history = read_history(history_file)
+    new_epoch_changes = get_new_epoch_changes(
+        validator_contract, epoch_history, batch_size=batch_size
+    )
+    epoch_history += new_epoch_changes
+    write_history(history_file, epoch_history)
+
+    click.echo(
+        f"Added {len(new_epoch_changes)} new epochs to the history of {len(epoch_history)} epochs"
+    )
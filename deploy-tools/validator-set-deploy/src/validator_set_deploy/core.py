@@ -1,12 +1,10 @@
 from typing import Dict
 
-from deploy_tools.deploy import (
-    deploy_compiled_contract,
-    load_contracts_json,
-    send_function_call_transaction,
-)
+from deploy_tools.deploy import deploy_compiled_contract, send_function_call_transaction
 from web3.contract import Contract
 
+from validator_set_deploy.contracts import contract_registry
+
 
 def deploy_validator_set_contract(
     *, web3, transaction_options: Dict = None, private_key=None
@@ -15,10 +13,8 @@ def deploy_validator_set_contract(
     if transaction_options is None:
         transaction_options = {}
 
-    compiled_contracts = load_contracts_json(__name__)
-
-    validator_set_abi = compiled_contracts["ValidatorSet"]["abi"]
-    validator_set_bin = compiled_contracts["ValidatorSet"]["bytecode"]
+    validator_set_abi = contract_registry.get_abi("ValidatorSet")
+    validator_set_bin = contract_registry.get_bytecode("ValidatorSet")
 
     validator_set_contract: Contract = deploy_compiled_contract(
         abi=validator_set_abi,
@@ -62,10 +58,8 @@ def deploy_validator_proxy_contract(
     if transaction_options is None:
         transaction_options = {}
 
-    compiled_contracts = load_contracts_json(__name__)
-
-    validator_proxy_abi = compiled_contracts["ValidatorProxy"]["abi"]
-    validator_proxy_bin = compiled_contracts["ValidatorProxy"]["bytecode"]
+    validator_proxy_abi = contract_registry.get_abi("ValidatorProxy")
+    validator_proxy_bin = contract_registry.get_bytecode("ValidatorProxy")
 
     validator_proxy_contract: Contract = deploy_compiled_contract(
         abi=validator_proxy_abi,
@@ -81,6 +75,4 @@ def deploy_validator_proxy_contract(
 
 def get_validator_contract(*, web3, address):
 
-    validator_contract_abi = load_contracts_json(__name__)["ValidatorSet"]["abi"]
-
-    return web3.eth.contract(address=address, abi=validator_contract_abi)
+    return contract_registry.get_contract(web3, "ValidatorSet", address)
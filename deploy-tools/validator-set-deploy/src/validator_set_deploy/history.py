@@ -0,0 +1,192 @@
+"""History of the validator changes of a validator set contract
+
+The history stores the added and removed validators of every epoch. The validators of
+an epoch are the result of applying the changes of all epochs up to it, so the history
+can be extended with the new epochs without fetching the old ones again.
+"""
+import csv
+import json
+import os
+from typing import Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+from eth_utils import to_checksum_address
+from hexbytes import HexBytes
+from web3.contract import Contract
+
+from deploy_tools_common.rpc import make_batch_request
+
+HISTORY_FORMAT_VERSION = 1
+
+CSV_FIELDS = ["epoch_start_height", "change", "validator"]
+
+
+class EpochChange(NamedTuple):
+    start_height: int
+    added: List[str]
+    removed: List[str]
+
+
+def get_new_epoch_changes(
+    validator_set_contract: Contract,
+    history: Sequence[EpochChange],
+    *,
+    batch_size: int = 100,
+) -> List[EpochChange]:
+    """Returns the changes of the epochs started after the last epoch of `history`"""
+    epoch_start_heights = validator_set_contract.functions.getEpochStartHeights().call()
+    if history:
+        epoch_start_heights = [
+            height
+            for height in epoch_start_heights
+            if height > history[-1].start_height
+        ]
+
+    validators_per_epoch = get_validators_of_epochs(
+        validator_set_contract, epoch_start_heights, batch_size=batch_size
+    )
+    return compute_epoch_changes(
+        zip(epoch_start_heights, validators_per_epoch),
+        previous_validators=apply_epoch_changes(history),
+    )
+
+
+def get_validators_of_epochs(
+    validator_set_contract: Contract,
+    epoch_start_heights: Sequence[int],
+    *,
+    batch_size: int = 100,
+) -> List[List[str]]:
+    """Returns the validators of the given epochs, read with one batch request per `batch_size` epochs"""
+    web3 = validator_set_contract.web3
+    validators_per_epoch: List[List[str]] = []
+    for chunk_start in range(0, len(epoch_start_heights), batch_size):
+        results = make_batch_request(
+            web3,
+            [
+                (
+                    "eth_call",
+                    [
+                        {
+                            "to": validator_set_contract.address,
+                            "data": validator_set_contract.encodeABI(
+                                fn_name="getValidators", args=[epoch_start_height]
+                            ),
+                        },
+                        "latest",
+                    ],
+                )
+                for epoch_start_height in epoch_start_heights[
+                    chunk_start : chunk_start + batch_size
+                ]
+            ],
+        )
+        validators_per_epoch.extend(
+            [
+                to_checksum_address(validator)
+                for validator in web3.codec.decode_abi(["address[]"], HexBytes(result))[
+                    0
+                ]
+            ]
+            for result in results
+        )
+    return validators_per_epoch
+
+
+def compute_epoch_changes(
+    epochs: Iterable[Tuple[int, Sequence[str]]],
+    previous_validators: Sequence[str] = (),
+) -> List[EpochChange]:
+    """Computes the changes of the (epoch start height, validators) epochs, each compared to the epoch before"""
+    changes = []
+    validators = set(previous_validators)
+    for start_height, epoch_validators in epochs:
+        epoch_validator_set = set(epoch_validators)
+        changes.append(
+            EpochChange(
+                start_height=start_height,
+                added=sorted(epoch_validator_set - validators),
+                removed=sorted(validators - epoch_validator_set),
+            )
+        )
+        validators = epoch_validator_set
+    return changes
+
+
+def apply_epoch_changes(history: Iterable[EpochChange]) -> List[str]:
+    """Returns the validators after the last epoch of `history`"""
+    validators: set = set()
+    for change in history:
+        validators.difference_update(change.removed)
+        validators.update(change.added)
+    return sorted(validators)
+
+
+def read_history(path: str) -> List[EpochChange]:
+    """Reads the history from a json or csv file, depending on the file extension"""
+    if not os.path.exists(path):
+        return []
+
+    if is_csv_path(path):
+        changes_by_height: Dict[int, EpochChange] = {}
+        with open(path, newline="") as file:
+            for row in csv.DictReader(file):
+                start_height = int(row["epoch_start_height"])
+                change = changes_by_height.setdefault(
+                    start_height, EpochChange(start_height, [], [])
+                )
+                if row["change"] == "added":
+                    change.added.append(row["validator"])
+                elif row["change"] == "removed":
+                    change.removed.append(row["validator"])
+        return sorted(changes_by_height.values())
+
+    with open(path) as file:
+        history = json.load(file)
+    if history.get("version") != HISTORY_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported validator history version {history.get('version')} in {path}"
+        )
+    return [
+        EpochChange(epoch["startHeight"], epoch["added"], epoch["removed"])
+        for epoch in history["epochs"]
+    ]
+
+
+def write_history(path: str, history: Sequence[EpochChange]) -> None:
+    """Writes the history as json or csv, depending on the file extension
+
+    In csv every added or removed validator is a row. Epochs without changes are left out."""
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "w", newline="") as file:
+        if is_csv_path(path):
+            writer = csv.writer(file)
+            writer.writerow(CSV_FIELDS)
+            for change in history:
+                writer.writerows(
+                    [change.start_height, "added", validator]
+                    for validator in change.added
+                )
+                writer.writerows(
+                    [change.start_height, "removed", validator]
+                    for validator in change.removed
+                )
+        else:
+            json.dump(
+                {
+                    "version": HISTORY_FORMAT_VERSION,
+                    "epochs": [
+                        {
+                            "startHeight": change.start_height,
+                            "added": change.added,
+                            "removed": change.removed,
+                        }
+                        for change in history
+                    ],
+                },
+                file,
+            )
+    os.replace(temporary_path, path)
+
+
+def is_csv_path(path: str) -> bool:
+    return path.lower().endswith(".csv")
@@ -44,6 +44,20 @@ def validators_file_missing_validators(tmp_path, validator_list):
     return file_path
 
 
+@pytest.fixture()
+def validators_file_with_duplicate(tmp_path, validator_list):
+    file_path = tmp_path / "validators_duplicate.csv"
+
+    with file_path.open("w") as f:
+        writer = csv.writer(f)
+        writer.writerows(
+            [to_checksum_address(address)]
+            for address in validator_list + validator_list[:1]
+        )
+
+    return file_path
+
+
 @pytest.fixture()
 def deployed_validator_contract_address(runner, validators_file):
 
@@ -90,6 +104,20 @@ def test_deploy_proxy(runner, validators_file):
     assert result.exit_code == 0
 
 
+@pytest.mark.parametrize("command", ["deploy", "deploy-proxy"])
+def test_deploy_with_duplicate_validator(
+    runner, validators_file_with_duplicate, command
+):
+    result = runner.invoke(
+        main,
+        args=f"{command} --jsonrpc test --validators {validators_file_with_duplicate}"
+        + (f" --address {ZERO_ADDRESS}" if command == "deploy" else ""),
+    )
+
+    assert result.exit_code == 2
+    assert "Duplicate address" in result.output
+
+
 def test_deploy_proxy_no_validators(runner):
 
     result = runner.invoke(main, args="deploy-proxy --jsonrpc test")
@@ -133,3 +161,19 @@ def test_print_validators(runner, deployed_validator_contract_address):
 
     print(result.output)
     assert result.exit_code == 0
+
+
+@pytest.mark.parametrize("file_name", ["history.json", "history.csv"])
+def test_history(runner, deployed_validator_contract_address, tmp_path, file_name):
+    history_file = tmp_path / file_name
+
+    result = runner.invoke(
+        main,
+        args=f"history --jsonrpc test --address {deployed_validator_contract_address} "
+        f"--output {history_file}",
+    )
+
+    assert result.exit_code == 0
+    # the epochs start with the first finalized validator change
+    assert result.output == "Added 0 new epochs to the history of 0 epochs\n"
+    assert history_file.exists()
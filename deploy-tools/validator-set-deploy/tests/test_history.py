@@ -0,0 +1,123 @@
+import json
+
+import pytest
+from eth_abi import decode_single, encode_abi
+from eth_utils import decode_hex
+from web3 import HTTPProvider, Web3
+
+import deploy_tools_common.rpc
+from validator_set_deploy.history import (
+    EpochChange,
+    apply_epoch_changes,
+    compute_epoch_changes,
+    get_validators_of_epochs,
+    read_history,
+    write_history,
+)
+
+VALIDATORS = ["0x" + str(i) * 40 for i in range(1, 6)]
+
+
+@pytest.fixture()
+def epoch_changes():
+    return compute_epoch_changes(
+        [
+            (10, VALIDATORS[:3]),
+            (20, VALIDATORS[1:4]),
+            (30, VALIDATORS[1:4]),
+            (40, VALIDATORS[2:5]),
+        ]
+    )
+
+
+def test_compute_epoch_changes(epoch_changes):
+    assert epoch_changes == [
+        EpochChange(10, VALIDATORS[:3], []),
+        EpochChange(20, [VALIDATORS[3]], [VALIDATORS[0]]),
+        EpochChange(30, [], []),
+        EpochChange(40, [VALIDATORS[4]], [VALIDATORS[1]]),
+    ]
+
+
+def test_compute_epoch_changes_with_previous_validators():
+    assert compute_epoch_changes(
+        [(50, VALIDATORS[:2])], previous_validators=VALIDATORS[1:3]
+    ) == [EpochChange(50, [VALIDATORS[0]], [VALIDATORS[2]])]
+
+
+def test_apply_epoch_changes(epoch_changes):
+    assert apply_epoch_changes(epoch_changes) == VALIDATORS[2:5]
+    assert apply_epoch_changes(epoch_changes[:2]) == VALIDATORS[1:4]
+
+
+@pytest.mark.parametrize("file_name", ["history.json", "history.csv"])
+def test_write_and_read_history(tmp_path, epoch_changes, file_name):
+    path = str(tmp_path / file_name)
+
+    write_history(path, epoch_changes)
+    history = read_history(path)
+
+    assert apply_epoch_changes(history) == apply_epoch_changes(epoch_changes)
+    assert history[-1] == epoch_changes[-1]
+
+
+def test_read_missing_history(tmp_path):
+    assert read_history(str(tmp_path / "history.json")) == []
+
+
+GET_VALIDATORS_ABI = [
+    {
+        "name": "getValidators",
+        "type": "function",
+        "stateMutability": "view",
+        "inputs": [{"name": "_blockNumber", "type": "uint256"}],
+        "outputs": [{"name": "", "type": "address[]"}],
+    }
+]
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 100])
+def test_get_validators_of_epochs_with_batch_requests(monkeypatch, batch_size):
+    validators_by_epoch_start_height = {
+        10: VALIDATORS[:3],
+        20: VALIDATORS[1:4],
+        30: VALIDATORS[2:5],
+        40: [],
+    }
+    posted_batches = []
+
+    def make_post_request(endpoint_uri, data, **kwargs):
+        """Answer the getValidators calls of the batch, in reverse order"""
+        batch = json.loads(data)
+        posted_batches.append(batch)
+        responses = []
+        for request in batch:
+            epoch_start_height = decode_single(
+                "uint256", decode_hex(request["params"][0]["data"])[4:]
+            )
+            validators = validators_by_epoch_start_height[epoch_start_height]
+            responses.append(
+                {
+                    "jsonrpc": "2.0",
+                    "id": request["id"],
+                    "result": "0x" + encode_abi(["address[]"], [validators]).hex(),
+                }
+            )
+        return json.dumps(responses[::-1]).encode()
+
+    monkeypatch.setattr(deploy_tools_common.rpc, "make_post_request", make_post_request)
+    validator_set_contract = Web3(HTTPProvider("http://node.test:8545")).eth.contract(
+        address=Web3.toChecksumAddress("0x" + "a" * 40), abi=GET_VALIDATORS_ABI
+    )
+
+    validators_per_epoch = get_validators_of_epochs(
+        validator_set_contract, [10, 20, 30, 40], batch_size=batch_size
+    )
+
+    assert validators_per_epoch == [
+        [Web3.toChecksumAddress(validator) for validator in validators]
+        for validators in validators_by_epoch_start_height.values()
+    ]
+    assert [len(batch) for batch in posted_batches] == [
+        min(batch_size, 4 - start) for start in range(0, 4, batch_size)
+    ]